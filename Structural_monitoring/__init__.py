@@ -0,0 +1,6 @@
+"""Structural monitoring models (bridges, columns, damage detection).
+
+The submodules replace the OpenSees Tcl scripts in this folder with
+NumPy/SciPy code; import them directly, e.g.
+``from Structural_monitoring import fem, bridges``.
+"""
@@ -0,0 +1,364 @@
+# Content-addressed cache of structural analysis results
+#
+# A result is stored under the SHA-256 of a canonical encoding of
+# everything that determines it: the analysis kind, the model (matrices,
+# Frame2D / TclModel arrays, script text), the load case, the analysis
+# settings and the source of the solver modules, so equal inputs hit
+# whatever object or file they came from, and a solver change misses.
+# Floats hash by value (-0.0 == 0.0), arrays by dtype kind, shape and
+# bytes, sparse matrices in canonical CSR form, dicts in key order.
+#
+#   <dir>/<key[:2]>/<key>.npz   arrays of one result plus a JSON entry with
+#                               the non-array values and the provenance
+#   <dir>/stats.json            cumulative hit / miss / eviction counts
+#
+# Entries are written atomically (tmp file + rename), so sweep workers can
+# share a cache directory. A hit touches the file; when the directory grows
+# past max_bytes the least recently used entries are evicted. A small
+# in-process LRU in front of the disk serves repeated dashboard requests
+# without reading the file again.
+import argparse
+import copy
+import datetime
+import functools
+import hashlib
+import json
+import os
+import platform
+import time
+from collections import OrderedDict
+
+import numpy as np
+import scipy
+import scipy.sparse as sp
+
+from Structural_monitoring import fem
+
+# Bump to invalidate every stored result when the entry format changes
+CACHE_VERSION = 1
+MAX_BYTES = 2**30
+MEMORY_ITEMS = 64
+
+
+def _feed(h, obj):
+    """Update hash h with a canonical, type-tagged encoding of obj"""
+    if obj is None:
+        h.update(b'N')
+    elif isinstance(obj, (bool, np.bool_)):
+        h.update(b'B1' if obj else b'B0')
+    elif isinstance(obj, (int, np.integer)):
+        h.update(b'I%d;' % int(obj))
+    elif isinstance(obj, (float, np.floating)):
+        h.update(b'F' + float(obj + 0.0).hex().encode() + b';')
+    elif isinstance(obj, str):
+        data = obj.encode()
+        h.update(b'S%d;' % len(data) + data)
+    elif isinstance(obj, bytes):
+        h.update(b'Y%d;' % len(obj) + obj)
+    elif isinstance(obj, dict):
+        h.update(b'D%d;' % len(obj))
+        for key in sorted(obj, key=str):
+            _feed(h, str(key))
+            _feed(h, obj[key])
+    elif isinstance(obj, (list, tuple)):
+        h.update(b'L%d;' % len(obj))
+        for item in obj:
+            _feed(h, item)
+    elif isinstance(obj, (set, frozenset)):
+        _feed(h, sorted(obj, key=str))
+    elif sp.issparse(obj):
+        A = sp.csr_matrix(obj, dtype=np.result_type(obj.dtype, np.float64))
+        A.sum_duplicates()
+        A.eliminate_zeros()
+        A.sort_indices()
+        h.update(b'P')
+        _feed(h, A.shape)
+        for part in (A.data, A.indices, A.indptr):
+            _feed(h, part)
+    elif isinstance(obj, np.ndarray):
+        if obj.dtype == object:
+            _feed(h, obj.tolist())
+            return
+        if obj.dtype.kind in 'iu':
+            obj = obj.astype(np.int64)
+        elif obj.dtype.kind == 'f':
+            obj = obj.astype(np.float64) + 0.0
+        h.update(b'A' + obj.dtype.str.encode())
+        _feed(h, obj.shape)
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif hasattr(obj, '__dict__') and not callable(obj):
+        # Models: public attributes only (private ones are caches)
+        h.update(b'O' + type(obj).__qualname__.encode())
+        _feed(h, {k: v for k, v in vars(obj).items() if not k.startswith('_')})
+    else:
+        raise TypeError(f"Cannot hash a {type(obj).__name__} for the result cache")
+
+
+@functools.lru_cache(maxsize=None)
+def _source_digest(path, mtime):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def code_digest(modules=(fem,)):
+    """Digest of the source files of the solver modules"""
+    paths = sorted(os.path.abspath(m.__file__) for m in modules)
+    return [_source_digest(p, os.stat(p).st_mtime) for p in paths]
+
+
+def cache_key(kind, model, load=None, settings=None, modules=(fem,)):
+    """SHA-256 hex key of an analysis: kind, model, load case, settings and solver code"""
+    h = hashlib.sha256()
+    _feed(h, [CACHE_VERSION, kind, code_digest(modules)])
+    _feed(h, model)
+    _feed(h, load)
+    _feed(h, settings)
+    return h.hexdigest()
+
+
+def _describe(obj):
+    """Short description of an input for the provenance record"""
+    if sp.issparse(obj) or isinstance(obj, np.ndarray):
+        return f'{type(obj).__name__} {obj.shape} {obj.dtype}'
+    if isinstance(obj, (dict, list, tuple)) or np.isscalar(obj) or obj is None:
+        try:
+            text = json.dumps(obj, default=str)
+        except (TypeError, ValueError):
+            text = str(obj)
+        return text if len(text) <= 200 else text[:197] + '...'
+    return type(obj).__name__
+
+
+def provenance(key, kind, runtime, model=None, load=None, settings=None, **extra):
+    """Where a result came from: inputs, time, code and library versions"""
+    return {
+        'key': key,
+        'kind': kind,
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'runtime': runtime,
+        'inputs': {'model': _describe(model), 'load': _describe(load), 'settings': _describe(settings)},
+        'versions': {'python': platform.python_version(), 'numpy': np.__version__, 'scipy': scipy.__version__},
+        'host': platform.node(),
+        **extra,
+    }
+
+
+def _pack(result):
+    """Split a result dict into npz arrays and a JSON-able remainder"""
+    arrays, values = {}, {}
+    for name, value in result.items():
+        if isinstance(value, np.ndarray) and value.dtype != object:
+            arrays[name] = value
+        elif isinstance(value, np.generic):
+            values[name] = value.item()
+        else:
+            values[name] = value
+    return arrays, values
+
+
+class ResultCache:
+    """Directory of content-addressed results with an LRU size limit
+
+    get / put work on keys from cache_key(); compute() wraps a solver call.
+    stats() reports this session's hits and misses, and the totals over
+    every session sharing the directory.
+    """
+
+    def __init__(self, path, max_bytes=MAX_BYTES, memory_items=MEMORY_ITEMS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self._memory = OrderedDict()
+        self.counts = {'hits': 0, 'memory_hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+        os.makedirs(path, exist_ok=True)
+        self._size = sum(size for _, _, size in self._entries())
+
+    def entry_path(self, key):
+        return os.path.join(self.path, key[:2], key + '.npz')
+
+    def _entries(self):
+        """(mtime, path, size) of every stored entry"""
+        entries = []
+        for sub in os.listdir(self.path):
+            folder = os.path.join(self.path, sub)
+            if not os.path.isdir(folder):
+                continue
+            for name in os.listdir(folder):
+                if name.endswith('.npz') and not name.endswith('.tmp.npz'):
+                    try:
+                        stat = os.stat(os.path.join(folder, name))
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, os.path.join(folder, name), stat.st_size))
+        return entries
+
+    def _remember(self, key, item):
+        self._memory[key] = item
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        """(result dict, provenance dict) of a stored key, or None"""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.counts['hits'] += 1
+            self.counts['memory_hits'] += 1
+            try:
+                os.utime(self.entry_path(key))
+            except FileNotFoundError:
+                pass
+            result, meta = self._memory[key]
+            # Copies, so callers editing arrays in place cannot corrupt later hits
+            return copy.deepcopy(result), copy.deepcopy(meta)
+        try:
+            with np.load(self.entry_path(key)) as data:
+                payload = json.loads(str(data['__json__']))
+                result = {name: data[name] for name in data.files if name != '__json__'}
+            os.utime(self.entry_path(key))
+        except (FileNotFoundError, OSError, ValueError, KeyError):
+            self.counts['misses'] += 1
+            return None
+        result.update(payload['values'])
+        self.counts['hits'] += 1
+        self._remember(key, (result, payload['provenance']))
+        return copy.deepcopy(result), copy.deepcopy(payload['provenance'])
+
+    def put(self, key, result, meta):
+        """Store a result dict (arrays + JSON-able values) under key"""
+        arrays, values = _pack(result)
+        final = self.entry_path(key)
+        os.makedirs(os.path.dirname(final), exist_ok=True)
+        tmp = final + f'.{os.getpid()}.tmp.npz'
+        np.savez(tmp, __json__=json.dumps({'values': values, 'provenance': meta}), **arrays)
+        try:
+            previous = os.path.getsize(final)
+        except FileNotFoundError:
+            previous = 0
+        os.replace(tmp, final)
+        self.counts['writes'] += 1
+        self._size += os.path.getsize(final) - previous
+        self._remember(key, (copy.deepcopy(result), copy.deepcopy(meta)))
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def evict(self, max_bytes=None):
+        """Remove least recently used entries until the cache fits in max_bytes"""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = sorted(self._entries())
+        size = sum(s for _, _, s in entries)
+        for _, path, entry_size in entries:
+            if size <= limit:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+            self.counts['evictions'] += 1
+            self._memory.pop(os.path.basename(path)[:-4], None)
+        self._size = size
+
+    def clear(self):
+        self.evict(0)
+
+    def compute(self, kind, fn, model, load=None, settings=None, modules=(fem,)):
+        """fn() through the cache; returns (result dict, provenance dict)
+
+        The key covers kind, model, load and settings, which must together
+        determine fn's result, and the source of `modules`.
+        """
+        key = cache_key(kind, model, load, settings, modules)
+        hit = self.get(key)
+        if hit is not None:
+            return hit
+        start = time.perf_counter()
+        result = fn()
+        meta = provenance(key, kind, time.perf_counter() - start, model, load, settings)
+        self.put(key, result, meta)
+        return result, meta
+
+    def save_stats(self):
+        """Add this session's counts to the directory totals in stats.json"""
+        path = os.path.join(self.path, 'stats.json')
+        totals = self._totals()
+        for name, count in self.counts.items():
+            totals[name] = totals.get(name, 0) + count
+        tmp = path + f'.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(totals, f, indent=2)
+        os.replace(tmp, path)
+        self.counts = dict.fromkeys(self.counts, 0)
+
+    def _totals(self):
+        try:
+            with open(os.path.join(self.path, 'stats.json')) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def stats(self):
+        """Session counts, hit rate, stored totals and current size"""
+        lookups = self.counts['hits'] + self.counts['misses']
+        entries = self._entries()
+        return {
+            **self.counts,
+            'hit_rate': self.counts['hits'] / lookups if lookups else 0.0,
+            'entries': len(entries),
+            'bytes': sum(s for _, _, s in entries),
+            'max_bytes': self.max_bytes,
+            'totals': self._totals(),
+        }
+
+
+def eigen(cache, K, M, n_modes):
+    """fem.eigen() through the cache: (omega, phi)"""
+    result, _ = cache.compute('eigen', lambda: dict(zip(('omega', 'phi'), fem.eigen(K, M, n_modes))),
+                              {'K': K, 'M': M}, settings={'n_modes': n_modes})
+    return result['omega'], result['phi']
+
+
+def newmark(cache, M, C, K, load, dt, n_steps=None, record=None, beta=0.25, gamma=0.5):
+    """fem.newmark() through the cache (load as an array, not a callable)"""
+    if callable(load):
+        raise TypeError("Cached Newmark needs the load as an array")
+    settings = {'dt': dt, 'n_steps': n_steps, 'record': record, 'beta': beta, 'gamma': gamma}
+    result, _ = cache.compute('newmark', lambda: fem.newmark(M, C, K, load, dt, n_steps, record, beta, gamma),
+                              {'K': K, 'M': M, 'C': C}, load, settings)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Inspect or trim a structural result cache')
+    parser.add_argument('cache_dir')
+    parser.add_argument('command', choices=['stats', 'list', 'evict', 'clear'])
+    parser.add_argument('--max-bytes', type=float, default=MAX_BYTES, help='size limit for evict')
+    args = parser.parse_args(argv)
+
+    cache = ResultCache(args.cache_dir, int(args.max_bytes))
+    if args.command == 'stats':
+        stats = cache.stats()
+        totals = stats['totals']
+        lookups = totals.get('hits', 0) + totals.get('misses', 0)
+        print(f"{stats['entries']} entries, {stats['bytes'] / 2**20:.1f} MiB of {stats['max_bytes'] / 2**20:.0f} MiB")
+        print(f"Totals: {totals.get('hits', 0)} hits, {totals.get('misses', 0)} misses"
+              f" ({100 * totals.get('hits', 0) / lookups if lookups else 0:.1f} % hit rate),"
+              f" {totals.get('evictions', 0)} evictions")
+    elif args.command == 'list':
+        for mtime, path, size in sorted(cache._entries(), reverse=True):
+            with np.load(path) as data:
+                meta = json.loads(str(data['__json__']))['provenance']
+            used = datetime.datetime.fromtimestamp(mtime).isoformat(timespec='seconds')
+            print(f"{meta['key'][:12]}  {meta['kind']:10s} {size / 1024:9.1f} KiB  created {meta['created']}"
+                  f"  used {used}  {meta['runtime']:.3f} s  {meta['inputs']['settings']}")
+    elif args.command == 'evict':
+        cache.evict()
+        cache.save_stats()
+        print(f"{cache.stats()['entries']} entries left")
+    else:
+        cache.clear()
+        print("Cache cleared")
+
+
+if __name__ == '__main__':
+    main()
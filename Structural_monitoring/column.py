@@ -0,0 +1,270 @@
+# Transient driver for the soil-structure column of scy_scapper/
+#
+# The model of scy_scraper2.py / scy_scraper.tcl: a 97.5 m column (fiber
+# section, mass 10000 at the top, axial load in a Linear time series) on a
+# zeroLength soil spring with a viscous dashpot, shaken by a uniform
+# ground acceleration. run() integrates a whole record (or a batch of
+# records) in one call into preallocated arrays holding only the node DOFs
+# and element forces chosen up front:
+#   - method='linear': pure NumPy. Elastic column with the fiber section's
+#     initial stiffness, one Newmark state recurrence for all records
+#     (fem.newmark_batch); no OpenSees needed.
+#   - method='opensees': the nonlinear model through openseespy, without
+#     file recorders or per-step Python lists.
+# The column base rotation is free and the zeroLength has no rotational
+# spring, so laterally the column is a mechanism restrained only by mass
+# damping; its horizontal response does not depend on the section, and the
+# linear path reproduces the OpenSees disp.out.
+import argparse
+import os
+
+import numpy as np
+
+from Structural_monitoring import fem
+
+COLUMN = {
+    'base': (0.0, -2.5),          # node 1, fixed
+    'ground': (0.0, 0.0),         # node 2, column base on the soil spring
+    'top': (0.0, 97.5),           # node 3
+    # zeroLength -mat 1 2 3 -dir 1 2 1: material 1 (labelled vertical in the
+    # scripts) acts in X together with the dashpot, material 2 in Y
+    'soil_x': 947053750.0,
+    'soil_y': 97518125.0,
+    'soil_c': 9733.0,
+    'concrete': (-30.0, -0.002, -12.0, -0.005),   # Concrete01 fpc epsc0 fpcu epscu
+    'steel': (500.0, 200000.0, 0.01),             # Steel01 fy E0 b
+    'section': (1.0, 1.0),                        # rect patch width, depth
+    'patch_fibers': (20, 20),
+    # Straight bar layers (y, count, bar area, z extent +/-)
+    'bars': ((-0.4, 8, 0.0004909, 0.4), (0.4, 8, 0.0004909, 0.4)),
+    'integration_points': 10,
+    'mass': 10000.0,
+    'axial_load': -264000.0,
+    'rayleigh': (0.05, 0.0, 0.0, 0.05),           # alphaM betaK betaKinit betaKcomm
+}
+NODES = ('base', 'ground', 'top')
+
+
+def section_stiffness(model=COLUMN):
+    """(EA, EI) of the fiber section from its materials' initial tangents"""
+    fpc, epsc0 = model['concrete'][:2]
+    Ec = 2.0 * fpc / epsc0   # Concrete01 initial tangent
+    Es = model['steel'][1]
+    b, h = model['section']
+    bars = np.array(model['bars'], dtype=float)
+    steel_area = bars[:, 1] * bars[:, 2]
+    EA = Ec * b * h + Es * steel_area.sum()
+    EI = Ec * b * h**3 / 12 + Es * (steel_area * bars[:, 0] ** 2).sum()
+    return EA, EI
+
+
+def ground_motion(path, factor=9.81, as_opensees=False):
+    """Ground acceleration values of a record file, scaled by factor
+
+    Two-column (time, accel) files give the accel column. OpenSees'
+    `timeSeries Path -filePath f -dt dt` reads every number in the file as
+    a value instead, interleaving the time column; as_opensees=True
+    reproduces that (the scy_scapper scripts load nairobi_eq.dat that way).
+    """
+    data = np.loadtxt(path, ndmin=2)
+    if as_opensees or data.shape[1] == 1:
+        return factor * data.ravel()
+    return factor * data[:, -1]
+
+
+def excitation(accel, dt, n_steps, record_dt=None):
+    """(n_records, n_steps) ground acceleration at the analysis times (i + 1) * dt
+
+    Like a Path time series: linear interpolation between record points
+    spaced record_dt (default dt) from t = 0, zero after the record ends.
+    """
+    accel = np.atleast_2d(np.asarray(accel, dtype=float))
+    record_dt = dt if record_dt is None else record_dt
+    t = dt * np.arange(1, n_steps + 1)
+    if np.isclose(record_dt, dt):
+        out = np.zeros((len(accel), n_steps))
+        n = min(n_steps, accel.shape[1] - 1)
+        out[:, :n] = accel[:, 1:n + 1]
+        return out
+    t_record = record_dt * np.arange(accel.shape[1])
+    return np.stack([np.interp(t, t_record, a, right=0.0) for a in accel])
+
+
+def linear_model(model=COLUMN):
+    """fem.Frame2D of the elastic column with the soil spring, and (M, C, K)
+
+    Rayleigh damping acts on the column and the nodal mass only, as OpenSees
+    skips zeroLength elements unless they are built with -doRayleigh.
+    """
+    EA, EI = section_stiffness(model)
+    frame = fem.Frame2D([model[name] for name in NODES], [[1, 2]], 1.0, EA, EI)
+    frame.fix(0, 1, 1, 1)
+    frame.fix(1, 0, 1, 0)
+    frame.add_mass(2, model['mass'], 0.0)
+
+    K_col = frame.stiffness().toarray()
+    M = frame.mass().toarray()
+    alpha_m, beta_k, beta_k_init, beta_k_comm = model['rayleigh']
+    # Committed and initial stiffness coincide for a linear model
+    C = alpha_m * M + (beta_k + beta_k_init + beta_k_comm) * K_col
+    spring = frame.free_index(1, fem.UX)
+    K = K_col.copy()
+    K[spring, spring] += model['soil_x']
+    C[spring, spring] += model['soil_c']
+    return frame, M, C, K
+
+
+def _parse_dofs(nodes):
+    """((node tag, dof 1-3), ...) -> (0-based node, dof) arrays"""
+    nodes = np.atleast_2d(np.asarray(nodes, dtype=np.int64))
+    if np.any((nodes[:, 0] < 1) | (nodes[:, 0] > len(NODES)) | (nodes[:, 1] < 1) | (nodes[:, 1] > 3)):
+        raise ValueError(f"Recorded DOFs must be (node 1-{len(NODES)}, dof 1-3) pairs, got {nodes.tolist()}")
+    return nodes[:, 0] - 1, nodes[:, 1] - 1
+
+
+def run_linear(accel, dt=0.02, n_steps=1500, nodes=((3, 1),), elements=(2,), record_dt=None, model=COLUMN):
+    """Pure-NumPy linear response; see run()"""
+    ag = excitation(accel, dt, n_steps, record_dt)
+    frame, M, C, K = linear_model(model)
+    influence = np.zeros(frame.n_free)
+    influence[frame.free_index(np.arange(frame.n_nodes)[~frame.fixed[:, fem.UX]], fem.UX)] = 1.0
+    axial = np.zeros(frame.n_free)
+    axial[frame.free_index(2, fem.UY)] = model['axial_load']
+    pattern = np.column_stack([-M @ influence, axial])
+    time = dt * np.arange(1, n_steps + 1)
+    history = np.stack([ag.T, np.broadcast_to(time[:, None], ag.T.shape)], axis=1)
+    result = fem.newmark_batch(M, C, K, pattern, history, dt)
+
+    # Full (n_steps, n_dof, n_records) displacement and velocity, zeros at fixed DOFs
+    u = np.zeros((n_steps, frame.n_dof, len(ag)))
+    v = np.zeros_like(u)
+    u[:, frame.free_dofs] = result['disp']
+    v[:, frame.free_dofs] = result['vel']
+
+    node, dof = _parse_dofs(nodes)
+    disp = u[:, node * fem.NDF + dof]
+    forces = np.empty((n_steps, len(elements), 6, len(ag)))
+    k_col = frame.element_stiffness()[0]
+    col_dofs = frame.element_dofs()[0]
+    gx, gy = fem.NDF + fem.UX, fem.NDF + fem.UY   # ground node DOFs
+    for j, tag in enumerate(elements):
+        if tag == 2:
+            forces[:, j] = np.einsum('ab,tbr->tar', k_col, u[:, col_dofs])
+        elif tag == 1:
+            fx = model['soil_x'] * u[:, gx] + model['soil_c'] * v[:, gx]
+            fy = model['soil_y'] * u[:, gy]
+            zero = np.zeros_like(fx)
+            forces[:, j] = np.stack([-fx, -fy, zero, fx, fy, zero], axis=1)
+        else:
+            raise ValueError(f"Unknown element {tag}; the model has elements 1 (soil) and 2 (column)")
+    return {'time': time, 'disp': disp.transpose(2, 0, 1), 'force': forces.transpose(3, 0, 1, 2)}
+
+
+def _build_opensees(ops, accel, record_dt, model):
+    ops.wipe()
+    ops.model('basic', '-ndm', 2, '-ndf', 3)
+    for tag, name in enumerate(NODES, start=1):
+        ops.node(tag, *model[name])
+    ops.fix(1, 1, 1, 1)
+    ops.fix(2, 0, 1, 0)
+    ops.uniaxialMaterial('Elastic', 1, model['soil_x'])
+    ops.uniaxialMaterial('Elastic', 2, model['soil_y'])
+    ops.uniaxialMaterial('Viscous', 3, model['soil_c'], 1.0)
+    ops.element('zeroLength', 1, 1, 2, '-mat', 1, 2, 3, '-dir', 1, 2, 1)
+
+    ops.uniaxialMaterial('Concrete01', 4, *model['concrete'])
+    ops.uniaxialMaterial('Steel01', 5, *model['steel'])
+    b, h = model['section']
+    ops.section('Fiber', 1)
+    ops.patch('rect', 4, *model['patch_fibers'], -h / 2, -b / 2, h / 2, b / 2)
+    for y, count, area, z in model['bars']:
+        ops.layer('straight', 5, int(count), area, y, z, y, -z)
+    ops.geomTransf('Linear', 1)
+    ops.element('nonlinearBeamColumn', 2, 2, 3, model['integration_points'], 1, 1)
+    ops.mass(3, model['mass'], 0.0, 0.0)
+
+    ops.timeSeries('Linear', 2)
+    ops.pattern('Plain', 2, 2)
+    ops.load(3, 0.0, model['axial_load'], 0.0)
+    ops.timeSeries('Path', 1, '-dt', record_dt, '-values', *accel)
+    ops.pattern('UniformExcitation', 1, 1, '-accel', 1)
+    ops.rayleigh(*model['rayleigh'])
+
+    ops.system('UmfPack')
+    ops.constraints('Plain')
+    ops.integrator('Newmark', 0.5, 0.25)
+    ops.analysis('Transient')
+
+
+def run_opensees(accel, dt=0.02, n_steps=1500, nodes=((3, 1),), elements=(2,), record_dt=None, model=COLUMN):
+    """Nonlinear response through openseespy; see run()"""
+    import openseespy.opensees as ops
+
+    accel = np.atleast_2d(np.asarray(accel, dtype=float))
+    node, dof = _parse_dofs(nodes)
+    disp = np.zeros((len(accel), n_steps, len(node)))
+    forces = np.zeros((len(accel), n_steps, len(elements), 6))
+    for r, record in enumerate(accel):
+        _build_opensees(ops, record, dt if record_dt is None else record_dt, model)
+        for i in range(n_steps):
+            if ops.analyze(1, dt) != 0:
+                raise RuntimeError(f"OpenSees failed to converge at step {i + 1} of record {r}")
+            for k in range(len(node)):
+                disp[r, i, k] = ops.nodeDisp(int(node[k]) + 1, int(dof[k]) + 1)
+            for j, tag in enumerate(elements):
+                forces[r, i, j] = ops.eleResponse(int(tag), 'force')
+    ops.wipe()
+    return {'time': dt * np.arange(1, n_steps + 1), 'disp': disp, 'force': forces}
+
+
+def run(accel, dt=0.02, n_steps=1500, nodes=((3, 1),), elements=(2,), record_dt=None,
+        method='linear', model=COLUMN):
+    """Transient response of the column to one or many ground motions
+
+    accel is one record (n_points,) or a batch (n_records, n_points) of
+    ground accelerations spaced record_dt (default dt). nodes lists the
+    recorded (node tag, dof) pairs and elements the element tags (1 soil
+    spring, 2 column) whose 6 global end forces are kept, OpenSees
+    numbering. Returns dict(time (n_steps,), disp (..., n_steps, n_dofs),
+    force (..., n_steps, n_elements, 6)); the leading records axis is
+    dropped for a single record.
+    """
+    runner = {'linear': run_linear, 'opensees': run_opensees}.get(method)
+    if runner is None:
+        raise ValueError(f"Unknown method {method!r}; use 'linear' or 'opensees'")
+    single = np.ndim(accel) == 1
+    result = runner(accel, dt, n_steps, nodes, elements, record_dt, model)
+    if single:
+        result['disp'] = result['disp'][0]
+        result['force'] = result['force'][0]
+    return result
+
+
+def main(argv=None):
+    from Structural_monitoring import bridges
+
+    here = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scy_scapper')
+    parser = argparse.ArgumentParser(description='Seismic response of the scy_scapper soil-structure column')
+    parser.add_argument('record', nargs='?', default=os.path.join(here, 'nairobi_eq.dat'))
+    parser.add_argument('--method', default='linear', choices=['linear', 'opensees'])
+    parser.add_argument('--dt', type=float, default=0.02)
+    parser.add_argument('--n-steps', type=int, default=1500)
+    parser.add_argument('--factor', type=float, default=9.81, help='record scale factor (to m/s^2)')
+    parser.add_argument('--as-opensees', action='store_true',
+                        help='read the record like `timeSeries Path -filePath` (every number is a value)')
+    parser.add_argument('--out-dir', default=None, help='write disp.out and shear.out here')
+    args = parser.parse_args(argv)
+
+    accel = ground_motion(args.record, args.factor, args.as_opensees)
+    result = run(accel, args.dt, args.n_steps, method=args.method)
+    disp = result['disp'][:, 0]
+    print(f"{args.method}: peak top displacement {np.abs(disp).max():.4g}, "
+          f"peak base shear {np.abs(result['force'][:, 0, 0]).max():.4g}")
+    if args.out_dir is not None:
+        os.makedirs(args.out_dir, exist_ok=True)
+        bridges.write_recorder(os.path.join(args.out_dir, 'disp.out'), result['time'], disp[:, None])
+        bridges.write_recorder(os.path.join(args.out_dir, 'shear.out'), result['time'], result['force'][:, 0])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+# Damage-scenario modal dataset generator
+#
+# A scenario scales the stiffness of chosen elements by (1 - severity), the
+# damage model of analysis.tcl. Rather than re-solving the full eigen problem
+# per scenario, each scenario is solved by Rayleigh-Ritz on a small basis:
+#   - the baseline modes (warm start, shared by all scenarios),
+#   - the static corrections K0^-1 range(K_e) of each damaged element,
+#   - a few Krylov steps K0^-1 M applied to those corrections.
+# The damage is a low-rank update confined to the damaged elements' DOFs, so
+# every reduced matrix is gathered from Gram matrices computed once, and all
+# scenarios with the same number of damaged elements are solved together
+# with batched dense linear algebra.
+import argparse
+import itertools
+import time
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+
+from Structural_monitoring import fem
+
+
+def element_ranges(model, elements):
+    """(len(elements), 6, 3) deformation modes of each global element stiffness"""
+    # Element stiffness has 3 rigid-body modes; keep the 3 deformation modes
+    _, vectors = np.linalg.eigh(model.element_stiffness()[elements])
+    return vectors[:, :, 3:]
+
+
+def _shape_signs(shapes):
+    """Signs making the first component above 10% of each mode's peak positive
+
+    (Largest-component conventions flip between runs on antisymmetric modes,
+    whose two peaks are equal.)
+    """
+    magnitude = np.abs(shapes)
+    first = np.argmax(magnitude > 0.1 * magnitude.max(axis=-1, keepdims=True), axis=-1)
+    return np.sign(np.take_along_axis(shapes, first[..., None], axis=-1))
+
+
+class DamageModel:
+    """Reduced model for fast modal analysis of damage scenarios
+
+    candidates are the element indices that may be damaged (default all);
+    n_base baseline modes seed every Ritz basis and enrich Krylov steps
+    K0^-1 M extend each element's static corrections.
+    """
+
+    def __init__(self, model, candidates=None, n_base=12, enrich=1):
+        self.model = model
+        self.candidates = np.arange(model.n_elem) if candidates is None else np.asarray(candidates)
+        K0 = sp.csc_matrix(model.stiffness())
+        M = sp.csc_matrix(model.mass())
+        _, phi0 = fem.eigen(K0, M, min(n_base, model.n_free))
+        # Fewer modes than asked for when massless DOFs are condensed out
+        self.n_base = phi0.shape[1]
+
+        full_to_free = np.full(model.n_dof, -1, dtype=np.int64)
+        full_to_free[model.free_dofs] = np.arange(model.n_free)
+        dofs = full_to_free[model.element_dofs()[self.candidates]]
+        # Unit forces on each element's deformation modes, in free DOFs
+        modes = element_ranges(model, self.candidates)
+        forces = np.zeros((model.n_free, 3 * len(self.candidates)))
+        for i in range(len(self.candidates)):
+            keep = dofs[i] >= 0
+            forces[dofs[i][keep], 3 * i:3 * i + 3] = modes[i][keep]
+
+        solve = spla.factorized(K0)
+        corrections = solve(forces)
+        blocks = [corrections]
+        for _ in range(enrich):
+            blocks.append(solve(M @ blocks[-1]))
+        # Columns of element i: its corrections, then each Krylov step
+        per_elem = np.stack([b.reshape(model.n_free, -1, 3) for b in blocks], axis=2)
+        self.block = 3 * len(blocks)
+        W = np.hstack([phi0, per_elem.reshape(model.n_free, -1)])
+        W = W / np.linalg.norm(W, axis=0)
+
+        self.basis_vectors = W
+        self.gram_K = W.T @ (K0 @ W)
+        self.gram_M = W.T @ (M @ W)
+        # Rows of the basis at each candidate element's DOFs (fixed DOFs -> 0)
+        padded = np.vstack([W, np.zeros((1, W.shape[1]))])
+        self.elem_rows = padded[np.where(dofs >= 0, dofs, model.n_free)]
+        self.k_elem = model.element_stiffness()[self.candidates]
+
+    def columns(self, damaged):
+        """(n_scenarios, r) basis columns for sets of damaged candidate positions"""
+        base = np.broadcast_to(np.arange(self.n_base), (len(damaged), self.n_base))
+        offsets = self.n_base + self.block * damaged[:, :, None] + np.arange(self.block)
+        return np.hstack([base, offsets.reshape(len(damaged), -1)])
+
+    def _solve_group(self, damaged, levels, n_modes, points):
+        cols = self.columns(damaged)
+        K = self.gram_K[cols[:, :, None], cols[:, None, :]]
+        M = self.gram_M[cols[:, :, None], cols[:, None, :]]
+        for j in range(damaged.shape[1]):
+            rows = np.take_along_axis(self.elem_rows[damaged[:, j]], cols[:, None, :], axis=2)
+            K -= levels[:, j, None, None] * (np.swapaxes(rows, 1, 2) @ self.k_elem[damaged[:, j]] @ rows)
+
+        # Whiten K (positive definite on the basis, even when M has massless
+        # DOFs) and drop dependent directions; then M x = mu K x is standard
+        lam, Q = np.linalg.eigh(K)
+        keep = lam > 1e-12 * lam[:, -1:]
+        T = Q * np.where(keep, 1.0 / np.sqrt(np.where(keep, lam, 1.0)), 0.0)[:, None, :]
+        mu, y = np.linalg.eigh(np.swapaxes(T, 1, 2) @ M @ T)
+        mu = mu[:, ::-1][:, :n_modes]
+        y = y[:, :, ::-1][:, :, :n_modes]
+        freqs = np.sqrt(1.0 / mu) / (2 * np.pi)
+
+        V = self.basis_vectors[points][:, cols]  # (n_points, S, r)
+        shapes = np.einsum('psr,srm->smp', V, T @ y) / np.sqrt(mu)[:, :, None]
+        return freqs, shapes
+
+    def solve(self, severities, n_modes=3, points=None):
+        """Frequencies (Hz) and mode shapes for a batch of scenarios
+
+        severities is (n_scenarios, n_candidates) stiffness losses in [0, 1).
+        Mode shapes (n_scenarios, n_modes, n_points) are mass-normalized,
+        sampled at the free DOFs given by points (default all) and signed so
+        the first significant component is positive.
+        """
+        severities = np.atleast_2d(np.asarray(severities, dtype=float))
+        points = np.arange(self.model.n_free) if points is None else np.asarray(points)
+        freqs = np.empty((len(severities), n_modes))
+        shapes = np.empty((len(severities), n_modes, len(points)))
+        n_damaged = np.count_nonzero(severities, axis=1)
+        for k in np.unique(n_damaged):
+            rows = np.flatnonzero(n_damaged == k)
+            # Damaged candidate positions, in increasing order, per scenario
+            damaged = np.sort(np.argsort(severities[rows] == 0, axis=1, kind='stable')[:, :k], axis=1)
+            levels = np.take_along_axis(severities[rows], damaged, axis=1)
+            freqs[rows], shapes[rows] = self._solve_group(damaged, levels, n_modes, points)
+
+        return freqs, shapes * _shape_signs(shapes)
+
+
+def scenarios(n_candidates, severities, max_damaged=1, include_baseline=True):
+    """(n_scenarios, n_candidates) severity matrix of every combination
+
+    Each scenario damages up to max_damaged elements, each with every
+    severity in severities.
+    """
+    rows = [np.zeros(n_candidates)] if include_baseline else []
+    for k in range(1, max_damaged + 1):
+        for elements in itertools.combinations(range(n_candidates), k):
+            for levels in itertools.product(severities, repeat=k):
+                row = np.zeros(n_candidates)
+                row[list(elements)] = levels
+                rows.append(row)
+    return np.array(rows)
+
+
+def vertical_points(model):
+    """Free-DOF positions of the vertical DOF of every node that has one"""
+    nodes = np.flatnonzero(~model.fixed[:, fem.UY])
+    return model.free_index(nodes, fem.UY), nodes
+
+
+def damage_dataset(model, severities, n_modes=3, candidates=None, batch_size=512, damage_model=None):
+    """Frequency and mode-shape table for a severity matrix
+
+    One row per scenario: damage_e<k> for each candidate element, Freq1..n
+    and Mode<m>_node<j> (vertical component) for every free vertical DOF.
+    """
+    damage_model = damage_model or DamageModel(model, candidates)
+    points, nodes = vertical_points(model)
+    severities = np.atleast_2d(severities)
+    freqs = np.empty((len(severities), n_modes))
+    shapes = np.empty((len(severities), n_modes, len(points)))
+    for start in range(0, len(severities), batch_size):
+        batch = slice(start, start + batch_size)
+        freqs[batch], shapes[batch] = damage_model.solve(severities[batch], n_modes, points)
+
+    table = pd.DataFrame(severities, columns=[f'damage_e{e}' for e in damage_model.candidates])
+    for m in range(n_modes):
+        table[f'Freq{m + 1}'] = freqs[:, m]
+    mode_cols = {f'Mode{m + 1}_node{node}': shapes[:, m, j]
+                 for m in range(n_modes) for j, node in enumerate(nodes)}
+    return pd.concat([table, pd.DataFrame(mode_cols)], axis=1)
+
+
+def main(argv=None):
+    from Structural_monitoring import bridges
+
+    parser = argparse.ArgumentParser(description='Damage-scenario modal dataset for the analysis.tcl beam')
+    parser.add_argument('out', help='output CSV path')
+    parser.add_argument('--severities', default='0.1,0.2,0.3,0.4,0.5',
+                        help='comma-separated stiffness losses')
+    parser.add_argument('--max-damaged', type=int, default=2, help='elements damaged at once')
+    parser.add_argument('--n-elem', type=int, default=5, help='mesh refinement of the 10 m beam')
+    parser.add_argument('--n-modes', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    model = bridges.analysis_model(n_elem=args.n_elem)
+    severity_levels = [float(x) for x in args.severities.split(',')]
+    matrix = scenarios(model.n_elem, severity_levels, args.max_damaged)
+    table = damage_dataset(model, matrix, args.n_modes)
+    table.to_csv(args.out, index=False)
+    print(f"{len(table)} scenarios written to {args.out} in {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,486 @@
+# Python-native 2D Euler-Bernoulli frame engine
+#
+# Replaces the OpenSees Tcl interpreter for the bridge and monitoring beams.
+# Element matrices are built for all elements at once as (n_elem, 6, 6)
+# arrays and scattered into a sparse global matrix in free-DOF numbering.
+# Each node has 3 DOFs (UX, UY, RZ), numbered node * 3 + dof.
+import numpy as np
+import scipy.linalg
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+
+UX, UY, RZ = 0, 1, 2
+NDF = 3
+# Dense generalized eigen solve below this many free DOFs, sparse above
+DENSE_EIGEN_LIMIT = 1500
+
+
+class Frame2D:
+    """Array-backed 2D frame model
+
+    nodes is an (n_nodes, 2) array of coordinates and elements an
+    (n_elem, 2) array of node indices. E, A, I and mass_per_length
+    (rho * A, lumped or consistent) are scalars or per-element arrays.
+    """
+
+    def __init__(self, nodes, elements, E, A, I, mass_per_length=0.0):
+        self.nodes = np.asarray(nodes, dtype=float).reshape(-1, 2)
+        self.elements = np.asarray(elements, dtype=np.int64).reshape(-1, 2)
+        n_elem = len(self.elements)
+        self.E = np.broadcast_to(np.asarray(E, dtype=float), (n_elem,)).copy()
+        self.A = np.broadcast_to(np.asarray(A, dtype=float), (n_elem,)).copy()
+        self.I = np.broadcast_to(np.asarray(I, dtype=float), (n_elem,)).copy()
+        self.mass_per_length = np.broadcast_to(np.asarray(mass_per_length, dtype=float), (n_elem,)).copy()
+        self.fixed = np.zeros((len(self.nodes), NDF), dtype=bool)
+        self.nodal_mass = np.zeros((len(self.nodes), NDF))
+
+    @classmethod
+    def beam(cls, length, n_elem, E, A, I, mass_per_length=0.0, supports='pinned-roller'):
+        """Straight beam along x with n_elem equal elements
+
+        supports: 'pinned-roller' (bridge_car*.tcl), 'fixed-roller'
+        (analysis.tcl) or None.
+        """
+        x = np.linspace(0.0, length, n_elem + 1)
+        nodes = np.column_stack([x, np.zeros_like(x)])
+        elements = np.column_stack([np.arange(n_elem), np.arange(1, n_elem + 1)])
+        model = cls(nodes, elements, E, A, I, mass_per_length)
+        if supports == 'pinned-roller':
+            model.fix(0, 1, 1, 0)
+            model.fix(n_elem, 0, 1, 0)
+        elif supports == 'fixed-roller':
+            model.fix(0, 1, 1, 1)
+            model.fix(n_elem, 0, 1, 0)
+        elif supports is not None:
+            raise ValueError(f"Unknown supports {supports!r}")
+        return model
+
+    def copy(self):
+        other = Frame2D(self.nodes, self.elements, self.E, self.A, self.I, self.mass_per_length)
+        other.fixed = self.fixed.copy()
+        other.nodal_mass = self.nodal_mass.copy()
+        return other
+
+    @property
+    def n_nodes(self):
+        return len(self.nodes)
+
+    @property
+    def n_elem(self):
+        return len(self.elements)
+
+    @property
+    def n_dof(self):
+        return self.n_nodes * NDF
+
+    def fix(self, node, ux, uy, rz):
+        """Restrain DOFs of a node (1 = fixed), like the Tcl `fix` command"""
+        self.fixed[node] = [bool(ux), bool(uy), bool(rz)]
+
+    def add_mass(self, node, mx, my, mr=0.0):
+        """Add lumped nodal mass, like the Tcl `mass` command"""
+        self.nodal_mass[node] += [mx, my, mr]
+
+    @property
+    def free_dofs(self):
+        """Full DOF numbers of the unrestrained DOFs"""
+        return np.flatnonzero(~self.fixed.ravel())
+
+    @property
+    def n_free(self):
+        return int(np.count_nonzero(~self.fixed))
+
+    def free_index(self, node, dof):
+        """Position of (node, dof) in free-DOF vectors"""
+        full = np.full(self.n_dof, -1, dtype=np.int64)
+        full[self.free_dofs] = np.arange(self.n_free)
+        index = full[np.asarray(node) * NDF + dof]
+        if np.any(index < 0):
+            raise ValueError(f"DOF {dof} of node {node} is restrained")
+        return index
+
+    def element_dofs(self):
+        """(n_elem, 6) full DOF numbers of every element"""
+        base = self.elements * NDF
+        return np.column_stack([base[:, 0], base[:, 0] + 1, base[:, 0] + 2,
+                                base[:, 1], base[:, 1] + 1, base[:, 1] + 2])
+
+    def geometry(self):
+        """Element lengths and direction cosines"""
+        d = self.nodes[self.elements[:, 1]] - self.nodes[self.elements[:, 0]]
+        L = np.hypot(d[:, 0], d[:, 1])
+        return L, d[:, 0] / L, d[:, 1] / L
+
+    def _rotation(self, c, s):
+        T = np.zeros((len(c), 6, 6))
+        for k in (0, 3):
+            T[:, k, k] = c
+            T[:, k, k + 1] = s
+            T[:, k + 1, k] = -s
+            T[:, k + 1, k + 1] = c
+            T[:, k + 2, k + 2] = 1.0
+        return T
+
+    def local_stiffness(self):
+        """(n_elem, 6, 6) element stiffness in local axes"""
+        L, _, _ = self.geometry()
+        EA = self.E * self.A / L
+        EI = self.E * self.I
+        k = np.zeros((self.n_elem, 6, 6))
+        k[:, 0, 0] = k[:, 3, 3] = EA
+        k[:, 0, 3] = k[:, 3, 0] = -EA
+        b1, b2, b3, b4 = 12 * EI / L**3, 6 * EI / L**2, 4 * EI / L, 2 * EI / L
+        k[:, 1, 1] = k[:, 4, 4] = b1
+        k[:, 1, 4] = k[:, 4, 1] = -b1
+        k[:, 1, 2] = k[:, 2, 1] = k[:, 1, 5] = k[:, 5, 1] = b2
+        k[:, 2, 4] = k[:, 4, 2] = k[:, 4, 5] = k[:, 5, 4] = -b2
+        k[:, 2, 2] = k[:, 5, 5] = b3
+        k[:, 2, 5] = k[:, 5, 2] = b4
+        return k
+
+    def element_stiffness(self):
+        """(n_elem, 6, 6) element stiffness in global axes"""
+        _, c, s = self.geometry()
+        T = self._rotation(c, s)
+        return np.einsum('eji,ejk,ekl->eil', T, self.local_stiffness(), T)
+
+    def element_mass(self, lumped=True):
+        """(n_elem, 6, 6) element mass in global axes from mass_per_length"""
+        L, c, s = self.geometry()
+        m = self.mass_per_length * L
+        me = np.zeros((self.n_elem, 6, 6))
+        if lumped:
+            for i in (0, 1, 3, 4):
+                me[:, i, i] = m / 2
+            return me
+        f = m / 420.0
+        me[:, 0, 0] = me[:, 3, 3] = 140 * f
+        me[:, 0, 3] = me[:, 3, 0] = 70 * f
+        me[:, 1, 1] = me[:, 4, 4] = 156 * f
+        me[:, 1, 4] = me[:, 4, 1] = 54 * f
+        me[:, 1, 2] = me[:, 2, 1] = 22 * L * f
+        me[:, 4, 5] = me[:, 5, 4] = -22 * L * f
+        me[:, 1, 5] = me[:, 5, 1] = -13 * L * f
+        me[:, 2, 4] = me[:, 4, 2] = 13 * L * f
+        me[:, 2, 2] = me[:, 5, 5] = 4 * L**2 * f
+        me[:, 2, 5] = me[:, 5, 2] = -3 * L**2 * f
+        T = self._rotation(c, s)
+        return np.einsum('eji,ejk,ekl->eil', T, me, T)
+
+    def assemble(self, element_matrices, diagonal=None):
+        """Scatter (n_elem, 6, 6) matrices into a sparse free-DOF CSR matrix"""
+        dofs = self.element_dofs()
+        full_to_free = np.full(self.n_dof, -1, dtype=np.int64)
+        full_to_free[self.free_dofs] = np.arange(self.n_free)
+        rows = np.repeat(full_to_free[dofs], 6, axis=1).ravel()
+        cols = np.tile(full_to_free[dofs], (1, 6)).ravel()
+        vals = element_matrices.ravel()
+        keep = (rows >= 0) & (cols >= 0)
+        n = self.n_free
+        matrix = sp.coo_matrix((vals[keep], (rows[keep], cols[keep])), shape=(n, n)).tocsr()
+        if diagonal is not None:
+            matrix = matrix + sp.diags(diagonal.ravel()[self.free_dofs])
+        return matrix
+
+    def stiffness(self):
+        """Free-DOF global stiffness (CSR)"""
+        return self.assemble(self.element_stiffness())
+
+    def mass(self, lumped=True):
+        """Free-DOF global mass (CSR): element mass plus nodal masses"""
+        return self.assemble(self.element_mass(lumped), diagonal=self.nodal_mass)
+
+    def mass_diagonal(self):
+        """Free-DOF diagonal mass for explicit integration
+
+        Element mass is HRZ-lumped: m / 2 per node in x and y and m L^2 / 78
+        rotary inertia, so every DOF of a massive element carries mass;
+        nodal masses are added.
+        """
+        L, _, _ = self.geometry()
+        m = self.mass_per_length * L
+        diagonal = self.nodal_mass.copy()
+        for end in (0, 1):
+            nodes = self.elements[:, end]
+            for dof, value in ((UX, m / 2), (UY, m / 2), (RZ, m * L**2 / 78)):
+                np.add.at(diagonal[:, dof], nodes, value)
+        return diagonal.ravel()[self.free_dofs]
+
+    def element_frequencies(self, mass=None):
+        """Highest natural frequency (rad/s) of every element
+
+        Each node's diagonal mass (free-DOF vector, default mass_diagonal())
+        is shared equally by the elements meeting there, so the largest
+        element frequency bounds the highest frequency of the model.
+        """
+        mass = self.mass_diagonal() if mass is None else np.asarray(mass, dtype=float)
+        if np.any(mass <= 0):
+            raise ValueError("Explicit integration needs mass on every free DOF")
+        full = np.full(self.n_dof, np.inf)
+        full[self.free_dofs] = mass
+        count = np.bincount(self.elements.ravel(), minlength=self.n_nodes)
+        dofs = self.element_dofs()
+        share = full[dofs] / np.repeat(count[self.elements], NDF, axis=1)
+        scale = 1.0 / np.sqrt(share)          # fixed DOFs (infinite mass) drop out
+        k = self.element_stiffness() * scale[:, :, None] * scale[:, None, :]
+        return np.sqrt(np.maximum(np.linalg.eigvalsh(k)[:, -1], 0.0))
+
+    def critical_time_step(self, mass=None):
+        """Central-difference stability limit 2 / omega_max from the element frequencies"""
+        return 2.0 / self.element_frequencies(mass).max()
+
+
+def rayleigh(M, K, alpha_m, beta_k):
+    """C = alpha_m M + beta_k K (OpenSees `rayleigh alphaM 0 betaKinit 0`)"""
+    return alpha_m * M + beta_k * K
+
+
+def rayleigh_coefficients(zeta, omega_i, omega_j=None):
+    """alpha_m, beta_k giving damping ratio zeta at omega_i and omega_j (rad/s)"""
+    if omega_j is None:
+        return zeta * omega_i, zeta / omega_i
+    alpha_m = 2 * zeta * omega_i * omega_j / (omega_i + omega_j)
+    beta_k = 2 * zeta / (omega_i + omega_j)
+    return alpha_m, beta_k
+
+
+def _condense_massless(K, M):
+    """Exact static condensation of DOFs without mass (dense K, M)
+
+    Returns (K_condensed, M_condensed, kept, recover) where
+    recover(phi_kept) rebuilds full mode shapes.
+    """
+    massless = np.all(M == 0, axis=1)
+    if not massless.any():
+        return K, M, np.arange(len(K)), lambda phi: phi
+    kept = np.flatnonzero(~massless)
+    slave = np.flatnonzero(massless)
+    Kss = K[np.ix_(slave, slave)]
+    Ksm = K[np.ix_(slave, kept)]
+    T = -scipy.linalg.solve(Kss, Ksm, assume_a='sym')
+    K_c = K[np.ix_(kept, kept)] + K[np.ix_(kept, slave)] @ T
+    M_c = M[np.ix_(kept, kept)]
+
+    def recover(phi):
+        full = np.zeros((len(K),) + phi.shape[1:])
+        full[kept] = phi
+        full[slave] = T @ phi
+        return full
+
+    return K_c, M_c, kept, recover
+
+
+def dense_eigen(K, M, n_modes):
+    """Lowest n_modes eigenpairs by a dense generalized solve
+
+    Massless (e.g. rotational) DOFs are condensed out exactly first, so at
+    most n_free - n_massless modes are returned.
+    """
+    Kd = K.toarray() if sp.issparse(K) else np.asarray(K)
+    Md = M.toarray() if sp.issparse(M) else np.asarray(M)
+    K_c, M_c, _, recover = _condense_massless(Kd, Md)
+    n_modes = min(n_modes, len(K_c))
+    lam, phi = scipy.linalg.eigh(K_c, M_c, subset_by_index=[0, n_modes - 1])
+    return np.sqrt(np.maximum(lam, 0.0)), recover(phi)
+
+
+def eigen(K, M, n_modes):
+    """Lowest n_modes eigenpairs of K phi = lambda M phi
+
+    Returns (omega [rad/s], phi) with phi mass-normalized, one mode per
+    column in free-DOF numbering. Models up to DENSE_EIGEN_LIMIT free DOFs
+    use dense_eigen, larger ones modal.shift_invert_modes.
+    """
+    if K.shape[0] <= DENSE_EIGEN_LIMIT:
+        return dense_eigen(K, M, n_modes)
+    from Structural_monitoring.modal import shift_invert_modes
+
+    result = shift_invert_modes(K, M, n_modes)
+    return result['omega'], result['modes']
+
+
+def frequencies(model, n_modes, lumped=True):
+    """Natural frequencies (Hz) of a Frame2D model"""
+    omega, _ = eigen(model.stiffness(), model.mass(lumped), n_modes)
+    return omega / (2 * np.pi)
+
+
+def _load_rows(load, n):
+    """Step -> force vector accessor for callables, dense and sparse loads"""
+    if callable(load):
+        return lambda i: np.asarray(load(i), dtype=float)
+    if sp.issparse(load):
+        # Scatter CSR rows into a reused buffer instead of slicing the matrix
+        load = sp.csr_matrix(load, copy=True)
+        load.sum_duplicates()
+        indptr, indices, data = load.indptr, load.indices, load.data
+        buffer = np.zeros(n)
+
+        def row(i):
+            buffer[:] = 0.0
+            start, end = indptr[i], indptr[i + 1]
+            buffer[indices[start:end]] = data[start:end]
+            return buffer
+        return row
+    load = np.asarray(load, dtype=float)
+    return lambda i: load[i]
+
+
+def newmark(M, C, K, load, dt, n_steps=None, record=None, beta=0.25, gamma=0.5,
+            u0=None, v0=None):
+    """Linear Newmark time integration with a single factorization
+
+    load gives the free-DOF force vector at each step: an (n_steps, n_free)
+    dense or sparse array, or a callable step -> vector. record selects the
+    free DOFs whose histories are kept (default: all). Like OpenSees, the
+    analysis starts from rest (zero initial acceleration) and step i is at
+    time (i + 1) * dt. Returns dict(time, disp, vel, accel) with
+    (n_steps, n_record) arrays.
+    """
+    if n_steps is None:
+        n_steps = load.shape[0]
+    n = K.shape[0]
+    record = np.arange(n) if record is None else np.atleast_1d(record)
+
+    a1 = 1.0 / (beta * dt**2)
+    a2 = 1.0 / (beta * dt)
+    a3 = 1.0 / (2 * beta) - 1.0
+    a4 = gamma / (beta * dt)
+    a5 = gamma / beta - 1.0
+    a6 = dt * (gamma / (2 * beta) - 1.0)
+    K_eff = sp.csc_matrix(K + a1 * M + a4 * C)
+    solve = spla.factorized(K_eff)
+
+    load_row = _load_rows(load, n)
+    u = np.zeros(n) if u0 is None else np.array(u0, dtype=float)
+    v = np.zeros(n) if v0 is None else np.array(v0, dtype=float)
+    a = np.zeros(n)
+    disp = np.empty((n_steps, len(record)))
+    vel = np.empty_like(disp)
+    accel = np.empty_like(disp)
+
+    for i in range(n_steps):
+        rhs = load_row(i) + M @ (a1 * u + a2 * v + a3 * a) + C @ (a4 * u + a5 * v + a6 * a)
+        u_new = solve(rhs)
+        a_new = a1 * (u_new - u) - a2 * v - a3 * a
+        v = v + dt * ((1 - gamma) * a + gamma * a_new)
+        u, a = u_new, a_new
+        disp[i] = u[record]
+        vel[i] = v[record]
+        accel[i] = a[record]
+
+    return {'time': dt * np.arange(1, n_steps + 1), 'disp': disp, 'vel': vel, 'accel': accel}
+
+
+def newmark_batch(M, C, K, pattern, history, dt, record=None, beta=0.25, gamma=0.5):
+    """Linear Newmark for many load histories at once (small dense models)
+
+    The force at step i of case c is pattern @ history[i, :, c], with
+    pattern (n_free, n_inputs) and history (n_steps, n_inputs, n_cases), or
+    (n_steps, n_cases) for a single input. Newmark is rewritten as the state
+    recurrence x[i + 1] = A x[i] + B f[i + 1] with x = (u, v, a), so a step
+    is one small matrix product over every case. Same start and time
+    convention as newmark(); returns dict(time, disp, vel, accel) with
+    (n_steps, n_record, n_cases) arrays.
+    """
+    K, M, C = (np.asarray(X.toarray() if sp.issparse(X) else X, dtype=float) for X in (K, M, C))
+    n = len(K)
+    pattern = np.asarray(pattern, dtype=float).reshape(n, -1)
+    history = np.asarray(history, dtype=float)
+    if history.ndim == 2:
+        history = history[:, None, :]
+    n_steps, _, n_cases = history.shape
+    record = np.arange(n) if record is None else np.atleast_1d(record)
+
+    a1 = 1.0 / (beta * dt**2)
+    a2 = 1.0 / (beta * dt)
+    a3 = 1.0 / (2 * beta) - 1.0
+    a4 = gamma / (beta * dt)
+    a5 = gamma / beta - 1.0
+    a6 = dt * (gamma / (2 * beta) - 1.0)
+    K_inv = np.linalg.inv(K + a1 * M + a4 * C)
+    eye, zero = np.eye(n), np.zeros((n, n))
+    # u' = K_inv (f + M (a1 u + a2 v + a3 a) + C (a4 u + a5 v + a6 a))
+    Gu = K_inv @ np.hstack([a1 * M + a4 * C, a2 * M + a5 * C, a3 * M + a6 * C])
+    # a' = a1 (u' - u) - a2 v - a3 a;  v' = v + dt ((1 - gamma) a + gamma a')
+    Ga = a1 * Gu - np.hstack([a1 * eye, a2 * eye, a3 * eye])
+    Gv = np.hstack([zero, eye, dt * (1 - gamma) * eye]) + dt * gamma * Ga
+    A = np.vstack([Gu, Gv, Ga])
+    B = np.vstack([K_inv, dt * gamma * a1 * K_inv, a1 * K_inv]) @ pattern
+
+    rows = np.concatenate([record, n + record, 2 * n + record])
+    out = np.empty((n_steps, 3, len(record), n_cases))
+    x = np.zeros((3 * n, n_cases))
+    for i in range(n_steps):
+        x = A @ x + B @ history[i]
+        out[i] = x[rows].reshape(3, len(record), n_cases)
+    return {'time': dt * np.arange(1, n_steps + 1), 'disp': out[:, 0], 'vel': out[:, 1], 'accel': out[:, 2]}
+
+
+def central_difference(M, C, K, load, dt, n_steps=None, record=None, dt_critical=None, safety=0.9,
+                       u0=None, v0=None):
+    """Explicit central-difference integration with a diagonal mass
+
+    Same inputs, start from rest and output convention as newmark(): dt is
+    the load and output step. Internally the step is cut to
+    safety * dt_critical, reduced for the damping at the highest frequency,
+    with the load interpolated linearly. dt_critical defaults to a
+    Gershgorin bound on the highest frequency of K and M; pass
+    Frame2D.critical_time_step() for the element estimate. Each sub-step is
+    sparse matrix-vector products with K and C, with no linear solve.
+    Returns dict(time, disp, vel, accel, dt) with (n_steps, n_record) arrays
+    and the sub-step used.
+    """
+    if n_steps is None:
+        n_steps = load.shape[0]
+    n = K.shape[0]
+    record = np.arange(n) if record is None else np.atleast_1d(record)
+    if sp.issparse(M) or np.ndim(M) == 2:
+        M = sp.csr_matrix(M)
+        m = M.diagonal()
+        if abs(M - sp.diags(m)).sum() > 0:
+            raise ValueError("central_difference needs a lumped (diagonal) mass matrix")
+    else:
+        m = np.asarray(M, dtype=float)
+    if np.any(m <= 0):
+        raise ValueError("Explicit integration needs mass on every free DOF")
+    K = sp.csr_matrix(K)
+    C = sp.csr_matrix(C) if C is not None else sp.csr_matrix((n, n))
+
+    # Row sums of M^-1/2 |K| M^-1/2 and M^-1 |C| bound omega_max^2 and 2 zeta omega_max
+    root = 1.0 / np.sqrt(m)
+    if dt_critical is None:
+        omega_max = np.sqrt((abs(K) @ root * root).max())
+        dt_critical = 2.0 / omega_max
+    else:
+        omega_max = 2.0 / dt_critical
+    zeta = (abs(C) @ np.ones(n) / m).max() / (2 * omega_max) if C.nnz else 0.0
+    dt_stable = dt_critical * (np.sqrt(1.0 + zeta**2) - zeta)
+    n_sub = max(int(np.ceil(dt / (safety * dt_stable))), 1)
+    h = dt / n_sub
+    inv_m = 1.0 / m
+
+    load_row = _load_rows(load, n)
+    u = np.zeros(n) if u0 is None else np.array(u0, dtype=float)
+    v = np.zeros(n) if v0 is None else np.array(v0, dtype=float)
+    a = -(K @ u + C @ v) * inv_m
+    v_half = v + 0.5 * h * a
+    f_prev = np.zeros(n)
+    disp = np.empty((n_steps, len(record)))
+    vel = np.empty_like(disp)
+    accel = np.empty_like(disp)
+
+    for i in range(n_steps):
+        f_next = np.array(load_row(i), dtype=float)
+        df = (f_next - f_prev) / n_sub
+        for j in range(1, n_sub + 1):
+            u += h * v_half
+            # Damping from the lagged half-step velocity keeps the step explicit
+            a = (f_prev + j * df - K @ u - C @ v_half) * inv_m
+            v_half += h * a
+        f_prev = f_next
+        disp[i] = u[record]
+        vel[i] = v_half[record] - 0.5 * h * a[record]
+        accel[i] = a[record]
+
+    return {'time': dt * np.arange(1, n_steps + 1), 'disp': disp, 'vel': vel, 'accel': accel, 'dt': h}
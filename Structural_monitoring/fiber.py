@@ -0,0 +1,372 @@
+# Vectorized fiber sections: Concrete01 / Steel01 state determination,
+# moment-curvature and P-M interaction
+#
+# A FiberSection holds a batch of 2D sections as arrays of concrete and steel
+# fibers, each (n_sections, n_fibers); designs with fewer bars are padded
+# with zero-area fibers. Strains follow OpenSees (compression negative,
+# strain = eps0 - y * kappa, M = -sum(stress * area * y)), and every fiber
+# of every section is evaluated in one vectorized material call. Forces are
+# stress x area units (MPa and m^2 give MN).
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from Structural_monitoring.column import COLUMN
+
+# Concrete01 (fpc, epsc0, fpcu, epscu) and Steel01 (fy, E0, b) of the column
+CONCRETE = COLUMN['concrete']
+STEEL = COLUMN['steel']
+
+
+def concrete_state(shape):
+    """Virgin Concrete01 state arrays (OpenSees committed variables)"""
+    return {'strain': np.zeros(shape), 'stress': np.zeros(shape), 'tangent': None,
+            'min_strain': np.zeros(shape), 'end_strain': np.zeros(shape), 'unload_slope': None}
+
+
+def steel_state(shape):
+    return {'strain': np.zeros(shape), 'stress': np.zeros(shape)}
+
+
+def _concrete_envelope(strain, fpc, epsc0, fpcu, epscu):
+    eta = strain / epsc0
+    Ec0 = 2.0 * fpc / epsc0
+    slope = (fpc - fpcu) / (epsc0 - epscu)
+    stress = np.where(strain > epsc0, fpc * (2 * eta - eta**2),
+                      np.where(strain > epscu, fpc + slope * (strain - epsc0), fpcu))
+    tangent = np.where(strain > epsc0, Ec0 * (1.0 - eta),
+                       np.where(strain > epscu, slope, 0.0))
+    return stress, tangent
+
+
+def _concrete_unload(min_strain, stress, fpc, epsc0, epscu):
+    """(end_strain, unload_slope) after reaching min_strain on the envelope"""
+    eta = np.maximum(min_strain, epscu) / epsc0
+    ratio = np.where(eta < 2.0, 0.145 * eta**2 + 0.13 * eta, 0.707 * (eta - 2.0) + 0.834)
+    end = ratio * epsc0
+    Ec0 = 2.0 * fpc / epsc0
+    temp1 = min_strain - end
+    temp2 = stress / Ec0
+    secant = temp1 <= temp2
+    safe = np.where(temp1 < 0, temp1, -1.0)
+    end = np.where(temp1 > -np.finfo(float).eps, end, np.where(secant, end, min_strain - temp2))
+    slope = np.where((temp1 > -np.finfo(float).eps) | ~secant, Ec0, stress / safe)
+    return end, slope
+
+
+def concrete01(strain, state, fpc=CONCRETE[0], epsc0=CONCRETE[1], fpcu=CONCRETE[2], epscu=CONCRETE[3]):
+    """(stress, tangent, trial state) of Concrete01 fibers from a committed state
+
+    Kent-Scott-Park envelope in compression, no tension, and the Karsan-Jirsa
+    unloading / reloading line of OpenSees' Concrete01.
+    """
+    Ec0 = 2.0 * fpc / epsc0
+    c_strain, c_stress = state['strain'], state['stress']
+    c_min, c_end = state['min_strain'], state['end_strain']
+    c_slope = Ec0 if state['unload_slope'] is None else state['unload_slope']
+    c_tangent = Ec0 if state['tangent'] is None else state['tangent']
+    c_slope = np.broadcast_to(c_slope, np.shape(strain))
+
+    temp = c_stress + c_slope * (strain - c_strain)
+    # Further into compression: reload along the unloading line or the envelope
+    env_stress, env_tangent = _concrete_envelope(strain, fpc, epsc0, fpcu, epscu)
+    new_min = strain <= c_min
+    new_end, new_slope = _concrete_unload(strain, env_stress, fpc, epsc0, epscu)
+    on_line = ~new_min & (strain <= c_end)
+    reload_stress = np.where(new_min, env_stress, np.where(on_line, c_slope * (strain - c_end), 0.0))
+    reload_tangent = np.where(new_min, env_tangent, np.where(on_line, c_slope, 0.0))
+    slope = np.where(new_min, new_slope, c_slope)
+    use_temp = temp > reload_stress
+    comp_stress = np.where(use_temp, temp, reload_stress)
+    comp_tangent = np.where(use_temp, slope, reload_tangent)
+    # Toward tension: along the unloading line until zero stress
+    tens_stress = np.where(temp <= 0.0, temp, 0.0)
+    tens_tangent = np.where(temp <= 0.0, c_slope, 0.0)
+
+    loading = strain < c_strain
+    stress = np.where(loading, comp_stress, tens_stress)
+    tangent = np.where(loading, comp_tangent, tens_tangent)
+    # Unchanged strain keeps the committed state
+    same = np.abs(strain - c_strain) <= np.finfo(float).eps
+    stress = np.where(same, c_stress, stress)
+    tangent = np.where(same, c_tangent, tangent)
+    advance = loading & new_min & ~same
+    trial = {
+        'strain': strain, 'stress': stress, 'tangent': tangent,
+        'min_strain': np.where(advance, strain, c_min),
+        'end_strain': np.where(advance, new_end, c_end),
+        'unload_slope': np.where(advance, new_slope, c_slope),
+    }
+    return stress, tangent, trial
+
+
+def steel01(strain, state, fy=STEEL[0], E0=STEEL[1], b=STEEL[2]):
+    """(stress, tangent, trial state) of Steel01 fibers (bilinear kinematic)"""
+    trial = state['stress'] + E0 * (strain - state['strain'])
+    bound = fy * (1.0 - b)
+    upper = b * E0 * strain + bound
+    lower = b * E0 * strain - bound
+    stress = np.clip(trial, lower, upper)
+    tangent = np.where((trial > upper) | (trial < lower), b * E0, E0)
+    return stress, tangent, {'strain': strain, 'stress': stress}
+
+
+class FiberSection:
+    """Batch of 2D fiber sections with committed Concrete01 / Steel01 states
+
+    concrete_y, concrete_area, steel_y, steel_area are (n_sections, n_fibers)
+    arrays (or 1D for one section); concrete and steel are the material
+    parameter tuples, each scalar or (n_sections,).
+    """
+
+    def __init__(self, concrete_y, concrete_area, steel_y, steel_area, concrete=CONCRETE, steel=STEEL):
+        n = max(np.atleast_2d(concrete_y).shape[0], np.atleast_2d(steel_y).shape[0])
+
+        def batch(values):
+            values = np.atleast_2d(np.asarray(values, dtype=float))
+            return np.broadcast_to(values, (n, values.shape[1]))
+
+        self.concrete_y, self.concrete_area = batch(concrete_y), batch(concrete_area)
+        self.steel_y, self.steel_area = batch(steel_y), batch(steel_area)
+        # Material parameters as (n_sections, 1) columns
+        self.concrete = [np.broadcast_to(np.asarray(p, dtype=float), (n,))[:, None] for p in concrete]
+        self.steel = [np.broadcast_to(np.asarray(p, dtype=float), (n,))[:, None] for p in steel]
+        self.reset()
+
+    def __len__(self):
+        return len(self.concrete_y)
+
+    @classmethod
+    def rectangular(cls, b, h, bars=(), concrete=CONCRETE, steel=STEEL, n_layers=20):
+        """Rectangular sections from (n_sections,) or scalar parameters
+
+        bars is a sequence of (y, count, bar_area) layers, each entry scalar
+        or (n_sections,); a count of 0 leaves the layer empty. Concrete is
+        n_layers strips through the depth, like `patch rect` with n_layers
+        subdivisions along y.
+        """
+        b, h = np.broadcast_arrays(np.atleast_1d(np.asarray(b, dtype=float)),
+                                   np.atleast_1d(np.asarray(h, dtype=float)))
+        s = (np.arange(n_layers) + 0.5) / n_layers - 0.5
+        concrete_y = h[:, None] * s
+        concrete_area = (b * h / n_layers)[:, None] * np.ones(n_layers)
+        if bars:
+            layers = [np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in layer)) for layer in bars]
+            steel_y = np.column_stack([np.broadcast_to(y, b.shape) for y, _, _ in layers])
+            steel_area = np.column_stack([np.broadcast_to(count * area, b.shape) for _, count, area in layers])
+        else:
+            steel_y = steel_area = np.zeros((len(b), 1))
+        return cls(concrete_y, concrete_area, steel_y, steel_area, concrete, steel)
+
+    @classmethod
+    def from_model(cls, model=COLUMN):
+        """The column's fiber section (patch rect + straight bar layers)"""
+        b, h = model['section']
+        bars = [(y, count, area) for y, count, area, _ in model['bars']]
+        return cls.rectangular(b, h, bars, model['concrete'], model['steel'], model['patch_fibers'][0])
+
+    def reset(self):
+        self.concrete_state = concrete_state(self.concrete_y.shape)
+        self.steel_state = steel_state(self.steel_y.shape)
+        self._trial = None
+
+    def initial_stiffness(self):
+        """(EA, EI) of every section from the materials' initial tangents"""
+        Ec = 2.0 * self.concrete[0] / self.concrete[1]
+        Es = self.steel[1]
+        EA = (Ec * self.concrete_area).sum(axis=1) + (Es * self.steel_area).sum(axis=1)
+        EI = (Ec * self.concrete_area * self.concrete_y**2).sum(axis=1) + \
+            (Es * self.steel_area * self.steel_y**2).sum(axis=1)
+        return EA, EI
+
+    def trial(self, eps0, kappa):
+        """Section forces for trial deformations (n_sections,) from the committed state
+
+        Returns (P, M, tangent (n_sections, 2, 2) on (eps0, kappa)).
+        """
+        eps0 = np.broadcast_to(np.asarray(eps0, dtype=float), (len(self),))[:, None]
+        kappa = np.broadcast_to(np.asarray(kappa, dtype=float), (len(self),))[:, None]
+        sc, tc, state_c = concrete01(eps0 - self.concrete_y * kappa, self.concrete_state, *self.concrete)
+        ss, ts, state_s = steel01(eps0 - self.steel_y * kappa, self.steel_state, *self.steel)
+        self._trial = (state_c, state_s)
+
+        P = (sc * self.concrete_area).sum(axis=1) + (ss * self.steel_area).sum(axis=1)
+        M = -(sc * self.concrete_area * self.concrete_y).sum(axis=1) - \
+            (ss * self.steel_area * self.steel_y).sum(axis=1)
+        kc, ks = tc * self.concrete_area, ts * self.steel_area
+        tangent = np.empty((len(self), 2, 2))
+        tangent[:, 0, 0] = kc.sum(axis=1) + ks.sum(axis=1)
+        tangent[:, 0, 1] = tangent[:, 1, 0] = -(kc * self.concrete_y).sum(axis=1) - (ks * self.steel_y).sum(axis=1)
+        tangent[:, 1, 1] = (kc * self.concrete_y**2).sum(axis=1) + (ks * self.steel_y**2).sum(axis=1)
+        return P, M, tangent
+
+    def commit(self):
+        self.concrete_state, self.steel_state = self._trial
+
+    def fiber_strains(self, eps0, kappa):
+        """Concrete and steel fiber strains for (n_sections,) or (n_sections, k) deformations"""
+        eps0 = np.asarray(eps0, dtype=float)[..., None]
+        kappa = np.asarray(kappa, dtype=float)[..., None]
+        shape = (len(self),) + (1,) * (eps0.ndim - 2) + (-1,)
+        return (eps0 - self.concrete_y.reshape(shape) * kappa,
+                eps0 - self.steel_y.reshape(shape) * kappa)
+
+
+def moment_curvature(section, axial_load=0.0, kappa_max=None, n_steps=100, tol=1e-10, max_iter=50):
+    """Monotonic moment-curvature of every section at constant axial load
+
+    axial_load (compression negative) and kappa_max are scalar or
+    (n_sections,); kappa_max defaults to 4 |epscu| / depth. At each
+    curvature step the axial strain is found by Newton iteration on all
+    sections at once.
+    Returns dict(curvature, moment, axial_strain (n_sections, n_steps + 1),
+    converged, yield_curvature, yield_moment, peak_moment (n_sections,)).
+    """
+    n = len(section)
+    depth = section.concrete_y.max(axis=1) - section.concrete_y.min(axis=1)
+    if kappa_max is None:
+        kappa_max = 4.0 * np.abs(section.concrete[3][:, 0]) / depth
+    kappa = np.broadcast_to(np.asarray(kappa_max, dtype=float), (n,))[:, None] * \
+        np.linspace(0.0, 1.0, n_steps + 1)
+    P_target = np.broadcast_to(np.asarray(axial_load, dtype=float), (n,))
+    EA0, _ = section.initial_stiffness()
+    scale = np.abs(P_target) + np.abs(section.concrete[0][:, 0]) * section.concrete_area.sum(axis=1)
+
+    section.reset()
+    moment = np.zeros((n, n_steps + 1))
+    eps = np.zeros((n, n_steps + 1))
+    converged = np.ones(n, dtype=bool)
+    eps0 = np.zeros(n)
+    # Apply the axial load at zero curvature first (step 0)
+    for step in range(n_steps + 1):
+        for _ in range(max_iter):
+            P, M, tangent = section.trial(eps0, kappa[:, step])
+            residual = P_target - P
+            done = np.abs(residual) <= tol * scale
+            if done.all():
+                break
+            EA = tangent[:, 0, 0]
+            EA = np.where(np.abs(EA) > 1e-9 * EA0, EA, EA0)
+            eps0 = eps0 + np.where(done, 0.0, residual / EA)
+        else:
+            P, M, tangent = section.trial(eps0, kappa[:, step])
+            converged &= np.abs(P_target - P) <= 1e3 * tol * scale
+        section.commit()
+        moment[:, step] = M
+        eps[:, step] = eps0
+
+    # First yield: first step where any bar reaches fy / E0 in tension or compression
+    _, steel_strain = section.fiber_strains(eps, kappa)         # (n, n_steps + 1, n_bars)
+    yielded = ((np.abs(steel_strain) >= (section.steel[0] / section.steel[1])[:, :, None])
+               & (section.steel_area > 0)[:, None]).any(axis=-1)
+    first = np.where(yielded.any(axis=1), yielded.argmax(axis=1), n_steps)
+    rows = np.arange(n)
+    return {
+        'curvature': kappa, 'moment': moment, 'axial_strain': eps, 'converged': converged,
+        'yield_curvature': np.where(yielded.any(axis=1), kappa[rows, first], np.nan),
+        'yield_moment': np.where(yielded.any(axis=1), moment[rows, first], np.nan),
+        'peak_moment': np.abs(moment).max(axis=1),
+    }
+
+
+def interaction(section, n_points=20, eps_cu=None, eps_su=0.01):
+    """P-M interaction curves from limiting strain profiles (three pivots)
+
+    As in EC2: profiles rotate about the point at strain epsc0 while the
+    whole section is compressed (uniform epsc0 is the squash load), then
+    about the extreme fiber at eps_cu (default epscu) and finally about the
+    opposite extreme fiber at eps_su in tension, to uniform tension. Both
+    bending directions are included, giving a closed curve from and back to
+    the squash load. Returns dict(P, M), each (n_sections, 6 * n_points).
+    """
+    n = len(section)
+    eps_c2 = section.concrete[1][:, 0]
+    eps_cu = section.concrete[3][:, 0] if eps_cu is None else np.broadcast_to(eps_cu, (n,))
+    top = section.concrete_y.max(axis=1)
+    bottom = section.concrete_y.min(axis=1)
+    t = np.linspace(0.0, 1.0, n_points, endpoint=False)[None]
+    c2, cu = eps_c2[:, None], eps_cu[:, None]
+
+    # (compressed fiber, opposite fiber) strains along the three domains
+    near1 = c2 + t * (cu - c2)
+    far1 = near1 + (c2 - near1) / (1.0 - c2 / cu)
+    near2, far2 = np.broadcast_to(cu, far1.shape), np.broadcast_to(t * eps_su, far1.shape)
+    near3, far3 = cu + t * (eps_su - cu), np.full(far1.shape, float(eps_su))
+    near = np.hstack([near1, near2, near3])
+    far = np.hstack([far1, far2, far3])
+    # Top compressed, then bottom compressed back towards uniform compression
+    eps_top = np.hstack([near, far[:, ::-1]])
+    eps_bot = np.hstack([far, near[:, ::-1]])
+    kappa = (eps_bot - eps_top) / (top - bottom)[:, None]
+    eps0 = eps_top + top[:, None] * kappa
+
+    strain_c, strain_s = section.fiber_strains(eps0, kappa)
+    sc, _, _ = concrete01(strain_c, concrete_state(strain_c.shape), *(p[:, :, None] for p in section.concrete))
+    ss, _, _ = steel01(strain_s, steel_state(strain_s.shape), *(p[:, :, None] for p in section.steel))
+    ac, yc = section.concrete_area[:, None], section.concrete_y[:, None]
+    as_, ys = section.steel_area[:, None], section.steel_y[:, None]
+    P = (sc * ac).sum(axis=-1) + (ss * as_).sum(axis=-1)
+    M = -(sc * ac * yc).sum(axis=-1) - (ss * as_ * ys).sum(axis=-1)
+    return {'P': P, 'M': M}
+
+
+def read_designs(path):
+    """Rectangular section designs from a CSV
+
+    Columns b, h, cover, n_top, n_bottom, bar_area and optionally fpc, epsc0,
+    fpcu, epscu, fy, E0, bsh (defaults: the column's materials).
+    """
+    table = pd.read_csv(path)
+    get = lambda name, default: table[name].to_numpy(float) if name in table else default
+    concrete = tuple(get(name, value) for name, value in zip(('fpc', 'epsc0', 'fpcu', 'epscu'), CONCRETE))
+    steel = tuple(get(name, value) for name, value in zip(('fy', 'E0', 'bsh'), STEEL))
+    y = table['h'].to_numpy(float) / 2 - table['cover'].to_numpy(float)
+    bars = [(y, table['n_top'], table['bar_area']), (-y, table['n_bottom'], table['bar_area'])]
+    section = FiberSection.rectangular(table['b'], table['h'], bars, concrete, steel)
+    return table, section
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Moment-curvature and P-M interaction of fiber sections')
+    parser.add_argument('--designs', default=None, help='CSV of rectangular designs (default: the column section)')
+    parser.add_argument('--axial', type=float, default=0.0, help='axial load, compression negative')
+    parser.add_argument('--n-steps', type=int, default=100)
+    parser.add_argument('--out', default=None, help='CSV path for the summary table')
+    parser.add_argument('--plot', action='store_true', help='plot the curves of the first sections')
+    args = parser.parse_args(argv)
+
+    if args.designs:
+        table, section = read_designs(args.designs)
+    else:
+        table, section = pd.DataFrame({'design': ['column']}), FiberSection.from_model()
+    mk = moment_curvature(section, args.axial, n_steps=args.n_steps)
+    pm = interaction(section)
+    EA, EI = section.initial_stiffness()
+    summary = table.assign(EA=EA, EI=EI, yield_curvature=mk['yield_curvature'], yield_moment=mk['yield_moment'],
+                           peak_moment=mk['peak_moment'], squash_load=pm['P'].min(axis=1),
+                           tension_capacity=pm['P'].max(axis=1), max_moment_pm=np.abs(pm['M']).max(axis=1),
+                           converged=mk['converged'])
+    if args.out:
+        summary.to_csv(args.out, index=False)
+    with pd.option_context('display.width', 200, 'display.max_columns', 20):
+        print(summary.head(20))
+    if args.plot:
+        import matplotlib.pyplot as plt
+
+        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(11, 4.5))
+        for i in range(min(len(section), 10)):
+            ax1.plot(mk['curvature'][i], mk['moment'][i])
+            ax2.plot(pm['M'][i], -pm['P'][i])
+        ax1.set_xlabel('Curvature [1/m]')
+        ax1.set_ylabel('Moment')
+        ax2.set_xlabel('Moment')
+        ax2.set_ylabel('Axial compression')
+        for ax in (ax1, ax2):
+            ax.grid(True, alpha=0.3)
+        fig.tight_layout()
+        plt.show()
+
+
+if __name__ == '__main__':
+    main()
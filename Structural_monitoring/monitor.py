@@ -0,0 +1,492 @@
+# Real-time monitoring of streamed accelerations
+#
+# A long-running asyncio service ingests sample blocks over TCP or UDP,
+# keeps a fixed-size ring buffer per channel and updates a sliding-window
+# Welch spectrum incrementally: each hop FFTs only the newest segment of every
+# channel (one batched rfft) and swaps it into a running sum. Peaks near the
+# baseline frequencies (modal_data.csv) are tracked, and a drift beyond the
+# tolerance for several consecutive updates raises an alarm.
+#
+# Wire format, little-endian: a header (magic b'SHM1', t0 float64, fs
+# float64, first channel uint16, n channels uint16, n samples uint32)
+# followed by float32 samples, (n_samples, n_channels) row-major. TCP sends
+# frames back to back; UDP sends one frame per datagram.
+#
+#   python -m Structural_monitoring.monitor serve --channels 1 --fs 2000
+#   python -m Structural_monitoring.monitor replay bridge_car2/accello.txt --repeat 100
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import struct
+import time
+
+import numpy as np
+import pandas as pd
+import scipy.fft as sfft
+import scipy.signal as ss
+from numpy.lib.stride_tricks import sliding_window_view
+
+from Structural_monitoring import spectral
+
+MAGIC = b'SHM1'
+HEADER = struct.Struct('<4sddHHI')
+DEFAULT_PORT = 9750
+# Largest UDP payload sent by the replay client
+MAX_DATAGRAM = 60000
+UDP_BUFFER = 1 << 22
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'modal_data.csv')
+log = logging.getLogger(__name__)
+
+
+def encode_frame(t0, fs, samples, first_channel=0):
+    """Header + float32 payload for (n_samples, n_channels) samples"""
+    samples = np.ascontiguousarray(samples, dtype='<f4')
+    return HEADER.pack(MAGIC, t0, fs, first_channel, samples.shape[1], samples.shape[0]) + samples.tobytes()
+
+
+def decode_header(data):
+    """(t0, fs, first_channel, n_channels, n_samples) of a frame header"""
+    magic, t0, fs, first, n_channels, n_samples = HEADER.unpack(data[:HEADER.size])
+    if magic != MAGIC:
+        raise ValueError(f"Bad frame magic {magic!r}")
+    return t0, fs, first, n_channels, n_samples
+
+
+def decode_frame(data):
+    """(t0, fs, first_channel, samples) of a complete frame"""
+    t0, fs, first, n_channels, n_samples = decode_header(data)
+    samples = np.frombuffer(data, dtype='<f4', offset=HEADER.size, count=n_samples * n_channels)
+    return t0, fs, first, samples.reshape(n_samples, n_channels)
+
+
+def load_baseline(path=DEFAULT_BASELINE, state='Baseline'):
+    """Baseline frequencies from a modal_data.csv row"""
+    table = pd.read_csv(path, index_col='State')
+    return table.loc[state].to_numpy(dtype=float)
+
+
+class RingBuffer:
+    """Fixed-capacity per-channel sample history; count is samples written per channel"""
+
+    def __init__(self, n_channels, capacity):
+        self.data = np.zeros((n_channels, capacity), dtype=np.float32)
+        self.count = np.zeros(n_channels, dtype=np.int64)
+
+    @property
+    def capacity(self):
+        return self.data.shape[1]
+
+    def write(self, first_channel, samples):
+        """Append (n_samples, n) samples to channels first_channel .. first_channel + n - 1"""
+        rows = slice(first_channel, first_channel + samples.shape[1])
+        n = len(samples)
+        if n > self.capacity:
+            samples = samples[-self.capacity:]
+        start = self.count[first_channel] + n - len(samples)
+        cols = (start + np.arange(len(samples))) % self.capacity
+        self.data[rows, cols] = samples.T
+        self.count[rows] += n
+
+    def read(self, start, stop):
+        """(n_channels, stop - start) samples with absolute indices start..stop-1"""
+        if start < self.count.max() - self.capacity:
+            raise IndexError("Requested samples were overwritten; enlarge the ring buffer")
+        return self.data[:, np.arange(start, stop) % self.capacity]
+
+
+class SlidingSpectrum:
+    """Welch PSD of the last n_average segments, updated one hop at a time
+
+    The spectrum covers nperseg + (n_average - 1) * hop samples; each update
+    costs one FFT per channel, not a new Welch estimate.
+    """
+
+    def __init__(self, n_channels, fs, nperseg=4096, hop=None, n_average=8, window='hann'):
+        self.fs = fs
+        self.nperseg = nperseg
+        self.hop = hop or nperseg // 2
+        self.window = ss.get_window(window, nperseg)
+        self.scale = 1.0 / (fs * (self.window**2).sum())
+        self.freqs = sfft.rfftfreq(nperseg, 1.0 / fs)
+        self.segments = np.zeros((n_average, n_channels, len(self.freqs)))
+        self.total = np.zeros((n_channels, len(self.freqs)))
+        self.filled = 0
+        self.slot = 0
+        self.updates = 0
+
+    def update(self, segments):
+        """Add (n_new, n_channels, nperseg) segments, oldest first"""
+        segments = segments - segments.mean(axis=-1, keepdims=True)
+        spectrum = sfft.rfft(segments * self.window, axis=-1, workers=-1)
+        power = spectrum.real**2 + spectrum.imag**2
+        n_average = len(self.segments)
+        for p in power[-n_average:]:
+            self.total += p - self.segments[self.slot]
+            self.segments[self.slot] = p
+            self.slot = (self.slot + 1) % n_average
+            if self.slot == 0:
+                # Re-sum once per cycle so the running total cannot drift
+                self.total = self.segments.sum(axis=0)
+        self.filled = min(self.filled + len(power), n_average)
+        self.updates += len(power)
+
+    @property
+    def ready(self):
+        return self.filled == len(self.segments)
+
+    def psd(self):
+        """(n_channels, n_freq) one-sided PSD of the current window"""
+        psd = self.total * (self.scale / max(self.filled, 1))
+        psd[:, 1:(self.nperseg + 1) // 2] *= 2.0
+        return psd
+
+
+class FrequencyTracker:
+    """Drift alarms for peaks near baseline frequencies
+
+    Each baseline frequency f is searched within f * (1 +/- search) in the
+    channel-averaged PSD. A mode alarms after persistence consecutive
+    updates with |drift| > tolerance and clears after as many within it.
+    """
+
+    def __init__(self, baseline, tolerance=0.02, search=0.15, persistence=3):
+        self.baseline = np.asarray(baseline, dtype=float)
+        self.tolerance = tolerance
+        self.search = search
+        self.persistence = persistence
+        self.streak = np.zeros(len(self.baseline), dtype=int)
+        self.alarmed = np.zeros(len(self.baseline), dtype=bool)
+        self.frequency = np.full(len(self.baseline), np.nan)
+
+    def update(self, freqs, psd, time):
+        """Track the peaks of a (n_channels, n_freq) PSD; returns new alarm/clear events"""
+        mean = psd.mean(axis=0)
+        for m, f in enumerate(self.baseline):
+            peak, _ = spectral.pick_peaks(freqs, mean, 1, (f * (1 - self.search), f * (1 + self.search)))
+            self.frequency[m] = peak[0]
+        drift = (self.frequency - self.baseline) / self.baseline
+        # NaN (no peak in the band) counts as drifted
+        outside = ~(np.abs(drift) <= self.tolerance)
+        changing = outside != self.alarmed
+        self.streak = np.where(changing, self.streak + 1, 0)
+        flip = self.streak >= self.persistence
+        events = []
+        for m in np.flatnonzero(flip):
+            self.alarmed[m] = outside[m]
+            self.streak[m] = 0
+            events.append({'time': time, 'mode': m + 1, 'state': 'alarm' if outside[m] else 'clear',
+                           'baseline': self.baseline[m], 'frequency': self.frequency[m],
+                           'drift': drift[m]})
+        return events
+
+
+class Monitor:
+    """Ring buffers, sliding spectrum and tracker for n_channels at fs"""
+
+    def __init__(self, n_channels, fs, baseline, nperseg=4096, hop=None, n_average=8,
+                 tolerance=0.02, persistence=3, capacity=None):
+        self.fs = fs
+        self.spectrum = SlidingSpectrum(n_channels, fs, nperseg, hop, n_average)
+        # Room for a full averaging window plus incoming frames
+        window = nperseg + (n_average - 1) * self.spectrum.hop
+        self.ring = RingBuffer(n_channels, capacity or 2 * window)
+        self.tracker = FrequencyTracker(baseline, tolerance, persistence=persistence)
+        self.next_end = nperseg
+        self.t0 = None
+        self.stats = {'frames': 0, 'samples': 0, 'rejected': 0, 'dropped': 0, 'gaps': 0, 'updates': 0,
+                      'latency_max': 0.0, 'latency_sum': 0.0}
+
+    @property
+    def n_channels(self):
+        return len(self.ring.count)
+
+    def ingest(self, t0, fs, first_channel, samples):
+        """Store a frame and update the spectrum for every completed hop; returns events"""
+        if abs(fs - self.fs) > 1e-9 * self.fs or first_channel + samples.shape[1] > self.n_channels:
+            self.stats['rejected'] += 1
+            return []
+        if self.t0 is None:
+            self.t0 = t0
+        elif abs(t0 - self.t0 - self.ring.count[first_channel] / self.fs) > 0.5 / self.fs:
+            # Lost or reordered frames (UDP): the window now spans a gap
+            self.stats['gaps'] += 1
+        self.stats['frames'] += 1
+        self.stats['samples'] += samples.size
+        if len(samples) <= self.ring.capacity:
+            return self._store(first_channel, samples)
+        # Longer than the ring: feed it hop by hop so no sample is overwritten unread
+        events = []
+        for start in range(0, len(samples), self.spectrum.hop):
+            events += self._store(first_channel, samples[start:start + self.spectrum.hop])
+        return events
+
+    def _store(self, first_channel, samples):
+        self.ring.write(first_channel, samples)
+        # Hops complete once every channel has reached the segment end
+        available = int(self.ring.count.min())
+        if available < self.next_end:
+            return []
+        hop, nperseg = self.spectrum.hop, self.spectrum.nperseg
+        last_end = self.next_end + (available - self.next_end) // hop * hop
+        # Segments older than the averaging window would be discarded anyway, and
+        # ones another channel group has already overwritten cannot be read
+        first_end = max(self.next_end, last_end - (len(self.spectrum.segments) - 1) * hop)
+        oldest = int(self.ring.count.max()) - self.ring.capacity + nperseg
+        if first_end < oldest:
+            first_end += -(-(oldest - first_end) // hop) * hop
+        if first_end > last_end:
+            self.next_end = first_end
+            return []
+        ends = np.arange(first_end, last_end + 1, hop)
+        history = self.ring.read(ends[0] - nperseg, ends[-1])
+        segments = sliding_window_view(history, nperseg, axis=1)[:, ends - ends[0]]
+        self.spectrum.update(segments.transpose(1, 0, 2).astype(float))
+        self.next_end = int(ends[-1]) + hop
+        self.stats['updates'] += len(ends)
+        if not self.spectrum.ready:
+            return []
+        return self.tracker.update(self.spectrum.freqs, self.spectrum.psd(),
+                                   self.t0 + (ends[-1] - 1) / self.fs)
+
+
+def print_event(event):
+    print(f"[t={event['time']:9.3f} s] mode {event['mode']} {event['state'].upper()}: "
+          f"{event['frequency']:.4f} Hz vs baseline {event['baseline']:.4f} Hz "
+          f"({100 * event['drift']:+.2f}%)", flush=True)
+
+
+class MonitorServer:
+    """asyncio TCP/UDP front end feeding a Monitor through a bounded queue
+
+    TCP readers wait when the queue is full (back-pressure); UDP datagrams
+    arriving to a full queue are dropped and counted.
+    """
+
+    def __init__(self, monitor, queue_size=256, on_event=print_event):
+        self.monitor = monitor
+        self.queue = None
+        self.queue_size = queue_size
+        self.on_event = on_event
+        self.events = []
+        self._servers = []
+        self._consumer = None
+
+    async def start(self, host='127.0.0.1', port=DEFAULT_PORT, protocol='tcp'):
+        """Start listening; returns the bound port (pass port=0 for any free port)"""
+        loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(self.queue_size)
+        self._consumer = asyncio.create_task(self._consume())
+        if protocol == 'tcp':
+            server = await asyncio.start_server(self._handle_tcp, host, port)
+            self._servers.append(server)
+            return server.sockets[0].getsockname()[1]
+        if protocol == 'udp':
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            # A large kernel buffer absorbs bursts while a frame is processed
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, UDP_BUFFER)
+            sock.bind((host, port))
+            transport, _ = await loop.create_datagram_endpoint(lambda: _Datagrams(self), sock=sock)
+            self._servers.append(transport)
+            return transport.get_extra_info('sockname')[1]
+        raise ValueError(f"Unknown protocol {protocol!r}; use 'tcp' or 'udp'")
+
+    async def _handle_tcp(self, reader, writer):
+        try:
+            while True:
+                header = await reader.readexactly(HEADER.size)
+                _, _, _, n_channels, n_samples = decode_header(header)
+                payload = await reader.readexactly(4 * n_channels * n_samples)
+                await self.queue.put((time.perf_counter(), decode_frame(header + payload)))
+        except asyncio.IncompleteReadError:
+            pass
+        except ValueError:
+            self.monitor.stats['rejected'] += 1
+        finally:
+            writer.close()
+
+    async def _consume(self):
+        while True:
+            arrival, frame = await self.queue.get()
+            try:
+                # NumPy FFTs release the GIL, so sockets keep being read meanwhile
+                events = await asyncio.to_thread(self.monitor.ingest, *frame)
+            except Exception:
+                # A bad frame must not stop the consumer (drain() would never return)
+                self.monitor.stats['rejected'] += 1
+                log.exception("Frame at t0=%s rejected", frame[0])
+                continue
+            finally:
+                self.queue.task_done()
+            latency = time.perf_counter() - arrival
+            stats = self.monitor.stats
+            stats['latency_max'] = max(stats['latency_max'], latency)
+            stats['latency_sum'] += latency
+            for event in events:
+                self.events.append(event)
+                if self.on_event is not None:
+                    self.on_event(event)
+
+    async def drain(self):
+        """Wait until every queued frame has been processed"""
+        await self.queue.join()
+
+    async def close(self):
+        for server in self._servers:
+            server.close()
+        if self._consumer is not None:
+            self._consumer.cancel()
+
+
+class _Datagrams(asyncio.DatagramProtocol):
+    def __init__(self, server):
+        self.server = server
+
+    def datagram_received(self, data, addr):
+        try:
+            frame = decode_frame(data)
+        except (ValueError, struct.error):
+            self.server.monitor.stats['rejected'] += 1
+            return
+        try:
+            self.server.queue.put_nowait((time.perf_counter(), frame))
+        except asyncio.QueueFull:
+            self.server.monitor.stats['dropped'] += 1
+
+
+def _frames(values, fs, block_size, max_bytes=None):
+    """(t0, first_channel, samples) frames of (n_channels, n) values"""
+    n_channels = len(values)
+    group = n_channels
+    if max_bytes is not None:
+        group = max(min(n_channels, (max_bytes - HEADER.size) // (4 * block_size)), 1)
+    for start in range(0, values.shape[1], block_size):
+        block = values[:, start:start + block_size].T
+        for first in range(0, n_channels, group):
+            yield start, first, block[:, first:first + group]
+
+
+async def replay(values, fs, host='127.0.0.1', port=DEFAULT_PORT, protocol='tcp', block_size=256,
+                 speed=1.0, repeat=1):
+    """Stream (n_channels, n) values as frames paced at speed x real time (0 = unpaced)
+
+    Returns the number of frames sent.
+    """
+    values = np.asarray(values, dtype=np.float32)
+    loop = asyncio.get_running_loop()
+    if protocol == 'tcp':
+        _, writer = await asyncio.open_connection(host, port)
+        send, max_bytes = writer.write, None
+    elif protocol == 'udp':
+        transport, _ = await loop.create_datagram_endpoint(asyncio.DatagramProtocol, remote_addr=(host, port))
+        send, max_bytes = transport.sendto, MAX_DATAGRAM
+    else:
+        raise ValueError(f"Unknown protocol {protocol!r}; use 'tcp' or 'udp'")
+
+    sent = 0
+    start_time = time.perf_counter()
+    n = values.shape[1]
+    for cycle in range(repeat):
+        for start, first, samples in _frames(values, fs, block_size, max_bytes):
+            offset = cycle * n + start
+            send(encode_frame(offset / fs, fs, samples, first))
+            sent += 1
+            if protocol == 'tcp':
+                await writer.drain()
+            if speed:
+                delay = start_time + (offset + len(samples)) / (fs * speed) - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif protocol == 'udp':
+                # Let the receiver's loop run when both ends share one
+                await asyncio.sleep(0)
+
+    if protocol == 'tcp':
+        writer.close()
+        await writer.wait_closed()
+    else:
+        transport.close()
+    return sent
+
+
+def cmd_serve(args):
+    baseline = ([float(x) for x in args.frequencies.split(',')] if args.frequencies
+                else load_baseline(args.baseline, args.state))
+    monitor = Monitor(args.channels, args.fs, baseline, args.nperseg, n_average=args.n_average,
+                      tolerance=args.tolerance, persistence=args.persistence)
+
+    async def run():
+        server = MonitorServer(monitor, args.queue_size)
+        port = await server.start(args.host, args.port, args.protocol)
+        print(f"Listening on {args.protocol}://{args.host}:{port}; baseline {np.round(baseline, 4)} Hz",
+              flush=True)
+        start = time.perf_counter()
+        try:
+            while args.duration is None or time.perf_counter() - start < args.duration:
+                await asyncio.sleep(args.report_every)
+                stats = monitor.stats
+                mean = stats['latency_sum'] / max(stats['frames'], 1)
+                print(f"{stats['samples'] / (time.perf_counter() - start):,.0f} samples/s, "
+                      f"{stats['frames']} frames ({stats['dropped']} dropped, {stats['gaps']} gaps, "
+                      f"{stats['rejected']} rejected), "
+                      f"latency mean {1e3 * mean:.2f} ms max {1e3 * stats['latency_max']:.2f} ms, "
+                      f"tracked {np.round(monitor.tracker.frequency, 3)} Hz", flush=True)
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+def cmd_replay(args):
+    from Structural_monitoring import oma
+
+    values, fs = oma.load_channels(args.files)
+    values = np.tile(values, (args.tile, 1))
+    sent = asyncio.run(replay(values, fs, args.host, args.port, args.protocol, args.block_size,
+                              args.speed, args.repeat))
+    print(f"Sent {sent} frames of {len(values)} channels at {fs:g} Hz")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Real-time frequency monitoring of streamed accelerations')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    serve = sub.add_parser('serve', help='run the monitoring service')
+    serve.add_argument('--channels', type=int, required=True)
+    serve.add_argument('--fs', type=float, required=True, help='sampling rate [Hz]')
+    serve.add_argument('--baseline', default=DEFAULT_BASELINE, help='modal_data.csv path')
+    serve.add_argument('--state', default='Baseline', help='modal_data.csv row used as the baseline')
+    serve.add_argument('--frequencies', default=None, help='comma-separated baseline frequencies [Hz]')
+    serve.add_argument('--nperseg', type=int, default=4096)
+    serve.add_argument('--n-average', type=int, default=8)
+    serve.add_argument('--tolerance', type=float, default=0.02, help='relative drift raising an alarm')
+    serve.add_argument('--persistence', type=int, default=3)
+    serve.add_argument('--queue-size', type=int, default=256)
+    serve.add_argument('--report-every', type=float, default=5.0, help='seconds between status lines')
+    serve.add_argument('--duration', type=float, default=None, help='stop after this many seconds')
+    serve.set_defaults(func=cmd_serve)
+
+    replay_parser = sub.add_parser('replay', help='stream recorder files to a running service')
+    replay_parser.add_argument('files', nargs='+', help='recorder files (time column + channels)')
+    replay_parser.add_argument('--block-size', type=int, default=256, help='samples per frame')
+    replay_parser.add_argument('--speed', type=float, default=1.0, help='x real time; 0 streams unpaced')
+    replay_parser.add_argument('--repeat', type=int, default=1, help='times to loop the files')
+    replay_parser.add_argument('--tile', type=int, default=1, help='copies of every channel (load testing)')
+    replay_parser.set_defaults(func=cmd_replay)
+
+    for p in (serve, replay_parser):
+        p.add_argument('--host', default='127.0.0.1')
+        p.add_argument('--port', type=int, default=DEFAULT_PORT)
+        p.add_argument('--protocol', default='tcp', choices=['tcp', 'udp'])
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+# Stochastic ground-motion ensembles and a binary record store
+#
+# Records are time-modulated Kanai-Tajimi processes: white noise is filtered
+# in the frequency domain by the Kanai-Tajimi ground filter (with a
+# Clough-Penzien high-pass, so ground velocity and displacement stay
+# bounded) and multiplied by a rise / strong motion / decay envelope.
+# Record i of a seed is drawn from its own generator, so any record can be
+# regenerated alone and ensembles do not depend on the batch size.
+#
+# Ensembles go to a record store like recorder_io's: a raw little-endian
+# (n_records, n_points) array (<name>.bin) with a JSON sidecar (<name>.json)
+# holding dt, units, record names, lengths and generator parameters.
+# Drivers address one record as '<name>.bin#<index>' (suite.read_record).
+import argparse
+import json
+import os
+
+import numpy as np
+import scipy.fft as sfft
+
+from Structural_monitoring.recorder_io import _binary_paths
+
+FORMAT_VERSION = 1
+# Kanai-Tajimi (wg, zeta_g) and Clough-Penzien (wf, zeta_f) filters [rad/s]
+SITES = {
+    'rock': {'wg': 25.0, 'zg': 0.6, 'wf': 2.0, 'zf': 0.6},
+    'firm': {'wg': 15.0, 'zg': 0.6, 'wf': 1.5, 'zf': 0.6},
+    'medium': {'wg': 10.0, 'zg': 0.4, 'wf': 1.0, 'zf': 0.6},
+    'soft': {'wg': 5.0, 'zg': 0.2, 'wf': 0.5, 'zf': 0.6},
+}
+# Envelope: quadratic rise to t1, strong motion to t2, then exp(-c (t - t2))
+ENVELOPE = {'t1': 2.0, 't2': 10.0, 'c': 0.3}
+
+
+def site_filter(omega, wg, zg, wf=None, zf=None):
+    """Complex Kanai-Tajimi (times Clough-Penzien if wf) transfer function"""
+    omega = np.asarray(omega, dtype=float)
+    h = (wg**2 + 2j * zg * wg * omega) / (wg**2 - omega**2 + 2j * zg * wg * omega)
+    if wf:
+        h = h * omega**2 / (wf**2 - omega**2 + 2j * zf * wf * omega)
+    return h
+
+
+def envelope(t, t1=ENVELOPE['t1'], t2=ENVELOPE['t2'], c=ENVELOPE['c']):
+    t = np.asarray(t, dtype=float)
+    return np.where(t < t1, (t / t1)**2, np.where(t <= t2, 1.0, np.exp(-c * (t - t2))))
+
+
+def generate(n_records, duration=30.0, dt=0.02, site='firm', seed=0, pga=None, s0=0.01, start=0,
+             modulation=ENVELOPE):
+    """(n_records, n_points) stochastic accelerations [m/s^2]
+
+    site is a SITES key or a dict of filter parameters; s0 is the two-sided
+    white-noise intensity [m^2/s^3]. With pga [m/s^2] every record is scaled
+    to that peak instead. Records start..start+n_records-1 of seed are drawn.
+    """
+    params = SITES[site] if isinstance(site, str) else site
+    n = int(round(duration / dt)) + 1
+    # Pad against wrap-around of the circular filter: ~5 decay times of the
+    # slowest pole
+    decay = 1.0 / min(params['zg'] * params['wg'], (params.get('zf') or 1.0) * (params.get('wf') or np.inf))
+    n_fft = sfft.next_fast_len(n + int(np.ceil(5 * decay / dt)), real=True)
+
+    noise = np.empty((n_records, n_fft))
+    for i in range(n_records):
+        noise[i] = np.random.default_rng([seed, start + i]).standard_normal(n_fft)
+    omega = 2 * np.pi * sfft.rfftfreq(n_fft, dt)
+    h = site_filter(omega, params['wg'], params['zg'], params.get('wf'), params.get('zf'))
+    accel = sfft.irfft(sfft.rfft(noise, axis=-1, workers=-1) * h, n_fft, axis=-1, workers=-1)[:, :n]
+    accel *= np.sqrt(2 * np.pi * s0 / dt) * envelope(dt * np.arange(n), **modulation)
+    if pga is not None:
+        accel *= pga / np.abs(accel).max(axis=1, keepdims=True)
+    return accel
+
+
+class RecordStore:
+    """Memory-mapped ground-motion records written by write_records()"""
+
+    def __init__(self, path):
+        self.bin_path, self.meta_path = _binary_paths(path.split('#')[0])
+        with open(self.meta_path) as f:
+            self.meta = json.load(f)
+        shape = tuple(self.meta['shape'])
+        self.data = np.memmap(self.bin_path, dtype=self.meta['dtype'], mode='r', shape=shape)
+
+    def __len__(self):
+        return self.meta['shape'][0]
+
+    def __getitem__(self, i):
+        """Record i (valid samples only) as float64"""
+        return np.asarray(self.data[i, :self.meta['lengths'][i]], dtype=float)
+
+    @property
+    def dt(self):
+        return self.meta['dt']
+
+    @property
+    def names(self):
+        return self.meta['names']
+
+    @property
+    def lengths(self):
+        return np.asarray(self.meta['lengths'])
+
+    def paths(self):
+        """'<name>.bin#<index>' addresses of every record, for the drivers"""
+        return [f'{self.bin_path}#{i}' for i in range(len(self))]
+
+
+def write_records(path, batches, dt, n_points, names=None, lengths=None, units='g', dtype='float32',
+                  **meta):
+    """Stream (n, n_points) record batches into a store; returns a RecordStore
+
+    Extra keyword arguments (generator parameters, seeds, ...) are kept in
+    the JSON sidecar. The binary is written atomically.
+    """
+    bin_path, meta_path = _binary_paths(path)
+    disk_dtype = np.dtype(dtype).newbyteorder('<')
+    n_records = 0
+    tmp = bin_path + '.tmp'
+    with open(tmp, 'wb') as f:
+        for batch in batches:
+            batch = np.atleast_2d(batch)
+            if batch.shape[1] != n_points:
+                raise ValueError(f"Batch has {batch.shape[1]} points, expected {n_points}")
+            batch.astype(disk_dtype).tofile(f)
+            n_records += len(batch)
+    os.replace(tmp, bin_path)
+
+    info = {
+        'version': FORMAT_VERSION,
+        'dtype': disk_dtype.str,
+        'shape': [n_records, n_points],
+        'dt': float(dt),
+        'units': units,
+        'names': list(names) if names is not None else [f'record{i:05d}' for i in range(n_records)],
+        'lengths': [int(x) for x in lengths] if lengths is not None else [n_points] * n_records,
+    }
+    info.update(meta)
+    with open(meta_path, 'w') as f:
+        json.dump(info, f, indent=2)
+    return RecordStore(bin_path)
+
+
+def write_ensemble(path, n_records, duration=30.0, dt=0.02, site='firm', seed=0, pga=None, s0=0.01,
+                   modulation=ENVELOPE, batch=500, dtype='float32'):
+    """Generate an ensemble in batches straight into a store (values in g)"""
+    n = int(round(duration / dt)) + 1
+    g = 9.81
+    batches = (generate(min(batch, n_records - start), duration, dt, site, seed,
+                        None if pga is None else pga * g, s0, start, modulation) / g
+               for start in range(0, n_records, batch))
+    params = SITES[site] if isinstance(site, str) else site
+    return write_records(path, batches, dt, n, dtype=dtype, generator='kanai_tajimi', site=site,
+                         filter=params, seed=seed, pga=pga, s0=s0, modulation=dict(modulation))
+
+
+def store_files(paths, path, record_dt=None, dtype='float64'):
+    """Convert text records (.dat, .txt, .AT2) of one time step into a store"""
+    from Structural_monitoring.suite import read_record
+
+    records = [read_record(p, record_dt) for p in paths]
+    dts = {round(dt, 12) for _, dt in records}
+    if len(dts) > 1:
+        raise ValueError(f"Records have different time steps {sorted(dts)}; store them separately")
+    lengths = [len(accel) for accel, _ in records]
+    stack = np.zeros((len(records), max(lengths)))
+    for i, (accel, _) in enumerate(records):
+        stack[i, :len(accel)] = accel
+    names = [os.path.basename(p) for p in paths]
+    return write_records(path, [stack], records[0][1], stack.shape[1], names, lengths, dtype=dtype,
+                         sources=[os.path.abspath(p) for p in paths])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate a stochastic ground-motion ensemble into a record store')
+    parser.add_argument('out', help='store path (<out>.bin + <out>.json)')
+    parser.add_argument('--n', type=int, default=100, help='number of records')
+    parser.add_argument('--duration', type=float, default=30.0)
+    parser.add_argument('--dt', type=float, default=0.02)
+    parser.add_argument('--site', default='firm', choices=sorted(SITES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--pga', type=float, default=None, help='scale every record to this PGA [g]')
+    parser.add_argument('--s0', type=float, default=0.01, help='white-noise intensity [m^2/s^3]')
+    parser.add_argument('--float64', action='store_true', help='store float64 instead of float32')
+    args = parser.parse_args(argv)
+
+    store = write_ensemble(args.out, args.n, args.duration, args.dt, args.site, args.seed, args.pga, args.s0,
+                           dtype='float64' if args.float64 else 'float32')
+    peaks = np.abs(store.data).max(axis=1)
+    print(f"{len(store)} records x {store.meta['shape'][1]} points (dt {store.dt:g} s) -> {store.bin_path}")
+    print(f"PGA [g]: median {np.median(peaks):.3f}, range {peaks.min():.3f}-{peaks.max():.3f}")
+
+
+if __name__ == '__main__':
+    main()
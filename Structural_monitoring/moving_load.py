@@ -0,0 +1,108 @@
+# Moving-load operator for vehicle crossings
+#
+# The whole load history of a crossing is one sparse (n_steps, n_free)
+# matrix: every axle force is distributed to the two nodes of the element
+# it stands on with the Hermite shape functions, i.e. the consistent nodal
+# loads of an OpenSees `eleLoad -type -beamPoint`. fem.newmark consumes the
+# matrix row by row with a single factorization.
+import numpy as np
+import scipy.sparse as sp
+
+from Structural_monitoring import fem
+
+
+def hermite_weights(xi, length):
+    """(n, 4) consistent-load weights for (v1, rz1, v2, rz2) of a point load at xi"""
+    xi = np.asarray(xi, dtype=float)
+    length = np.asarray(length, dtype=float)
+    return np.stack([
+        1 - 3 * xi**2 + 2 * xi**3,
+        length * xi * (1 - xi)**2,
+        3 * xi**2 - 2 * xi**3,
+        -length * xi**2 * (1 - xi),
+    ], axis=-1)
+
+
+def axle_positions(time, speed, axle_offsets=(0.0,), start=0.0):
+    """(n_steps, n_axles) axle positions along the deck
+
+    Axle k is axle_offsets[k] metres behind the front axle, which is at
+    start + speed * t.
+    """
+    time = np.asarray(time, dtype=float)
+    front = start + speed * time
+    return front[:, None] - np.asarray(axle_offsets, dtype=float)[None, :]
+
+
+def locate(model, x):
+    """Element index and local coordinate xi in [0, 1] for deck positions x
+
+    The model is a beam along x with elements numbered left to right, as
+    built by Frame2D.beam. Positions off the deck get element -1.
+    """
+    x = np.asarray(x, dtype=float)
+    x_start = model.nodes[model.elements[:, 0], 0]
+    x_end = model.nodes[model.elements[:, 1], 0]
+    elem = np.searchsorted(x_end, x, side='left')
+    elem = np.minimum(elem, model.n_elem - 1)
+    xi = (x - x_start[elem]) / (x_end[elem] - x_start[elem])
+    off = (x < x_start[0]) | (x > x_end[-1])
+    elem = np.where(off, -1, elem)
+    return elem, np.clip(xi, 0.0, 1.0)
+
+
+def contact_weights(model, x):
+    """Free-DOF indices and Hermite weights, each (..., 4), of deck positions x
+
+    The four entries are (v1, rz1, v2, rz2) of the element under each
+    position; positions off the deck and fixed DOFs get index -1 and
+    weight 0.
+    """
+    x = np.asarray(x, dtype=float)
+    elem, xi = locate(model, x)
+    off = elem < 0
+    elem = np.where(off, 0, elem)
+    lengths, _, _ = model.geometry()
+    weights = hermite_weights(xi, lengths[elem])
+    nodes = model.elements[elem]
+    dofs = np.stack([nodes[..., 0] * fem.NDF + fem.UY, nodes[..., 0] * fem.NDF + fem.RZ,
+                     nodes[..., 1] * fem.NDF + fem.UY, nodes[..., 1] * fem.NDF + fem.RZ], axis=-1)
+    full_to_free = np.full(model.n_dof, -1, dtype=np.int64)
+    full_to_free[model.free_dofs] = np.arange(model.n_free)
+    dofs = full_to_free[dofs]
+    dofs[off] = -1
+    weights[(dofs < 0)] = 0.0
+    return dofs, weights
+
+
+def load_matrix(model, positions, axle_loads):
+    """Sparse (n_steps, n_free) consistent nodal load history
+
+    positions is (n_steps, n_axles) from axle_positions; axle_loads is
+    (n_axles,) or (n_steps, n_axles) vertical forces (negative = downward).
+    Axles off the deck contribute nothing.
+    """
+    positions = np.atleast_2d(np.asarray(positions, dtype=float))
+    n_steps, n_axles = positions.shape
+    forces = np.broadcast_to(np.asarray(axle_loads, dtype=float), (n_steps, n_axles))
+
+    dofs, weights = contact_weights(model, positions)
+    rows = np.broadcast_to(np.arange(n_steps)[:, None, None], dofs.shape).ravel()
+    cols = dofs.ravel()
+    vals = (weights * forces[..., None]).ravel()
+    keep = cols >= 0
+    return sp.csr_matrix((vals[keep], (rows[keep], cols[keep])), shape=(n_steps, model.n_free))
+
+
+def crossing_loads(model, speed, dt, axle_loads, axle_offsets=(0.0,), n_steps=None):
+    """Load matrix for a vehicle entering at x = 0 at t = 0
+
+    Step i is at time i * dt, the convention of the Tcl scripts (the load of
+    step i is applied while integrating to (i + 1) * dt). By default the run
+    lasts until the last axle leaves the deck.
+    """
+    length = model.nodes[:, 0].max() - model.nodes[:, 0].min()
+    if n_steps is None:
+        n_steps = int(round((length + max(axle_offsets)) / (speed * dt))) + 1
+    positions = axle_positions(dt * np.arange(n_steps), speed, axle_offsets)
+    return load_matrix(model, positions, axle_loads)
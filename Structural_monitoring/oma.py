@@ -0,0 +1,331 @@
+# Operational modal analysis from ambient multi-channel accelerations
+#
+# Two output-only identification methods on (n_channels, n_samples) arrays:
+#   - FDD: cross-spectral matrices G(f) from segment FFTs (one batched
+#     matmul per segment block), a batched Hermitian eigen-decomposition over
+#     all frequency lines, peak picking on the first singular value and
+#     damping from the EFDD bell (MAC-selected SDOF spectrum -> correlation
+#     -> logarithmic decrement).
+#   - SSI-COV: output correlations from zero-padded segment FFTs, a block
+#     Toeplitz matrix, one SVD, and poles for every model order from the
+#     shift structure of the observability matrix. Poles are checked for
+#     stability between consecutive orders and clustered into modes.
+import argparse
+
+import numpy as np
+import pandas as pd
+import scipy.fft as sfft
+import scipy.signal as ss
+from numpy.lib.stride_tricks import sliding_window_view
+
+from Structural_monitoring import spectral
+
+# Segment samples x channels per FFT block (bounds memory on long records)
+BATCH_SAMPLES = 1 << 23
+
+
+def _segment_products(signals, nperseg, step, nfft, window, refs=None):
+    """Sum over segments of X_i(f) conj(X_j(f)), shape (n_freq, n_ch, n_ref)"""
+    y = np.asarray(signals, dtype=float)
+    refs = np.arange(len(y)) if refs is None else np.asarray(refs)
+    n_segments = (y.shape[1] - nperseg) // step + 1
+    if n_segments < 1:
+        raise ValueError(f"Records of {y.shape[1]} samples are shorter than one segment ({nperseg})")
+    segments = sliding_window_view(y, nperseg, axis=1)[:, ::step]  # (ch, seg, nperseg)
+    total = np.zeros((nfft // 2 + 1, len(y), len(refs)), dtype=complex)
+    batch = max(BATCH_SAMPLES // (len(y) * nfft), 1)
+    for start in range(0, n_segments, batch):
+        X = sfft.rfft(segments[:, start:start + batch] * window, n=nfft, axis=-1, workers=-1)
+        X = X.transpose(2, 0, 1)  # (freq, ch, seg)
+        total += X @ X[:, refs].conj().transpose(0, 2, 1)
+    return total, n_segments
+
+
+def cross_spectra(signals, fs, nperseg=1024, overlap=0.5, nfft=None, window='hann'):
+    """One-sided cross-spectral density matrices G(f) of (n_channels, n_samples) data
+
+    Segments are mean-detrended per channel. Returns (freqs, G) with G
+    shaped (n_freq, n_channels, n_channels) and Hermitian per line.
+    """
+    y = np.asarray(signals, dtype=float)
+    y = y - y.mean(axis=1, keepdims=True)
+    nperseg = min(nperseg, y.shape[1])
+    nfft = max(nfft or nperseg, nperseg)
+    win = ss.get_window(window, nperseg)
+    step = max(nperseg - int(overlap * nperseg), 1)
+    total, n_segments = _segment_products(y, nperseg, step, nfft, win)
+    G = total * (2.0 / (fs * (win**2).sum() * n_segments))
+    G[0] /= 2.0
+    if nfft % 2 == 0:
+        G[-1] /= 2.0
+    return sfft.rfftfreq(nfft, 1.0 / fs), G
+
+
+def correlations(signals, max_lag, ref_channels=None, segment=None):
+    """Unbiased output correlations R[k] = E[y(t + k) y_ref(t)^T] for k = 0..max_lag
+
+    Computed from non-overlapping segments zero-padded against wrap-around,
+    so the cost is a few FFTs per channel plus one batched matmul. Returns
+    (max_lag + 1, n_channels, n_ref).
+    """
+    y = np.asarray(signals, dtype=float)
+    y = y - y.mean(axis=1, keepdims=True)
+    if segment is None:
+        segment = max(8 * (max_lag + 1), 1024)
+    segment = min(segment, y.shape[1])
+    if segment <= max_lag:
+        raise ValueError(f"max_lag {max_lag} needs records longer than {max_lag + 1} samples")
+    nfft = sfft.next_fast_len(segment + max_lag + 1)
+    total, n_segments = _segment_products(y, segment, segment, nfft, np.ones(segment), ref_channels)
+    R = sfft.irfft(total, n=nfft, axis=0)[:max_lag + 1]
+    return R / (n_segments * (segment - np.arange(max_lag + 1)))[:, None, None]
+
+
+def mac(a, b):
+    """Modal assurance criterion between the columns of a and of b"""
+    a = np.asarray(a)
+    b = np.asarray(b)
+    cross = np.abs(a.conj().T @ b) ** 2
+    return cross / np.outer(np.einsum('ij,ij->j', a.conj(), a).real, np.einsum('ij,ij->j', b.conj(), b).real)
+
+
+def real_modes(phi):
+    """Real mode shapes: rotate each complex column so its largest entry is real, max |.| = 1"""
+    phi = np.asarray(phi)
+    peak = np.take_along_axis(phi, np.abs(phi).argmax(axis=0)[None], axis=0)
+    rotated = (phi * np.exp(-1j * np.angle(peak))).real
+    return rotated / np.abs(rotated).max(axis=0)
+
+
+def _efdd_damping(freqs, s1, u1, peak_bins, mac_threshold, decay_range=(0.3, 0.9)):
+    """Damping ratio and frequency of every peak from its EFDD SDOF bell"""
+    n_modes = len(peak_bins)
+    bells = np.zeros((n_modes, len(freqs)))
+    # MAC of every line's first singular vector with the peak vector (unit norms)
+    similarity = np.abs(u1[peak_bins].conj() @ u1.T) ** 2
+    for m, k in enumerate(peak_bins):
+        outside = np.flatnonzero(similarity[m] < mac_threshold)
+        left = outside[outside < k].max(initial=-1) + 1
+        right = outside[outside > k].min(initial=len(freqs))
+        bells[m, left:right] = s1[left:right]
+
+    correlation = sfft.irfft(bells, axis=1)
+    correlation = correlation[:, :correlation.shape[1] // 2] / correlation[:, :1]
+    dt = 1.0 / (2 * freqs[-1])
+    damping = np.full(n_modes, np.nan)
+    frequency = np.full(n_modes, np.nan)
+    for m in range(n_modes):
+        r = correlation[m]
+        maxima = np.flatnonzero((r[1:-1] > r[:-2]) & (r[1:-1] >= r[2:]) & (r[1:-1] > 0)) + 1
+        maxima = np.r_[0, maxima]
+        keep = (r[maxima] >= decay_range[0]) & (r[maxima] <= decay_range[1])
+        if np.count_nonzero(keep) < 2:
+            keep = r[maxima] >= decay_range[0]
+        if np.count_nonzero(keep) < 2:
+            continue
+        cycles = np.arange(len(maxima))[keep]
+        delta = -np.polyfit(cycles, np.log(r[maxima][keep]), 1)[0]
+        damping[m] = delta / np.sqrt(4 * np.pi**2 + delta**2)
+        period = np.polyfit(cycles, maxima[keep] * dt, 1)[0]
+        frequency[m] = 1.0 / (period * np.sqrt(1 - damping[m] ** 2))
+    return damping, frequency
+
+
+def fdd(signals, fs, n_modes=3, f_range=None, nperseg=1024, nfft=None, overlap=0.5, mac_threshold=0.8):
+    """Frequency-domain decomposition with EFDD damping
+
+    signals is (n_channels, n_samples). The n_modes largest peaks of the
+    first singular value inside f_range are picked and refined by parabolic
+    interpolation. Returns dict(frequency, damping, efdd_frequency, modes
+    (n_channels, n_modes, real, max |.| = 1), freqs, singular_values
+    (n_freq, n_channels), descending).
+    """
+    freqs, G = cross_spectra(signals, fs, nperseg, overlap, nfft)
+    # G is Hermitian positive semi-definite, so its SVD is its eigh
+    values, vectors = np.linalg.eigh(G)
+    values = values[:, ::-1]
+    u1 = vectors[:, :, -1]
+    peaks, _ = spectral.pick_peaks(freqs, values[:, 0], n_modes, f_range)
+    peaks = peaks[~np.isnan(peaks)]
+    bins = np.abs(freqs[:, None] - peaks).argmin(axis=0)
+    damping, efdd_frequency = _efdd_damping(freqs, values[:, 0], u1, bins, mac_threshold)
+    return {
+        'frequency': peaks,
+        'damping': damping,
+        'efdd_frequency': efdd_frequency,
+        'modes': real_modes(u1[bins].T),
+        'freqs': freqs,
+        'singular_values': values,
+    }
+
+
+def _leading_svd(T, k, n_iter=4, seed=0):
+    """First k singular vectors/values of T; randomized when T is much larger than k"""
+    if min(T.shape) <= 4 * k:
+        U, S, _ = np.linalg.svd(T, full_matrices=False)
+        return U[:, :k], S[:k]
+    # Range finder with power iterations (Halko et al.): only a thin slab of
+    # T's columns is ever factorized
+    Q = T @ np.random.default_rng(seed).standard_normal((T.shape[1], k + 20))
+    for _ in range(n_iter):
+        Q, _ = np.linalg.qr(Q)
+        Q, _ = np.linalg.qr(T.T @ Q)
+        Q = T @ Q
+    Q, _ = np.linalg.qr(Q)
+    U, S, _ = np.linalg.svd(Q.T @ T, full_matrices=False)
+    return (Q @ U)[:, :k], S[:k]
+
+
+def _poles(O, n_channels, fs):
+    """Frequencies, damping ratios and complex shapes from an observability matrix"""
+    A = np.linalg.lstsq(O[:-n_channels], O[n_channels:], rcond=None)[0]
+    lam, psi = np.linalg.eig(A)
+    keep = lam.imag > 0  # one of each conjugate pair; real poles are not modes
+    mu = np.log(lam[keep]) * fs
+    return np.abs(mu) / (2 * np.pi), -mu.real / np.abs(mu), O[:n_channels] @ psi[:, keep]
+
+
+def ssi_cov(signals, fs, max_order=40, block_rows=None, ref_channels=None, f_range=None,
+            f_tol=0.01, damping_tol=0.05, mac_tol=0.98, max_damping=0.2, min_count=None):
+    """Covariance-driven stochastic subspace identification
+
+    signals is (n_channels, n_samples); ref_channels (default all) are the
+    reference outputs of the correlations. Poles are computed for the even
+    orders 2..max_order; a pole is stable when the previous order has one
+    within f_tol in frequency, damping_tol in damping and mac_tol in MAC.
+    Stable poles are clustered by frequency; clusters with at least
+    min_count poles (default a quarter of the orders) are the modes.
+    block_rows defaults to enough lags for max_order and for one period of
+    the lowest frequency of interest (f_range[0], else fs / 50). Returns
+    dict(frequency, damping, modes, count, diagram) where diagram is a
+    DataFrame with one row per pole.
+    """
+    y = np.asarray(signals, dtype=float)
+    n_channels = len(y)
+    n_refs = n_channels if ref_channels is None else len(ref_channels)
+    if block_rows is None:
+        f_low = f_range[0] if f_range is not None and f_range[0] > 0 else fs / 50
+        block_rows = max(int(np.ceil(max_order / n_refs)) + 1, int(np.ceil(fs / f_low)))
+    R = correlations(y, 2 * block_rows, ref_channels)
+
+    # Block Toeplitz T[a, b] = R[s + a - b], a, b = 0..s-1  (T = O Gamma)
+    lag = block_rows + np.arange(block_rows)[:, None] - np.arange(block_rows)[None, :]
+    T = R[lag].transpose(0, 2, 1, 3).reshape(block_rows * n_channels, block_rows * n_refs)
+    U, S = _leading_svd(T, min(max_order, *T.shape))
+    max_order = len(S)
+
+    rows = []
+    previous = None
+    for order in range(2, max_order + 1, 2):
+        O = U[:, :order] * np.sqrt(S[:order])
+        freq, damp, shapes = _poles(O, n_channels, fs)
+        physical = (damp > 0) & (damp < max_damping)
+        if f_range is not None:
+            physical &= (freq >= f_range[0]) & (freq <= f_range[1])
+        freq, damp, shapes = freq[physical], damp[physical], shapes[:, physical]
+        stable_f = stable_d = stable_m = np.zeros(len(freq), dtype=bool)
+        if previous is not None and len(previous[0]) and len(freq):
+            p_freq, p_damp, p_shapes = previous
+            nearest = np.abs(freq[:, None] - p_freq).argmin(axis=1)
+            stable_f = np.abs(freq - p_freq[nearest]) <= f_tol * freq
+            stable_d = np.abs(damp - p_damp[nearest]) <= damping_tol * damp
+            stable_m = mac(shapes, p_shapes)[np.arange(len(freq)), nearest] >= mac_tol
+        previous = (freq, damp, shapes)
+        for i in range(len(freq)):
+            rows.append((order, freq[i], damp[i], stable_f[i], stable_d[i], stable_m[i], shapes[:, i]))
+
+    diagram = pd.DataFrame([r[:6] for r in rows],
+                           columns=['order', 'frequency', 'damping', 'stable_frequency',
+                                    'stable_damping', 'stable_mode'])
+    diagram['stable'] = diagram[['stable_frequency', 'stable_damping', 'stable_mode']].all(axis=1)
+    shapes = np.array([r[6] for r in rows]).T if rows else np.empty((n_channels, 0))
+
+    # Cluster stable poles: sorted frequencies split where the gap exceeds f_tol
+    if min_count is None:
+        min_count = max(max_order // 8, 2)
+    stable = np.flatnonzero(diagram['stable'].to_numpy())
+    stable = stable[np.argsort(diagram['frequency'].to_numpy()[stable])]
+    f_stable = diagram['frequency'].to_numpy()[stable]
+    breaks = np.flatnonzero(np.diff(f_stable) > f_tol * f_stable[1:]) + 1
+    modes = []
+    for cluster in np.split(stable, breaks):
+        if len(cluster) < min_count:
+            continue
+        highest = cluster[diagram['order'].to_numpy()[cluster].argmax()]
+        modes.append((np.median(diagram['frequency'].to_numpy()[cluster]),
+                      np.median(diagram['damping'].to_numpy()[cluster]),
+                      shapes[:, highest], len(cluster)))
+    return {
+        'frequency': np.array([m[0] for m in modes]),
+        'damping': np.array([m[1] for m in modes]),
+        'modes': real_modes(np.array([m[2] for m in modes]).T) if modes else np.empty((n_channels, 0)),
+        'count': np.array([m[3] for m in modes], dtype=int),
+        'diagram': diagram,
+    }
+
+
+def plot_stabilization(diagram, singular_values=None, freqs=None, ax=None):
+    """Stabilization diagram (order vs frequency), optionally over the FDD spectrum"""
+    import matplotlib.pyplot as plt
+
+    if ax is None:
+        _, ax = plt.subplots(figsize=(10, 6))
+    unstable = diagram[~diagram['stable']]
+    stable = diagram[diagram['stable']]
+    ax.plot(unstable['frequency'], unstable['order'], '.', color='0.7', label='pole')
+    ax.plot(stable['frequency'], stable['order'], 'o', mfc='none', color='C0', label='stable')
+    ax.set_xlabel('Frequency (Hz)')
+    ax.set_ylabel('Model order')
+    if singular_values is not None:
+        twin = ax.twinx()
+        twin.semilogy(freqs, singular_values[:, 0], color='C3', lw=1)
+        twin.set_ylabel('First singular value')
+    ax.legend(loc='upper right')
+    return ax
+
+
+def load_channels(paths):
+    """(n_channels, n_samples) values and sampling rate from recorder files on one time base"""
+    from Structural_monitoring import recorder_io
+
+    recordings = [recorder_io.open_recorder(path) for path in paths]
+    lengths = {len(rec) for rec in recordings}
+    if len(lengths) != 1:
+        raise ValueError(f"Recorder files have different lengths: {sorted(lengths)}")
+    dt = recordings[0].dt if recordings[0].dt is not None else float(np.diff(recordings[0].time).mean())
+    return np.vstack([np.asarray(rec.values).T for rec in recordings]), 1.0 / dt
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Operational modal analysis of ambient recorder files')
+    parser.add_argument('files', nargs='+', help='recorder files (time column + channels), one time base')
+    parser.add_argument('--method', default='both', choices=['fdd', 'ssi', 'both'])
+    parser.add_argument('--n-modes', type=int, default=3, help='FDD peaks')
+    parser.add_argument('--max-order', type=int, default=40, help='SSI model order')
+    parser.add_argument('--f-range', type=float, nargs=2, default=None, metavar=('F_LOW', 'F_HIGH'))
+    parser.add_argument('--nperseg', type=int, default=1024)
+    parser.add_argument('--plot', default=None, help='stabilization diagram image path')
+    args = parser.parse_args(argv)
+
+    y, fs = load_channels(args.files)
+    print(f"{y.shape[0]} channels x {y.shape[1]} samples at {fs:g} Hz")
+    fdd_result = ssi_result = None
+    if args.method in ('fdd', 'both'):
+        fdd_result = fdd(y, fs, args.n_modes, args.f_range, args.nperseg)
+        print('FDD:  ' + ', '.join(f'{f:.3f} Hz ({100 * z:.2f}%)'
+                                  for f, z in zip(fdd_result['frequency'], fdd_result['damping'])))
+    if args.method in ('ssi', 'both'):
+        ssi_result = ssi_cov(y, fs, args.max_order, f_range=args.f_range)
+        print('SSI:  ' + ', '.join(f'{f:.3f} Hz ({100 * z:.2f}%)'
+                                  for f, z in zip(ssi_result['frequency'], ssi_result['damping'])))
+    if args.plot and ssi_result is not None:
+        import matplotlib
+        # Written straight to a file: no display needed
+        matplotlib.use('Agg')
+        ax = plot_stabilization(ssi_result['diagram'],
+                                fdd_result and fdd_result['singular_values'], fdd_result and fdd_result['freqs'])
+        ax.figure.savefig(args.plot, dpi=150, bbox_inches='tight')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+# Chunked reader and binary store for OpenSees recorder outputs
+#
+# Recorder text files (`recorder Node/Element -file ... -time`) are parsed in
+# chunks and converted once into a raw little-endian array (<name>.bin)
+# with a JSON sidecar (<name>.json) holding the shape, column names, source
+# file stamp and the time base. Recording memory-maps the binary, so time
+# windows and downsampled views never re-parse the text.
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Column names of a 2D beam-column `force` recorder (global end forces)
+FORCE_2D = ('Fx_i', 'Fy_i', 'Mz_i', 'Fx_j', 'Fy_j', 'Mz_j')
+FORMAT_VERSION = 1
+
+
+def iter_chunks(path, chunk_rows=100_000):
+    """Yield (rows, columns) float64 blocks of a whitespace-separated text file"""
+    reader = pd.read_csv(path, sep=r'\s+', header=None, chunksize=chunk_rows,
+                         dtype=np.float64, engine='c', float_precision='round_trip')
+    for block in reader:
+        yield block.to_numpy()
+
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    return {'path': os.path.abspath(path), 'mtime': stat.st_mtime, 'size': stat.st_size}
+
+
+def _binary_paths(out):
+    base = out[:-4] if out.endswith('.bin') else out
+    return base + '.bin', base + '.json'
+
+
+def convert(path, out=None, columns=None, has_time=True, dtype='float64', chunk_rows=100_000,
+            force=False):
+    """Convert a recorder text file to the binary format; returns a Recording
+
+    out defaults to the text path without extension. columns names the value
+    columns (e.g. FORCE_2D); defaults to value0, value1, ... Conversion is
+    skipped while the source file's size and mtime are unchanged.
+    """
+    if out is None:
+        out = os.path.splitext(path)[0]
+    bin_path, meta_path = _binary_paths(out)
+    stamp = _source_stamp(path)
+    if not force and os.path.exists(meta_path) and os.path.exists(bin_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get('source') == stamp and meta.get('version') == FORMAT_VERSION:
+            return Recording(bin_path)
+
+    disk_dtype = np.dtype(dtype).newbyteorder('<')
+    n_rows = 0
+    n_cols = None
+    first = last = None
+    uniform = has_time
+    dt_est = None
+    tmp = bin_path + '.tmp'
+    with open(tmp, 'wb') as f:
+        for block in iter_chunks(path, chunk_rows):
+            if n_cols is None:
+                n_cols = block.shape[1]
+            elif block.shape[1] != n_cols:
+                raise ValueError(f"{path}: row {n_rows + 1} has {block.shape[1]} columns, expected {n_cols}")
+            if has_time and len(block):
+                t = block[:, 0]
+                if first is None:
+                    first = t[0]
+                if dt_est is None:
+                    # First two times seen, which may straddle a chunk boundary
+                    seen = np.concatenate([[last], t]) if last is not None else t
+                    dt_est = seen[1] - seen[0] if len(seen) > 1 else None
+                # Check spacing across chunk boundaries as well as within;
+                # recorders print times to 6 significant digits
+                steps = np.diff(np.concatenate([[last], t]) if last is not None else t)
+                if dt_est is not None and len(steps):
+                    tol = 1e-3 * abs(dt_est) + 1e-5 * abs(t[-1])
+                    uniform &= bool(np.abs(steps - dt_est).max() <= tol)
+                last = t[-1]
+            block.astype(disk_dtype).tofile(f)
+            n_rows += len(block)
+    os.replace(tmp, bin_path)
+
+    if n_cols is None:
+        n_cols = 0
+    n_values = n_cols - (1 if has_time else 0)
+    if columns is None:
+        columns = [f'value{i}' for i in range(n_values)]
+    elif len(columns) != n_values:
+        raise ValueError(f"{len(columns)} column names for {n_values} value columns")
+    time_base = None
+    if has_time and uniform and n_rows > 1:
+        time_base = {'t0': float(first), 'dt': float((last - first) / (n_rows - 1))}
+
+    meta = {
+        'version': FORMAT_VERSION,
+        'dtype': disk_dtype.str,
+        'shape': [n_rows, n_cols],
+        'has_time': has_time,
+        'columns': list(columns),
+        'time_base': time_base,
+        'source': stamp,
+    }
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f, indent=2)
+    return Recording(bin_path)
+
+
+class Recording:
+    """Memory-mapped recorder data written by convert()"""
+
+    def __init__(self, path):
+        self.bin_path, self.meta_path = _binary_paths(path)
+        with open(self.meta_path) as f:
+            self.meta = json.load(f)
+        shape = tuple(self.meta['shape'])
+        if shape[0] == 0:
+            self.data = np.empty(shape, dtype=self.meta['dtype'])
+        else:
+            self.data = np.memmap(self.bin_path, dtype=self.meta['dtype'], mode='r', shape=shape)
+
+    def __len__(self):
+        return self.meta['shape'][0]
+
+    @property
+    def columns(self):
+        return self.meta['columns']
+
+    @property
+    def dt(self):
+        base = self.meta['time_base']
+        return base['dt'] if base else None
+
+    @property
+    def time(self):
+        if not self.meta['has_time']:
+            raise ValueError("Recording has no time column")
+        return self.data[:, 0]
+
+    @property
+    def values(self):
+        return self.data[:, 1:] if self.meta['has_time'] else self.data
+
+    def column(self, name):
+        return self.values[:, self.columns.index(name)]
+
+    def _index(self, t, side):
+        base = self.meta['time_base']
+        if base is not None:
+            # Uniform time base: O(1) index arithmetic, no time column scan
+            exact = (t - base['t0']) / base['dt']
+            i = np.ceil(exact - 1e-9) if side == 'left' else np.floor(exact + 1e-9) + 1
+            return int(np.clip(i, 0, len(self)))
+        return int(np.searchsorted(self.time, t, side=side))
+
+    def window(self, t_start=None, t_end=None):
+        """Rows with t_start <= time <= t_end, as a view of the memory map"""
+        start = 0 if t_start is None else self._index(t_start, 'left')
+        end = len(self) if t_end is None else self._index(t_end, 'right')
+        return self.data[start:max(start, end)]
+
+    def downsample(self, factor, t_start=None, t_end=None, method='stride'):
+        """Every factor-th row ('stride', a view) or block means ('mean')"""
+        rows = self.window(t_start, t_end)
+        if method == 'stride':
+            return rows[::factor]
+        if method == 'mean':
+            n = len(rows) // factor
+            out = np.empty((n, rows.shape[1]))
+            block_rows = max(factor, (1_000_000 // factor) * factor)
+            # Average in bounded chunks so huge windows are never fully loaded
+            for start in range(0, n * factor, block_rows):
+                chunk = np.asarray(rows[start:min(start + block_rows, n * factor)], dtype=float)
+                out[start // factor:start // factor + len(chunk) // factor] = \
+                    chunk.reshape(-1, factor, rows.shape[1]).mean(axis=1)
+            return out
+        raise ValueError(f"Unknown method {method!r}; use 'stride' or 'mean'")
+
+
+def open_recorder(path, columns=None, **kwargs):
+    """Recording for a text recorder file, converting it on first use"""
+    if path.endswith('.bin') or path.endswith('.json'):
+        return Recording(path)
+    return convert(path, columns=columns, **kwargs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Convert OpenSees recorder text files to memory-mapped binaries')
+    parser.add_argument('files', nargs='+')
+    parser.add_argument('--columns', default=None,
+                        help="comma-separated value column names, or 'force2d' for FORCE_2D")
+    parser.add_argument('--float32', action='store_true', help='store single precision')
+    parser.add_argument('--force', action='store_true', help='reconvert even if up to date')
+    args = parser.parse_args(argv)
+
+    columns = None
+    if args.columns == 'force2d':
+        columns = FORCE_2D
+    elif args.columns:
+        columns = args.columns.split(',')
+    for path in args.files:
+        rec = convert(path, columns=columns, dtype='float32' if args.float32 else 'float64',
+                      force=args.force)
+        base = rec.meta['time_base']
+        timing = f"dt {base['dt']:g} s from t0 {base['t0']:g} s" if base else 'non-uniform time'
+        print(f"{path}: {len(rec)} rows x {len(rec.columns)} values, {timing} -> {rec.bin_path}")
+
+
+if __name__ == '__main__':
+    main()
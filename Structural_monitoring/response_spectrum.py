@@ -0,0 +1,264 @@
+# Elastic response spectra of ground-motion records
+#
+# Each SDOF oscillator u'' + 2 zeta w u' + w^2 u = -ag is stepped with the
+# exact recurrence for piecewise-linear excitation (Nigam & Jennings, 1969):
+#   [u, v]_(i+1) = A [u, v]_i + B [ag_i, ag_(i+1)]
+# Instead of looping over time for every oscillator, L steps are composed
+# into one block operator per oscillator. The block-start states of all
+# oscillators and records are carried block to block, and the response of an
+# oscillator to every record and block is then a single matrix product.
+# All periods, damping ratios and stacked records are handled together.
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_PERIODS = np.geomspace(0.01, 10.0, 200)
+BLOCK = 16
+# Block-start state values per record batch (bounds memory for large stacks)
+BATCH_VALUES = 1 << 23
+
+
+def nigam_jennings(periods, damping, dt):
+    """Exact step matrices (A, B), each (..., 2, 2), for 0 <= damping < 1"""
+    w = 2 * np.pi / np.asarray(periods, dtype=float)
+    z = np.asarray(damping, dtype=float)
+    w, z = np.broadcast_arrays(w, z)
+    if np.any((z < 0) | (z >= 1)):
+        raise ValueError("Damping ratios must be in [0, 1)")
+    root = np.sqrt(1 - z**2)
+    wd = w * root
+    E = np.exp(-z * w * dt)
+    S, C = np.sin(wd * dt), np.cos(wd * dt)
+    zr = z / root
+
+    A = np.empty(w.shape + (2, 2))
+    A[..., 0, 0] = E * (zr * S + C)
+    A[..., 0, 1] = E * S / wd
+    A[..., 1, 0] = -w / root * E * S
+    A[..., 1, 1] = E * (C - zr * S)
+
+    c1 = (2 * z**2 - 1) / (w**2 * dt)
+    c2 = 2 * z / (w**3 * dt)
+    c3 = 1 / w**2
+    dS = wd * S + z * w * C        # derivative terms of the velocity row
+    B = np.empty(w.shape + (2, 2))
+    B[..., 0, 0] = E * ((c1 + z / w) * S / wd + (c2 + c3) * C) - c2
+    B[..., 0, 1] = -E * (c1 * S / wd + c2 * C) - c3 + c2
+    B[..., 1, 0] = E * ((c1 + z / w) * (C - zr * S) - (c2 + c3) * dS) + 1 / (w**2 * dt)
+    B[..., 1, 1] = -E * (c1 * (C - zr * S) - c2 * dS) - 1 / (w**2 * dt)
+    return A, B
+
+
+def _block_operators(A, B, w, z, L):
+    """Maps of (ag window of L+1 values, initial u, v) to L steps of u, v, a
+
+    Returns (T (n, 3, L, L+3), carry (n, 2, L+3)) for the n oscillators of
+    the flattened A, B; the carry rows are the (u, v) state after L steps.
+    """
+    n = len(A)
+    state = np.zeros((n, 2, L + 3))
+    state[:, 0, L + 1] = state[:, 1, L + 2] = 1.0
+    T = np.empty((n, 3, L, L + 3))
+    for j in range(L):
+        state = A @ state
+        state[..., j] += B[..., 0]
+        state[..., j + 1] += B[..., 1]
+        T[:, :2, j] = state
+        # Absolute acceleration u'' + ag = -(w^2 u + 2 zeta w v)
+        T[:, 2, j] = -(w[:, None]**2 * state[:, 0] + 2 * (z * w)[:, None] * state[:, 1])
+    return T, state
+
+
+def _peaks(ag, lengths, T, carry, n_blocks, L):
+    """Peak |u|, |v|, |a| (n_osc, 3, n_records) of zero-padded records"""
+    R, n = ag.shape
+    n_osc = len(T)
+    padded = np.zeros((R, n_blocks * L + 1))
+    padded[:, :n] = ag
+    # Inputs of every block: ag window (L+1 rows), then the block-start u, v
+    # of the current oscillator; columns are block-major (n_blocks * R)
+    inputs = np.empty((L + 3, n_blocks * R))
+    idx = np.arange(n_blocks)[:, None] * L + np.arange(L + 1)
+    inputs[:L + 1] = padded[:, idx].transpose(2, 1, 0).reshape(L + 1, -1)
+
+    # Block-start states, carried block to block for all oscillators at once
+    forced = (carry[..., :L + 1].reshape(-1, L + 1) @ inputs[:L + 1]).reshape(n_osc, 2, n_blocks, R)
+    states = np.zeros((n_osc, 2, n_blocks, R))
+    Phi = carry[..., L + 1:]
+    for k in range(1, n_blocks):
+        states[:, :, k] = Phi @ states[:, :, k - 1] + forced[:, :, k - 1]
+    states = states.reshape(n_osc, 2, -1)
+
+    # Step k*L + j + 1 is valid if it is a recorded sample; only the blocks
+    # past the shortest record need masking
+    first = (lengths.min() - 1) // L * R
+    step = (np.arange(n_blocks)[:, None, None] * L + np.arange(L)[None, :, None] + 1)
+    valid = (step < lengths).transpose(1, 0, 2).reshape(L, -1)[:, first:]
+
+    peaks = np.empty((n_osc, 3, R))
+    for o in range(n_osc):
+        inputs[L + 1:] = states[o]
+        out = (T[o].reshape(3 * L, L + 3) @ inputs).reshape(3, L, -1)
+        out[..., first:] *= valid
+        out = np.abs(out, out=out).reshape(3, L * n_blocks, R)
+        peaks[o] = out.max(axis=1)
+    return peaks
+
+
+def response_spectrum(accel, dt, periods=DEFAULT_PERIODS, damping=0.05, lengths=None, block=BLOCK):
+    """Elastic response spectra of one record (n,) or stacked records (..., n)
+
+    damping is a ratio or a sequence of ratios. lengths optionally gives the
+    number of valid samples of each (zero-padded) record; peaks are taken
+    over those samples only. Returns dict(periods, damping, Sd, Sv, Sa, PSV,
+    PSA), each spectrum shaped (..., [n_damping,] n_periods): Sd, Sv are peak
+    relative displacement and velocity, Sa peak absolute acceleration, and
+    PSV = w Sd, PSA = w^2 Sd. Periods <= 0 give the rigid response (Sa = PGA).
+    """
+    ag = np.asarray(accel, dtype=float)
+    lead, n = ag.shape[:-1], ag.shape[-1]
+    ag = ag.reshape(-1, n)
+    R = len(ag)
+    periods = np.atleast_1d(np.asarray(periods, dtype=float))
+    ratios = np.atleast_1d(np.asarray(damping, dtype=float))
+    L = block
+    n_blocks = max(-(-(n - 1) // L), 1)
+
+    rigid = periods <= 0
+    T_osc = np.broadcast_to(periods[~rigid], (len(ratios), (~rigid).sum()))
+    Z_osc = np.broadcast_to(ratios[:, None], T_osc.shape)
+    w = (2 * np.pi / T_osc).ravel()
+    z = Z_osc.ravel()
+    A, B = nigam_jennings(T_osc.ravel(), z, dt)
+    T, carry = _block_operators(A, B, w, z, L)
+
+    lengths = np.full(R, n) if lengths is None else np.asarray(lengths).reshape(-1)
+    peaks = np.empty((len(w), 3, R))
+    batch = max(BATCH_VALUES // (len(w) * 2 * n_blocks), 1)
+    for start in range(0, R, batch):
+        stop = min(start + batch, R)
+        peaks[..., start:stop] = _peaks(ag[start:stop], lengths[start:stop], T, carry, n_blocks, L)
+
+    shape = lead + (len(ratios), len(periods))
+    result = {'periods': periods, 'damping': ratios}
+    omega = np.where(rigid, 0.0, 2 * np.pi / np.where(rigid, 1.0, periods))
+    for key, row in (('Sd', 0), ('Sv', 1), ('Sa', 2)):
+        values = np.zeros((R, len(ratios), len(periods)))
+        values[..., ~rigid] = peaks[:, row].T.reshape(R, len(ratios), -1)
+        result[key] = values
+    if rigid.any():
+        mask = np.arange(n) < lengths[:, None]
+        result['Sa'][..., rigid] = np.abs(np.where(mask, ag, 0.0)).max(axis=1)[:, None, None]
+    result['PSV'] = omega * result['Sd']
+    result['PSA'] = omega**2 * result['Sd']
+    for key in ('Sd', 'Sv', 'Sa', 'PSV', 'PSA'):
+        result[key] = result[key].reshape(shape)
+        if np.ndim(damping) == 0:
+            result[key] = result[key][..., 0, :]
+    return result
+
+
+def _spectra_table(names, result):
+    """Long table (record, damping, period, spectra) of a stacked result"""
+    R, Z, P = result['Sd'].shape
+    table = pd.DataFrame({
+        'record': np.repeat(np.asarray(names, dtype=object), Z * P),
+        'damping': np.tile(np.repeat(result['damping'], P), R),
+        'period': np.tile(result['periods'], R * Z),
+    })
+    for key in ('Sd', 'Sv', 'Sa', 'PSV', 'PSA'):
+        table[key] = result[key].ravel()
+    return table
+
+
+def spectra_files(paths, periods=DEFAULT_PERIODS, damping=0.05, units=9.81, record_dt=None):
+    """Spectra of record files (.AT2, two- or single-column) as a long table
+
+    Record stores (motions.RecordStore .bin/.json) are processed straight
+    from their memory map; other records with the same time step are
+    zero-padded and processed as one stack. units converts record values to
+    m/s^2. Returns a DataFrame with columns record, damping, period, Sd, Sv,
+    Sa, PSV, PSA.
+    """
+    from Structural_monitoring.motions import RecordStore
+    from Structural_monitoring.suite import read_record
+
+    ratios = np.atleast_1d(damping)
+    frames = []
+    groups = {}
+    for path in paths:
+        if path.endswith('.bin') or path.endswith('.json'):
+            store = RecordStore(path)
+            result = response_spectrum(store.data * units, store.dt, periods, ratios, store.lengths)
+            frames.append(_spectra_table(store.names, result))
+            continue
+        accel, dt = read_record(path, record_dt)
+        groups.setdefault(round(dt, 12), []).append((os.path.basename(path), accel * units))
+
+    for dt, members in groups.items():
+        lengths = np.array([len(accel) for _, accel in members])
+        stack = np.zeros((len(members), lengths.max()))
+        for i, (_, accel) in enumerate(members):
+            stack[i, :len(accel)] = accel
+        result = response_spectrum(stack, dt, periods, ratios, lengths)
+        frames.append(_spectra_table([name for name, _ in members], result))
+    return pd.concat(frames, ignore_index=True)
+
+
+def plot_spectra(table, quantity='PSA', filename=None):
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(8, 5))
+    for (record, ratio), group in table.groupby(['record', 'damping']):
+        ax.loglog(group['period'], group[quantity], label=f'{record} ({100 * ratio:g}%)')
+    ax.set_xlabel('Period [s]')
+    ax.set_ylabel(quantity)
+    ax.grid(True, which='both', alpha=0.3)
+    if table.groupby(['record', 'damping']).ngroups <= 10:
+        ax.legend()
+    fig.tight_layout()
+    if filename:
+        fig.savefig(filename, dpi=150)
+    else:
+        plt.show()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Elastic response spectra of ground-motion records')
+    parser.add_argument('records', nargs='+', help='record files, directories (.AT2, .dat, .txt) or record stores (.bin)')
+    parser.add_argument('--damping', default='0.05', help='comma-separated damping ratios')
+    parser.add_argument('--periods', default='0.01,10,200', help='first,last,count (log spaced) [s]')
+    parser.add_argument('--units', type=float, default=9.81, help='record units to m/s^2')
+    parser.add_argument('--record-dt', type=float, default=None, help='step of single-column records')
+    parser.add_argument('--out', default=None, help='CSV path for the spectra table')
+    parser.add_argument('--plot', default=None, choices=['Sd', 'Sv', 'Sa', 'PSV', 'PSA'])
+    args = parser.parse_args(argv)
+
+    from Structural_monitoring.motions import RecordStore
+    from Structural_monitoring.suite import find_records
+
+    paths = []
+    for path in args.records:
+        paths.extend(find_records(path) if os.path.isdir(path) else [path])
+    n_records = sum(len(RecordStore(p)) if p.endswith(('.bin', '.json')) else 1 for p in paths)
+    first, last, count = args.periods.split(',')
+    periods = np.geomspace(float(first), float(last), int(count))
+    damping = [float(x) for x in args.damping.split(',')]
+    table = spectra_files(paths, periods, damping, args.units, args.record_dt)
+    if args.out:
+        table.to_csv(args.out, index=False)
+    peaks = table.loc[table.groupby(['record', 'damping'], sort=False)['PSA'].idxmax(),
+                      ['record', 'damping', 'period', 'PSA']]
+    print(f"{n_records} records, {len(periods)} periods, damping {damping}")
+    peaks = peaks.rename(columns={'period': 'peak_period', 'PSA': 'peak_PSA'})
+    print(peaks.head(20).to_string(index=False))
+    if len(peaks) > 20:
+        print(f"... {len(peaks) - 20} more rows")
+    if args.plot:
+        plot_spectra(table, args.plot)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,18 @@
+import os
+import sys
+
 import numpy as np
-t = np.arange(0, 30, 0.02)
-a = 0.15 * np.sin(2 * np.pi * 2 * t) * np.exp(-0.05 * 2 * np.pi * 2 * t)
-np.savetxt('nairobi_eq.dat', np.column_stack((t, a)), fmt='%.3f %.4f')
\ No newline at end of file
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+if __name__ == '__main__':
+    # Make the Structural_monitoring package importable when run as a script
+    sys.path.insert(0, os.path.dirname(os.path.dirname(HERE)))
+    from Structural_monitoring.motions import write_records
+
+    t = np.arange(0, 30, 0.02)
+    a = 0.15 * np.sin(2 * np.pi * 2 * t) * np.exp(-0.05 * 2 * np.pi * 2 * t)
+    # Text copy for OpenSees (timeSeries Path -filePath)
+    np.savetxt('nairobi_eq.dat', np.column_stack((t, a)), fmt='%.3f %.4f')
+    # Full-precision record store for the Python drivers (suite, response_spectrum)
+    write_records('nairobi_eq', [a], 0.02, len(a), names=['nairobi_eq'], dtype='float64')
@@ -0,0 +1,195 @@
+# Batch frequency identification from acceleration records
+#
+# Welch PSDs of many records and channels are computed together: signals are
+# stacked as (..., n_samples), cut into overlapping segments with a strided
+# view, windowed, and every segment of a batch goes through one real FFT call
+# (scipy.fft caches the plan for the segment length). Peaks are picked with
+# vectorized local-maximum masks, refined by parabolic interpolation of the
+# log PSD, and matched to model frequencies (e.g. frequencies.txt).
+import argparse
+
+import numpy as np
+import pandas as pd
+import scipy.fft as sfft
+import scipy.signal as ss
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Samples of segment data per FFT batch (bounds memory for huge stacks)
+BATCH_SAMPLES = 1 << 23
+
+
+def welch(signals, fs, nperseg=1024, overlap=0.5, nfft=None, window='hann', detrend='constant'):
+    """One-sided Welch PSD of (..., n_samples) signals
+
+    nperseg is clipped to the record length and nfft >= nperseg zero-pads
+    each segment. Returns (freqs, psd) with psd shaped (..., len(freqs)),
+    scaled as a density like scipy.signal.welch.
+    """
+    x = np.asarray(signals, dtype=float)
+    n = x.shape[-1]
+    nperseg = min(nperseg, n)
+    nfft = max(nfft or nperseg, nperseg)
+    step = max(nperseg - int(overlap * nperseg), 1)
+    win = ss.get_window(window, nperseg)
+    scale = 1.0 / (fs * (win**2).sum())
+
+    flat = x.reshape(-1, n)
+    n_segments = (n - nperseg) // step + 1
+    psd = np.empty((len(flat), nfft // 2 + 1))
+    batch = max(BATCH_SAMPLES // (n_segments * nfft), 1)
+    for start in range(0, len(flat), batch):
+        segments = sliding_window_view(flat[start:start + batch], nperseg, axis=-1)[:, ::step]
+        if detrend == 'constant':
+            segments = segments - segments.mean(axis=-1, keepdims=True)
+        elif detrend == 'linear':
+            segments = ss.detrend(segments, axis=-1)
+        elif detrend is not None:
+            raise ValueError(f"Unknown detrend {detrend!r}; use 'constant', 'linear' or None")
+        spectrum = sfft.rfft(segments * win, n=nfft, axis=-1, workers=-1)
+        power = (spectrum.real**2 + spectrum.imag**2).mean(axis=1) * scale
+        # One-sided: double everything but DC (and Nyquist for even nfft)
+        power[:, 1:nfft - nfft // 2] *= 2.0
+        psd[start:start + batch] = power
+    return sfft.rfftfreq(nfft, 1.0 / fs), psd.reshape(x.shape[:-1] + (-1,))
+
+
+def pick_peaks(freqs, psd, n_peaks=3, f_range=None):
+    """The n_peaks largest local maxima of every spectrum
+
+    psd is (..., n_freq). Peaks are refined by fitting a parabola to the log
+    PSD at the three bins around each maximum. Returns (frequency,
+    amplitude), each (..., n_peaks) sorted by frequency; missing peaks are
+    NaN.
+    """
+    freqs = np.asarray(freqs, dtype=float)
+    p = np.asarray(psd, dtype=float).reshape(-1, len(freqs))
+    is_peak = np.zeros(p.shape, dtype=bool)
+    is_peak[:, 1:-1] = (p[:, 1:-1] > p[:, :-2]) & (p[:, 1:-1] >= p[:, 2:])
+    if f_range is not None:
+        is_peak &= (freqs >= f_range[0]) & (freqs <= f_range[1])
+
+    k = min(n_peaks, len(freqs))
+    score = np.where(is_peak, p, -np.inf)
+    idx = np.argpartition(-score, k - 1, axis=1)[:, :k]
+    valid = np.isfinite(np.take_along_axis(score, idx, axis=1))
+    idx = np.clip(idx, 1, len(freqs) - 2)
+
+    logp = np.log(np.maximum(p, np.finfo(float).tiny))
+    a, b, c = (np.take_along_axis(logp, idx + shift, axis=1) for shift in (-1, 0, 1))
+    curvature = a - 2 * b + c
+    delta = np.where(curvature < 0, 0.5 * (a - c) / np.where(curvature < 0, curvature, -1.0), 0.0)
+    frequency = freqs[idx] + delta * (freqs[1] - freqs[0])
+    amplitude = np.exp(b - 0.25 * (a - c) * delta)
+
+    frequency = np.where(valid, frequency, np.nan)
+    amplitude = np.where(valid, amplitude, np.nan)
+    order = np.argsort(frequency, axis=1)  # NaN sorts last
+    frequency = np.take_along_axis(frequency, order, axis=1)
+    amplitude = np.take_along_axis(amplitude, order, axis=1)
+    if k < n_peaks:
+        pad = np.full((len(p), n_peaks - k), np.nan)
+        frequency, amplitude = np.hstack([frequency, pad]), np.hstack([amplitude, pad])
+    shape = np.shape(psd)[:-1] + (n_peaks,)
+    return frequency.reshape(shape), amplitude.reshape(shape)
+
+
+def match(peaks, model_frequencies, tolerance=0.1):
+    """Nearest identified peak to each model frequency
+
+    peaks is (..., n_peaks). Returns dict(frequency, error, matched), each
+    (..., n_modes): the matched peak, its relative error to the model value
+    and whether that error is within tolerance.
+    """
+    model = np.asarray(model_frequencies, dtype=float)
+    peaks = np.asarray(peaks, dtype=float)
+    distance = np.abs(peaks[..., :, None] - model)
+    distance = np.where(np.isnan(distance), np.inf, distance)
+    nearest = distance.argmin(axis=-2)
+    frequency = np.take_along_axis(peaks, nearest, axis=-1) if peaks.shape[-1] else \
+        np.full(nearest.shape, np.nan)
+    error = (frequency - model) / model
+    return {'frequency': frequency, 'error': error, 'matched': np.abs(error) <= tolerance}
+
+
+def screen(signals, fs, model_frequencies, n_peaks=None, tolerance=0.1, f_range=None, **welch_kwargs):
+    """Welch PSD, peak picking and model comparison for stacked signals
+
+    signals is (..., n_samples), e.g. (n_records, n_channels, n_samples).
+    n_peaks defaults to twice the number of model modes. Returns dict(freqs,
+    psd, peaks, amplitudes, frequency, error, matched); flag records with
+    ~matched.all(axis=-1).
+    """
+    model = np.atleast_1d(np.asarray(model_frequencies, dtype=float))
+    freqs, psd = welch(signals, fs, **welch_kwargs)
+    if f_range is None:
+        f_range = (0.5 * model.min(), 1.5 * model.max())
+    peaks, amplitudes = pick_peaks(freqs, psd, n_peaks or 2 * len(model), f_range)
+    result = {'freqs': freqs, 'psd': psd, 'peaks': peaks, 'amplitudes': amplitudes}
+    result.update(match(peaks, model, tolerance))
+    return result
+
+
+def screen_files(paths, model_frequencies, n_peaks=None, tolerance=0.1, **welch_kwargs):
+    """Screen recorder files (time column + channels) against model frequencies
+
+    Files are read through recorder_io (binary conversions are reused) and
+    records with the same length and time step are processed as one stack.
+    Returns a DataFrame with one row per file and channel.
+    """
+    from Structural_monitoring import recorder_io
+
+    model = np.atleast_1d(np.asarray(model_frequencies, dtype=float))
+    n_peaks = n_peaks or 2 * len(model)
+    groups = {}
+    for path in paths:
+        rec = recorder_io.open_recorder(path)
+        dt = rec.dt if rec.dt is not None else float(np.diff(rec.time).mean())
+        groups.setdefault((len(rec), round(dt, 12)), []).append((path, rec))
+
+    rows = []
+    for (_, dt), members in groups.items():
+        stack = np.stack([np.asarray(rec.values).T for _, rec in members])
+        result = screen(stack, 1.0 / dt, model, n_peaks, tolerance, **welch_kwargs)
+        for i, (path, rec) in enumerate(members):
+            for j, channel in enumerate(rec.columns):
+                row = {'file': path, 'channel': channel, 'fs': 1.0 / dt}
+                row.update({f'Peak{k + 1}': result['peaks'][i, j, k] for k in range(n_peaks)})
+                for m in range(len(model)):
+                    row[f'Mode{m + 1}'] = result['frequency'][i, j, m]
+                    row[f'Mode{m + 1}_error'] = result['error'][i, j, m]
+                row['flagged'] = not result['matched'][i, j].all()
+                rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def read_model_frequencies(text):
+    """Frequencies from a frequencies.txt file (Mode,Freq(Hz)) or a comma list"""
+    try:
+        return [float(x) for x in text.split(',')]
+    except ValueError:
+        return pd.read_csv(text).iloc[:, 1].to_numpy()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Identify frequencies of recorder files and compare to a model')
+    parser.add_argument('files', nargs='+', help='recorder files with a time column')
+    parser.add_argument('--model', required=True, type=read_model_frequencies,
+                        help='frequencies.txt path or comma-separated frequencies [Hz]')
+    parser.add_argument('--nperseg', type=int, default=1024)
+    parser.add_argument('--pad', type=int, default=4, help='zero-padding factor (nfft / nperseg)')
+    parser.add_argument('--n-peaks', type=int, default=None)
+    parser.add_argument('--tolerance', type=float, default=0.1, help='relative frequency tolerance')
+    parser.add_argument('--out', default=None, help='CSV path for the screening table')
+    args = parser.parse_args(argv)
+
+    table = screen_files(args.files, args.model, args.n_peaks, args.tolerance,
+                         nperseg=args.nperseg, nfft=args.pad * args.nperseg)
+    if args.out:
+        table.to_csv(args.out, index=False)
+    with pd.option_context('display.width', 200, 'display.max_columns', 20):
+        print(table.drop(columns=[c for c in table if c.startswith('Peak')]))
+    print(f"{int(table['flagged'].sum())} of {len(table)} channels outside {100 * args.tolerance:g}% of the model")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,273 @@
+# Ground-motion suite runner for the soil-structure column
+#
+# Every record in a directory is analysed at every scale factor by
+# column.run, one analysis per task in a process pool; each worker process
+# receives the settings once (and, on the OpenSees path, has its own OpenSees
+# domain). Results go to a store directory:
+#
+#   runs/<record>_x<factor>_<key>.npz   histories + summary of one analysis
+#   summary.csv                         one row per analysis
+#   meta.json                           analysis settings
+#
+# <key> hashes the record contents (a record store's own samples for
+# '<store>.bin#<index>') and the analysis settings, so re-running the suite
+# only analyses new or changed records.
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from Structural_monitoring import column
+
+RECORD_PATTERNS = ('*.dat', '*.txt', '*.AT2', '*.at2')
+_WORKER = {}
+
+
+def read_record(path, dt=None):
+    """(accel, dt) of a record file in its own units
+
+    Handles PEER .AT2 files (NPTS/DT header), two-column (time, accel) files,
+    single-column files, which need dt, and '<store>.bin#<index>' records
+    of a motions.RecordStore.
+    """
+    if '#' in path:
+        from Structural_monitoring.motions import RecordStore
+
+        store = RecordStore(path)
+        return store[int(path.rsplit('#', 1)[1])], store.dt
+    with open(path) as f:
+        head = [f.readline() for _ in range(4)]
+    match = re.search(r'NPTS\s*=\s*(\d+)\s*,\s*DT\s*=\s*([\d.eE+-]+)', head[3], re.IGNORECASE)
+    if match:
+        values = np.loadtxt(path, skiprows=4).ravel()[:int(match.group(1))]
+        return values, float(match.group(2))
+    data = np.loadtxt(path, ndmin=2)
+    if data.shape[1] >= 2:
+        return data[:, 1], float(np.diff(data[:, 0]).mean())
+    if dt is None:
+        raise ValueError(f"{path}: single-column record needs dt")
+    return data[:, 0], dt
+
+
+def find_records(directory, patterns=RECORD_PATTERNS):
+    """Sorted ground-motion files of a directory"""
+    paths = set()
+    for pattern in patterns:
+        paths.update(glob.glob(os.path.join(directory, pattern)))
+    return sorted(paths)
+
+
+def expand_records(path):
+    """Record addresses of a directory, a record store (.bin/.json) or a file"""
+    if os.path.isdir(path):
+        return find_records(path)
+    if path.endswith('.bin') or path.endswith('.json'):
+        from Structural_monitoring.motions import RecordStore
+
+        return RecordStore(path).paths()
+    return [path]
+
+
+def record_digest(path):
+    """SHA-1 of a record's contents; for a store record, of its samples and dt"""
+    digest = hashlib.sha1()
+    if '#' in path:
+        from Structural_monitoring.motions import RecordStore
+
+        store = RecordStore(path)
+        i = int(path.rsplit('#', 1)[1])
+        digest.update(json.dumps([store.meta['dtype'], store.dt]).encode())
+        digest.update(np.ascontiguousarray(store.data[i, :store.lengths[i]]).tobytes())
+    else:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def run_key(path, factor, settings):
+    """Cache key of one analysis: record contents, scale factor and settings"""
+    text = json.dumps([record_digest(path), float(factor), settings], sort_keys=True)
+    return hashlib.sha1(text.encode()).hexdigest()[:10]
+
+
+def run_name(path, factor, key):
+    base, _, index = path.partition('#')
+    stem = os.path.splitext(os.path.basename(base))[0] + (f'_{index}' if index else '')
+    return f'{stem}_x{factor:g}_{key}'
+
+
+def _init_worker(settings):
+    # Settings travel once per process; tasks only carry the record address
+    _WORKER['settings'] = settings
+    _WORKER['model'] = dict(column.COLUMN)
+
+
+def analyze(path, factor, settings, model=column.COLUMN):
+    """Histories and summary of one scaled record (see run_suite for settings)"""
+    start = time.perf_counter()
+    accel, record_dt = read_record(path, settings['record_dt'])
+    accel = accel * settings['units'] * factor
+    dt = settings['dt'] or record_dt
+    n_steps = int(np.ceil((len(accel) * record_dt + settings['free_vibration']) / dt))
+    result = column.run(accel, dt, n_steps, nodes=((3, 1), (2, 1)), elements=(1, 2),
+                        record_dt=record_dt, method=settings['method'], model=model)
+
+    height = model['top'][1] - model['ground'][1]
+    drift = (result['disp'][:, 0] - result['disp'][:, 1]) / height
+    # Shear carried into the soil: spring + dashpot force at the ground node
+    base_shear = result['force'][:, 0, 3]
+    tail = result['time'] > result['time'][-1] - settings['residual_window']
+    histories = {
+        'time': result['time'],
+        'top_disp': result['disp'][:, 0],
+        'drift': drift,
+        'base_shear': base_shear,
+        'column_force': result['force'][:, 1],
+    }
+    summary = {
+        'record': os.path.basename(path),
+        'factor': float(factor),
+        'pga': float(np.abs(accel).max()),
+        'dt': dt,
+        'n_steps': n_steps,
+        'peak_drift': float(np.abs(drift).max()),
+        'residual_drift': float(abs(drift[tail].mean())),
+        'peak_base_shear': float(np.abs(base_shear).max()),
+        'runtime': time.perf_counter() - start,
+    }
+    return histories, summary
+
+
+def _analyze_task(name, path, factor):
+    return (name,) + analyze(path, factor, _WORKER['settings'], _WORKER['model'])
+
+
+class SuiteStore:
+    """Directory of per-analysis result files plus a summary table"""
+
+    def __init__(self, path):
+        self.path = path
+        self.runs = os.path.join(path, 'runs')
+
+    def run_path(self, name):
+        return os.path.join(self.runs, name + '.npz')
+
+    def has(self, name):
+        return os.path.exists(self.run_path(name))
+
+    def write(self, name, histories, summary):
+        os.makedirs(self.runs, exist_ok=True)
+        final = self.run_path(name)
+        tmp = final + '.tmp.npz'
+        np.savez_compressed(tmp, summary=json.dumps(summary), **histories)
+        os.replace(tmp, final)
+
+    def read(self, name):
+        """(histories dict, summary dict) of one analysis"""
+        with np.load(self.run_path(name)) as data:
+            histories = {key: data[key] for key in data.files if key != 'summary'}
+            return histories, json.loads(str(data['summary']))
+
+    def summary(self, names=None):
+        """One row per stored analysis (or per name in names)"""
+        if names is None:
+            names = sorted(os.path.splitext(f)[0] for f in os.listdir(self.runs) if f.endswith('.npz')
+                           and not f.endswith('.tmp.npz')) if os.path.isdir(self.runs) else []
+        rows = []
+        for name in names:
+            with np.load(self.run_path(name)) as data:
+                rows.append({'run': name, **json.loads(str(data['summary']))})
+        return pd.DataFrame(rows)
+
+
+def run_suite(records, factors, store_path, method='linear', dt=None, record_dt=None, units=9.81,
+              free_vibration=5.0, residual_window=1.0, n_jobs=1, verbose=True):
+    """Analyse every record (files or a directory) at every scale factor
+
+    units converts record values to m/s^2 (records in g); record_dt is the
+    step of single-column records; dt is the analysis step (default: each
+    record's). Analyses already in the store are skipped. Returns the
+    summary DataFrame of this suite, also written to summary.csv with a
+    'cached' column.
+    """
+    if isinstance(records, str):
+        records = expand_records(records)
+    settings = {'method': method, 'dt': dt, 'record_dt': record_dt, 'units': units,
+                'free_vibration': free_vibration, 'residual_window': residual_window}
+    store = SuiteStore(store_path)
+    os.makedirs(store_path, exist_ok=True)
+    with open(os.path.join(store_path, 'meta.json'), 'w') as f:
+        json.dump(settings, f, indent=2)
+
+    tasks = []
+    for path in records:
+        for factor in factors:
+            tasks.append((run_name(path, factor, run_key(path, factor, settings)), path, factor))
+    todo = [task for task in tasks if not store.has(task[0])]
+    if verbose:
+        print(f"{len(tasks)} analyses ({len(records)} records x {len(factors)} factors); "
+              f"{len(tasks) - len(todo)} cached, {len(todo)} to run")
+
+    start = time.perf_counter()
+
+    def finish(name, histories, summary):
+        store.write(name, histories, summary)
+        if verbose:
+            print(f"  {summary['record']} x{summary['factor']:g}: peak drift {summary['peak_drift']:.3e}, "
+                  f"{summary['runtime']:.2f} s")
+
+    if n_jobs == 1:
+        _init_worker(settings)
+        for task in todo:
+            finish(*_analyze_task(*task))
+    elif todo:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(settings,)) as pool:
+            pending = []
+            for task in todo:
+                pending.append(pool.submit(_analyze_task, *task))
+                # Bound memory: store the oldest result before queueing more
+                if len(pending) >= 2 * n_jobs:
+                    finish(*pending.pop(0).result())
+            for future in pending:
+                finish(*future.result())
+
+    summary = store.summary([task[0] for task in tasks])
+    summary['cached'] = ~summary['run'].isin([task[0] for task in todo])
+    summary.to_csv(os.path.join(store_path, 'summary.csv'), index=False)
+    if verbose:
+        print(f"Suite complete in {time.perf_counter() - start:.1f} s "
+              f"(analysis time {summary.loc[~summary['cached'], 'runtime'].sum():.1f} s): {store_path}")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run a ground-motion suite on the soil-structure column')
+    parser.add_argument('records', help='directory of records (.dat/.txt/.AT2), a record store (.bin) or a file')
+    parser.add_argument('store', help='result store directory (cached analyses are skipped)')
+    parser.add_argument('--factors', default='1.0', help='comma-separated scale factors')
+    parser.add_argument('--method', default='linear', choices=['linear', 'opensees'])
+    parser.add_argument('--dt', type=float, default=None, help='analysis step (default: record step)')
+    parser.add_argument('--record-dt', type=float, default=None, help='step of single-column records')
+    parser.add_argument('--units', type=float, default=9.81, help='record units to m/s^2')
+    parser.add_argument('--free-vibration', type=float, default=5.0, help='seconds analysed after the record')
+    parser.add_argument('--n-jobs', type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+
+    records = expand_records(args.records)
+    factors = [float(x) for x in args.factors.split(',')]
+    summary = run_suite(records, factors, args.store, args.method, args.dt, args.record_dt, args.units,
+                        args.free_vibration, n_jobs=args.n_jobs)
+    with pd.option_context('display.width', 200, 'display.max_columns', 20):
+        print(summary.drop(columns=['run']))
+
+
+if __name__ == '__main__':
+    main()
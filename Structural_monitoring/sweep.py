@@ -0,0 +1,245 @@
+# Parallel parametric sweep of bridge crossings
+#
+# Scenarios (speed, axle load, damping, span, damage) come from a grid or a
+# Latin hypercube. Each chunk of scenarios is simulated in a worker process
+# and written to a store directory:
+#
+#   index.csv          one row per scenario: parameters, chunk, row
+#   meta.json          time step, history length, sensor positions, model
+#   chunk_00000.npz    compressed float32 array (n_rows, n_steps, n_sensors)
+#
+# Chunks are written atomically, so an interrupted sweep resumes by running
+# only the chunks whose file is missing.
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from Structural_monitoring import fem, moving_load
+
+PARAMETERS = ('speed', 'axle_load', 'damping', 'span', 'damage', 'damage_location')
+DEFAULTS = {
+    'speed': 20.0,            # m/s
+    'axle_load': -10000.0,    # N, downward
+    'damping': 0.05,          # ratio at modes 1 and 2
+    'span': 30.0,             # m
+    'damage': 0.0,            # stiffness loss of the damaged element (0-1)
+    'damage_location': 0.5,   # damaged element position as x / span
+}
+# Deck section of bridge_car1/bridge_car2
+MODEL = {'E': 3.0e10, 'A': 0.5, 'I': 0.1, 'rho': 2500.0, 'elem_length': 1.0}
+SENSORS = (0.25, 0.5, 0.75)
+
+
+def grid(**values):
+    """Full factorial scenario table; unspecified parameters use DEFAULTS"""
+    unknown = set(values) - set(PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+    axes = [np.atleast_1d(values.get(name, DEFAULTS[name])) for name in PARAMETERS]
+    return pd.DataFrame(list(itertools.product(*axes)), columns=list(PARAMETERS), dtype=float)
+
+
+def latin_hypercube(n, bounds, seed=42):
+    """n scenarios sampled by Latin hypercube over {parameter: (low, high)}"""
+    from scipy.stats import qmc
+
+    unknown = set(bounds) - set(PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+    names = list(bounds)
+    if any(len(bounds[name]) != 2 for name in names):
+        raise ValueError("Latin-hypercube bounds must be (low, high) pairs")
+    sample = qmc.LatinHypercube(d=len(names), seed=seed).random(n)
+    low = np.array([bounds[name][0] for name in names], dtype=float)
+    high = np.array([bounds[name][1] for name in names], dtype=float)
+    table = pd.DataFrame({name: np.full(n, DEFAULTS[name], dtype=float) for name in PARAMETERS})
+    table[names] = qmc.scale(sample, low, high) if n else sample
+    return table
+
+
+def bridge_model(span, damage=0.0, damage_location=0.5, model=MODEL):
+    """Simply supported deck with one element softened by damage"""
+    n_elem = max(int(round(span / model['elem_length'])), 2)
+    beam = fem.Frame2D.beam(span, n_elem, model['E'], model['A'], model['I'],
+                            model['rho'] * model['A'], supports='pinned-roller')
+    damaged = min(int(damage_location * n_elem), n_elem - 1)
+    beam.E[damaged] *= 1.0 - damage
+    return beam
+
+
+def simulate(params, dt, n_steps, sensors=SENSORS, model=MODEL):
+    """Sensor accelerations (n_steps, n_sensors) for one crossing scenario"""
+    beam = bridge_model(params['span'], params['damage'], params['damage_location'], model)
+    K = beam.stiffness()
+    M = beam.mass()
+    omega, _ = fem.eigen(K, M, 2)
+    C = fem.rayleigh(M, K, *fem.rayleigh_coefficients(params['damping'], omega[0], omega[1]))
+    loads = moving_load.crossing_loads(beam, params['speed'], dt, params['axle_load'], n_steps=n_steps)
+    nodes = [int(round(s * beam.n_elem)) for s in sensors]
+    result = fem.newmark(M, C, K, loads, dt, record=beam.free_index(nodes, fem.UY))
+    return result['accel']
+
+
+def _run_chunk(chunk_id, rows, dt, n_steps, sensors, model):
+    histories = np.stack([simulate(row, dt, n_steps, sensors, model) for row in rows])
+    return chunk_id, histories.astype(np.float32)
+
+
+def history_length(scenarios, dt, free_vibration=0.5):
+    """Steps for the slowest crossing plus free_vibration seconds"""
+    crossing = (scenarios['span'] / scenarios['speed']).max()
+    return int(np.ceil((crossing + free_vibration) / dt))
+
+
+class SweepStore:
+    """Chunked, compressed store of sweep response histories"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def chunk_path(self, chunk_id):
+        return os.path.join(self.path, f'chunk_{chunk_id:05d}.npz')
+
+    @property
+    def index(self):
+        return pd.read_csv(os.path.join(self.path, 'index.csv'))
+
+    @property
+    def meta(self):
+        with open(os.path.join(self.path, 'meta.json')) as f:
+            return json.load(f)
+
+    def exists(self):
+        return os.path.exists(os.path.join(self.path, 'index.csv'))
+
+    def create(self, scenarios, chunk_size, meta):
+        os.makedirs(self.path, exist_ok=True)
+        index = scenarios.reset_index(drop=True).copy()
+        index['chunk'] = index.index // chunk_size
+        index['row'] = index.index % chunk_size
+        index.to_csv(os.path.join(self.path, 'index.csv'), index_label='scenario')
+        with open(os.path.join(self.path, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+
+    def completed_chunks(self):
+        return {chunk for chunk in self.index['chunk'].unique() if os.path.exists(self.chunk_path(chunk))}
+
+    def write_chunk(self, chunk_id, histories):
+        # Write then rename so a killed sweep never leaves a truncated chunk
+        final = self.chunk_path(chunk_id)
+        tmp = final + '.tmp.npz'
+        np.savez_compressed(tmp, accel=histories)
+        os.replace(tmp, final)
+
+    def read_chunk(self, chunk_id):
+        with np.load(self.chunk_path(chunk_id)) as data:
+            return data['accel']
+
+    def histories(self, scenarios=None):
+        """(n, n_steps, n_sensors) histories for scenario numbers (default all)"""
+        index = self.index.set_index('scenario')
+        if scenarios is not None:
+            index = index.loc[np.atleast_1d(scenarios)]
+        out = np.empty((len(index), self.meta['n_steps'], len(self.meta['sensors'])), dtype=np.float32)
+        for chunk_id, group in index.groupby('chunk'):
+            data = self.read_chunk(chunk_id)
+            out[index.index.get_indexer(group.index)] = data[group['row'].to_numpy()]
+        return out
+
+    def query(self, **ranges):
+        """Index rows with each parameter within (low, high) or equal to a value"""
+        index = self.index
+        keep = np.ones(len(index), dtype=bool)
+        for name, value in ranges.items():
+            if isinstance(value, tuple):
+                keep &= index[name].between(*value).to_numpy()
+            else:
+                keep &= np.isclose(index[name], value)
+        return index[keep]
+
+
+def run_sweep(scenarios, store_path, dt=0.002, n_steps=None, chunk_size=32, n_jobs=1,
+              sensors=SENSORS, model=MODEL, verbose=True):
+    """Simulate every scenario into a SweepStore, resuming an existing one
+
+    Returns the store. Resuming requires the same scenario table; the time
+    step, history length and sensors are taken from the existing store.
+    """
+    store = SweepStore(store_path)
+    scenarios = scenarios[list(PARAMETERS)].reset_index(drop=True).astype(float)
+    if store.exists():
+        stored = store.index[list(PARAMETERS)]
+        if stored.shape != scenarios.shape or not np.allclose(stored.to_numpy(), scenarios.to_numpy()):
+            raise ValueError(f"{store_path} holds a different scenario table; use a new store path")
+        meta = store.meta
+    else:
+        if n_steps is None:
+            n_steps = history_length(scenarios, dt)
+        meta = {'dt': dt, 'n_steps': n_steps, 'sensors': list(sensors), 'model': dict(model),
+                'chunk_size': chunk_size, 'quantity': 'accel', 'units': 'm/s^2'}
+        store.create(scenarios, chunk_size, meta)
+
+    index = store.index
+    done = store.completed_chunks()
+    todo = [(chunk_id, group[list(PARAMETERS)].to_dict('records'))
+            for chunk_id, group in index.groupby('chunk') if chunk_id not in done]
+    if verbose:
+        print(f"{len(index)} scenarios in {index['chunk'].nunique()} chunks; "
+              f"{len(done)} already done, {len(todo)} to run")
+
+    args = (meta['dt'], meta['n_steps'], tuple(meta['sensors']), meta['model'])
+    start = time.perf_counter()
+    if n_jobs == 1:
+        for chunk_id, rows in todo:
+            store.write_chunk(*_run_chunk(chunk_id, rows, *args))
+            if verbose:
+                print(f"  chunk {chunk_id} written ({time.perf_counter() - start:.1f} s)")
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            pending = []
+            for chunk_id, rows in todo:
+                pending.append(pool.submit(_run_chunk, chunk_id, rows, *args))
+                # Bound memory: write the oldest chunk before queueing more
+                if len(pending) >= 2 * n_jobs:
+                    store.write_chunk(*pending.pop(0).result())
+            for future in pending:
+                store.write_chunk(*future.result())
+    if verbose:
+        print(f"Sweep complete in {time.perf_counter() - start:.1f} s: {store_path}")
+    return store
+
+
+def _parse_values(text):
+    return [float(x) for x in text.split(',')]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Parametric sweep of bridge crossings')
+    parser.add_argument('store', help='output store directory (resumed if it exists)')
+    parser.add_argument('--lhs', type=int, default=None,
+                        help='number of Latin-hypercube samples; parameters give low,high')
+    for name in PARAMETERS:
+        parser.add_argument(f"--{name.replace('_', '-')}", type=_parse_values, default=None,
+                            help=f'grid values (or low,high with --lhs); default {DEFAULTS[name]}')
+    parser.add_argument('--dt', type=float, default=0.002)
+    parser.add_argument('--chunk-size', type=int, default=32)
+    parser.add_argument('--n-jobs', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    given = {name: getattr(args, name) for name in PARAMETERS if getattr(args, name) is not None}
+    if args.lhs is not None:
+        scenarios = latin_hypercube(args.lhs, {name: tuple(v) for name, v in given.items()}, args.seed)
+    else:
+        scenarios = grid(**given)
+    run_sweep(scenarios, args.store, dt=args.dt, chunk_size=args.chunk_size, n_jobs=args.n_jobs)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,1235 @@
+# Run the repo's OpenSees Tcl scripts in-process on the native solvers
+#
+# A small Tcl interpreter covers the subset the scripts use: set / expr /
+# incr / for / foreach / while / if / break / continue, lists, puts / open /
+# close, and the OpenSees commands model, node, fix, mass, uniaxialMaterial,
+# section (Elastic, Fiber with patch / layer / fiber), geomTransf,
+# beamIntegration, element, timeSeries, pattern, load, eleLoad, rayleigh,
+# recorder and remove. They build a TclModel of tag-indexed records;
+# TclModel.frame() compiles beam models to a fem.Frame2D and
+# TclModel.truss() truss models to a truss.Truss (vectorized assembly).
+# eigen, analyze (linear Newmark transient or LoadControl static) and
+# record run on the compiled model, so bridge_car.tcl, bridge_car2.tcl,
+# analysis.tcl and TCL/Trusses.tcl reproduce their OpenSees outputs.
+#
+# Every script body is parsed once and cached, and expr is compiled from its
+# source text with variables looked up at run time, so the per-step loops
+# of the scripts re-run without re-parsing. Recorder and `open` files go to
+# out_dir, or stay in TclInterpreter.files when out_dir is None.
+import argparse
+import ast
+import math
+import os
+import re
+import sys
+
+import numpy as np
+import scipy.sparse.linalg as spla
+
+from Structural_monitoring import fem, moving_load, truss, vbi
+from Structural_monitoring.moving_load import hermite_weights
+from Structural_monitoring.vbi import _newmark_constants, _newmark_step
+
+BEAM_ELEMENTS = ('elasticBeamColumn', 'dispBeamColumn', 'forceBeamColumn', 'nonlinearBeamColumn')
+RESPONSES = {'disp': 'u', 'vel': 'v', 'accel': 'a'}
+
+
+class TclError(Exception):
+    pass
+
+
+class _Break(Exception):
+    pass
+
+
+class _Continue(Exception):
+    pass
+
+
+# ---------------------------------------------------------------- parsing
+
+def _match_brace(s, i):
+    """Index of the brace closing the one at s[i]"""
+    depth = 0
+    while i < len(s):
+        c = s[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == '{':
+            depth += 1
+        elif c == '}':
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    raise TclError("missing close-brace")
+
+
+def _match_bracket(s, i):
+    """Index of the bracket closing the one at s[i]"""
+    depth = 0
+    while i < len(s):
+        c = s[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == '{':
+            i = _match_brace(s, i)
+        elif c == '[':
+            depth += 1
+        elif c == ']':
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    raise TclError("missing close-bracket")
+
+
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r'}
+_NAME = re.compile(r'[A-Za-z0-9_:]+')
+
+
+def _parse_parts(s, i, quoted):
+    """Substitution parts ('text' | 'var' | 'cmd', value) of a bare or quoted word"""
+    parts, buf = [], []
+
+    def flush():
+        if buf:
+            parts.append(('text', ''.join(buf)))
+            buf.clear()
+
+    while i < len(s):
+        c = s[i]
+        if quoted and c == '"':
+            flush()
+            return parts, i + 1
+        if not quoted and c in ' \t\r\n;':
+            break
+        if c == '\\' and i + 1 < len(s):
+            nxt = s[i + 1]
+            if nxt == '\n':
+                buf.append(' ')
+                i += 2
+                while i < len(s) and s[i] in ' \t':
+                    i += 1
+                continue
+            buf.append(_ESCAPES.get(nxt, nxt))
+            i += 2
+        elif c == '$':
+            if s.startswith('${', i):
+                end = s.index('}', i)
+                name, i = s[i + 2:end], end + 1
+            else:
+                match = _NAME.match(s, i + 1)
+                if not match:
+                    buf.append('$')
+                    i += 1
+                    continue
+                name, i = match.group(), match.end()
+            flush()
+            parts.append(('var', name))
+        elif c == '[':
+            end = _match_bracket(s, i)
+            flush()
+            parts.append(('cmd', s[i + 1:end]))
+            i = end + 1
+        else:
+            buf.append(c)
+            i += 1
+    if quoted:
+        raise TclError('missing "')
+    flush()
+    return parts, i
+
+
+def parse_script(script):
+    """Commands of a Tcl script, each a list of (parts, source) words"""
+    commands = []
+    i, n = 0, len(script)
+    while i < n:
+        while i < n and (script[i] in ' \t\r\n;' or script.startswith('\\\n', i)):
+            i += 2 if script[i] == '\\' else 1
+        if i >= n:
+            break
+        if script[i] == '#':
+            while i < n and script[i] != '\n':
+                i += 2 if script[i] == '\\' else 1
+            continue
+        words = []
+        while i < n:
+            while i < n and (script[i] in ' \t' or script.startswith('\\\n', i)):
+                i += 2 if script[i] == '\\' else 1
+            if i >= n or script[i] in '\r\n;':
+                break
+            if script[i] == '{':
+                end = _match_brace(script, i)
+                text = script[i + 1:end]
+                words.append(([('text', text)], text))
+                i = end + 1
+            elif script[i] == '"':
+                parts, end = _parse_parts(script, i + 1, True)
+                words.append((parts, script[i + 1:end - 1]))
+                i = end
+            else:
+                parts, end = _parse_parts(script, i, False)
+                words.append((parts, script[i:end]))
+                i = end
+        if words:
+            commands.append(words)
+    return commands
+
+
+def split_list(text):
+    """Elements of a Tcl list (braces group, no substitution)"""
+    items, i = [], 0
+    while i < len(text):
+        if text[i].isspace():
+            i += 1
+        elif text[i] == '{':
+            end = _match_brace(text, i)
+            items.append(text[i + 1:end])
+            i = end + 1
+        elif text[i] == '"':
+            end = text.index('"', i + 1)
+            items.append(text[i + 1:end])
+            i = end + 1
+        else:
+            end = i
+            while end < len(text) and not text[end].isspace():
+                end += 1
+            items.append(text[i:end])
+            i = end
+    return items
+
+
+def join_list(items):
+    return ' '.join('{' + item + '}' if not item or any(c.isspace() for c in item) else item
+                    for item in items)
+
+
+# ------------------------------------------------------------- expressions
+
+def _tcl_div(a, b):
+    # Tcl divides integers with floor division
+    if isinstance(a, int) and isinstance(b, int):
+        return a // b
+    return a / b
+
+
+EXPR_FUNCTIONS = {
+    'sqrt': math.sqrt, 'pow': math.pow, 'exp': math.exp, 'log': math.log, 'log10': math.log10,
+    'sin': math.sin, 'cos': math.cos, 'tan': math.tan, 'asin': math.asin, 'acos': math.acos,
+    'atan': math.atan, 'atan2': math.atan2, 'sinh': math.sinh, 'cosh': math.cosh, 'tanh': math.tanh,
+    'hypot': math.hypot, 'fmod': math.fmod, 'abs': abs, 'int': int, 'wide': int, 'entier': int,
+    'double': float, 'round': round, 'floor': lambda x: float(math.floor(x)),
+    'ceil': lambda x: float(math.ceil(x)), 'min': min, 'max': max, '_div': _tcl_div,
+}
+_EXPR_TOKEN = re.compile(r'\s+|&&|\|\||!=|!|==|<=|>=|\*\*|[A-Za-z_][A-Za-z0-9_]*|'
+                         r'\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?|.')
+
+
+class _Divisions(ast.NodeTransformer):
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Div):
+            return ast.Call(ast.Name('_div', ast.Load()), [node.left, node.right], [])
+        return node
+
+
+def compile_expr(source):
+    """Compile a Tcl expression to Python code plus its embedded scripts
+
+    $name becomes _v('name'), [script] becomes _c(k) and quoted strings
+    _s(k); Tcl operators and integer division are translated.
+    """
+    out, embedded, i = [], [], 0
+    while i < len(source):
+        c = source[i]
+        if c == '$':
+            parts, _ = _parse_parts(source, i, False)
+            if parts[0][0] != 'var':
+                raise TclError(f"bad variable reference in expression {source!r}")
+            name = parts[0][1]
+            i += len(name) + (3 if source.startswith('${', i) else 1)
+            out.append(f'_v({name!r})')
+        elif c == '[':
+            end = _match_bracket(source, i)
+            embedded.append(('cmd', source[i + 1:end]))
+            out.append(f'_c({len(embedded) - 1})')
+            i = end + 1
+        elif c == '"':
+            parts, end = _parse_parts(source, i + 1, True)
+            embedded.append(('str', parts))
+            out.append(f'_s({len(embedded) - 1})')
+            i = end
+        else:
+            token = _EXPR_TOKEN.match(source, i).group()
+            i += len(token)
+            if token == '&&':
+                token = ' and '
+            elif token == '||':
+                token = ' or '
+            elif token == '!':
+                token = ' not '
+            elif token in ('eq', 'ne'):
+                token = ' == ' if token == 'eq' else ' != '
+            elif token in ('true', 'false'):
+                token = '1' if token == 'true' else '0'
+            elif (token[0].isalpha() or token[0] == '_') and token not in EXPR_FUNCTIONS:
+                raise TclError(f"invalid bareword {token!r} in expression {source!r}")
+            elif token == '.':
+                # Only numbers contain dots: no attribute access
+                raise TclError(f"invalid character '.' in expression {source!r}")
+            out.append(token)
+    try:
+        tree = _Divisions().visit(ast.parse(''.join(out).strip(), mode='eval'))
+    except SyntaxError:
+        raise TclError(f"syntax error in expression {source!r}") from None
+    return compile(ast.fix_missing_locations(tree), '<expr>', 'eval'), embedded
+
+
+def to_number(text):
+    """Tcl value as int or float (the text itself if not numeric)"""
+    try:
+        return int(text)
+    except ValueError:
+        try:
+            return float(text)
+        except ValueError:
+            return text
+
+
+def format_value(value):
+    """Python result as Tcl text (bools as 1 / 0, doubles round-tripped)"""
+    if isinstance(value, (bool, np.bool_)):
+        return '1' if value else '0'
+    if isinstance(value, (int, np.integer)):
+        return str(int(value))
+    if isinstance(value, (float, np.floating)):
+        value = float(value)
+        if math.isinf(value):
+            return 'Inf' if value > 0 else '-Inf'
+        return repr(value)
+    return str(value)
+
+
+# ------------------------------------------------------------------ model
+
+class TclModel:
+    """OpenSees domain built by a script: tag-indexed records
+
+    nodes, fixes and masses map node tags to arrays; elements map element
+    tags to dicts (type, nodes, parameters); materials, sections,
+    transforms, integrations, time_series and patterns likewise. frame()
+    compiles beam models to fem.Frame2D.
+    """
+
+    def __init__(self, ndm=2, ndf=3):
+        self.ndm, self.ndf = ndm, ndf
+        self.nodes = {}
+        self.fixes = {}
+        self.masses = {}
+        self.materials = {}
+        self.sections = {}
+        self.transforms = {}
+        self.integrations = {}
+        self.elements = {}
+        self.time_series = {}
+        self.patterns = {}
+        self.rayleigh = (0.0, 0.0, 0.0, 0.0)
+        self.version = 0
+
+    def changed(self):
+        self.version += 1
+
+    def node_arrays(self):
+        """(tags, coordinates) in tag order"""
+        tags = np.array(sorted(self.nodes), dtype=int)
+        coords = np.array([self.nodes[t] for t in tags], dtype=float).reshape(len(tags), self.ndm)
+        return tags, coords
+
+    def element_types(self):
+        types = {}
+        for element in self.elements.values():
+            types[element['type']] = types.get(element['type'], 0) + 1
+        return types
+
+    def _beam_properties(self, element):
+        """(E, A, I, mass per length, lumped) of a beam element record"""
+        if element['type'] == 'elasticBeamColumn' and element['section'] is None:
+            E, A, I = element['E'], element['A'], element['I']
+        else:
+            tag = element['section']
+            if tag is None:
+                tag = self.integrations[element['integration']]['section']
+            section = self.sections[tag]
+            if section['type'] != 'Elastic':
+                raise TclError(f"element {element['tag']}: {section['type']} section {tag} is not linear elastic")
+            E, A, I = section['E'], section['A'], section['I']
+        return E, A, I, element['mass'], element['lumped']
+
+    def frame(self):
+        """fem.Frame2D of a 2D, 3 DOF/node beam model (node order = tag order)"""
+        if (self.ndm, self.ndf) != (2, 3):
+            raise TclError(f"A frame needs -ndm 2 -ndf 3, not -ndm {self.ndm} -ndf {self.ndf}")
+        others = {t for t in self.element_types() if t not in BEAM_ELEMENTS}
+        if others:
+            raise TclError(f"{', '.join(sorted(others))} elements cannot be compiled to a frame")
+        tags, coords = self.node_arrays()
+        index = {tag: i for i, tag in enumerate(tags)}
+        element_tags = sorted(self.elements)
+        records = [self.elements[t] for t in element_tags]
+        props = np.array([self._beam_properties(e)[:4] for e in records], dtype=float).reshape(-1, 4)
+        lumped = {self._beam_properties(e)[4] for e in records}
+        if len(lumped) > 1:
+            raise TclError("Mixed -cMass and lumped elements")
+        connectivity = np.array([[index[e['nodes'][0]], index[e['nodes'][1]]] for e in records], dtype=int)
+        model = fem.Frame2D(coords, connectivity.reshape(-1, 2), props[:, 0], props[:, 1], props[:, 2], props[:, 3])
+        for tag, flags in self.fixes.items():
+            model.fix(index[tag], *flags)
+        for tag, mass in self.masses.items():
+            model.add_mass(index[tag], *mass)
+        model.node_tags = tags
+        model.element_tags = np.array(element_tags, dtype=int)
+        model.lumped = lumped.pop() if lumped else True
+        return model
+
+    def truss(self):
+        """truss.Truss of a model of truss elements with Elastic materials"""
+        if self.ndf != self.ndm:
+            raise TclError(f"A truss needs -ndf equal to -ndm, not -ndm {self.ndm} -ndf {self.ndf}")
+        others = {t for t in self.element_types() if t != 'truss'}
+        if others:
+            raise TclError(f"{', '.join(sorted(others))} elements cannot be compiled to a truss")
+        tags, coords = self.node_arrays()
+        index = {tag: i for i, tag in enumerate(tags)}
+        element_tags = sorted(self.elements)
+        records = [self.elements[t] for t in element_tags]
+        E = []
+        for element in records:
+            kind, args = self.materials[element['material']]
+            if kind != 'Elastic':
+                raise TclError(f"element {element['tag']}: {kind} material is not linear elastic")
+            E.append(float(args[0]))
+        connectivity = np.array([[index[e['nodes'][0]], index[e['nodes'][1]]] for e in records], dtype=int)
+        model = truss.Truss(coords, connectivity.reshape(-1, 2), E, [e['A'] for e in records],
+                            [e['mass'] for e in records])
+        for tag, flags in self.fixes.items():
+            model.fix(index[tag], *flags)
+        for tag, mass in self.masses.items():
+            model.add_mass(index[tag], *mass)
+        model.node_tags = tags
+        model.element_tags = np.array(element_tags, dtype=int)
+        model.lumped = True
+        return model
+
+    def structure(self):
+        """Native model: a truss.Truss when every element is a truss, else a fem.Frame2D"""
+        if self.elements and set(self.element_types()) == {'truss'}:
+            return self.truss()
+        return self.frame()
+
+    def fiber_section(self, tag):
+        """fiber.FiberSection of a `section Fiber` (one Concrete01, one Steel01)
+
+        Fibers are read literally from patch rect / layer straight / fiber
+        commands; in 2D only their y coordinate and area matter.
+        """
+        from Structural_monitoring.fiber import FiberSection
+
+        section = self.sections[tag]
+        y = {'Concrete01': [], 'Steel01': []}
+        area = {'Concrete01': [], 'Steel01': []}
+        params = {}
+        for mat, fy, fa in section['fibers']:
+            kind, args = self.materials[mat]
+            if kind not in y:
+                raise TclError(f"Fiber material {mat} is {kind}; only Concrete01 and Steel01 are supported")
+            params[kind] = tuple(args)
+            y[kind].extend(fy)
+            area[kind].extend(fa)
+        return FiberSection(y['Concrete01'], area['Concrete01'], y['Steel01'], area['Steel01'],
+                            params['Concrete01'], params['Steel01'])
+
+
+# ------------------------------------------------------------ interpreter
+
+class TclInterpreter:
+    """Evaluate OpenSees Tcl scripts against a TclModel and the native solvers
+
+    out_dir receives recorder and `open` files (None keeps them in
+    self.files); base_dir resolves relative input files (timeSeries Path).
+    With analyze=False, eigen / analyze / record only build the model.
+    """
+
+    def __init__(self, out_dir=None, base_dir='.', analyze=True, echo=False):
+        self.out_dir = out_dir
+        self.base_dir = base_dir
+        self.run_analyses = analyze
+        self.echo = echo
+        self.eigen_log = []         # eigen results, in call order
+        self.eigen_replay = []      # results to answer eigen with instead (cached runs)
+        self.vars = {}
+        self.files = {}
+        self.output = []
+        self._parsed = {}
+        self._exprs = {}
+        self._channels = {}
+        self._wipe()
+
+    # -- evaluation
+    def eval(self, script):
+        commands = self._parsed.get(script)
+        if commands is None:
+            commands = self._parsed[script] = parse_script(script)
+        result = ''
+        for words in commands:
+            first = words[0][0]
+            if len(first) == 1 and first[0] == ('text', 'expr'):
+                result = self.expr(' '.join(source for _, source in words[1:]))
+                continue
+            args = [self._word(parts) for parts, _ in words]
+            handler = getattr(self, '_cmd_' + args[0], None)
+            if handler is None:
+                raise TclError(f'invalid command name "{args[0]}"')
+            result = handler(args[1:])
+            result = '' if result is None else result
+        return result
+
+    def _word(self, parts):
+        if len(parts) == 1 and parts[0][0] == 'text':
+            return parts[0][1]
+        return ''.join(self._part(kind, value) for kind, value in parts)
+
+    def _part(self, kind, value):
+        if kind == 'text':
+            return value
+        if kind == 'var':
+            try:
+                return self.vars[value]
+            except KeyError:
+                raise TclError(f'can\'t read "{value}": no such variable') from None
+        return self.eval(value)
+
+    def expr(self, source):
+        compiled = self._exprs.get(source)
+        if compiled is None:
+            compiled = self._exprs[source] = compile_expr(source)
+        code, embedded = compiled
+        namespace = dict(EXPR_FUNCTIONS)
+        namespace['__builtins__'] = {}
+        namespace['_v'] = lambda name: to_number(self._part('var', name))
+        namespace['_c'] = lambda k: to_number(self.eval(embedded[k][1]))
+        namespace['_s'] = lambda k: self._word(embedded[k][1])
+        try:
+            return format_value(eval(code, namespace))
+        except ZeroDivisionError:
+            raise TclError("divide by zero") from None
+
+    def _true(self, condition):
+        value = to_number(self.expr(condition))
+        return bool(value) if not isinstance(value, str) else value in ('true', 'yes', 'on')
+
+    def run_file(self, path):
+        with open(path) as f:
+            script = f.read()
+        result = self.eval(script)
+        self.flush()
+        return result
+
+    # -- Tcl commands
+    def _cmd_set(self, args):
+        if len(args) == 2:
+            self.vars[args[0]] = args[1]
+        return self._part('var', args[0])
+
+    def _cmd_unset(self, args):
+        for name in args:
+            self.vars.pop(name, None)
+
+    def _cmd_incr(self, args):
+        value = int(self.vars.get(args[0], '0')) + (int(args[1]) if len(args) > 1 else 1)
+        self.vars[args[0]] = str(value)
+        return self.vars[args[0]]
+
+    def _cmd_expr(self, args):
+        return self.expr(' '.join(args))
+
+    def _loop_body(self, body):
+        """Run a loop body; True when the loop must stop"""
+        try:
+            self.eval(body)
+        except _Break:
+            return True
+        except _Continue:
+            pass
+        return False
+
+    def _cmd_for(self, args):
+        start, test, step, body = args
+        self.eval(start)
+        while self._true(test):
+            if self._loop_body(body):
+                break
+            self.eval(step)
+
+    def _cmd_while(self, args):
+        test, body = args
+        while self._true(test):
+            if self._loop_body(body):
+                break
+
+    def _cmd_foreach(self, args):
+        names, values, body = split_list(args[0]), split_list(args[1]), args[2]
+        for k in range(0, len(values), len(names)):
+            for name, value in zip(names, values[k:k + len(names)] + [''] * len(names)):
+                self.vars[name] = value
+            if self._loop_body(body):
+                break
+
+    def _cmd_if(self, args):
+        i = 0
+        while i < len(args):
+            condition, i = args[i], i + 1
+            if i < len(args) and args[i] == 'then':
+                i += 1
+            if self._true(condition):
+                return self.eval(args[i])
+            i += 1
+            if i >= len(args):
+                return ''
+            if args[i] == 'elseif':
+                i += 1
+            elif args[i] == 'else':
+                return self.eval(args[i + 1])
+            else:
+                return self.eval(args[i])
+        return ''
+
+    def _cmd_break(self, args):
+        raise _Break
+
+    def _cmd_continue(self, args):
+        raise _Continue
+
+    def _cmd_list(self, args):
+        return join_list(args)
+
+    def _cmd_lappend(self, args):
+        items = split_list(self.vars.get(args[0], '')) + list(args[1:])
+        self.vars[args[0]] = join_list(items)
+        return self.vars[args[0]]
+
+    def _cmd_lindex(self, args):
+        items = split_list(args[0])
+        index = args[1].strip()
+        if index == 'end' or index.startswith('end-') or index.startswith('end+'):
+            k = len(items) - 1 + (int(index[3:]) if len(index) > 3 else 0)
+        else:
+            k = int(to_number(self.expr(index) if not index.lstrip('-').isdigit() else index))
+        return items[k] if 0 <= k < len(items) else ''
+
+    def _cmd_llength(self, args):
+        return str(len(split_list(args[0])))
+
+    def _cmd_puts(self, args):
+        args = list(args)
+        newline = '\n'
+        if args and args[0] == '-nonewline':
+            newline = ''
+            args.pop(0)
+        if len(args) == 1 or args[0] == 'stdout':
+            text = args[-1] + newline
+            self.output.append(text)
+            if self.echo:
+                print(text, end='')
+        else:
+            self._channels[args[0]][1].append(args[1] + newline)
+
+    def _cmd_open(self, args):
+        channel = f'file{len(self._channels) + 1}'
+        self._channels[channel] = (args[0], [])
+        return channel
+
+    def _cmd_close(self, args):
+        name, chunks = self._channels.pop(args[0])
+        self._write(name, ''.join(chunks))
+
+    def _write(self, name, text):
+        if self.out_dir is None:
+            self.files[name] = text
+        else:
+            with open(os.path.join(self.out_dir, name), 'w') as f:
+                f.write(text)
+
+    # -- OpenSees model commands
+    def _wipe(self):
+        self.model = TclModel()
+        self.analysis = {'integrator': ('Newmark', 0.5, 0.25), 'type': None}
+        self.recorders = []
+        self.time = 0.0
+        self._pattern = None
+        self._section = None
+        self._compiled = None
+        self._state = None
+
+    def _cmd_wipe(self, args):
+        self.flush()
+        self._wipe()
+
+    def _cmd_model(self, args):
+        options = dict(zip(args[1::2], args[2::2]))
+        ndm = int(options['-ndm'])
+        self.model = TclModel(ndm, int(options.get('-ndf', ndm * (ndm + 1) // 2)))
+
+    def _cmd_node(self, args):
+        m = self.model
+        m.nodes[int(args[0])] = np.array([float(x) for x in args[1:1 + m.ndm]])
+        if '-mass' in args:
+            k = args.index('-mass')
+            m.masses[int(args[0])] = np.array([float(x) for x in args[k + 1:k + 1 + m.ndf]])
+        m.changed()
+
+    def _cmd_fix(self, args):
+        self.model.fixes[int(args[0])] = tuple(int(x) for x in args[1:1 + self.model.ndf])
+        self.model.changed()
+
+    def _cmd_mass(self, args):
+        self.model.masses[int(args[0])] = np.array([float(x) for x in args[1:1 + self.model.ndf]])
+        self.model.changed()
+
+    def _cmd_uniaxialMaterial(self, args):
+        self.model.materials[int(args[1])] = (args[0], [to_number(x) for x in args[2:]])
+
+    def _cmd_section(self, args):
+        kind, tag = args[0], int(args[1])
+        if kind == 'Elastic':
+            E, A, I = (float(x) for x in args[2:5])
+            self.model.sections[tag] = {'type': kind, 'E': E, 'A': A, 'I': I}
+        elif kind == 'Fiber':
+            self._section = self.model.sections[tag] = {'type': kind, 'fibers': []}
+            self.eval(args[-1])
+            self._section = None
+        else:
+            self.model.sections[tag] = {'type': kind, 'args': [to_number(x) for x in args[2:]]}
+        self.model.changed()
+
+    def _cmd_patch(self, args):
+        if args[0] != 'rect':
+            raise TclError(f"patch {args[0]} is not supported")
+        mat, ny, _ = int(args[1]), int(args[2]), int(args[3])
+        yI, zI, yJ, zJ = (float(x) for x in args[4:8])
+        edges = np.linspace(yI, yJ, ny + 1)
+        area = abs((yJ - yI) * (zJ - zI)) / ny
+        self._section['fibers'].append((mat, list(0.5 * (edges[1:] + edges[:-1])), [area] * ny))
+
+    def _cmd_layer(self, args):
+        if args[0] != 'straight':
+            raise TclError(f"layer {args[0]} is not supported")
+        mat, n, area = int(args[1]), int(args[2]), float(args[3])
+        yS, _, yE, _ = (float(x) for x in args[4:8])
+        self._section['fibers'].append((mat, list(np.linspace(yS, yE, n)), [area] * n))
+
+    def _cmd_fiber(self, args):
+        y, _, area, mat = float(args[0]), float(args[1]), float(args[2]), int(args[3])
+        self._section['fibers'].append((mat, [y], [area]))
+
+    def _cmd_geomTransf(self, args):
+        self.model.transforms[int(args[1])] = args[0]
+
+    def _cmd_beamIntegration(self, args):
+        self.model.integrations[int(args[1])] = {'type': args[0], 'section': int(args[2]),
+                                                 'points': int(args[3]) if len(args) > 3 else None}
+
+    def _cmd_element(self, args):
+        kind, tag = args[0], int(args[1])
+        options = [a for a in args[2:]]
+        record = {'type': kind, 'tag': tag, 'mass': 0.0, 'lumped': True, 'section': None}
+        if '-mass' in options:
+            k = options.index('-mass')
+            record['mass'] = float(options[k + 1])
+            del options[k:k + 2]
+        if '-cMass' in options:
+            record['lumped'] = False
+            options.remove('-cMass')
+        if kind in BEAM_ELEMENTS:
+            record['nodes'] = (int(options[0]), int(options[1]))
+            values = options[2:]
+            if kind == 'elasticBeamColumn' and len(values) >= 4:
+                record['A'], record['E'], record['I'] = (float(x) for x in values[:3])
+                record['transform'] = int(values[3])
+            elif len(values) == 2:
+                # New syntax: transfTag (integrationTag | secTag for elasticBeamColumn)
+                record['transform'] = int(values[0])
+                if kind == 'elasticBeamColumn':
+                    record['section'] = int(values[1])
+                else:
+                    record['integration'] = int(values[1])
+            else:
+                record['points'], record['section'], record['transform'] = (int(x) for x in values[:3])
+        elif kind == 'truss':
+            record['nodes'] = (int(options[0]), int(options[1]))
+            record['A'], record['material'] = float(options[2]), int(options[3])
+            if '-rho' in options:
+                record['mass'] = float(options[options.index('-rho') + 1])
+        elif kind == 'zeroLength':
+            record['nodes'] = (int(options[0]), int(options[1]))
+            k_mat, k_dir = options.index('-mat'), options.index('-dir')
+            record['materials'] = [int(x) for x in options[k_mat + 1:k_dir]]
+            record['directions'] = [int(x) for x in options[k_dir + 1:k_dir + 1 + len(record['materials'])]]
+        else:
+            record['nodes'] = tuple(int(x) for x in options[:2])
+            record['args'] = options[2:]
+        self.model.elements[tag] = record
+        self.model.changed()
+
+    def _cmd_timeSeries(self, args):
+        self._time_series(args[0], int(args[1]), args[2:])
+
+    def _time_series(self, kind, tag, args):
+        options = dict(zip(args[::2], args[1::2]))
+        series = {'type': kind, 'factor': float(options.get('-factor', 1.0))}
+        if kind == 'Path':
+            series['dt'] = float(options['-dt'])
+            if '-filePath' in options:
+                path = os.path.join(self.base_dir, options['-filePath'])
+                series['values'] = np.loadtxt(path).ravel()
+            else:
+                series['values'] = np.array([float(x) for x in split_list(options['-values'])])
+        elif kind not in ('Linear', 'Constant'):
+            raise TclError(f"timeSeries {kind} is not supported")
+        self.model.time_series[tag] = series
+        return tag
+
+    def _series_factor(self, tag, t):
+        series = self.model.time_series[tag]
+        if series['type'] == 'Linear':
+            return series['factor'] * t
+        if series['type'] == 'Constant':
+            return series['factor']
+        values = series['values']
+        return series['factor'] * np.interp(t, series['dt'] * np.arange(len(values)), values, right=0.0)
+
+    def _cmd_pattern(self, args):
+        kind, tag = args[0], int(args[1])
+        if kind == 'Plain':
+            series = args[2]
+            if not series.lstrip('-').isdigit():
+                series = self._time_series(series, -tag, [])     # inline series
+            self._pattern = self.model.patterns[tag] = {'type': kind, 'series': int(series), 'loads': {},
+                                                        'element_loads': []}
+            if len(args) > 3:
+                self.eval(args[3])
+        elif kind == 'UniformExcitation':
+            options = dict(zip(args[3::2], args[4::2]))
+            self.model.patterns[tag] = {'type': kind, 'direction': int(args[2]),
+                                        'series': int(options['-accel']), 'factor': float(options.get('-fact', 1.0))}
+        else:
+            raise TclError(f"pattern {kind} is not supported")
+
+    def _cmd_load(self, args):
+        node = int(args[0])
+        values = np.array([float(x) for x in args[1:1 + self.model.ndf]])
+        pattern = self._pattern
+        if '-pattern' in args:
+            pattern = self.model.patterns[int(args[args.index('-pattern') + 1])]
+        if pattern is None:
+            raise TclError("load outside any load pattern")
+        # OpenSees adds a new nodal load every time; they all act together
+        loads = pattern['loads']
+        loads[node] = loads.get(node, 0.0) + values
+
+    def _cmd_eleLoad(self, args):
+        args = list(args)
+        elements = []
+        kind = None
+        k = 0
+        while k < len(args):
+            if args[k] == '-ele':
+                k += 1
+                while k < len(args) and not args[k].startswith('-'):
+                    elements.append(int(args[k]))
+                    k += 1
+            elif args[k] == '-range':
+                elements.extend(range(int(args[k + 1]), int(args[k + 2]) + 1))
+                k += 3
+            elif args[k] == '-type':
+                kind, values = args[k + 1], [float(x) for x in args[k + 2:]]
+                break
+            else:
+                k += 1
+        if kind is None:
+            raise TclError("eleLoad needs -type")
+        if kind not in ('-beamPoint', '-beamUniform'):
+            raise TclError(f"eleLoad {kind} is not supported")
+        if self._pattern is None:
+            raise TclError("eleLoad outside any load pattern")
+        self._pattern['element_loads'].extend((tag, kind, values) for tag in elements)
+
+    def _cmd_rayleigh(self, args):
+        self.model.rayleigh = tuple(float(x) for x in args[:4])
+        self._compiled = None
+
+    def _cmd_remove(self, args):
+        kind = args[0]
+        if kind == 'element':
+            self.model.elements.pop(int(args[1]), None)
+            self.model.changed()
+        elif kind == 'node':
+            tag = int(args[1])
+            for records in (self.model.nodes, self.model.fixes, self.model.masses):
+                records.pop(tag, None)
+            self.model.changed()
+        elif kind == 'loadPattern':
+            pattern = self.model.patterns.pop(int(args[1]), None)
+            if pattern is self._pattern:
+                self._pattern = None
+        elif kind == 'recorders':
+            self.flush()
+            self.recorders = []
+        else:
+            raise TclError(f"remove {kind} is not supported")
+
+    def _cmd_recorder(self, args):
+        kind, args = args[0], list(args[1:])
+        recorder = {'type': kind, 'file': None, 'time': False, 'rows': [], 'tags': [], 'dofs': []}
+        k = 0
+        while k < len(args):
+            a = args[k]
+            if a in ('-file', '-xml', '-binary'):
+                recorder['file'] = args[k + 1]
+                k += 2
+            elif a == '-time':
+                recorder['time'] = True
+                k += 1
+            elif a in ('-node', '-ele', '-dof'):
+                key = 'dofs' if a == '-dof' else 'tags'
+                k += 1
+                while k < len(args) and args[k].lstrip('-').isdigit():
+                    recorder[key].append(int(args[k]))
+                    k += 1
+            elif a in ('-nodeRange', '-eleRange'):
+                recorder['tags'].extend(range(int(args[k + 1]), int(args[k + 2]) + 1))
+                k += 3
+            elif a in ('-precision', '-closeOnWrite', '-dT'):
+                k += 1 if a == '-closeOnWrite' else 2
+            else:
+                recorder['response'] = a
+                k += 1
+        self.recorders.append(recorder)
+
+    def _cmd_wipeAnalysis(self, args):
+        self.analysis = {'integrator': ('Newmark', 0.5, 0.25), 'type': None}
+
+    def _cmd_integrator(self, args):
+        self.analysis['integrator'] = (args[0], *[to_number(x) for x in args[1:]])
+
+    def _cmd_analysis(self, args):
+        self.analysis['type'] = args[0]
+
+    def _cmd_system(self, args):
+        self.analysis['system'] = args[0]
+
+    def _cmd_constraints(self, args):
+        self.analysis['constraints'] = args[0]
+
+    def _cmd_numberer(self, args):
+        self.analysis['numberer'] = args[0]
+
+    def _cmd_test(self, args):
+        self.analysis['test'] = args
+
+    def _cmd_algorithm(self, args):
+        self.analysis['algorithm'] = args[0]
+
+    def _cmd_loadConst(self, args):
+        # Freeze every pattern at its current value
+        for pattern in self.model.patterns.values():
+            if pattern['type'] == 'Plain':
+                factor = self._series_factor(pattern['series'], self.time)
+                tag = -1000 - len(self.model.time_series)
+                self.model.time_series[tag] = {'type': 'Constant', 'factor': factor}
+                pattern['series'] = tag
+        if '-time' in args:
+            self.time = float(args[args.index('-time') + 1])
+
+    def _cmd_setTime(self, args):
+        self.time = float(args[0])
+
+    def _cmd_getTime(self, args):
+        return format_value(self.time)
+
+    def _cmd_nodeDisp(self, args):
+        return self._node_response('u', args)
+
+    def _cmd_nodeVel(self, args):
+        return self._node_response('v', args)
+
+    def _cmd_nodeAccel(self, args):
+        return self._node_response('a', args)
+
+    def _cmd_nodeCoord(self, args):
+        coords = self.model.nodes[int(args[0])]
+        return format_value(float(coords[int(args[1]) - 1])) if len(args) > 1 else \
+            join_list([format_value(float(x)) for x in coords])
+
+    # -- analysis on the compiled model
+    def compile(self):
+        """Compiled structure and matrices of the current model (cached)"""
+        key = (self.model.version, self.model.rayleigh)
+        if self._compiled is None or self._compiled['key'] != key:
+            structure = self.model.structure()
+            K = structure.stiffness()
+            M = structure.mass(structure.lumped)
+            a0, a1, a2, a3 = self.model.rayleigh
+            C = fem.rayleigh(M, K, a0, a1 + a2 + a3)
+            index = {int(tag): i for i, tag in enumerate(structure.node_tags)}
+            self._compiled = {'key': key, 'structure': structure, 'K': K, 'M': M, 'C': C, 'index': index,
+                              'solvers': {}}
+            n = K.shape[0]
+            if self._state is None or len(self._state['u']) != n:
+                self._state = {'u': np.zeros(n), 'v': np.zeros(n), 'a': np.zeros(n)}
+        return self._compiled
+
+    def _load_vector(self, t, compiled):
+        """Free-DOF force vector of every pattern at time t"""
+        structure, index, ndf = compiled['structure'], compiled['index'], self.model.ndf
+        force = np.zeros(structure.n_dof)
+        for pattern in self.model.patterns.values():
+            factor = self._series_factor(pattern['series'], t)
+            if pattern['type'] == 'UniformExcitation':
+                r = np.zeros(structure.n_dof)
+                r[pattern['direction'] - 1::ndf] = 1.0
+                free = structure.free_dofs
+                force[free] -= pattern['factor'] * factor * (compiled['M'] @ r[free])
+                continue
+            for node, values in pattern['loads'].items():
+                force[index[node] * ndf:index[node] * ndf + ndf] += factor * values
+            if pattern['element_loads']:
+                if isinstance(structure, truss.Truss):
+                    raise TclError("eleLoad is not supported on truss elements")
+                force += factor * self._element_loads(pattern['element_loads'], compiled)
+        return force[compiled['structure'].free_dofs]
+
+    def _element_loads(self, element_loads, compiled):
+        """Full-DOF consistent nodal loads of beamPoint / beamUniform loads"""
+        structure = compiled['structure']
+        position = {int(tag): i for i, tag in enumerate(structure.element_tags)}
+        elems = np.array([position[tag] for tag, _, _ in element_loads])
+        L, c, s = structure.geometry()
+        L, c, s = L[elems], c[elems], s[elems]
+        local = np.zeros((len(elems), 6))
+        for k, (_, kind, values) in enumerate(element_loads):
+            if kind == '-beamPoint':
+                P, xi = values[0], values[1]
+                Px = values[2] if len(values) > 2 else 0.0
+                local[k, [1, 2, 4, 5]] = P * hermite_weights(xi, L[k])
+                local[k, [0, 3]] = Px * (1 - xi), Px * xi
+            else:
+                w = values[0]
+                wx = values[1] if len(values) > 1 else 0.0
+                local[k] = [wx * L[k] / 2, w * L[k] / 2, w * L[k]**2 / 12,
+                            wx * L[k] / 2, w * L[k] / 2, -w * L[k]**2 / 12]
+        T = structure._rotation(c, s)
+        force = np.zeros(structure.n_dof)
+        np.add.at(force, structure.element_dofs()[elems], np.einsum('eji,ej->ei', T, local))
+        return force
+
+    def _cmd_eigen(self, args):
+        n = int(args[-1])
+        if self.eigen_replay:
+            return self.eigen_replay.pop(0)
+        if not self.run_analyses:
+            # Neutral eigenvalues, so scripts deriving damping from them still build
+            return join_list(['1.0'] * n)
+        compiled = self.compile()
+        omega, _ = fem.eigen(compiled['K'], compiled['M'], n)
+        result = join_list([format_value(float(w)**2) for w in omega])
+        self.eigen_log.append(result)
+        return result
+
+    def _cmd_analyze(self, args):
+        if not self.run_analyses:
+            return '0'
+        n_steps = int(args[0])
+        compiled = self.compile()
+        state = self._state
+        kind, *params = self.analysis['integrator']
+        for _ in range(n_steps):
+            if self.analysis['type'] == 'Transient':
+                dt = float(args[1])
+                t = self.time + dt
+                gamma, beta = (float(p) for p in params[:2])
+                solve = compiled['solvers'].get(('Newmark', dt, beta, gamma))
+                c = _newmark_constants(dt, beta, gamma)
+                if solve is None:
+                    K_eff = compiled['K'] + c[0] * compiled['M'] + c[3] * compiled['C']
+                    solve = compiled['solvers'][('Newmark', dt, beta, gamma)] = spla.factorized(K_eff.tocsc())
+                state['u'], state['v'], state['a'] = _newmark_step(
+                    solve, compiled['M'], compiled['C'], c, state['u'], state['v'], state['a'],
+                    self._load_vector(t, compiled))
+            elif self.analysis['type'] == 'Static':
+                if kind != 'LoadControl':
+                    raise TclError(f"integrator {kind} is not supported for static analysis")
+                t = self.time + float(params[0])
+                solve = compiled['solvers'].get('static')
+                if solve is None:
+                    solve = compiled['solvers']['static'] = spla.factorized(compiled['K'].tocsc())
+                state['u'] = solve(self._load_vector(t, compiled))
+            else:
+                raise TclError("analyze needs an `analysis Transient` or `analysis Static` command first")
+            self.time = t
+            self._record()
+        return '0'
+
+    def _cmd_record(self, args):
+        if self.run_analyses:
+            self.compile()
+            self._record()
+
+    def _full(self, key):
+        compiled = self._compiled
+        values = np.zeros(compiled['structure'].n_dof)
+        values[compiled['structure'].free_dofs] = self._state[key]
+        return values
+
+    def _node_response(self, key, args):
+        compiled = self.compile()
+        values = self._full(key)
+        return format_value(float(values[compiled['index'][int(args[0])] * self.model.ndf + int(args[1]) - 1]))
+
+    def _record(self):
+        compiled = self._compiled
+        for recorder in self.recorders:
+            if recorder['type'] == 'Node':
+                values = self._full(RESPONSES[recorder['response']])
+                rows = [compiled['index'][t] * self.model.ndf + d - 1
+                        for t in recorder['tags'] for d in recorder['dofs']]
+                row = values[rows]
+            elif recorder['type'] == 'Element':
+                row = self._element_response(recorder)
+            else:
+                raise TclError(f"recorder {recorder['type']} is not supported")
+            if recorder['time']:
+                row = np.concatenate([[self.time], row])
+            recorder['rows'].append(row)
+
+    def _element_response(self, recorder):
+        structure = self._compiled['structure']
+        if isinstance(structure, truss.Truss):
+            return self._truss_response(structure, recorder)
+        if recorder['response'] not in ('force', 'globalForce'):
+            raise TclError(f"Element response {recorder['response']} is not supported for frames")
+        position = {int(tag): i for i, tag in enumerate(structure.element_tags)}
+        elems = np.array([position[t] for t in recorder['tags']])
+        u = self._full('u')[structure.element_dofs()[elems]]
+        return np.einsum('eij,ej->ei', structure.element_stiffness()[elems], u).ravel()
+
+    def _truss_response(self, structure, recorder):
+        position = {int(tag): i for i, tag in enumerate(structure.element_tags)}
+        elems = np.array([position[t] for t in recorder['tags']])
+        force = (self._full('u') @ structure.equilibrium_matrix()[:, elems]) * structure.axial_stiffness()[elems]
+        response = recorder['response']
+        if response in ('axialForce', 'basicForce'):
+            return force
+        if response in ('force', 'globalForce'):
+            _, c = structure.geometry()
+            return (force[:, None] * np.concatenate([-c[elems], c[elems]], axis=1)).ravel()
+        raise TclError(f"Element response {response} is not supported for trusses")
+
+    def flush(self):
+        """Write recorder files (one `%g` row per recorded step)"""
+        for recorder in self.recorders:
+            if recorder['file'] is None:
+                continue
+            text = ''.join(' '.join(f'{x:g}' for x in row) + '\n' for row in recorder['rows'])
+            self._write(recorder['file'], text)
+
+
+def _script_inputs(path):
+    """Script text plus the contents of the input files it names"""
+    with open(path) as f:
+        script = f.read()
+    base = os.path.dirname(os.path.abspath(path))
+    inputs = {}
+    for name in re.findall(r'-filePath\s+"?([^\s"]+)', script):
+        with open(os.path.join(base, name), 'rb') as f:
+            inputs[name] = f.read()
+    return {'script': script, 'inputs': inputs}
+
+
+def run_script(path, out_dir=None, analyze=True, echo=False, cache=None):
+    """Run a Tcl script in-process; returns the TclInterpreter
+
+    Input files resolve next to the script; outputs go to out_dir (or stay
+    in interpreter.files). With a cache.ResultCache, a script whose text and
+    input files were run before only rebuilds its model (eigen answers are
+    replayed from the first run) and gets its output files from the cache
+    (interpreter.provenance tells where from).
+    """
+    base = os.path.dirname(os.path.abspath(path))
+    if cache is None or not analyze:
+        interp = TclInterpreter(out_dir, base, analyze, echo)
+        interp.run_file(path)
+        return interp
+
+    executed = []
+
+    def run():
+        interp = TclInterpreter(None, base, True, False)
+        interp.run_file(path)
+        executed.append(interp)
+        return {'files': interp.files, 'output': ''.join(interp.output), 'eigen': interp.eigen_log}
+
+    result, meta = cache.compute('tcl', run, _script_inputs(path), modules=(fem, moving_load, truss, vbi, sys.modules[__name__]))
+    if executed:
+        interp = executed[0]
+    else:
+        interp = TclInterpreter(None, base, False, False)
+        interp.eigen_replay = list(result['eigen'])
+        interp.run_file(path)
+    interp.files, interp.output = dict(result['files']), [result['output']]
+    interp.provenance = meta
+    if echo:
+        print(result['output'], end='')
+    if out_dir is not None:
+        interp.out_dir = out_dir
+        for name, text in interp.files.items():
+            interp._write(name, text)
+        interp.files = {}
+    return interp
+
+
+def load_model(path):
+    """TclModel of a script without running its analyses"""
+    return run_script(path, analyze=False).model
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run an OpenSees Tcl script on the native solvers')
+    parser.add_argument('script')
+    parser.add_argument('--out-dir', default=None, help='write recorder and output files here (default: keep in memory)')
+    parser.add_argument('--model-only', action='store_true', help='build the model, skip eigen/analyze')
+    parser.add_argument('--cache', default=None, help='result cache directory (reuse runs of unchanged scripts)')
+    args = parser.parse_args(argv)
+
+    cache = None
+    if args.cache:
+        from Structural_monitoring.cache import ResultCache
+        cache = ResultCache(args.cache)
+    interp = run_script(args.script, args.out_dir, not args.model_only, True, cache)
+    model = interp.model
+    types = ', '.join(f'{n} {t}' for t, n in model.element_types().items()) or 'no elements'
+    print(f"Model: {len(model.nodes)} nodes, {types}, {len(model.patterns)} load patterns")
+    for name, text in interp.files.items():
+        print(f"{name}: {text.count(chr(10))} lines (not written; use --out-dir)")
+    if cache is not None:
+        hit = cache.counts['hits'] > 0
+        print(f"Cache {'hit' if hit else 'miss'}: {interp.provenance['key'][:12]}, "
+              f"computed {interp.provenance['created']} in {interp.provenance['runtime']:.3f} s")
+        cache.save_stats()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+# Linear 2D / 3D truss by the direct stiffness method
+#
+# Every member is a two-force bar, so the whole model is described by its
+# equilibrium matrix B (n_dof, n_members), with the member direction cosines
+# -c at the start node DOFs and +c at the end node DOFs:
+#   elongations  e = B^T u
+#   axial forces N = (E A / L) e
+#   nodal forces f = B N
+# The stiffness is assembled in one sparse product, K = B diag(E A / L) B^T,
+# restricted to the free DOFs. Load cases are columns of one right-hand
+# side, solved with a single sparse factorization. Member forces, stresses
+# and support reactions of every case come from B products, without a loop
+# over members or cases. TCL/Trusses.tcl runs on this engine through
+# tcl_import.
+import argparse
+import time
+
+import numpy as np
+import scipy.sparse as sp
+
+from Structural_monitoring.modal import _splu
+
+
+class Truss:
+    """Array-backed pin-jointed truss in 2D or 3D
+
+    nodes is an (n_nodes, ndm) array of coordinates (ndm = 2 or 3) and
+    elements an (n_elem, 2) array of node indices; each node has ndm
+    translational DOFs. E, A and mass_per_length are scalars or per-member
+    arrays.
+    """
+
+    def __init__(self, nodes, elements, E, A, mass_per_length=0.0):
+        self.nodes = np.atleast_2d(np.asarray(nodes, dtype=float))
+        if self.nodes.shape[1] not in (2, 3):
+            raise ValueError(f"Truss nodes need 2 or 3 coordinates, not {self.nodes.shape[1]}")
+        self.elements = np.asarray(elements, dtype=np.int64).reshape(-1, 2)
+        n_elem = len(self.elements)
+        self.E = np.broadcast_to(np.asarray(E, dtype=float), (n_elem,)).copy()
+        self.A = np.broadcast_to(np.asarray(A, dtype=float), (n_elem,)).copy()
+        self.mass_per_length = np.broadcast_to(np.asarray(mass_per_length, dtype=float), (n_elem,)).copy()
+        self.fixed = np.zeros(self.nodes.shape, dtype=bool)
+        self.nodal_mass = np.zeros(self.nodes.shape)
+
+    @property
+    def ndm(self):
+        return self.nodes.shape[1]
+
+    @property
+    def n_nodes(self):
+        return len(self.nodes)
+
+    @property
+    def n_elem(self):
+        return len(self.elements)
+
+    @property
+    def n_dof(self):
+        return self.n_nodes * self.ndm
+
+    def fix(self, node, *flags):
+        """Restrain DOFs of a node (1 = fixed), like the Tcl `fix` command"""
+        self.fixed[node] = [bool(f) for f in flags[:self.ndm]]
+
+    def add_mass(self, node, *masses):
+        """Add lumped nodal mass, like the Tcl `mass` command"""
+        self.nodal_mass[node] += masses[:self.ndm]
+
+    @property
+    def free_dofs(self):
+        """Full DOF numbers of the unrestrained DOFs"""
+        return np.flatnonzero(~self.fixed.ravel())
+
+    @property
+    def n_free(self):
+        return int(np.count_nonzero(~self.fixed))
+
+    def element_dofs(self):
+        """(n_elem, 2 ndm) full DOF numbers of every member"""
+        dof = np.arange(self.ndm)
+        return np.concatenate([self.elements[:, :1] * self.ndm + dof, self.elements[:, 1:] * self.ndm + dof], axis=1)
+
+    def geometry(self):
+        """Member lengths (n_elem,) and direction cosines (n_elem, ndm)"""
+        d = self.nodes[self.elements[:, 1]] - self.nodes[self.elements[:, 0]]
+        L = np.linalg.norm(d, axis=1)
+        if np.any(L == 0):
+            raise ValueError(f"Zero-length members: {np.flatnonzero(L == 0).tolist()}")
+        return L, d / L[:, None]
+
+    def axial_stiffness(self):
+        """E A / L of every member"""
+        L, _ = self.geometry()
+        return self.E * self.A / L
+
+    def equilibrium_matrix(self):
+        """(n_dof, n_elem) CSC matrix B: nodal forces = B N, elongations = B^T u"""
+        _, c = self.geometry()
+        values = np.concatenate([-c, c], axis=1)
+        cols = np.repeat(np.arange(self.n_elem), 2 * self.ndm)
+        return sp.csc_matrix((values.ravel(), (self.element_dofs().ravel(), cols)), shape=(self.n_dof, self.n_elem))
+
+    def stiffness(self):
+        """Free-DOF global stiffness (CSR)"""
+        B = self.equilibrium_matrix()[self.free_dofs]
+        return (B @ sp.diags(self.axial_stiffness()) @ B.T).tocsr()
+
+    def mass(self, lumped=True):
+        """Free-DOF lumped mass (CSR): half of each member's mass per node, plus nodal masses"""
+        if not lumped:
+            raise ValueError("Truss mass is lumped only")
+        L, _ = self.geometry()
+        diagonal = self.nodal_mass.copy()
+        half = self.mass_per_length * L / 2
+        for end in (0, 1):
+            np.add.at(diagonal, self.elements[:, end], half[:, None])
+        return sp.diags(diagonal.ravel()[self.free_dofs]).tocsr()
+
+    def load_cases(self, cases):
+        """(n_cases, n_dof) full-DOF loads from a list of {node: (Fx, Fy[, Fz])} dicts"""
+        loads = np.zeros((len(cases), self.n_nodes, self.ndm))
+        for k, case in enumerate(cases):
+            for node, values in case.items():
+                loads[k, node] += values
+        return loads.reshape(len(cases), self.n_dof)
+
+    def solve(self, loads):
+        """Static response of one or many load cases with one factorization
+
+        loads is a full-DOF vector (n_dof,) or (n_cases, n_dof); loads on
+        restrained DOFs go straight into the supports. Returns dict(disp,
+        reactions) as (n_cases, n_nodes, ndm) arrays and dict(axial_force,
+        stress) as (n_cases, n_elem), tension positive; a single load
+        vector drops the case axis.
+        """
+        loads = np.asarray(loads, dtype=float)
+        single = loads.ndim == 1
+        loads = np.atleast_2d(loads)
+        if loads.shape[1] != self.n_dof:
+            raise ValueError(f"Loads need {self.n_dof} columns (full DOFs), got {loads.shape[1]}")
+        free = self.free_dofs
+        B = self.equilibrium_matrix()
+        k = self.axial_stiffness()
+        K = (B[free] @ sp.diags(k) @ B[free].T).tocsc()
+        try:
+            lu = _splu(K)
+        except RuntimeError:
+            raise ValueError("Truss stiffness is singular: the truss is a mechanism or lacks supports") from None
+
+        disp = np.zeros_like(loads)
+        disp[:, free] = lu.solve(np.ascontiguousarray(loads[:, free].T)).T
+        force = (disp @ B) * k
+        reactions = force @ B.T - loads
+        reactions[:, free] = 0.0
+        result = {
+            'disp': disp.reshape(-1, self.n_nodes, self.ndm),
+            'axial_force': force,
+            'stress': force / self.A,
+            'reactions': reactions.reshape(-1, self.n_nodes, self.ndm),
+        }
+        if single:
+            result = {key: value[0] for key, value in result.items()}
+        return result
+
+
+def warren(n_panels, panel=2.0, depth=1.5, width=None, E=200e9, A=0.001):
+    """Simply supported Warren truss with n_panels bottom-chord panels
+
+    2D in the x-y plane, or with width a 3D box of two Warren trusses at
+    z = 0 and z = width, tied by transverse struts, cross-bracing in the
+    top and bottom chord planes and end portal braces. Returns the Truss
+    plus its bottom-chord node indices (per plane in 3D).
+    """
+    bottom_x = panel * np.arange(n_panels + 1)
+    top_x = panel * (np.arange(n_panels) + 0.5)
+    n_bottom, n_top = n_panels + 1, n_panels
+    b = np.arange(n_bottom)
+    t = n_bottom + np.arange(n_top)
+    members = [np.column_stack([b[:-1], b[1:]]), np.column_stack([t[:-1], t[1:]]),
+               np.column_stack([b[:-1], t]), np.column_stack([t, b[1:]])]
+    plane = np.concatenate(members)
+    xy = np.concatenate([np.column_stack([bottom_x, np.zeros(n_bottom)]), np.column_stack([top_x, np.full(n_top, depth)])])
+    if width is None:
+        model = Truss(xy, plane, E, A)
+        model.fix(0, 1, 1)
+        model.fix(n_panels, 0, 1)
+        return model, b
+
+    n_plane = len(xy)
+    nodes = np.concatenate([np.column_stack([xy, np.zeros(n_plane)]), np.column_stack([xy, np.full(n_plane, width)])])
+    o = n_plane
+    ties = [np.column_stack([np.arange(n_plane), o + np.arange(n_plane)]),
+            np.column_stack([b[:-1], o + b[1:]]), np.column_stack([t[:-1], o + t[1:]]),
+            [[b[0], o + t[0]], [b[-1], o + t[-1]]]]
+    model = Truss(nodes, np.concatenate([plane, plane + o] + ties), E, A)
+    model.fix(0, 1, 1, 1)
+    model.fix(o, 0, 1, 1)
+    model.fix(n_panels, 0, 1, 1)
+    model.fix(o + n_panels, 0, 1, 0)
+    return model, np.stack([b, o + b])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Linear truss solver: Warren truss under many load cases')
+    parser.add_argument('--panels', type=int, default=100, help='bottom-chord panels (2 m each)')
+    parser.add_argument('--depth', type=float, default=12.0)
+    parser.add_argument('--area', type=float, default=0.02, help='member area (m²)')
+    parser.add_argument('--cases', type=int, default=40, help='load cases (one moving panel-point load each, '
+                                                              'plus uniform dead load)')
+    parser.add_argument('--width', type=float, default=None, help='build a 3D box truss of this width')
+    parser.add_argument('--load', type=float, default=-10000.0, help='panel-point load (N)')
+    args = parser.parse_args(argv)
+
+    model, bottom = warren(args.panels, depth=args.depth, width=args.width, A=args.area)
+    bottom = np.atleast_2d(bottom)
+    vertical = 1
+    loads = np.zeros((args.cases, model.n_nodes, model.ndm))
+    loads[:, bottom[:, 1:-1], vertical] = args.load / 10
+    positions = np.linspace(1, args.panels - 1, args.cases).round().astype(int)
+    loads[np.arange(args.cases)[:, None], bottom[:, positions].T, vertical] += args.load
+
+    start = time.perf_counter()
+    result = model.solve(loads.reshape(args.cases, -1))
+    elapsed = time.perf_counter() - start
+    applied = loads.sum(axis=(0, 1))
+    residual = np.abs(result['reactions'].sum(axis=(0, 1)) + applied).max() / np.abs(applied).max()
+    print(f"{model.ndm}D truss: {model.n_nodes} nodes, {model.n_elem} members, {model.n_free} free DOFs, "
+          f"{args.cases} load cases solved in {elapsed:.3f} s")
+    worst = np.abs(result['axial_force']).max(axis=0)
+    critical = np.argmax(worst)
+    print(f"Largest member force {worst[critical] / 1000:.1f} kN in member {critical} "
+          f"(stress {worst[critical] / model.A[critical] / 1e6:.1f} MPa)")
+    print(f"Peak deflection {np.abs(result['disp'][..., vertical]).max() * 1000:.2f} mm; "
+          f"relative equilibrium residual {residual:.1e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,301 @@
+# Vehicle-bridge interaction with multi-vehicle traffic
+#
+# bridge_car.tcl drives a constant force P across the deck, so vehicle
+# dynamics and dynamic amplification are lost; bridge_car2/accel.m couples a
+# quarter car to a few analytical modes. Here linear vehicles (quarter car,
+# two-axle half car) ride on the fem.Frame2D deck through tire springs and
+# dampers. The deck displacement under a wheel is read with the same Hermite
+# shape functions moving_load uses to spread the contact force, plus an
+# optional road roughness profile (ISO 8608 classes).
+#
+# Both subsystems are stepped with Newmark and iterated within each step
+# (block Gauss-Seidel): the vehicles see the latest deck displacement at the
+# wheels, the bridge sees the resulting contact forces. Neither effective
+# matrix depends on vehicle positions, so the bridge and the vehicles (all
+# of them, block-diagonal) are each factorized once and every iteration is
+# two back-substitutions. The converged step is the monolithic Newmark step
+# of the coupled system.
+import argparse
+import os
+import time
+
+import numpy as np
+import scipy.linalg
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+
+from Structural_monitoring import fem, moving_load
+
+G = 9.81
+# ISO 8608 displacement PSD Gd(n0) at n0 = 0.1 cycle/m [m^3], geometric mean of each class
+ROAD_CLASSES = {'A': 16e-6, 'B': 64e-6, 'C': 256e-6, 'D': 1024e-6, 'E': 4096e-6}
+# Steps whose wheel positions and contact weights are computed together
+CHUNK = 1024
+
+
+class Vehicle:
+    """Linear vehicle model on tire springs
+
+    M, C, K are the (n, n) suspension matrices without the tires; wheels
+    are the DOFs resting on the tires, offsets the distances of those axles
+    behind the front axle; kt, ct the tire stiffness and damping per wheel;
+    vertical flags the DOFs that carry weight.
+    """
+
+    def __init__(self, M, C, K, wheels, offsets, kt, ct=0.0, vertical=None, name='vehicle'):
+        self.M = np.asarray(M, dtype=float)
+        self.C = np.asarray(C, dtype=float)
+        self.K = np.asarray(K, dtype=float)
+        self.wheels = np.atleast_1d(wheels)
+        self.offsets = np.broadcast_to(np.asarray(offsets, dtype=float), self.wheels.shape)
+        self.kt = np.broadcast_to(np.asarray(kt, dtype=float), self.wheels.shape)
+        self.ct = np.broadcast_to(np.asarray(ct, dtype=float), self.wheels.shape)
+        self.vertical = np.ones(len(self.M), bool) if vertical is None else np.asarray(vertical, bool)
+        self.name = name
+
+    @classmethod
+    def quarter_car(cls, ms=225.0, mu=25.0, ks=2e4, cs=1.5e3, kt=2e5, ct=0.0):
+        """Sprung and unsprung mass (DOFs ys, yu); defaults of bridge_car2/accel.m"""
+        spring = np.array([[1.0, -1.0], [-1.0, 1.0]])
+        return cls(np.diag([ms, mu]), cs * spring, ks * spring, [1], [0.0], kt, ct, name='quarter car')
+
+    @classmethod
+    def half_car(cls, ms=18000.0, Is=65000.0, mf=1000.0, mr=1500.0, a=2.5, b=2.0, ksf=4e5, csf=1e4,
+                 ksr=1e6, csr=2e4, ktf=1.75e6, ktr=3.5e6, ctf=0.0, ctr=0.0):
+        """Two-axle half car (DOFs bounce yc, pitch theta, front and rear axles)
+
+        The front axle is a ahead of the body's centre of mass and the rear
+        axle b behind it; theta is positive nose up.
+        """
+        front = np.array([1.0, a, -1.0, 0.0])
+        rear = np.array([1.0, -b, 0.0, -1.0])
+        K = ksf * np.outer(front, front) + ksr * np.outer(rear, rear)
+        C = csf * np.outer(front, front) + csr * np.outer(rear, rear)
+        return cls(np.diag([ms, Is, mf, mr]), C, K, [2, 3], [0.0, a + b], [ktf, ktr], [ctf, ctr],
+                   vertical=[True, False, True, True], name='half car')
+
+    @property
+    def n_dof(self):
+        return len(self.M)
+
+    @property
+    def weight(self):
+        return G * self.M.diagonal()[self.vertical].sum()
+
+
+def iso_roughness(x_min, x_max, road_class='A', dx=0.05, seed=0, n_freq=200, band=(0.011, 2.83)):
+    """ISO 8608 road profile (x, r) by harmonic superposition
+
+    Gd(n) = Gd(n0) (n / n0)^-2 over the spatial frequency band [cycle/m],
+    with random phases from seed.
+    """
+    x = np.arange(x_min, x_max + dx / 2, dx)
+    n = np.linspace(band[0], band[1], n_freq)
+    dn = n[1] - n[0]
+    amplitude = np.sqrt(2 * ROAD_CLASSES[road_class] * (n / 0.1) ** -2 * dn)
+    phase = np.random.default_rng(seed).uniform(0, 2 * np.pi, n_freq)
+    return x, np.cos(2 * np.pi * np.outer(x, n) + phase) @ amplitude
+
+
+def _newmark_constants(dt, beta, gamma):
+    return (1.0 / (beta * dt**2), 1.0 / (beta * dt), 1.0 / (2 * beta) - 1.0, gamma / (beta * dt),
+            gamma / beta - 1.0, dt * (gamma / (2 * beta) - 1.0))
+
+
+def _newmark_step(solve, M, C, c, u, v, a, force):
+    a1, a2, a3, a4, a5, a6 = c
+    u_new = solve(force + M @ (a1 * u + a2 * v + a3 * a) + C @ (a4 * u + a5 * v + a6 * a))
+    a_new = a1 * (u_new - u) - a2 * v - a3 * a
+    v_new = a4 * (u_new - u) - a5 * v - a6 * a
+    return u_new, v_new, a_new
+
+
+def simulate(model, traffic, dt, duration=None, K=None, M=None, C=None, zeta=0.05, roughness=None,
+             record=None, beta=0.25, gamma=0.5, tol=1e-8, max_iter=20):
+    """Coupled response of the deck and every vehicle of traffic
+
+    traffic is a list of (vehicle, speed, entry_time): the front axle is at
+    x = 0 at entry_time and moves at speed [m/s]. Vehicles start in static
+    equilibrium on rigid ground and weigh on the deck while their wheels
+    are on it. roughness = (x, r) is a road profile (zero outside it). C
+    defaults to zeta Rayleigh damping at the first two modes. By default the
+    run lasts until the last wheel leaves the deck; step i is at time
+    (i + 1) * dt as in fem.newmark.
+
+    Returns dict(time, disp, vel, accel, static) for the recorded deck DOFs
+    (static: the response to the static wheel loads at the same
+    positions), vehicle_disp and vehicle_accel (n_steps, n_vehicle_dof,
+    vehicles in traffic order), contact_force (n_steps, n_wheels; negative
+    is compression, positive means the wheel would lift off), iterations
+    and converged per step.
+    """
+    K = model.stiffness() if K is None else K
+    M = model.mass() if M is None else M
+    if C is None:
+        omega, _ = fem.eigen(K, M, 2)
+        C = fem.rayleigh(M, K, *fem.rayleigh_coefficients(zeta, omega[0], omega[1]))
+    n = K.shape[0]
+    record = np.arange(n) if record is None else np.atleast_1d(record)
+    length = model.nodes[:, 0].max() - model.nodes[:, 0].min()
+
+    # All vehicles as one block-diagonal system; wheel arrays in traffic order
+    vehicles = [vehicle for vehicle, _, _ in traffic]
+    first = np.concatenate([[0], np.cumsum([v.n_dof for v in vehicles])])
+    wheel_dof = np.concatenate([first[i] + v.wheels for i, v in enumerate(vehicles)])
+    offsets = np.concatenate([v.offsets for v in vehicles])
+    kt = np.concatenate([v.kt for v in vehicles])
+    ct = np.concatenate([v.ct for v in vehicles])
+    speed = np.concatenate([np.full(len(v.wheels), s) for v, s, _ in traffic])
+    entry = np.concatenate([np.full(len(v.wheels), t0) for v, _, t0 in traffic])
+    Mv = sp.csr_matrix(scipy.linalg.block_diag(*[v.M for v in vehicles]))
+    tire = sp.csr_matrix((kt, (wheel_dof, wheel_dof)), shape=Mv.shape)
+    Kv = sp.csr_matrix(scipy.linalg.block_diag(*[v.K for v in vehicles])) + tire
+    Cv = sp.csr_matrix(scipy.linalg.block_diag(*[v.C for v in vehicles])) + \
+        sp.csr_matrix((ct, (wheel_dof, wheel_dof)), shape=Mv.shape)
+    gravity = -G * Mv.diagonal() * np.concatenate([v.vertical for v in vehicles])
+
+    if duration is None:
+        duration = max((length + v.offsets.max()) / s + t0 for v, s, t0 in traffic)
+    n_steps = int(np.ceil(duration / dt - 1e-9))
+
+    if roughness is not None:
+        x_road, r_road = (np.asarray(a, dtype=float) for a in roughness)
+        slope = np.gradient(r_road, x_road)
+
+        def road(x):
+            return (np.interp(x, x_road, r_road, left=0.0, right=0.0),
+                    np.interp(x, x_road, slope, left=0.0, right=0.0))
+    else:
+        def road(x):
+            return np.zeros_like(x), np.zeros_like(x)
+
+    c = _newmark_constants(dt, beta, gamma)
+    solve_bridge = spla.factorized(sp.csc_matrix(K + c[0] * M + c[3] * C))
+    solve_vehicles = spla.factorized(sp.csc_matrix(Kv + c[0] * Mv + c[3] * Cv))
+    solve_static = spla.factorized(sp.csc_matrix(K))
+
+    u, v, a = np.zeros(n), np.zeros(n), np.zeros(n)
+    y = spla.spsolve(sp.csc_matrix(Kv), gravity)
+    yd, ydd = np.zeros_like(y), np.zeros_like(y)
+    static_force = kt * y[wheel_dof]
+
+    out = {key: np.empty((n_steps, len(record))) for key in ('disp', 'vel', 'accel', 'static')}
+    vehicle_disp = np.empty((n_steps, len(y)))
+    vehicle_accel = np.empty_like(vehicle_disp)
+    contact_force = np.zeros((n_steps, len(wheel_dof)))
+    iterations = np.zeros(n_steps, dtype=int)
+    converged = np.zeros(n_steps, dtype=bool)
+
+    def at_wheels(values):
+        return (np.append(values, 0.0)[dofs] * weights).sum(axis=1)      # index -1 reads the 0
+
+    def to_deck(force):
+        return np.bincount(dofs.ravel() % (n + 1), (weights * force[:, None]).ravel(), n + 1)[:n]
+
+    for i in range(n_steps):
+        if i % CHUNK == 0:
+            # Wheel positions -> deck DOFs and Hermite weights for the next steps
+            t = dt * np.arange(i + 1, min(i + CHUNK, n_steps) + 1)
+            x_chunk = speed * (t[:, None] - entry) - offsets
+            dofs_chunk, weights_chunk = moving_load.contact_weights(model, x_chunk)
+            r_chunk, slope_chunk = road(x_chunk)
+        dofs, weights = dofs_chunk[i % CHUNK], weights_chunk[i % CHUNK]
+        on = (dofs >= 0).any(axis=1)
+        r, r_dot = r_chunk[i % CHUNK], speed * slope_chunk[i % CHUNK]
+        # Predict the deck with the previous step's velocity and acceleration
+        u_b = u + dt * v + 0.5 * dt**2 * a
+        v_b, a_b = v + dt * a, a
+        z = at_wheels(u_b) + r
+        for k in range(1, max_iter + 1):
+            z_dot = at_wheels(v_b) + r_dot
+            f_v = gravity.copy()
+            f_v[wheel_dof] += kt * z + ct * z_dot
+            y_n, yd_n, ydd_n = _newmark_step(solve_vehicles, Mv, Cv, c, y, yd, ydd, f_v)
+            force = np.where(on, kt * (y_n[wheel_dof] - z) + ct * (yd_n[wheel_dof] - z_dot), 0.0)
+            u_b, v_b, a_b = _newmark_step(solve_bridge, M, C, c, u, v, a, to_deck(force))
+            z_new = at_wheels(u_b) + r
+            change = np.abs(z_new - z).max(initial=0.0)
+            z = z_new
+            if change <= tol * max(np.abs(z).max(initial=0.0), 1e-12):
+                converged[i] = True
+                break
+        iterations[i] = k
+        u, v, a = u_b, v_b, a_b
+        y, yd, ydd = y_n, yd_n, ydd_n
+
+        out['disp'][i] = u[record]
+        out['vel'][i] = v[record]
+        out['accel'][i] = a[record]
+        out['static'][i] = solve_static(to_deck(np.where(on, static_force, 0.0)))[record]
+        vehicle_disp[i] = y
+        vehicle_accel[i] = ydd
+        contact_force[i] = force
+
+    out.update(time=dt * np.arange(1, n_steps + 1), vehicle_disp=vehicle_disp, vehicle_accel=vehicle_accel,
+               contact_force=contact_force, iterations=iterations, converged=converged)
+    return out
+
+
+def traffic_stream(n_vehicles, speed, headway, vehicle=None, seed=None, speed_spread=0.0):
+    """Vehicles entering every headway seconds (exponential gaps with seed)
+
+    vehicle is a Vehicle or a list of them to cycle through; speeds vary by
+    +/- speed_spread (fraction) when a seed is given.
+    """
+    vehicle = vehicle or Vehicle.quarter_car()
+    fleet = vehicle if isinstance(vehicle, (list, tuple)) else [vehicle]
+    if seed is None:
+        entries = headway * np.arange(n_vehicles)
+        speeds = np.full(n_vehicles, float(speed))
+    else:
+        rng = np.random.default_rng(seed)
+        entries = np.concatenate([[0.0], np.cumsum(rng.exponential(headway, n_vehicles - 1))])
+        speeds = speed * (1 + speed_spread * rng.uniform(-1, 1, n_vehicles))
+    return [(fleet[i % len(fleet)], float(speeds[i]), float(entries[i])) for i in range(n_vehicles)]
+
+
+def main(argv=None):
+    from Structural_monitoring import bridges
+
+    parser = argparse.ArgumentParser(description='Vehicle-bridge interaction on the bridge_car1 deck')
+    parser.add_argument('--vehicles', type=int, default=1)
+    parser.add_argument('--speed', type=float, default=20.0, help='m/s')
+    parser.add_argument('--headway', type=float, default=1.0, help='mean time between vehicles [s]')
+    parser.add_argument('--half-car', action='store_true', help='two-axle half cars instead of quarter cars')
+    parser.add_argument('--road-class', default=None, choices=sorted(ROAD_CLASSES))
+    parser.add_argument('--seed', type=int, default=None, help='random headways, speeds and road phases')
+    parser.add_argument('--dt', type=float, default=0.001)
+    parser.add_argument('--out-dir', default=None, help='write vbi_accel.txt (midspan) and vbi_vehicle.txt')
+    args = parser.parse_args(argv)
+
+    model = bridges.bridge_car1_model()
+    vehicle = Vehicle.half_car() if args.half_car else Vehicle.quarter_car()
+    traffic = traffic_stream(args.vehicles, args.speed, args.headway, vehicle, args.seed,
+                             0.1 if args.seed is not None else 0.0)
+    length = model.nodes[-1, 0]
+    roughness = None
+    if args.road_class:
+        roughness = iso_roughness(-50.0, length, args.road_class, seed=args.seed or 0)
+    mid = model.free_index(model.n_elem // 2, fem.UY)
+
+    start = time.perf_counter()
+    result = simulate(model, traffic, args.dt, roughness=roughness, record=[mid])
+    elapsed = time.perf_counter() - start
+    daf = np.abs(result['disp']).max() / np.abs(result['static']).max()
+    wheels = result['contact_force']
+    print(f"{args.vehicles} x {vehicle.name} ({vehicle.weight / 1e3:.1f} kN) at {args.speed:g} m/s, "
+          f"{len(result['time'])} steps in {elapsed:.2f} s "
+          f"({result['iterations'].mean():.1f} iterations/step, all converged: {result['converged'].all()})")
+    print(f"Midspan: peak disp {np.abs(result['disp']).max() * 1e3:.3f} mm, "
+          f"peak accel {np.abs(result['accel']).max():.4f} m/s², DAF {daf:.3f}")
+    bodies = np.cumsum([0] + [v.n_dof for v, _, _ in traffic[:-1]])
+    print(f"Vehicle bodies: peak accel {np.abs(result['vehicle_accel'][:, bodies]).max():.4f} m/s², "
+          f"wheel lift-off: {bool((wheels > 0).any())}")
+    if args.out_dir:
+        bridges.write_recorder(os.path.join(args.out_dir, 'vbi_accel.txt'), result['time'], result['accel'])
+        bridges.write_recorder(os.path.join(args.out_dir, 'vbi_vehicle.txt'), result['time'],
+                               result['vehicle_accel'])
+
+
+if __name__ == '__main__':
+    main()
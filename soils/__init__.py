@@ -0,0 +1,35 @@
+"""Soil CBR prediction helpers (MTRD soils standard tests data).
+
+Importing the package is cheap: the helpers below are resolved on first
+attribute access, so pandas/scikit-learn/matplotlib are only loaded by the
+submodule that needs them. Run the workflow with ``python -m soils``.
+"""
+import importlib
+
+_LAZY = {
+    'create_all_splits': 'soils.splitting',
+    'train_model_from_files': 'soils.training',
+    'fit_split': 'soils.training',
+    'compare_splits': 'soils.training',
+    'score_file': 'soils.training',
+    'compare_cluster_models': 'soils.clusters',
+    'plot_predictions_comparison': 'soils.plots',
+    'train_out_of_core': 'soils.out_of_core',
+    'validate_frame': 'soils.validation',
+    'drop_invalid': 'soils.validation',
+    'ReportStore': 'soils.report_store',
+}
+
+__all__ = sorted(_LAZY)
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module 'soils' has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,3 @@
+from soils.cli import main
+
+main()
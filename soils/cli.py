@@ -0,0 +1,126 @@
+# Single command line for the soils CBR workflow
+#
+#   python -m soils split | train | compare | cluster | score ...
+#
+# Only the standard library is imported at start-up; pandas, scikit-learn
+# and matplotlib are imported inside the subcommand that needs them, so
+# `python -m soils --help` returns immediately. Measure start-up with
+#
+#   python -X importtime -m soils --help
+import argparse
+import os
+import sys
+
+SOILS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATA = os.path.join(SOILS_DIR, 'cleaned_MTRD_Soils_data2.csv')
+DEFAULT_SPLITS_DIR = os.path.join(SOILS_DIR, 'data_splits')
+DEFAULT_CLUSTERS = os.path.join(SOILS_DIR, 'Sieve_gradings', 'soil_grading_clusters.csv')
+
+
+def cmd_split(args):
+    from soils.splitting import create_all_splits
+    create_all_splits(args.data, args.out_dir, args.methods)
+
+
+def cmd_train(args):
+    from soils import training
+
+    if args.chunked:
+        from soils.out_of_core import evaluate_out_of_core, train_out_of_core
+        model, scaler, feature_cols = train_out_of_core(
+            args.train_csv, block_size=args.block_size, n_estimators_per_block=args.trees_per_block,
+            subsample=args.subsample, n_jobs=args.jobs)
+        if args.test_csv:
+            rmse, r2 = evaluate_out_of_core(model, scaler, feature_cols, args.test_csv, args.block_size)
+            print(f"RMSE: {rmse:.2f}")
+            print(f"R²: {r2:.3f}")
+        fit = {'model': model, 'scaler': scaler, 'label_encoders': {}, 'feature_names': feature_cols}
+    else:
+        if not args.test_csv:
+            sys.exit("train: a test CSV is required unless --chunked is given")
+        train_df, test_df = training.load_split(args.train_csv, args.test_csv, args.split_name)
+        fit = training.fit_split(train_df, test_df)
+
+    if args.model_out:
+        training.save_model(fit, args.model_out)
+        print(f"Saved model to {args.model_out}")
+
+
+def cmd_compare(args):
+    from soils.training import compare_splits, verify_sequential_split
+
+    fits = compare_splits(args.data_dir, verbose=not args.quiet)
+    verify_sequential_split(args.data_dir)
+    if not fits:
+        print("No results to plot - check if data files are accessible")
+        return
+    from soils.plots import create_performance_summary_table, plot_predictions_comparison
+    if not args.no_plots:
+        plot_predictions_comparison(fits, args.plots_dir)
+    create_performance_summary_table({name: fit['r2'] for name, fit in fits.items()})
+
+
+def cmd_cluster(args):
+    from soils.clusters import compare_cluster_models
+    compare_cluster_models(args.data, args.clusters, args.out)
+
+
+def cmd_score(args):
+    from soils.training import score_file
+    scored = score_file(args.model, args.data_csv, args.out)
+    if not args.out:
+        print(scored.to_string(index=False))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m soils', description="Soil CBR prediction workflow")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    split = sub.add_parser('split', help="write random/stratified/sequential/custom train-test files")
+    split.add_argument('--data', default=DEFAULT_DATA)
+    split.add_argument('--out-dir', default=DEFAULT_SPLITS_DIR)
+    split.add_argument('--methods', nargs='+', default=['random', 'stratified', 'sequential', 'custom'],
+                       choices=['random', 'stratified', 'sequential', 'custom'])
+    split.set_defaults(func=cmd_split)
+
+    train = sub.add_parser('train', help="train a CBR model on one train/test pair")
+    train.add_argument('train_csv')
+    train.add_argument('test_csv', nargs='?')
+    train.add_argument('--split-name', default='custom')
+    train.add_argument('--model-out', help="pickle the fitted model for `score`")
+    train.add_argument('--chunked', action='store_true', help="stream the CSV in blocks (out-of-core)")
+    train.add_argument('--block-size', type=int, default=50_000)
+    train.add_argument('--trees-per-block', type=int, default=10)
+    train.add_argument('--subsample', type=float, default=1.0,
+                       help="fraction of each block's rows per forest (--chunked)")
+    train.add_argument('--jobs', type=int, default=1)
+    train.set_defaults(func=cmd_train)
+
+    compare = sub.add_parser('compare', help="compare model performance across the split files")
+    compare.add_argument('--data-dir', default=DEFAULT_SPLITS_DIR)
+    compare.add_argument('--plots-dir', default='.')
+    compare.add_argument('--no-plots', action='store_true')
+    compare.add_argument('--quiet', action='store_true')
+    compare.set_defaults(func=cmd_compare)
+
+    cluster = sub.add_parser('cluster', help="compare sieve, grading-cluster and combined features")
+    cluster.add_argument('--data', default=DEFAULT_DATA)
+    cluster.add_argument('--clusters', default=DEFAULT_CLUSTERS)
+    cluster.add_argument('--out', help="CSV for the data enhanced with grading clusters")
+    cluster.set_defaults(func=cmd_cluster)
+
+    score = sub.add_parser('score', help="predict CBR for a CSV with a saved model")
+    score.add_argument('model')
+    score.add_argument('data_csv')
+    score.add_argument('--out')
+    score.set_defaults(func=cmd_score)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+# Grading-cluster features for the CBR model (merge clusters with main data)
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+from sklearn.metrics import mean_squared_error, r2_score
+
+TARGET_COL = 'CBR.4daysSoak.(%)'
+
+GRADING_TYPES = {
+    0: 'Medium_Graded',      # Moderate distribution
+    1: 'Fine_Graded',        # High fine content
+    2: 'Coarse_Graded',      # More coarse particles
+    3: 'Well_Graded'         # Good distribution across sizes
+}
+
+
+def label_grading_type(cluster):
+    """Convert cluster numbers to meaningful soil type names"""
+    return GRADING_TYPES.get(cluster, 'Unknown')
+
+
+def merge_grading_clusters(main_data, grading_clusters):
+    """Main data with GradingCluster and GradingType columns (merged on SampleNo.)"""
+    enhanced_data = main_data.merge(
+        grading_clusters[['SampleNo.', 'GradingCluster']],
+        on='SampleNo.',
+        how='left'
+    )
+    enhanced_data['GradingType'] = enhanced_data['GradingCluster'].apply(label_grading_type)
+    return enhanced_data
+
+
+def feature_sets(main_data, enhanced_data):
+    """Original, cluster-only and combined feature frames"""
+    grading_sieve_cols = [col for col in enhanced_data.columns if 'Grading.%PassingBSSieveSize' in col]
+    grading_dummies = pd.get_dummies(enhanced_data['GradingType'], prefix='GradingType')
+
+    # Option 1: Features with clusters only
+    X_with_clusters = enhanced_data.drop(grading_sieve_cols + ['SampleNo.', TARGET_COL], axis=1)
+    X_with_clusters = pd.concat([X_with_clusters.drop(['GradingCluster', 'GradingType'], axis=1), grading_dummies], axis=1)
+
+    # Option 2: Features with both sieves and clusters
+    X_with_both = enhanced_data.drop(['SampleNo.', TARGET_COL], axis=1)
+    X_with_both = pd.concat([X_with_both.drop(['GradingCluster', 'GradingType'], axis=1), grading_dummies], axis=1)
+
+    X_original = main_data.drop(['SampleNo.', TARGET_COL], axis=1)
+    return {
+        "Original Model (Individual Sieves)": X_original,
+        "Cluster Model (No Individual Sieves)": X_with_clusters,
+        "Combined Model (Sieves + Clusters)": X_with_both,
+    }
+
+
+def train_and_evaluate_model(X, y, model_name):
+    """Train RF model and return performance metrics"""
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    # Standardize features
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+    X_test_scaled = scaler.transform(X_test)
+
+    # Train model
+    rf_model = RandomForestRegressor(n_estimators=100, random_state=42)
+    rf_model.fit(X_train_scaled, y_train)
+
+    # Evaluate
+    y_pred = rf_model.predict(X_test_scaled)
+    rmse = np.sqrt(mean_squared_error(y_test, y_pred))
+    r2 = r2_score(y_test, y_pred)
+
+    print(f"\n{model_name} Results:")
+    print(f"RMSE: {rmse:.2f}")
+    print(f"R²: {r2:.3f}")
+    print(f"Number of features: {X.shape[1]}")
+
+    return rf_model, scaler
+
+
+def compare_cluster_models(main_path, clusters_path, out_path=None):
+    """Compare sieve, cluster and combined feature sets; returns the enhanced data"""
+    main_data = pd.read_csv(main_path)
+    grading_clusters = pd.read_csv(clusters_path)
+
+    print("Main data shape:", main_data.shape)
+    print("Grading clusters shape:", grading_clusters.shape)
+
+    enhanced_data = merge_grading_clusters(main_data, grading_clusters)
+    print("Enhanced data shape:", enhanced_data.shape)
+    print("Grading cluster distribution:")
+    print(enhanced_data['GradingCluster'].value_counts().sort_index())
+    print("\nGrading type distribution:")
+    print(enhanced_data['GradingType'].value_counts())
+
+    y = enhanced_data[TARGET_COL]
+
+    print("="*50)
+    print("MODEL COMPARISON")
+    print("="*50)
+    models = {}
+    features = feature_sets(main_data, enhanced_data)
+    for model_name, X in features.items():
+        models[model_name], _ = train_and_evaluate_model(X, y, model_name)
+
+    # Feature importance (without plotting)
+    combined = "Combined Model (Sieves + Clusters)"
+    importances_combined = pd.DataFrame({
+        'Feature': features[combined].columns,
+        'Importance': models[combined].feature_importances_
+    }).sort_values('Importance', ascending=False)
+
+    print("\n" + "="*50)
+    print("TOP 10 MOST IMPORTANT FEATURES")
+    print("="*50)
+    print(importances_combined.head(10))
+
+    # CBR statistics by grading type
+    print("\nCBR Statistics by Grading Type:")
+    cbr_by_grading = enhanced_data.groupby('GradingType')[TARGET_COL].agg(['count', 'mean', 'std', 'min', 'max'])
+    print(cbr_by_grading)
+
+    if out_path:
+        enhanced_data.to_csv(out_path, index=False)
+        print(f"\nSaved enhanced dataset to '{out_path}'")
+
+    print("\n" + "="*60)
+    print("RECOMMENDATION")
+    print("="*60)
+    print("Based on the model comparison above:")
+    print("- Compare R² values to determine best approach")
+    print("- Grading clusters provide simplified soil classification")
+    print("- Combined approach may offer best predictive power")
+    return enhanced_data
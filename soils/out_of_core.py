@@ -0,0 +1,179 @@
+# Out-of-core CBR training for soil archives that do not fit in memory
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+from sklearn.ensemble import RandomForestRegressor
+
+from soils.validation import drop_invalid
+
+TARGET_COL = 'CBR.4daysSoak.(%)'
+# Columns that are identifiers or dosage information, never features
+NON_FEATURE_COLS = ['SampleNo.', 'Dosage.%']
+
+
+def iter_blocks(path, block_size=50_000):
+    """Yield the CSV snapshot as DataFrames of at most block_size rows"""
+    for block in pd.read_csv(path, chunksize=block_size):
+        yield block
+
+
+def feature_columns(path, target_col=TARGET_COL):
+    """Feature column names read from the CSV header only"""
+    header = pd.read_csv(path, nrows=0).columns
+    return [col for col in header if col not in NON_FEATURE_COLS and col != target_col]
+
+
+def prepare_block(block, feature_cols, target_col=TARGET_COL):
+    """Numeric feature matrix, target and rejected-row count for one block
+
+    Rows failing soils.validation (including rows without a target) are
+    dropped; missing features become 0 exactly as in train_model_from_files.
+    """
+    n_rows = len(block)
+    block, _ = drop_invalid(block, target_col, verbose=False)
+    X = block.reindex(columns=feature_cols).apply(pd.to_numeric, errors='coerce')
+    X = X.fillna(0).to_numpy(dtype=np.float64)
+    y = pd.to_numeric(block[target_col], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+    return X, y, n_rows - len(block)
+
+
+def fit_scaler_streaming(path, feature_cols, block_size=50_000, target_col=TARGET_COL):
+    """First pass: fit a StandardScaler incrementally with partial_fit"""
+    scaler = StandardScaler()
+    n_rows = 0
+    n_rejected = 0
+    for block in iter_blocks(path, block_size):
+        X, _, rejected = prepare_block(block, feature_cols, target_col)
+        n_rejected += rejected
+        if len(X):
+            scaler.partial_fit(X)
+            n_rows += len(X)
+    if n_rejected:
+        print(f"⚠️ {n_rejected} rows failed validation and were skipped")
+    if n_rows == 0:
+        raise ValueError(f"No valid rows with a '{target_col}' value in {path}")
+    return scaler, n_rows
+
+
+class BlockEnsembleRegressor:
+    """Average of small random forests, each fitted on one block of the archive"""
+
+    def __init__(self, members=None):
+        self.members = list(members or [])
+
+    def add(self, member):
+        self.members.append(member)
+
+    def predict(self, X):
+        if not self.members:
+            raise ValueError("BlockEnsembleRegressor has no fitted members")
+        total = np.zeros(len(X))
+        for member in self.members:
+            total += member.predict(X)
+        return total / len(self.members)
+
+    @property
+    def feature_importances_(self):
+        return np.mean([m.feature_importances_ for m in self.members], axis=0)
+
+
+def _fit_block(X, y, n_estimators, subsample, seed):
+    """Fit one ensemble member on a (optionally subsampled) block"""
+    rng = np.random.default_rng(seed)
+    if subsample < 1.0:
+        keep = rng.random(len(y)) < subsample
+        X, y = X[keep], y[keep]
+    model = RandomForestRegressor(n_estimators=n_estimators, random_state=seed, n_jobs=1)
+    model.fit(X, y)
+    return model
+
+
+def train_out_of_core(path, block_size=50_000, n_estimators_per_block=10, subsample=1.0,
+                      n_jobs=1, random_state=42, target_col=TARGET_COL):
+    """Train a CBR model on a CSV snapshot streamed in blocks
+
+    Pass 1 fits the scaler incrementally, pass 2 fits one forest per block.
+    With n_jobs > 1 the per-block fits run in worker processes; at most
+    n_jobs blocks are held in memory at any time.
+    Returns (model, scaler, feature_cols).
+    """
+    feature_cols = feature_columns(path, target_col)
+    scaler, n_rows = fit_scaler_streaming(path, feature_cols, block_size, target_col)
+    print(f"Scaler fitted on {n_rows} rows, {len(feature_cols)} features")
+
+    model = BlockEnsembleRegressor()
+    seed_rng = np.random.default_rng(random_state)
+
+    def blocks():
+        for block in iter_blocks(path, block_size):
+            X, y, _ = prepare_block(block, feature_cols, target_col)
+            if len(y) > 1:
+                yield scaler.transform(X), y, int(seed_rng.integers(2**31 - 1))
+
+    if n_jobs == 1:
+        for X, y, seed in blocks():
+            model.add(_fit_block(X, y, n_estimators_per_block, subsample, seed))
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            pending = []
+            for X, y, seed in blocks():
+                pending.append(pool.submit(_fit_block, X, y, n_estimators_per_block, subsample, seed))
+                # Bound memory: wait for the oldest fit before reading more blocks
+                if len(pending) >= n_jobs:
+                    model.add(pending.pop(0).result())
+            for future in pending:
+                model.add(future.result())
+
+    print(f"Trained {len(model.members)} block models")
+    return model, scaler, feature_cols
+
+
+def evaluate_out_of_core(model, scaler, feature_cols, path, block_size=50_000, target_col=TARGET_COL):
+    """Streaming RMSE and R² over a (possibly huge) test CSV"""
+    n = 0
+    sse = 0.0
+    sum_y = 0.0
+    sum_y2 = 0.0
+    for block in iter_blocks(path, block_size):
+        X, y, _ = prepare_block(block, feature_cols, target_col)
+        if not len(y):
+            continue
+        y_pred = model.predict(scaler.transform(X))
+        sse += float(np.sum((y - y_pred) ** 2))
+        sum_y += float(y.sum())
+        sum_y2 += float(np.sum(y ** 2))
+        n += len(y)
+    if n == 0:
+        raise ValueError(f"No valid rows with a '{target_col}' value in {path}")
+    sst = sum_y2 - sum_y ** 2 / n
+    rmse = np.sqrt(sse / n)
+    r2 = 1.0 - sse / sst if sst > 0 else float('nan')
+    return rmse, r2
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chunked CBR training for large soil archives")
+    parser.add_argument('train_csv')
+    parser.add_argument('--test-csv')
+    parser.add_argument('--block-size', type=int, default=50_000)
+    parser.add_argument('--trees-per-block', type=int, default=10)
+    parser.add_argument('--subsample', type=float, default=1.0)
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    model, scaler, feature_cols = train_out_of_core(
+        args.train_csv, block_size=args.block_size, n_estimators_per_block=args.trees_per_block,
+        subsample=args.subsample, n_jobs=args.jobs)
+    if args.test_csv:
+        rmse, r2 = evaluate_out_of_core(model, scaler, feature_cols, args.test_csv, args.block_size)
+        print(f"RMSE: {rmse:.2f}")
+        print(f"R²: {r2:.3f}")
+    return model, scaler
+
+
+if __name__ == '__main__':
+    main()
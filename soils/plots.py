@@ -0,0 +1,221 @@
+# Split-comparison plots and summary table for the CBR models
+#
+# matplotlib/seaborn are imported inside _pyplot() so that importing this
+# module (or the soils CLI) stays cheap.
+import os
+
+import numpy as np
+import pandas as pd
+
+COLORS = ['blue', 'red', 'green', 'orange']
+
+
+def _pyplot():
+    # FIX TCL ERROR - Set matplotlib backend BEFORE importing pyplot
+    import matplotlib
+    matplotlib.use('Agg')  # Use non-interactive backend to avoid TCL issues
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    # Set plotting style
+    plt.style.use('default')
+    sns.set_palette("husl")
+    return plt
+
+
+def plot_predictions_comparison(fits, out_dir='.'):
+    """Create comprehensive plots comparing all split predictions
+
+    fits is the {split_name: fit} dict returned by training.compare_splits.
+    """
+    plt = _pyplot()
+    all_predictions = {name: fit['y_pred'] for name, fit in fits.items()}
+    all_actuals = {name: fit['y_test'] for name, fit in fits.items()}
+    all_residuals = {name: fit['y_test'] - fit['y_pred'] for name, fit in fits.items()}
+    results = {name: fit['r2'] for name, fit in fits.items()}
+
+    fig, axes = plt.subplots(2, 3, figsize=(18, 12))
+    fig.suptitle('Soil CBR Prediction Comparison Across Different Data Splits', fontsize=16, fontweight='bold')
+
+    # 1. Actual vs Predicted scatter plots
+    ax = axes[0, 0]
+    for split_name, color in zip(all_predictions.keys(), COLORS):
+        ax.scatter(all_actuals[split_name], all_predictions[split_name],
+                   alpha=0.7, label=f'{split_name.capitalize()}', color=color, s=50)
+
+    # Perfect prediction line
+    min_val = min([min(all_actuals[k]) for k in all_actuals.keys()])
+    max_val = max([max(all_actuals[k]) for k in all_actuals.keys()])
+    ax.plot([min_val, max_val], [min_val, max_val], 'k--', alpha=0.8, linewidth=2)
+    ax.set_xlabel('Actual CBR (%)')
+    ax.set_ylabel('Predicted CBR (%)')
+    ax.set_title('Actual vs Predicted CBR')
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+
+    # 2. R² comparison bar plot
+    ax = axes[0, 1]
+    split_names = list(results.keys())
+    r2_values = list(results.values())
+    bars = ax.bar(split_names, r2_values, color=COLORS[:len(split_names)], alpha=0.7, edgecolor='black')
+    ax.set_ylabel('R² Score')
+    ax.set_title('Model Performance Comparison')
+    ax.set_ylim(0, 1)
+
+    # Add value labels on bars
+    for bar, r2 in zip(bars, r2_values):
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height + 0.01,
+                f'{r2:.3f}', ha='center', va='bottom', fontweight='bold')
+    ax.grid(True, alpha=0.3, axis='y')
+
+    # 3. Residuals plot
+    ax = axes[0, 2]
+    for split_name, color in zip(all_residuals.keys(), COLORS):
+        ax.scatter(all_predictions[split_name], all_residuals[split_name],
+                   alpha=0.7, label=f'{split_name.capitalize()}', color=color, s=50)
+    ax.axhline(y=0, color='black', linestyle='--', alpha=0.8)
+    ax.set_xlabel('Predicted CBR (%)')
+    ax.set_ylabel('Residuals (Actual - Predicted)')
+    ax.set_title('Residuals vs Predicted')
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+
+    # 4. Distribution of actual values per split
+    ax = axes[1, 0]
+    for split_name, color in zip(all_actuals.keys(), COLORS):
+        ax.hist(all_actuals[split_name], alpha=0.5, label=f'{split_name.capitalize()}',
+                color=color, bins=15, edgecolor='black')
+    ax.set_xlabel('CBR (%)')
+    ax.set_ylabel('Frequency')
+    ax.set_title('Distribution of Actual CBR Values by Split')
+    ax.legend()
+    ax.grid(True, alpha=0.3, axis='y')
+
+    # 5. Box plot of residuals
+    ax = axes[1, 1]
+    residual_data = [all_residuals[split] for split in all_residuals.keys()]
+    split_labels = [split.capitalize() for split in all_residuals.keys()]
+    box_plot = ax.boxplot(residual_data, labels=split_labels, patch_artist=True)
+
+    # Color the boxes
+    for patch, color in zip(box_plot['boxes'], COLORS[:len(box_plot['boxes'])]):
+        patch.set_facecolor(color)
+        patch.set_alpha(0.7)
+
+    ax.axhline(y=0, color='red', linestyle='--', alpha=0.8)
+    ax.set_ylabel('Residuals')
+    ax.set_title('Distribution of Residuals by Split')
+    ax.grid(True, alpha=0.3, axis='y')
+
+    # 6. RMSE comparison
+    ax = axes[1, 2]
+    rmse_values = [np.sqrt(np.mean(all_residuals[name]**2)) for name in all_predictions.keys()]
+    bars = ax.bar(split_labels, rmse_values, color=COLORS[:len(rmse_values)],
+                  alpha=0.7, edgecolor='black')
+    ax.set_ylabel('RMSE')
+    ax.set_title('Root Mean Square Error Comparison')
+
+    # Add value labels on bars
+    for bar, rmse in zip(bars, rmse_values):
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height + 0.1,
+                f'{rmse:.2f}', ha='center', va='bottom', fontweight='bold')
+    ax.grid(True, alpha=0.3, axis='y')
+
+    plt.tight_layout()
+    path = os.path.join(out_dir, 'soil_cbr_prediction_comparison.png')
+    plt.savefig(path, dpi=300, bbox_inches='tight')
+    plt.close(fig)
+    print(f"✅ Saved: {path}")
+
+    # Additional detailed plot for each split
+    create_individual_split_plots(all_predictions, all_actuals, all_residuals, results, out_dir)
+
+
+def create_individual_split_plots(all_predictions, all_actuals, all_residuals, results, out_dir='.'):
+    """Create individual detailed plots for each split"""
+    plt = _pyplot()
+
+    n_splits = len(all_predictions)
+    fig, axes = plt.subplots(n_splits, 3, figsize=(15, 4*n_splits))
+
+    if n_splits == 1:
+        axes = axes.reshape(1, -1)
+
+    for i, (split_name, color) in enumerate(zip(all_predictions.keys(), COLORS)):
+        # Actual vs Predicted
+        axes[i, 0].scatter(all_actuals[split_name], all_predictions[split_name],
+                           alpha=0.7, color=color, s=60, edgecolors='black', linewidth=0.5)
+
+        # Perfect prediction line
+        min_val = min(all_actuals[split_name])
+        max_val = max(all_actuals[split_name])
+        axes[i, 0].plot([min_val, max_val], [min_val, max_val], 'k--', alpha=0.8, linewidth=2)
+        axes[i, 0].set_xlabel('Actual CBR (%)')
+        axes[i, 0].set_ylabel('Predicted CBR (%)')
+        axes[i, 0].set_title(f'{split_name.capitalize()} Split: Actual vs Predicted (R² = {results[split_name]:.3f})')
+        axes[i, 0].grid(True, alpha=0.3)
+
+        # Residuals vs Predicted
+        axes[i, 1].scatter(all_predictions[split_name], all_residuals[split_name],
+                           alpha=0.7, color=color, s=60, edgecolors='black', linewidth=0.5)
+        axes[i, 1].axhline(y=0, color='black', linestyle='--', alpha=0.8)
+        axes[i, 1].set_xlabel('Predicted CBR (%)')
+        axes[i, 1].set_ylabel('Residuals')
+        axes[i, 1].set_title(f'{split_name.capitalize()} Split: Residuals vs Predicted')
+        axes[i, 1].grid(True, alpha=0.3)
+
+        # Histogram of residuals
+        axes[i, 2].hist(all_residuals[split_name], bins=10, alpha=0.7, color=color,
+                        edgecolor='black', density=True)
+        axes[i, 2].axvline(x=0, color='red', linestyle='--', alpha=0.8)
+        axes[i, 2].set_xlabel('Residuals')
+        axes[i, 2].set_ylabel('Density')
+        axes[i, 2].set_title(f'{split_name.capitalize()} Split: Residuals Distribution')
+        axes[i, 2].grid(True, alpha=0.3, axis='y')
+
+        # Add statistics text
+        rmse = np.sqrt(np.mean(all_residuals[split_name]**2))
+        mae = np.mean(np.abs(all_residuals[split_name]))
+        axes[i, 2].text(0.05, 0.95, f'RMSE: {rmse:.2f}\nMAE: {mae:.2f}',
+                        transform=axes[i, 2].transAxes, verticalalignment='top',
+                        bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
+
+    plt.tight_layout()
+    path = os.path.join(out_dir, 'individual_split_analysis.png')
+    plt.savefig(path, dpi=300, bbox_inches='tight')
+    plt.close(fig)
+    print(f"✅ Saved: {path}")
+
+
+def create_performance_summary_table(results):
+    """Create a summary table of model performance from {split_name: r2}"""
+
+    print(f"\n{'='*80}")
+    print("DETAILED PERFORMANCE SUMMARY")
+    print(f"{'='*80}")
+
+    # Create summary DataFrame
+    summary_data = []
+    for split_name in results.keys():
+        summary_data.append({
+            'Split Type': split_name.capitalize(),
+            'R² Score': f"{results[split_name]:.3f}",
+            'Performance Level': 'Excellent' if results[split_name] > 0.9 else
+                                 'Very Good' if results[split_name] > 0.8 else
+                                 'Good' if results[split_name] > 0.7 else
+                                 'Fair' if results[split_name] > 0.6 else 'Poor'
+        })
+
+    summary_df = pd.DataFrame(summary_data)
+    print(summary_df.to_string(index=False))
+
+    # Best performing split
+    best_split = max(results, key=results.get)
+    worst_split = min(results, key=results.get)
+
+    print(f"\n🏆 Best performing split: {best_split.capitalize()} (R² = {results[best_split]:.3f})")
+    print(f"📉 Worst performing split: {worst_split.capitalize()} (R² = {results[worst_split]:.3f})")
+    print(f"📊 Performance spread: {results[best_split] - results[worst_split]:.3f}")
+    return summary_df
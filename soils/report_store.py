@@ -0,0 +1,423 @@
+# Indexed SQLite store of the MTRD laboratory test reports
+#
+# The report folder (e.g. "Test results 2023/") only encodes date, client,
+# lab number and test type in free-text file names. This module parses the
+# file names and the soils result tables inside each .docx into an embedded
+# SQLite database with indexes on those fields, and returns query results as
+# DataFrames using the same column names as the cleaned soils CSVs.
+import argparse
+import calendar
+import os
+import re
+import sqlite3
+import zipfile
+from datetime import date
+from xml.etree import ElementTree as ET
+
+import numpy as np
+import pandas as pd
+
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+SIEVE_SIZES = ['20', '10', '5', '2', '0.425', '0.075']
+# Value columns of the standard soils results table, in table order
+RESULT_COLUMNS = (
+    [f'Grading.%PassingBSSieveSize(mm).{size}' for size in SIEVE_SIZES]
+    + ['AtterbergLimits.LL.%', 'AtterbergLimits.PL.%', 'AtterbergLimits.PI.%',
+       'AtterbergLimits.LS.%', 'AtterbergLimits.PM',
+       'CompactionT180.MDD.Kgm3', 'CompactionT180.OMC.(%)',
+       'CBR.4daysSoak.(%)', 'Swell.(%)']
+)
+COMPOSITION_COLUMNS = ['SoilComposition.Gravel.(%)', 'SoilComposition.Sand.(%)',
+                       'SoilComposition.SiltClay.(%)']
+SAMPLE_COLUMNS = ['SampleNo.', 'Reference', 'Dosage.%'] + RESULT_COLUMNS + COMPOSITION_COLUMNS
+
+# File-name keywords -> test type
+TEST_TYPES = {
+    'fdd': 'fdd',           # field dry density
+    'neat': 'neat',         # untreated material
+    'stab': 'stab',         # stabilised material
+    'gcs': 'gcs',           # graded crushed stone
+    'quarry waste': 'quarry_waste',
+    'alignment': 'alignment',
+}
+
+# Normalised client agency, checked in order against the upper-cased name
+AGENCIES = [
+    ('KENHA', 'KeNHA'),
+    ('KURA', 'KURA'),
+    ('KENYA URBAN ROADS', 'KURA'),
+    ('KERRA', 'KeRRA'),
+    ('KENYA AIRPORTS', 'KAA'),
+    ('KAA', 'KAA'),
+    ('KENYA PIPE LINE', 'KPC'),
+    ('KENYA WILDLIFE', 'KWS'),
+    ('COUNTY', 'County'),
+    ('MUNICIPALITY', 'County'),
+    ('MTRD', 'MTRD'),
+]
+
+_DATE = re.compile(r'^\s*(\d{1,2})\.(\d{1,2})\.(\d{4}|\d{2})')
+_LAB_NO = re.compile(r'(?<![\d.])(\d{3,4})(?![\d.])')
+# 'GCS 040 1799': a zero-padded gravel grade before the lab number
+_GCS_GRADE = re.compile(r'\b(GCS\s+)0\d{1,2}(?=\s+\d{3,4}(?![\d.]))', re.IGNORECASE)
+# A keyword stands alone or is glued to a word at a case change ('LTDneat', 'UnknownNeat')
+_KEYWORD_START = r'(?:(?<![A-Za-z])|(?-i:(?<=[A-Z])(?=[a-z])|(?<=[a-z])(?=[A-Z])))'
+_SAMPLE_NO = re.compile(r'^\s*(\d+/S/\d{2})')
+_NUMBER = re.compile(r'^[<>]?\s*(-?\d+(?:\.\d+)?)\s*%?$')
+_COMPOSITION = re.compile(r'Gravel\s*=\s*(\d+(?:\.\d+)?).*?Sand\s*=\s*(\d+(?:\.\d+)?).*?'
+                          r'Silt\s*/?\s*clay\s*=\s*(\d+(?:\.\d+)?)', re.IGNORECASE | re.DOTALL)
+_JOB_CARD = re.compile(r'Job\s*Card\s*No\.?\s*(\d+)\s*/\s*S', re.IGNORECASE)
+_DESCRIPTION = re.compile(r'Sample\s+Description:\s*(.*?)(?:\s{2,}|\d+\.\s)', re.IGNORECASE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    report_date TEXT,
+    client TEXT,
+    agency TEXT,
+    lab_no INTEGER,
+    test_type TEXT,
+    description TEXT,
+    n_samples INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS lab_numbers (
+    report_id INTEGER NOT NULL REFERENCES reports(id) ON DELETE CASCADE,
+    lab_no INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS samples (
+    report_id INTEGER NOT NULL REFERENCES reports(id) ON DELETE CASCADE,
+    {sample_columns}
+);
+CREATE INDEX IF NOT EXISTS idx_reports_client ON reports(client);
+CREATE INDEX IF NOT EXISTS idx_reports_agency ON reports(agency);
+CREATE INDEX IF NOT EXISTS idx_reports_date ON reports(report_date);
+CREATE INDEX IF NOT EXISTS idx_reports_lab_no ON reports(lab_no);
+CREATE INDEX IF NOT EXISTS idx_reports_test_type ON reports(test_type);
+CREATE INDEX IF NOT EXISTS idx_lab_numbers_lab_no ON lab_numbers(lab_no);
+CREATE INDEX IF NOT EXISTS idx_samples_report ON samples(report_id);
+"""
+
+
+def _quote(col):
+    return '"' + col.replace('"', '""') + '"'
+
+
+def parse_file_name(name):
+    """Date, client, agency, lab numbers and test type from a report file name"""
+    stem = re.sub(r'(\.docx)+$', '', os.path.basename(name), flags=re.IGNORECASE)
+    stem = re.sub(r'docx', ' ', stem, flags=re.IGNORECASE)
+
+    report_date = None
+    match = _DATE.match(stem)
+    if match:
+        day, month, year = (int(g) for g in match.groups())
+        if year < 100:
+            year += 2000
+        try:
+            report_date = date(year, month, day).isoformat()
+        except ValueError:
+            pass
+        stem = stem[match.end():]
+
+    stem = _GCS_GRADE.sub(r'\1', stem)
+    test_type = None
+    for keyword, value in TEST_TYPES.items():
+        pattern = re.compile(rf'{_KEYWORD_START}{keyword}(?![A-Za-z])', re.IGNORECASE)
+        if pattern.search(stem):
+            test_type = test_type or value
+            stem = pattern.sub(' ', stem)
+
+    lab_numbers = [int(n) for n in _LAB_NO.findall(stem)]
+    stem = _LAB_NO.sub(' ', stem)
+
+    client = re.sub(r'[\s&,]+', ' ', stem).strip(' .-')
+    client = re.sub(r'\s\d{1,2}$', '', client).strip() or None
+    return {
+        'report_date': report_date,
+        'client': client,
+        'agency': normalise_agency(client),
+        'lab_numbers': lab_numbers,
+        'test_type': test_type,
+    }
+
+
+def normalise_agency(client):
+    """Client agency (KeNHA, KURA, KeRRA, County, ...) or 'Other'"""
+    if not client:
+        return None
+    upper = client.upper()
+    for fragment, agency in AGENCIES:
+        if re.search(rf'\b{fragment}\b', upper):
+            return agency
+    return 'Other'
+
+
+def _cell_text(cell):
+    return ''.join(t.text or '' for t in cell.iter(_W + 't'))
+
+
+def _leaf_tables(root):
+    """Tables without nested tables, as lists of rows of cell strings"""
+    for tbl in root.iter(_W + 'tbl'):
+        if tbl.find('.//' + _W + 'tbl') is not None:
+            continue
+        yield [[_cell_text(tc) for tc in tr.findall(_W + 'tc')] for tr in tbl.findall(_W + 'tr')]
+
+
+def _value(text):
+    """Lab-sheet cell to float: '<0.1' -> 0.1, blanks and 'NP' -> NaN"""
+    match = _NUMBER.match(text.replace('\xa0', ' ').strip())
+    return float(match.group(1)) if match else np.nan
+
+
+def _parse_results_table(rows):
+    """Samples from a standard soils results table (grading .. swell)"""
+    header = None
+    for i, row in enumerate(rows):
+        stripped = {cell.strip() for cell in row}
+        if {'LL', 'PL', 'PI'} <= stripped:
+            header = i
+            break
+    if header is None:
+        return []
+    has_dosage = any('Dosage' in cell for row in rows[:header + 1] for cell in row)
+    n_values = len(RESULT_COLUMNS)
+
+    samples = []
+    current = None
+    for row in rows[header + 1:]:
+        text = ' '.join(row)
+        first = row[0] if row else ''
+        match = _SAMPLE_NO.match(first)
+        if match:
+            current = {'SampleNo.': match.group(1),
+                       'Reference': row[1].strip() if len(row) > 1 else None,
+                       'Dosage.%': _value(row[2]) if has_dosage and len(row) > 2 else np.nan}
+            samples.append(current)
+        if current is None:
+            continue
+        if 'COMPOSITION' in text.upper():
+            comp = _COMPOSITION.search(text)
+            if comp:
+                current.update(zip(COMPOSITION_COLUMNS, (float(g) for g in comp.groups())))
+        elif len(row) >= n_values and RESULT_COLUMNS[0] not in current:
+            current.update(zip(RESULT_COLUMNS, (_value(c) for c in row[-n_values:])))
+    return [s for s in samples if RESULT_COLUMNS[0] in s]
+
+
+def parse_report(path):
+    """Report-level text fields and sample rows from one .docx report"""
+    with zipfile.ZipFile(path) as archive:
+        root = ET.fromstring(archive.read('word/document.xml'))
+    text = ' '.join(t.text or '' for t in root.iter(_W + 't'))
+
+    samples = []
+    for rows in _leaf_tables(root):
+        samples.extend(_parse_results_table(rows))
+
+    job_card = _JOB_CARD.search(text)
+    description = _DESCRIPTION.search(text)
+    is_fdd = 'field dry density' in text.lower()
+    return {
+        'job_card': int(job_card.group(1)) if job_card else None,
+        'description': description.group(1).strip() if description else None,
+        'is_fdd': is_fdd,
+        'samples': samples,
+    }
+
+
+class ReportStore:
+    """SQLite index of lab reports with incremental refresh and DataFrame queries"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        sample_columns = ',\n    '.join(
+            f'{_quote(col)} {"TEXT" if col in ("SampleNo.", "Reference") else "REAL"}'
+            for col in SAMPLE_COLUMNS)
+        self.conn.executescript(SCHEMA.format(sample_columns=sample_columns))
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def refresh(self, folder, verbose=True):
+        """Index new or changed .docx reports and forget deleted ones
+
+        Unchanged files (same mtime and size) are skipped, so refreshing a
+        folder after a few reports are added only parses those reports.
+        Returns a dict with added, updated, removed, unchanged and failed counts.
+        """
+        known = {path: (mtime, size) for path, mtime, size in
+                 self.conn.execute('SELECT path, mtime, size FROM reports')}
+        seen = set()
+        stats = dict(added=0, updated=0, removed=0, unchanged=0, failed=0)
+
+        for entry in sorted(os.scandir(folder), key=lambda e: e.name):
+            if not entry.is_file() or not entry.name.lower().endswith('.docx') or entry.name.startswith('~$'):
+                continue
+            path = os.path.abspath(entry.path)
+            seen.add(path)
+            stat = entry.stat()
+            if known.get(path) == (stat.st_mtime, stat.st_size):
+                stats['unchanged'] += 1
+                continue
+            try:
+                report = parse_report(path)
+            except (zipfile.BadZipFile, KeyError, ET.ParseError) as e:
+                stats['failed'] += 1
+                if verbose:
+                    print(f"⚠️ Could not parse {entry.name}: {e}")
+                continue
+            self._store(path, stat, parse_file_name(entry.name), report)
+            stats['updated' if path in known else 'added'] += 1
+
+        for path in set(known) - seen:
+            self.conn.execute('DELETE FROM reports WHERE path = ?', (path,))
+            stats['removed'] += 1
+        self.conn.commit()
+        if verbose:
+            print(', '.join(f'{k}: {v}' for k, v in stats.items()))
+        return stats
+
+    def _store(self, path, stat, meta, report):
+        lab_numbers = list(meta['lab_numbers'])
+        if report['job_card'] and report['job_card'] not in lab_numbers:
+            lab_numbers.append(report['job_card'])
+        test_type = meta['test_type']
+        if test_type is None:
+            if report['is_fdd']:
+                test_type = 'fdd'
+            elif report['samples']:
+                dosed = any(s.get('Dosage.%', 0) > 0 for s in report['samples'])
+                test_type = 'stab' if dosed else 'neat'
+
+        self.conn.execute('DELETE FROM reports WHERE path = ?', (path,))
+        cur = self.conn.execute(
+            'INSERT INTO reports (path, mtime, size, report_date, client, agency, lab_no, '
+            'test_type, description, n_samples) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (path, stat.st_mtime, stat.st_size, meta['report_date'], meta['client'], meta['agency'],
+             lab_numbers[0] if lab_numbers else None, test_type, report['description'],
+             len(report['samples'])))
+        report_id = cur.lastrowid
+        self.conn.executemany('INSERT INTO lab_numbers (report_id, lab_no) VALUES (?, ?)',
+                              [(report_id, n) for n in lab_numbers])
+        if report['samples']:
+            columns = ', '.join(_quote(c) for c in ['report_id'] + SAMPLE_COLUMNS)
+            placeholders = ', '.join('?' * (len(SAMPLE_COLUMNS) + 1))
+            rows = [[report_id] + [_nan_to_none(s.get(c)) for c in SAMPLE_COLUMNS]
+                    for s in report['samples']]
+            self.conn.executemany(f'INSERT INTO samples ({columns}) VALUES ({placeholders})', rows)
+
+    def _where(self, client=None, agency=None, test_type=None, lab_no=None,
+               date_from=None, date_to=None, quarter=None):
+        clauses, params = [], []
+        if client:
+            clauses.append('r.client LIKE ?')
+            params.append(f'%{client}%')
+        if agency:
+            clauses.append('r.agency = ?')
+            params.append(agency)
+        if test_type:
+            clauses.append('r.test_type = ?')
+            params.append(test_type)
+        if lab_no is not None:
+            clauses.append('r.id IN (SELECT report_id FROM lab_numbers WHERE lab_no = ?)')
+            params.append(int(lab_no))
+        if quarter:
+            date_from, date_to = quarter_bounds(quarter)
+        if date_from:
+            clauses.append('r.report_date >= ?')
+            params.append(str(date_from))
+        if date_to:
+            clauses.append('r.report_date <= ?')
+            params.append(str(date_to))
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def reports(self, **filters):
+        """Report-level metadata matching the filters (see samples)"""
+        where, params = self._where(**filters)
+        return pd.read_sql_query(
+            'SELECT r.id, r.report_date, r.client, r.agency, r.lab_no, r.test_type, r.description, '
+            f'r.n_samples, r.path FROM reports r{where} ORDER BY r.report_date, r.id',
+            self.conn, params=params)
+
+    def samples(self, **filters):
+        """Sample rows matching the filters, in the soils CSV column layout
+
+        Filters: client (substring), agency ('KURA', 'KeNHA', ...), test_type
+        ('neat', 'stab', 'fdd', ...), lab_no, date_from/date_to (ISO dates)
+        or quarter ('2023Q3'). Report date, client, agency, lab number and
+        test type are appended as extra columns.
+        """
+        where, params = self._where(**filters)
+        columns = ', '.join(f's.{_quote(c)}' for c in SAMPLE_COLUMNS)
+        return pd.read_sql_query(
+            f'SELECT {columns}, r.report_date, r.client, r.agency, r.lab_no, r.test_type '
+            f'FROM samples s JOIN reports r ON r.id = s.report_id{where} '
+            'ORDER BY r.report_date, s.rowid', self.conn, params=params)
+
+
+def quarter_bounds(quarter):
+    """'2023Q3' -> ('2023-07-01', '2023-09-30')"""
+    match = re.fullmatch(r'(\d{4})\s*-?\s*Q([1-4])', str(quarter).strip(), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Quarter must look like '2023Q3', got {quarter!r}")
+    year, q = int(match.group(1)), int(match.group(2))
+    last_month = 3 * q
+    start = date(year, last_month - 2, 1)
+    end = date(year, last_month, calendar.monthrange(year, last_month)[1])
+    return start.isoformat(), end.isoformat()
+
+
+def _nan_to_none(value):
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Index and query MTRD lab reports")
+    parser.add_argument('--db', default='lab_reports.sqlite')
+    sub = parser.add_subparsers(dest='command', required=True)
+    refresh = sub.add_parser('refresh', help="index new or changed reports in a folder")
+    refresh.add_argument('folder')
+    query = sub.add_parser('query', help="print matching samples or write them to CSV")
+    query.add_argument('--client')
+    query.add_argument('--agency')
+    query.add_argument('--test-type')
+    query.add_argument('--lab-no', type=int)
+    query.add_argument('--date-from')
+    query.add_argument('--date-to')
+    query.add_argument('--quarter')
+    query.add_argument('--reports', action='store_true', help="list reports instead of samples")
+    query.add_argument('--out', help="CSV file for the result")
+    args = parser.parse_args(argv)
+
+    with ReportStore(args.db) as store:
+        if args.command == 'refresh':
+            store.refresh(args.folder)
+            return
+        filters = dict(client=args.client, agency=args.agency, test_type=args.test_type,
+                       lab_no=args.lab_no, date_from=args.date_from, date_to=args.date_to,
+                       quarter=args.quarter)
+        result = store.reports(**filters) if args.reports else store.samples(**filters)
+        if args.out:
+            result.to_csv(args.out, index=False)
+            print(f"Saved {len(result)} rows to {args.out}")
+        else:
+            print(result.to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+# Physical train/test splits of the soils dataset
+import os
+
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+TARGET_COL = 'CBR.4daysSoak.(%)'
+SPLIT_METHODS = ('random', 'stratified', 'sequential', 'custom')
+
+
+def _save(train_df, test_df, out_dir, name):
+    train_df.to_csv(os.path.join(out_dir, f'soil_train_{name}.csv'), index=False)
+    test_df.to_csv(os.path.join(out_dir, f'soil_test_{name}.csv'), index=False)
+
+
+# Method 1: Random Split (80/20)
+def create_random_split(df, out_dir):
+    train_df, test_df = train_test_split(df, test_size=0.2, random_state=42, stratify=None)
+    _save(train_df, test_df, out_dir, 'random')
+
+    print("Random split created:")
+    print(f"Training: {len(train_df)} samples")
+    print(f"Testing: {len(test_df)} samples")
+    return train_df, test_df
+
+
+# Method 2: Stratified Split by CBR Range
+def create_stratified_split(df, out_dir):
+    # Create CBR bins for stratification
+    cbr_bin = pd.cut(df[TARGET_COL],
+                     bins=[0, 10, 30, 100, float('inf')],
+                     labels=['Low', 'Medium', 'High', 'Very_High'])
+
+    train_df, test_df = train_test_split(df, test_size=0.2, random_state=42, stratify=cbr_bin)
+    _save(train_df, test_df, out_dir, 'stratified')
+
+    print("Stratified split created:")
+    print(f"Training: {len(train_df)} samples")
+    print(f"Testing: {len(test_df)} samples")
+    return train_df, test_df
+
+
+# Method 3: Sequential Split (good for time-series or ordered data)
+def create_sequential_split(df, out_dir):
+    # First 80% for training, last 20% for testing
+    split_point = int(0.8 * len(df))
+
+    train_df = df.iloc[:split_point].copy()
+    test_df = df.iloc[split_point:].copy()
+    _save(train_df, test_df, out_dir, 'sequential')
+
+    print("Sequential split created:")
+    print(f"Training: {len(train_df)} samples (Samples 1-{split_point})")
+    print(f"Testing: {len(test_df)} samples (Samples {split_point+1}-{len(df)})")
+    return train_df, test_df
+
+
+# Method 4: Custom Split by Sample Groups
+def create_custom_split(df, out_dir, test_samples=(10, 20, 30, 40, 50, 60, 70, 80, 89)):
+    # Example: Use specific sample ranges for testing (every 10th sample roughly)
+    test_samples = list(test_samples)
+
+    test_df = df[df['SampleNo.'].isin(test_samples)].copy()
+    train_df = df[~df['SampleNo.'].isin(test_samples)].copy()
+    _save(train_df, test_df, out_dir, 'custom')
+
+    print("Custom split created:")
+    print(f"Training: {len(train_df)} samples")
+    print(f"Testing: {len(test_df)} samples")
+    print(f"Test samples: {test_samples}")
+    return train_df, test_df
+
+
+SPLITTERS = {
+    'random': create_random_split,
+    'stratified': create_stratified_split,
+    'sequential': create_sequential_split,
+    'custom': create_custom_split,
+}
+
+
+def create_all_splits(data_path, out_dir, methods=SPLIT_METHODS):
+    """Write soil_train_<method>.csv / soil_test_<method>.csv for each method"""
+    df = pd.read_csv(data_path)
+    os.makedirs(out_dir, exist_ok=True)
+
+    print("Creating physical data splits...")
+    print("=" * 50)
+    for method in methods:
+        SPLITTERS[method](df, out_dir)
+        print()
+
+    print(f"Files created in '{out_dir}' folder:")
+    for method in methods:
+        print(f"- soil_train_{method}.csv / soil_test_{method}.csv")
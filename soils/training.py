@@ -0,0 +1,265 @@
+# Random forest CBR training on the physical train/test split files
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler, LabelEncoder
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_squared_error, r2_score
+
+from soils.validation import ALL_RULES, MISSING_TARGET, drop_invalid
+
+TARGET_COL = 'CBR.4daysSoak.(%)'
+PREDICTION_COL = 'CBR.Predicted.(%)'
+
+SPLITS = [
+    ('soil_train_random.csv', 'soil_test_random.csv', 'random'),
+    ('soil_train_stratified.csv', 'soil_test_stratified.csv', 'stratified'),
+    ('soil_train_sequential.csv', 'soil_test_sequential.csv', 'sequential'),
+    ('soil_train_custom.csv', 'soil_test_custom.csv', 'custom'),
+]
+
+
+def _columns_to_drop(df):
+    cols_to_drop = ['SampleNo.', TARGET_COL]
+    # Check if Dosage is present and should be excluded
+    if 'Dosage.%' in df.columns:
+        cols_to_drop.append('Dosage.%')
+    return [col for col in cols_to_drop if col in df.columns]
+
+
+def _categorical_columns(df, cols_to_drop):
+    """Columns with object dtype or string values"""
+    categorical_cols = []
+    for col in df.columns:
+        if col not in cols_to_drop:
+            if df[col].dtype == 'object' or any(isinstance(val, str) for val in df[col].dropna()):
+                categorical_cols.append(col)
+    return categorical_cols
+
+
+def encode_features(df, feature_names, label_encoders):
+    """Numeric feature frame: label-encode categoricals, coerce, zero-fill
+
+    Categories unseen by the encoder map to -1.
+    """
+    X = df.reindex(columns=feature_names).copy()
+    for col, le in label_encoders.items():
+        codes = {cls: code for code, cls in enumerate(le.classes_)}
+        X[col] = X[col].fillna('Unknown').astype(str).map(codes).fillna(-1)
+    X = X.apply(pd.to_numeric, errors='coerce')
+    return X.fillna(0)
+
+
+def fit_split(train_df, test_df, verbose=True):
+    """Fit scaler + random forest on one split and predict its test rows
+
+    Returns a dict with model, scaler, label_encoders, feature_names,
+    y_test, y_pred, rmse and r2.
+    """
+    # Reject physically inconsistent rows before they can be zero-filled below
+    train_df, _ = drop_invalid(train_df, verbose=verbose)
+    test_df, _ = drop_invalid(test_df, verbose=verbose)
+
+    cols_to_drop = _columns_to_drop(train_df)
+    categorical_cols = _categorical_columns(train_df, cols_to_drop)
+
+    # Encode categorical columns on train and test values together
+    label_encoders = {}
+    for col in categorical_cols:
+        le = LabelEncoder()
+        combined_values = pd.concat([train_df[col], test_df[col]]).fillna('Unknown').astype(str)
+        le.fit(combined_values)
+        label_encoders[col] = le
+        if verbose:
+            print(f"Encoded {col}: {dict(zip(le.classes_, le.transform(le.classes_)))}")
+
+    feature_names = [col for col in train_df.columns if col not in cols_to_drop]
+    X_train = encode_features(train_df, feature_names, label_encoders)
+    X_test = encode_features(test_df, feature_names, label_encoders)
+    y_train = train_df[TARGET_COL]
+    y_test = test_df[TARGET_COL]
+
+    if verbose:
+        print(f"\nFeatures: {X_train.shape[1]}")
+        print(f"Feature names: {feature_names}")
+        print(f"Target range - Train: {y_train.min():.1f} to {y_train.max():.1f}")
+        print(f"Target range - Test: {y_test.min():.1f} to {y_test.max():.1f}")
+
+    # Standardize features
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+    X_test_scaled = scaler.transform(X_test)
+
+    # Train model
+    rf_model = RandomForestRegressor(n_estimators=100, random_state=42)
+    rf_model.fit(X_train_scaled, y_train)
+
+    # Evaluate
+    y_pred = rf_model.predict(X_test_scaled)
+    rmse = np.sqrt(mean_squared_error(y_test, y_pred))
+    r2 = r2_score(y_test, y_pred)
+
+    if verbose:
+        print(f"RMSE: {rmse:.2f}")
+        print(f"R²: {r2:.3f}")
+
+    return {
+        'model': rf_model,
+        'scaler': scaler,
+        'label_encoders': label_encoders,
+        'feature_names': feature_names,
+        'y_test': y_test.to_numpy(),
+        'y_pred': y_pred,
+        'rmse': rmse,
+        'r2': r2,
+    }
+
+
+def _check_sequential_order(train_df, test_df):
+    train_samples = sorted(train_df['SampleNo.'].tolist())
+    test_samples = sorted(test_df['SampleNo.'].tolist())
+
+    print(f"Training sample range: {min(train_samples)} to {max(train_samples)}")
+    print(f"Testing sample range: {min(test_samples)} to {max(test_samples)}")
+
+    # Check if sequential order is maintained
+    if train_samples == list(range(min(train_samples), max(train_samples) + 1)):
+        print("✅ Sequential training order maintained")
+    else:
+        print("⚠️ Sequential training order disrupted")
+
+    if test_samples == list(range(min(test_samples), max(test_samples) + 1)):
+        print("✅ Sequential testing order maintained")
+    else:
+        print("⚠️ Sequential testing order disrupted")
+
+
+def load_split(train_path, test_path, split_name, verbose=True):
+    """(train_df, test_df) read from a pair of split files"""
+    train_df = pd.read_csv(train_path)
+    test_df = pd.read_csv(test_path)
+
+    if verbose:
+        print(f"\n{'='*50}")
+        print(f"TRAINING WITH {split_name.upper()} SPLIT")
+        print(f"{'='*50}")
+        print(f"Training samples: {len(train_df)}")
+        print(f"Testing samples: {len(test_df)}")
+        # Check sample continuity for sequential split
+        if split_name == 'sequential' and 'SampleNo.' in train_df.columns:
+            _check_sequential_order(train_df, test_df)
+    return train_df, test_df
+
+
+def train_model_from_files(train_path, test_path, split_name, verbose=True):
+    """Train model using physical train/test files
+
+    Returns (model, scaler, r2, label_encoders); use fit_split for the
+    predictions and feature names as well.
+    """
+    train_df, test_df = load_split(train_path, test_path, split_name, verbose)
+    fit = fit_split(train_df, test_df, verbose)
+    return fit['model'], fit['scaler'], fit['r2'], fit['label_encoders']
+
+
+def compare_splits(data_dir, splits=SPLITS, verbose=True):
+    """Train on every split in data_dir; returns {split_name: fit_split dict}"""
+    fits = {}
+    for train_file, test_file, split_name in splits:
+        train_path = os.path.join(data_dir, train_file)
+        test_path = os.path.join(data_dir, test_file)
+        try:
+            train_df, test_df = load_split(train_path, test_path, split_name, verbose)
+        except FileNotFoundError as e:
+            print(f"⚠️ File not found for {split_name} split: {e}")
+            print(f"Expected files in data_splits folder: {train_file}, {test_file}")
+            continue
+        try:
+            fits[split_name] = fit_split(train_df, test_df, verbose)
+        except Exception as e:
+            print(f"⚠️ Error processing {split_name} split: {e}")
+            print(f"Error type: {type(e).__name__}")
+
+    print(f"\n{'='*50}")
+    print("SPLIT COMPARISON RESULTS")
+    print(f"{'='*50}")
+    for split_name, fit in fits.items():
+        print(f"{split_name.capitalize()} split R²: {fit['r2']:.3f}")
+
+    # Check if sequential effect impacted performance
+    if 'sequential' in fits and 'random' in fits:
+        seq_performance = fits['sequential']['r2']
+        random_performance = fits['random']['r2']
+        diff = abs(seq_performance - random_performance)
+
+        print("\nSequential vs Random Performance:")
+        print(f"Random split R²: {random_performance:.3f}")
+        print(f"Sequential split R²: {seq_performance:.3f}")
+        print(f"Difference: {diff:.3f}")
+        if diff > 0.05:
+            print("⚠️ Significant difference - check if sequential order was maintained")
+        else:
+            print("✅ Similar performance - sequential order likely preserved")
+    return fits
+
+
+def verify_sequential_split(data_dir):
+    """Verify that sequential split maintains proper order"""
+    try:
+        train_df = pd.read_csv(os.path.join(data_dir, 'soil_train_sequential.csv'))
+        test_df = pd.read_csv(os.path.join(data_dir, 'soil_test_sequential.csv'))
+    except FileNotFoundError as e:
+        print(f"⚠️ Sequential files not found: {e}")
+        return
+
+    train_samples = sorted(train_df['SampleNo.'].tolist())
+    test_samples = sorted(test_df['SampleNo.'].tolist())
+
+    print(f"\n{'='*50}")
+    print("SEQUENTIAL SPLIT VERIFICATION")
+    print(f"{'='*50}")
+    print(f"Training samples: {train_samples[:5]}...{train_samples[-5:]}")
+    print(f"Testing samples: {test_samples}")
+
+    # Check if training samples come before test samples
+    if max(train_samples) < min(test_samples):
+        print("✅ Sequential order maintained: training samples < test samples")
+    else:
+        print("⚠️ Sequential order disrupted: overlapping sample ranges")
+
+
+def save_model(fit, path):
+    """Pickle the model bundle needed by score_file"""
+    bundle = {key: fit[key] for key in ('model', 'scaler', 'label_encoders', 'feature_names')}
+    with open(path, 'wb') as f:
+        pickle.dump(bundle, f)
+
+
+def load_model(path):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def score_frame(bundle, df, verbose=True):
+    """Predict CBR for validated rows of df; target column is optional"""
+    # Scoring data has no CBR yet, so a missing target is not a rejection
+    df, _ = drop_invalid(df, reject=ALL_RULES & ~MISSING_TARGET, verbose=verbose)
+    X = encode_features(df, bundle['feature_names'], bundle['label_encoders'])
+    scaler = bundle['scaler']
+    # Chunked (out-of-core) models were fitted on plain arrays
+    if not hasattr(scaler, 'feature_names_in_'):
+        X = X.to_numpy()
+    scored = df.copy()
+    scored[PREDICTION_COL] = bundle['model'].predict(scaler.transform(X))
+    return scored
+
+
+def score_file(model_path, data_path, out_path=None, verbose=True):
+    """Score a CSV with a saved model and optionally write the predictions"""
+    scored = score_frame(load_model(model_path), pd.read_csv(data_path), verbose)
+    if out_path:
+        scored.to_csv(out_path, index=False)
+        print(f"Saved {len(scored)} predictions to {out_path}")
+    return scored
@@ -0,0 +1,173 @@
+# Physical-consistency checks for incoming soil lab rows
+#
+# Every rule is a column-wise NumPy operation over the whole frame, so a
+# million rows validate in a fraction of a second. Each row gets a bitmask
+# of the rules it violates.
+import re
+
+import numpy as np
+import pandas as pd
+
+GRADING_NOT_MONOTONIC = 1 << 0   # % passing increases as the sieve gets smaller
+GRADING_OUT_OF_RANGE = 1 << 1    # % passing outside 0..100
+PI_MISMATCH = 1 << 2             # PI != LL - PL
+LIMITS_ORDER = 1 << 3            # PL > LL
+COMPOSITION_SUM = 1 << 4         # Gravel + Sand + SiltClay != 100
+NEGATIVE_VALUE = 1 << 5          # negative value in a measured quantity
+MDD_OUT_OF_RANGE = 1 << 6        # implausible maximum dry density (kg/m3)
+OMC_OUT_OF_RANGE = 1 << 7        # implausible optimum moisture content (%)
+LS_OUT_OF_RANGE = 1 << 8         # implausible linear shrinkage (%)
+NON_NUMERIC = 1 << 9             # text where a number is expected
+MISSING_TARGET = 1 << 10         # no CBR value to train or score against
+
+RULES = {
+    GRADING_NOT_MONOTONIC: 'grading_not_monotonic',
+    GRADING_OUT_OF_RANGE: 'grading_out_of_range',
+    PI_MISMATCH: 'pi_mismatch',
+    LIMITS_ORDER: 'limits_order',
+    COMPOSITION_SUM: 'composition_sum',
+    NEGATIVE_VALUE: 'negative_value',
+    MDD_OUT_OF_RANGE: 'mdd_out_of_range',
+    OMC_OUT_OF_RANGE: 'omc_out_of_range',
+    LS_OUT_OF_RANGE: 'ls_out_of_range',
+    NON_NUMERIC: 'non_numeric',
+    MISSING_TARGET: 'missing_target',
+}
+ALL_RULES = sum(RULES)
+
+# Tolerances absorb the integer rounding used on the lab sheets
+PI_TOLERANCE = 1.0
+COMPOSITION_TOLERANCE = 2.0
+GRADING_TOLERANCE = 0.5
+MDD_RANGE = (1000.0, 2800.0)
+OMC_RANGE = (2.0, 60.0)
+LS_RANGE = (0.0, 30.0)
+
+TARGET_COL = 'CBR.4daysSoak.(%)'
+MEASUREMENT_GROUPS = ('Grading', 'AtterbergLimits', 'Compaction', 'CompactionT180',
+                      'SoilComposition', 'Swell', 'CBR')
+_SIEVE_PATTERN = re.compile(r'Grading\.%PassingBSSieveSize\(mm\)\.(\d+(?:\.\d+)?)$')
+
+
+def _numeric(df, col, cache):
+    """Column as a float array, converted once per validation run"""
+    if col not in cache:
+        cache[col] = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float64)
+    return cache[col]
+
+
+def _find(df, *fragments):
+    """First column whose name contains all fragments, or None"""
+    for col in df.columns:
+        if all(fragment in col for fragment in fragments):
+            return col
+    return None
+
+
+def measurement_columns(df):
+    """Columns holding lab measurements (categorical labels are left alone)"""
+    return [col for col in df.columns if col.split('.')[0] in MEASUREMENT_GROUPS]
+
+
+def sieve_columns(df):
+    """Grading columns ordered from the largest to the smallest sieve"""
+    sieves = []
+    for col in df.columns:
+        match = _SIEVE_PATTERN.search(col)
+        if match:
+            sieves.append((float(match.group(1)), col))
+    return [col for _, col in sorted(sieves, reverse=True)]
+
+
+def validate_frame(df, target_col=TARGET_COL):
+    """Check every row against the physical rules
+
+    Returns (mask, summary): mask is a uint16 array with one bit per
+    violated rule, summary a DataFrame with the row count per rule.
+    Comparisons involving missing values never raise a violation.
+    """
+    n = len(df)
+    mask = np.zeros(n, dtype=np.uint16)
+    cache = {}
+    measured = measurement_columns(df)
+
+    # Text in measurement columns (only object/string columns can hold it)
+    for col in measured:
+        if pd.api.types.is_numeric_dtype(df[col]):
+            continue
+        raw = df[col]
+        coerced = pd.to_numeric(raw, errors='coerce')
+        mask[(raw.notna() & coerced.isna()).to_numpy()] |= NON_NUMERIC
+
+    sieves = sieve_columns(df)
+    if sieves:
+        # One row per sieve keeps each column contiguous for the reductions
+        grading = np.vstack([_numeric(df, col, cache) for col in sieves])
+        with np.errstate(invalid='ignore'):
+            out_of_range = ((grading < 0) | (grading > 100)).any(axis=0)
+            increasing = (np.diff(grading, axis=0) > GRADING_TOLERANCE).any(axis=0)
+        mask[out_of_range] |= GRADING_OUT_OF_RANGE
+        mask[increasing] |= GRADING_NOT_MONOTONIC
+
+    ll_col = _find(df, 'AtterbergLimits.LL')
+    pl_col = _find(df, 'AtterbergLimits.PL')
+    pi_col = _find(df, 'AtterbergLimits.PI')
+    with np.errstate(invalid='ignore'):
+        if ll_col and pl_col:
+            ll, pl = _numeric(df, ll_col, cache), _numeric(df, pl_col, cache)
+            mask[pl > ll] |= LIMITS_ORDER
+            if pi_col:
+                pi = _numeric(df, pi_col, cache)
+                mask[np.abs(pi - (ll - pl)) > PI_TOLERANCE] |= PI_MISMATCH
+
+        parts = [_find(df, 'SoilComposition', name) for name in ('Gravel', 'Sand', 'SiltClay')]
+        if all(parts):
+            total = sum(_numeric(df, col, cache) for col in parts)
+            mask[np.abs(total - 100.0) > COMPOSITION_TOLERANCE] |= COMPOSITION_SUM
+
+        negative = np.zeros(n, dtype=bool)
+        for col in measured:
+            negative |= _numeric(df, col, cache) < 0
+        mask[negative] |= NEGATIVE_VALUE
+
+        for fragments, (low, high), bit in ((('.MDD.',), MDD_RANGE, MDD_OUT_OF_RANGE),
+                                            (('.OMC.',), OMC_RANGE, OMC_OUT_OF_RANGE),
+                                            (('AtterbergLimits.LS',), LS_RANGE, LS_OUT_OF_RANGE)):
+            col = _find(df, *fragments)
+            if col:
+                values = _numeric(df, col, cache)
+                mask[(values < low) | (values > high)] |= bit
+
+    if target_col in df.columns:
+        mask[np.isnan(_numeric(df, target_col, cache))] |= MISSING_TARGET
+
+    return mask, summarize(mask)
+
+
+def summarize(mask):
+    """Row count and share of rows violating each rule"""
+    n = len(mask)
+    rows = []
+    for bit, name in RULES.items():
+        count = int(np.count_nonzero(mask & bit))
+        rows.append({'rule': name, 'bit': bit, 'rows': count, 'fraction': count / n if n else 0.0})
+    rows.append({'rule': 'any', 'bit': ALL_RULES, 'rows': int(np.count_nonzero(mask)),
+                 'fraction': np.count_nonzero(mask) / n if n else 0.0})
+    return pd.DataFrame(rows)
+
+
+def describe(bits):
+    """Rule names set in one row's bitmask"""
+    return [name for bit, name in RULES.items() if bits & bit]
+
+
+def drop_invalid(df, target_col=TARGET_COL, reject=ALL_RULES, verbose=True):
+    """Validate df and return (clean_df, mask) without the rejected rows"""
+    mask, summary = validate_frame(df, target_col)
+    bad = (mask & reject) != 0
+    if verbose and bad.any():
+        flagged = summary[(summary['rows'] > 0) & (summary['rule'] != 'any')]
+        print(f"⚠️ Dropping {int(bad.sum())} of {len(df)} rows failing validation:")
+        for _, row in flagged.iterrows():
+            print(f"  {row['rule']}: {row['rows']}")
+    return df[~bad], mask
@@ -0,0 +1,144 @@
+import os
+import time
+
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+from Structural_monitoring import bridges, cache, fem, tcl_import
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_canonical_keys():
+    model = bridges.bridge_car1_model()
+    K = model.stiffness()
+    coo = sp.coo_matrix(K)
+    # Same matrix with split (duplicate) entries, other format and index dtype
+    doubled = sp.coo_matrix((np.r_[coo.data / 2, coo.data / 2], (np.r_[coo.row, coo.row], np.r_[coo.col, coo.col])),
+                            shape=K.shape)
+    assert cache.cache_key('eigen', K) == cache.cache_key('eigen', doubled.tocsc())
+    assert cache.cache_key('x', {'a': 1, 'b': -0.0}) == cache.cache_key('x', {'b': 0.0, 'a': 1})
+    assert cache.cache_key('x', np.arange(3, dtype=np.int32)) == cache.cache_key('x', np.arange(3))
+    assert cache.cache_key('x', model) == cache.cache_key('x', bridges.bridge_car1_model())
+
+    assert cache.cache_key('x', model) != cache.cache_key('x', bridges.bridge_car1_model(E=3.1e10))
+    assert cache.cache_key('x', 1) != cache.cache_key('x', 1.0)
+    assert cache.cache_key('eigen', K) != cache.cache_key('newmark', K)
+    with pytest.raises(TypeError):
+        cache.cache_key('x', lambda: 0)
+
+
+def test_hits_misses_and_provenance(tmp_path):
+    model = bridges.bridge_car1_model()
+    K, M = model.stiffness(), model.mass()
+    store = cache.ResultCache(str(tmp_path))
+    omega, phi = cache.eigen(store, K, M, 3)
+    assert store.counts['misses'] == 1 and store.counts['writes'] == 1
+
+    # A fresh process (new object) reads the entry back from disk
+    again = cache.ResultCache(str(tmp_path))
+    omega2, phi2 = cache.eigen(again, K.copy(), M.copy(), 3)
+    np.testing.assert_array_equal(omega2, omega)
+    np.testing.assert_array_equal(phi2, phi)
+    assert again.counts['hits'] == 1 and again.counts['memory_hits'] == 0
+    cache.eigen(again, K, M, 3)
+    assert again.counts['memory_hits'] == 1
+    cache.eigen(again, K, M, 4)
+    assert again.stats()['hit_rate'] == pytest.approx(2 / 3)
+
+    key = cache.cache_key('eigen', {'K': K, 'M': M}, settings={'n_modes': 3})
+    result, meta = again.get(key)
+    assert meta['key'] == key and meta['kind'] == 'eigen'
+    assert meta['inputs']['settings'] == '{"n_modes": 3}'
+    assert meta['versions']['numpy'] == np.__version__
+
+    store.save_stats()
+    again.save_stats()
+    totals = cache.ResultCache(str(tmp_path)).stats()['totals']
+    assert (totals['hits'], totals['misses']) == (3, 2)
+
+
+def test_lru_eviction(tmp_path):
+    store = cache.ResultCache(str(tmp_path), memory_items=0)
+    keys = [cache.cache_key('x', i) for i in range(4)]
+    for i, key in enumerate(keys[:3]):
+        store.put(key, {'data': np.full(10000, float(i))}, {'key': key})
+        os.utime(store.entry_path(key), (time.time() - 100 + i, time.time() - 100 + i))
+    assert store.get(keys[0]) is not None       # now the most recently used
+    size = os.path.getsize(store.entry_path(keys[0]))
+    store.max_bytes = 3 * size
+    store.put(keys[3], {'data': np.zeros(10000)}, {'key': keys[3]})
+    assert store.get(keys[1]) is None
+    assert all(store.get(key) is not None for key in (keys[0], keys[2], keys[3]))
+    assert store.counts['evictions'] == 1
+
+    # Overwriting a key tracks the new file size
+    store.max_bytes = 10 * size
+    store.put(keys[3], {'data': np.zeros(20000)}, {'key': keys[3]})
+    assert store._size == sum(os.path.getsize(store.entry_path(key)) for key in (keys[0], keys[2], keys[3]))
+
+
+def test_hits_are_copies(tmp_path):
+    store = cache.ResultCache(str(tmp_path))
+    key = cache.cache_key('x', 0)
+    store.put(key, {'accel': np.zeros(5)}, {'key': key})
+    for _ in range(2):          # memory hit, then (after the first edit) another
+        result, _ = store.get(key)
+        result['accel'] += 1.0
+    np.testing.assert_array_equal(store.get(key)[0]['accel'], 0.0)
+    store._memory.clear()
+    result, _ = store.get(key)  # disk hit fills memory; editing it must not leak
+    result['accel'] += 1.0
+    np.testing.assert_array_equal(store.get(key)[0]['accel'], 0.0)
+
+
+def test_cached_tcl_run(tmp_path):
+    script = os.path.join(ROOT, 'Structural_monitoring', 'bridge_car1', 'bridge_car.tcl')
+    store = cache.ResultCache(str(tmp_path / 'cache'))
+    first = tcl_import.run_script(script, cache=store)
+    out = tmp_path / 'out'
+    out.mkdir()
+    second = tcl_import.run_script(script, str(out), cache=store)
+    assert store.counts['hits'] == 1
+    assert second.provenance['key'] == first.provenance['key']
+    assert (out / 'accel.txt').read_text() == first.files['accel.txt']
+    assert len(second.model.elements) == 30
+
+    # Cached Newmark returns what the solver returns
+    model = bridges.bridge_car1_model()
+    K, M = model.stiffness(), model.mass()
+    load = bridges.bridge_car1_loads(model)
+    C = fem.rayleigh(M, K, 0.0, 0.0)
+    result = cache.newmark(store, M, C, K, load, 0.001, record=[15])
+    expected = fem.newmark(M, C, K, load, 0.001, record=[15])
+    np.testing.assert_array_equal(result['accel'], expected['accel'])
+    assert cache.newmark(store, M, C, K, load, 0.001, record=[15]) is not None
+    assert store.counts['hits'] == 2
+
+
+RAYLEIGH_SCRIPT = '''
+model basic -ndm 2 -ndf 3
+for {set i 0} {$i <= 4} {incr i} {node [expr $i + 1] [expr 2.5 * $i] 0.0 -mass 100.0 100.0 0.0}
+fix 1 1 1 0
+fix 5 0 1 0
+geomTransf Linear 1
+for {set i 1} {$i <= 4} {incr i} {element elasticBeamColumn $i $i [expr $i + 1] 0.01 2e11 1e-5 1}
+set lam [eigen 2]
+set w1 [expr sqrt([lindex $lam 0])]
+set w2 [expr sqrt([lindex $lam 1])]
+rayleigh [expr 2 * 0.02 * $w1 * $w2 / ($w1 + $w2)] 0.0 0.0 0.0
+puts "w1 $w1"
+'''
+
+
+def test_cached_tcl_run_replays_eigen(tmp_path):
+    script = tmp_path / 'rayleigh.tcl'
+    script.write_text(RAYLEIGH_SCRIPT)
+    store = cache.ResultCache(str(tmp_path / 'cache'))
+    first = tcl_import.run_script(str(script), cache=store)
+    second = tcl_import.run_script(str(script), cache=store)
+    assert (store.counts['misses'], store.counts['hits']) == (1, 1)
+    assert second.output == first.output and first.output[0].startswith('w1 ')
+    assert second.model.rayleigh == first.model.rayleigh
+    assert second.vars['w1'] == first.vars['w1'] != '1.0'
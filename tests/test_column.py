@@ -0,0 +1,40 @@
+import os
+
+import numpy as np
+
+from Structural_monitoring import column
+
+HERE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                    'Structural_monitoring', 'scy_scapper')
+
+
+def test_linear_path_reproduces_opensees_recorders():
+    accel = column.ground_motion(os.path.join(HERE, 'nairobi_eq.dat'), as_opensees=True)
+    result = column.run(accel, dt=0.02, n_steps=1500, nodes=((3, 1),), elements=(2,))
+    disp = np.loadtxt(os.path.join(HERE, 'disp.out'))
+    np.testing.assert_allclose(result['time'], disp[:, 0])
+    # Recorders print 6 significant digits
+    np.testing.assert_allclose(result['disp'][:, 0], disp[:, 1], rtol=1e-5, atol=1e-9)
+
+    # Column axial force once the damped start-up (nonlinear in OpenSees) has passed
+    shear = np.loadtxt(os.path.join(HERE, 'shear.out'))
+    later = result['time'] > 1.0
+    np.testing.assert_allclose(result['force'][later, 0, 1], shear[later, 2], rtol=1e-5)
+
+
+def test_batch_matches_single_records_and_resampling():
+    rng = np.random.default_rng(0)
+    records = rng.standard_normal((3, 400))
+    batch = column.run(records, dt=0.02, n_steps=300, nodes=((3, 1), (2, 1)), elements=(1, 2))
+    assert batch['disp'].shape == (3, 300, 2) and batch['force'].shape == (3, 300, 2, 6)
+    single = column.run(records[1], dt=0.02, n_steps=300, nodes=((3, 1), (2, 1)), elements=(1, 2))
+    np.testing.assert_allclose(batch['disp'][1], single['disp'])
+    np.testing.assert_allclose(batch['force'][1], single['force'], atol=1e-12 * np.abs(single['force']).max())
+
+    # A record sampled at dt / 2 interpolates to the same excitation
+    fine = np.interp(0.01 * np.arange(799), 0.02 * np.arange(400), records[1])
+    resampled = column.run(fine, dt=0.02, n_steps=300, record_dt=0.01, nodes=((3, 1), (2, 1)))
+    np.testing.assert_allclose(resampled['disp'], single['disp'], rtol=1e-10, atol=1e-14)
+
+    # Soil spring end forces balance
+    np.testing.assert_allclose(single['force'][:, 0, :3], -single['force'][:, 0, 3:])
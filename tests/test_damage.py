@@ -0,0 +1,46 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from Structural_monitoring import bridges, damage, fem
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_analysis_damage_case_matches_modal_data():
+    model = bridges.analysis_model()
+    severities = np.zeros((2, model.n_elem))
+    severities[1, 2] = 0.2
+    freqs, _ = damage.DamageModel(model).solve(severities)
+    expected = pd.read_csv(os.path.join(ROOT, 'modal_data.csv'), index_col='State')
+    scale = 2 * np.pi / (2 * bridges.TCL_PI)
+    np.testing.assert_allclose(freqs * scale, expected.to_numpy(), rtol=1e-9)
+
+
+def test_reduced_solution_matches_full_eigen():
+    model = bridges.bridge_car1_model()
+    severities = damage.scenarios(model.n_elem, [0.2, 0.5], max_damaged=2)
+    picks = np.random.default_rng(1).choice(len(severities), 8, replace=False)
+    freqs, shapes = damage.DamageModel(model).solve(severities[picks], n_modes=3)
+    for i, row in enumerate(severities[picks]):
+        damaged = model.copy()
+        damaged.E *= 1 - row
+        omega, phi = fem.eigen(damaged.stiffness(), damaged.mass(), 3)
+        np.testing.assert_allclose(freqs[i], omega / (2 * np.pi), rtol=1e-6)
+        phi = phi.T * np.sign(np.sum(phi.T * shapes[i], axis=1))[:, None]
+        np.testing.assert_allclose(shapes[i], phi, atol=1e-4 * np.abs(phi).max())
+
+
+def test_dataset_table_layout():
+    model = bridges.analysis_model()
+    matrix = damage.scenarios(model.n_elem, [0.1, 0.3], max_damaged=2)
+    assert len(matrix) == 1 + 5 * 2 + 10 * 4
+    table = damage.damage_dataset(model, matrix, n_modes=2)
+    assert len(table) == len(matrix)
+    assert list(table.columns[:7]) == ['damage_e0', 'damage_e1', 'damage_e2', 'damage_e3',
+                                       'damage_e4', 'Freq1', 'Freq2']
+    # Node 0 is fixed, node 5 is a roller: vertical shapes at nodes 1-4
+    assert 'Mode2_node4' in table.columns and 'Mode1_node5' not in table.columns
+    # Any damage lowers the fundamental frequency
+    assert (table['Freq1'][1:] < table['Freq1'][0]).all()
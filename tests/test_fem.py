@@ -0,0 +1,106 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.linalg
+import scipy.sparse as sp
+
+from Structural_monitoring import bridges, fem
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BRIDGE1 = os.path.join(ROOT, 'Structural_monitoring', 'bridge_car1')
+
+
+def test_bridge_car1_matches_opensees_outputs():
+    result = bridges.run_bridge_car1()
+    expected = pd.read_csv(os.path.join(BRIDGE1, 'frequencies.txt'))['Freq(Hz)'].to_numpy()
+    np.testing.assert_allclose(result['frequencies'], expected, rtol=1e-9)
+
+    accel = np.loadtxt(os.path.join(BRIDGE1, 'accel.txt'))
+    np.testing.assert_allclose(result['time'], accel[:, 0])
+    scale = np.abs(accel[:, 1]).max()
+    assert np.abs(result['accel'] - accel[:, 1]).max() < 1e-5 * scale
+
+
+def test_analysis_matches_modal_data():
+    baseline, damaged = bridges.run_analysis()
+    expected = pd.read_csv(os.path.join(ROOT, 'modal_data.csv'), index_col='State')
+    np.testing.assert_allclose(baseline, expected.loc['Baseline'], rtol=1e-9)
+    np.testing.assert_allclose(damaged, expected.loc['Damaged'], rtol=1e-9)
+
+
+def test_consistent_mass_converges_to_euler_bernoulli():
+    L, EI, m = 30.0, 3e9, 1250.0
+    model = fem.Frame2D.beam(L, 40, 3e10, 0.5, EI / 3e10, m)
+    freqs = fem.frequencies(model, 3, lumped=False)
+    exact = np.array([(n * np.pi / L) ** 2 * np.sqrt(EI / m) / (2 * np.pi) for n in (1, 2, 3)])
+    np.testing.assert_allclose(freqs, exact, rtol=1e-4)
+
+
+def test_rotated_frame_has_same_frequencies():
+    model = fem.Frame2D.beam(10.0, 8, 2e11, 0.01, 8e-5, 80.0, supports='fixed-roller')
+    angle = np.radians(30)
+    rot = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+    tilted = model.copy()
+    tilted.nodes = model.nodes @ rot.T
+    # Roller perpendicular to the beam axis cannot be expressed with fix(); pin both ends
+    model.fix(8, 1, 1, 0)
+    tilted.fix(8, 1, 1, 0)
+    np.testing.assert_allclose(fem.frequencies(tilted, 4, lumped=False),
+                               fem.frequencies(model, 4, lumped=False), rtol=1e-10)
+
+
+def test_newmark_static_limit():
+    model = fem.Frame2D.beam(10.0, 10, 2e11, 0.01, 8e-5, 80.0)
+    K, M = model.stiffness(), model.mass()
+    C = fem.rayleigh(M, K, *fem.rayleigh_coefficients(0.5, 10.0))
+    mid = model.free_index(5, fem.UY)
+    force = np.zeros(model.n_free)
+    force[mid] = -1000.0
+    result = fem.newmark(M, C, K, lambda i: force, 0.01, n_steps=2000, record=[mid])
+    static = -1000.0 * 10.0**3 / (48 * 2e11 * 8e-5)
+    assert abs(result['disp'][-1, 0] - static) < 1e-3 * abs(static)
+
+
+def test_newmark_batch_matches_newmark():
+    model = fem.Frame2D.beam(10.0, 5, 3e10, 0.5, 0.1, 1250.0)
+    K, M = model.stiffness(), model.mass()
+    C = fem.rayleigh(M, K, 0.3, 0.002)
+    rng = np.random.default_rng(0)
+    pattern = rng.standard_normal((model.n_free, 2))
+    history = rng.standard_normal((200, 2, 3))
+    batch = fem.newmark_batch(M, C, K, pattern, history, 0.01, record=[1, 4])
+    for case in range(3):
+        single = fem.newmark(M, C, K, history[:, :, case] @ pattern.T, 0.01, record=[1, 4])
+        for key in ('disp', 'vel', 'accel'):
+            np.testing.assert_allclose(batch[key][:, :, case], single[key], rtol=1e-10,
+                                       atol=1e-12 * np.abs(single[key]).max())
+
+
+def test_central_difference_matches_newmark():
+    model = fem.Frame2D.beam(10.0, 10, 2e11, 0.01, 8e-5, 80.0)
+    K, mass = model.stiffness(), model.mass_diagonal()
+    # Element estimate bounds the global limit from below, and not by much
+    omega_max = np.sqrt(scipy.linalg.eigh(K.toarray(), np.diag(mass), eigvals_only=True)[-1])
+    dt_critical = model.critical_time_step()
+    assert 0.8 * 2 / omega_max < dt_critical <= 2 / omega_max
+
+    C = fem.rayleigh(sp.diags(mass), K, 2.0, 0.0)
+    mid = model.free_index(5, fem.UY)
+    t = 0.002 * np.arange(1, 501)
+    loads = np.zeros((500, model.n_free))
+    loads[:, mid] = -1000.0 * np.sin(2 * np.pi * 3.0 * t)
+    explicit = fem.central_difference(mass, C, K, loads, 0.002, record=[mid], dt_critical=dt_critical)
+    assert explicit['dt'] < 0.9 * dt_critical
+    implicit = fem.newmark(sp.diags(mass), C, K, loads, 0.002, record=[mid])
+    peak = np.abs(implicit['disp']).max()
+    assert np.abs(explicit['disp'] - implicit['disp']).max() < 1e-2 * peak
+    # Matrix-only default (Gershgorin bound) is stable too
+    bound = fem.central_difference(mass, C, K, loads, 0.002, record=[mid])
+    np.testing.assert_allclose(bound['disp'], explicit['disp'], atol=1e-3 * peak)
+
+    with pytest.raises(ValueError):
+        fem.central_difference(model.mass(), C, K, loads, 0.002)     # no rotary mass
+    with pytest.raises(ValueError):
+        fem.central_difference(model.mass(lumped=False), C, K, loads, 0.002)
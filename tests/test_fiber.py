@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from Structural_monitoring import column, fiber
+
+
+def _history(material, strains, **params):
+    state = fiber.concrete_state(()) if material is fiber.concrete01 else fiber.steel_state(())
+    out = []
+    for strain in strains:
+        stress, _, state = material(np.float64(strain), state, **params)
+        out.append(float(stress))
+    return np.array(out)
+
+
+def test_concrete01_and_steel01_cycles():
+    fpc, epsc0, fpcu, epscu = column.COLUMN['concrete']
+    stress = _history(fiber.concrete01, [-0.001, -0.002, -0.0035, -0.006, -0.003, 0.001, -0.003, -0.0062])
+    assert stress[0] == pytest.approx(fpc * (2 * 0.5 - 0.25))
+    assert stress[1] == pytest.approx(fpc)
+    assert stress[2] == pytest.approx(fpc + (fpc - fpcu) / (epsc0 - epscu) * (-0.0035 - epsc0))
+    assert stress[3] == pytest.approx(fpcu)
+    # Unloading follows a line to zero stress, no tension; reloading retraces it
+    assert fpcu < stress[4] < 0 and stress[5] == 0.0
+    assert stress[6] == pytest.approx(stress[4])
+    assert stress[7] == pytest.approx(fpcu)
+
+    fy, E0, b = column.COLUMN['steel']
+    stress = _history(fiber.steel01, [0.001, 0.01, 0.005, -0.01])
+    assert stress[0] == pytest.approx(E0 * 0.001)
+    assert stress[1] == pytest.approx(fy + b * E0 * (0.01 - fy / E0))
+    assert stress[2] == pytest.approx(stress[1] - E0 * 0.005)
+    assert stress[3] == pytest.approx(-fy + b * E0 * (-0.01 + fy / E0))
+
+
+def test_column_section_stiffness_and_interaction():
+    section = fiber.FiberSection.from_model()
+    EA, EI = section.initial_stiffness()
+    col_EA, col_EI = column.section_stiffness()
+    assert EA[0] == pytest.approx(col_EA)
+    assert EI[0] == pytest.approx(col_EI, rel=1e-2)    # 20 layers vs b h^3 / 12
+
+    _, _, tangent = section.trial(0.0, 0.0)
+    np.testing.assert_allclose(tangent[0], [[EA[0], 0.0], [0.0, EI[0]]], atol=1e-9)
+    # No concrete tension: bending without axial load cracks half the section
+    _, M, _ = section.trial(0.0, 1e-6)
+    assert 0.4 * EI[0] * 1e-6 < M[0] < 0.6 * EI[0] * 1e-6
+
+    pm = fiber.interaction(section)
+    fpc, epsc0 = column.COLUMN['concrete'][:2]
+    steel_area = 16 * 0.0004909
+    squash = fpc * 1.0 + column.COLUMN['steel'][1] * epsc0 * steel_area
+    assert pm['P'].min() == pytest.approx(squash)
+    # Last profile before uniform tension at eps_su = 0.01 (hardened steel)
+    assert pm['P'].max() == pytest.approx(steel_area * (500.0 + 2000.0 * (0.01 - 0.0025)), rel=1e-2)
+    # Symmetric reinforcement: both bending directions reach the same moment
+    assert pm['M'].max() == pytest.approx(-pm['M'].min(), rel=1e-2)
+
+
+def test_batched_moment_curvature():
+    h = np.array([0.5, 0.8, 1.0])
+    b = np.array([0.4, 0.5, 1.0])
+    bars = [(h / 2 - 0.05, np.array([3, 4, 8]), 0.000491), (-(h / 2 - 0.05), np.array([3, 2, 8]), 0.000491)]
+    sections = fiber.FiberSection.rectangular(b, h, bars)
+    axial = np.array([0.0, -1.0, -5.0])
+    result = fiber.moment_curvature(sections, axial, n_steps=60)
+    assert result['converged'].all()
+    assert result['moment'].shape == (3, 61)
+
+    # Same answer section by section
+    for i in range(3):
+        one = fiber.FiberSection.rectangular(b[i], h[i], [(y[i], n[i], a) for y, n, a in bars])
+        single = fiber.moment_curvature(one, axial[i], kappa_max=result['curvature'][i, -1], n_steps=60)
+        np.testing.assert_allclose(single['moment'][0], result['moment'][i], rtol=1e-10, atol=1e-12)
+        assert single['yield_moment'][0] == result['yield_moment'][i]
+
+    # Peak of the moment-curvature curve sits on the interaction curve
+    pm = fiber.interaction(sections, n_points=60)
+    for i in range(3):
+        upper = pm['M'][i] > 0
+        order = np.argsort(pm['P'][i, upper])
+        capacity = np.interp(axial[i], pm['P'][i, upper][order], pm['M'][i, upper][order])
+        assert result['peak_moment'][i] == pytest.approx(capacity, rel=0.06)
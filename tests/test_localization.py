@@ -0,0 +1,42 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from Structural_monitoring import bridges, damage, localization as loc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_strain_energy_fractions_sum_to_one():
+    index = loc.SensitivityIndex.from_model(bridges.bridge_car1_model(), n_modes=4)
+    np.testing.assert_allclose(index.sensitivity.sum(axis=1), 1.0, rtol=1e-9)
+    assert (index.sensitivity >= 0).all()
+
+
+def test_modal_data_damage_is_located_on_element_2():
+    data = pd.read_csv(os.path.join(ROOT, 'modal_data.csv'), index_col='State')
+    index = loc.SensitivityIndex.from_model(bridges.analysis_model())
+    measured = data.loc['Damaged'].to_numpy() * index.frequencies / data.loc['Baseline'].to_numpy()
+    result = index.localize(measured)
+    assert result['element'][0] == 2
+    # First-order sensitivities slightly overestimate a 20% stiffness loss
+    assert 0.18 < result['severity'][0] < 0.25
+
+
+def test_batch_localization_of_small_damage(tmp_path):
+    model = bridges.bridge_car1_model()
+    severities = damage.scenarios(model.n_elem, [0.05], include_baseline=False)
+    freqs, _ = damage.DamageModel(model).solve(severities, n_modes=6)
+
+    index = loc.SensitivityIndex.from_model(model, n_modes=6)
+    index.save(tmp_path / 'index.npz')
+    index = loc.SensitivityIndex.load(tmp_path / 'index.npz')
+    result = index.localize(freqs)
+
+    true = severities.argmax(axis=1)
+    # The simply supported deck is symmetric: mirror elements are equivalent
+    mirror = model.n_elem - 1 - true
+    assert np.all((result['element'] == true) | (result['element'] == mirror))
+    np.testing.assert_allclose(result['severity'], 0.05, rtol=0.1)
+    assert result['distributed'].shape == (len(freqs), model.n_elem)
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from Structural_monitoring import bridges, fem, modal
+
+
+def test_sparse_matches_dense_on_frame_with_massless_rotations():
+    model = modal.frame_grid(6, 6)
+    dense = modal.modal_analysis(model, 6, method='dense')
+    sparse = modal.modal_analysis(model, 6, method='sparse')
+    np.testing.assert_allclose(sparse['frequency'], dense['frequency'], rtol=1e-9)
+    M = model.mass()
+    np.testing.assert_allclose(sparse['modes'].T @ M @ sparse['modes'], np.eye(6), atol=1e-9)
+    assert set(sparse['timing']) == {'assemble', 'factorize', 'solve', 'total'}
+
+
+def test_band_returns_every_mode_in_range():
+    model = bridges.bridge_car1_model(num_elem=600)
+    reference = modal.modal_analysis(model, 40, method='sparse')['frequency']
+    in_band = reference[(reference >= 5.0) & (reference <= 60.0)]
+    result = modal.modal_analysis(model, band=(5.0, 60.0), method='sparse')
+    np.testing.assert_allclose(result['frequency'], in_band, rtol=1e-6)
+
+
+def test_unsupported_model_gives_rigid_body_modes():
+    model = fem.Frame2D.beam(10.0, 500, 2e11, 0.01, 8e-5, 80.0, supports=None)
+    result = modal.shift_invert_modes(model.stiffness(), model.mass(False), 5)
+    # Three rigid-body modes, then the first free-free bending mode
+    assert np.all(result['frequency'][:3] < 1e-2)
+    beta_l = 4.730040745
+    expected = beta_l**2 * np.sqrt(2e11 * 8e-5 / 80.0) / (2 * np.pi * 10.0**2)
+    assert result['frequency'][3] == pytest.approx(expected, rel=1e-5)
@@ -0,0 +1,95 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from Structural_monitoring import monitor, spectral
+
+
+def test_incremental_spectrum_matches_welch_of_window():
+    fs, nperseg, n_average = 200.0, 256, 4
+    y = np.random.default_rng(0).standard_normal((5, 3000)).astype(np.float32)
+    mon = monitor.Monitor(5, fs, [10.0], nperseg=nperseg, n_average=n_average)
+    # Uneven frames, channels arriving from two acquisition units
+    for start, stop in [(0, 700), (700, 701), (701, 2222), (2222, 3000)]:
+        mon.ingest(start / fs, fs, 0, y[:3, start:stop].T)
+        mon.ingest(start / fs, fs, 3, y[3:, start:stop].T)
+
+    end = mon.next_end - mon.spectrum.hop
+    window = y[:, end - nperseg - (n_average - 1) * mon.spectrum.hop:end]
+    _, expected = spectral.welch(window.astype(float), fs, nperseg=nperseg)
+    np.testing.assert_allclose(mon.spectrum.psd(), expected, rtol=1e-5)
+    assert mon.stats['gaps'] == 0 and mon.stats['rejected'] == 0
+
+
+def test_oversize_and_failing_frames_do_not_stall_the_server():
+    fs = 200.0
+    y = np.random.default_rng(2).standard_normal((2, 6000)).astype(np.float32)
+    mon = monitor.Monitor(2, fs, [10.0], nperseg=256, n_average=4)
+    ingest = mon.ingest
+
+    def flaky(t0, *args):
+        if t0 < 0:
+            raise RuntimeError("corrupt frame")
+        return ingest(t0, *args)
+
+    mon.ingest = flaky
+
+    async def run():
+        server = monitor.MonitorServer(mon, on_event=None)
+        port = await server.start(port=0)
+        _, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(monitor.encode_frame(-1.0, fs, y[:, :10].T))
+        # Longer than the ring, and channel 1 running ahead of channel 0
+        writer.write(monitor.encode_frame(0.0, fs, y[1:].T, first_channel=1))
+        writer.write(monitor.encode_frame(0.0, fs, y[:1].T))
+        await writer.drain()
+        for _ in range(200):
+            if mon.stats['frames'] + mon.stats['rejected'] == 3:
+                break
+            await asyncio.sleep(0.01)
+        await asyncio.wait_for(server.drain(), 5)
+        writer.close()
+        await server.close()
+
+    asyncio.run(run())
+    assert mon.ring.capacity < y.shape[1]
+    assert mon.stats['rejected'] == 1 and mon.stats['frames'] == 2
+
+    end = mon.next_end - mon.spectrum.hop
+    window = y[:, end - 256 - 3 * mon.spectrum.hop:end]
+    _, expected = spectral.welch(window.astype(float), fs, nperseg=256)
+    np.testing.assert_allclose(mon.spectrum.psd(), expected, rtol=1e-5)
+
+
+@pytest.mark.parametrize('protocol', ['tcp', 'udp'])
+def test_stream_raises_alarm_on_frequency_drift(protocol):
+    fs = 500.0
+    baseline = monitor.load_baseline()
+    t = np.arange(int(90 * fs)) / fs
+    # Mode 1 drops 5% half way through the record
+    f1 = np.where(t < 45, baseline[0], 0.95 * baseline[0])
+    phase = 2 * np.pi * np.cumsum(f1) / fs
+    rng = np.random.default_rng(1)
+    y = np.vstack([np.sin(phase + c) + 0.5 * np.sin(2 * np.pi * baseline[1] * t)
+                   + 0.3 * np.sin(2 * np.pi * baseline[2] * t) for c in range(3)])
+    y += 0.2 * rng.standard_normal(y.shape)
+
+    async def run():
+        mon = monitor.Monitor(3, fs, baseline, nperseg=1024)
+        server = monitor.MonitorServer(mon, on_event=None)
+        port = await server.start(port=0, protocol=protocol)
+        sent = await monitor.replay(y, fs, port=port, protocol=protocol, speed=0)
+        for _ in range(100):
+            if mon.stats['frames'] == sent:
+                break
+            await asyncio.sleep(0.01)
+        await server.drain()
+        await server.close()
+        return mon, server.events
+
+    mon, events = asyncio.run(run())
+    assert mon.stats['samples'] == y.size and mon.stats['gaps'] == 0
+    assert [(e['mode'], e['state']) for e in events] == [(1, 'alarm')]
+    assert events[0]['time'] > 45
+    np.testing.assert_allclose(mon.tracker.frequency, baseline * [0.95, 1, 1], rtol=0.01)
@@ -0,0 +1,58 @@
+import json
+
+import numpy as np
+import pytest
+
+from Structural_monitoring import motions, response_spectrum, spectral, suite
+
+
+def test_generator_is_reproducible_and_filtered():
+    batch = motions.generate(6, duration=20.0, dt=0.01, site='soft', seed=4)
+    # Any record regenerates alone, whatever the batch it came from
+    np.testing.assert_array_equal(motions.generate(2, 20.0, 0.01, 'soft', seed=4, start=3), batch[3:5])
+    assert not np.allclose(motions.generate(1, 20.0, 0.01, 'soft', seed=5), batch[0])
+    assert batch.shape == (6, 2001)
+
+    # Envelope: quiet start, decaying tail
+    assert np.abs(batch[:, :20]).max() < 0.05 * np.abs(batch).max()
+    # Soft site: spectral peak near the Kanai-Tajimi ground frequency
+    freqs, psd = spectral.welch(batch[:, 200:1000], 100.0, nperseg=400)
+    peak = freqs[psd.mean(axis=0).argmax()]
+    assert 0.5 < peak < 1.3     # wg = 5 rad/s = 0.8 Hz
+
+    scaled = motions.generate(3, 20.0, 0.01, 'firm', seed=1, pga=2.0)
+    np.testing.assert_allclose(np.abs(scaled).max(axis=1), 2.0)
+
+
+def test_record_store_roundtrip_and_drivers(tmp_path):
+    path = str(tmp_path / 'ensemble')
+    store = motions.write_ensemble(path, 7, duration=10.0, dt=0.02, seed=2, pga=0.2, batch=3)
+    assert len(store) == 7 and store.dt == 0.02
+    assert store.data.dtype == np.float32
+    with open(path + '.json') as f:
+        meta = json.load(f)
+    assert meta['seed'] == 2 and meta['filter'] == motions.SITES['firm']
+
+    expected = motions.generate(7, 10.0, 0.02, seed=2, pga=0.2 * 9.81) / 9.81
+    np.testing.assert_allclose(store.data, expected, rtol=1e-6, atol=1e-7)
+
+    # Drivers read records by '<store>.bin#<index>'
+    accel, dt = suite.read_record(store.paths()[4])
+    np.testing.assert_array_equal(accel, store[4])
+    assert dt == 0.02
+    table = response_spectrum.spectra_files([store.bin_path], periods=[0.2, 1.0])
+    direct = response_spectrum.response_spectrum(store[6] * 9.81, 0.02, [0.2, 1.0])
+    np.testing.assert_allclose(table.loc[table['record'] == 'record00006', 'Sa'], direct['Sa'])
+
+
+def test_store_text_records(tmp_path):
+    for name, n in (('a.txt', 50), ('b.txt', 80)):
+        t = 0.01 * np.arange(n)
+        np.savetxt(tmp_path / name, np.column_stack([t, np.sin(t)]))
+    store = motions.store_files([str(tmp_path / 'a.txt'), str(tmp_path / 'b.txt')], str(tmp_path / 'records'))
+    assert store.names == ['a.txt', 'b.txt']
+    assert list(store.lengths) == [50, 80]
+    np.testing.assert_allclose(store[0], np.sin(0.01 * np.arange(50)))
+    np.savetxt(tmp_path / 'c.txt', np.column_stack([0.02 * np.arange(10), np.ones(10)]))
+    with pytest.raises(ValueError):
+        motions.store_files([str(tmp_path / 'a.txt'), str(tmp_path / 'c.txt')], str(tmp_path / 'bad'))
@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+from Structural_monitoring import bridges, fem, moving_load as ml
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_bridge_car2_matches_accello():
+    result = bridges.run_bridge_car2()
+    expected = np.loadtxt(os.path.join(ROOT, 'Structural_monitoring', 'bridge_car2', 'accello.txt'))
+    np.testing.assert_allclose(result['time'], expected[:, 0])
+    scale = np.abs(expected[:, 1]).max()
+    assert np.abs(result['accel'] - expected[:, 1]).max() < 1e-4 * scale
+
+
+def test_explicit_bridge_car2_matches_newmark_on_the_same_model():
+    with pytest.warns(UserWarning, match='mass-proportional'):
+        result = bridges.run_bridge_car2(explicit=True)
+    # Same lumped mass and mass-proportional damping, integrated implicitly
+    model = bridges.bridge_car2_model()
+    K, mass = model.stiffness(), model.mass_diagonal()
+    L = model.nodes[-1, 0]
+    omega1 = (bridges.TCL_PI / L) ** 2 * np.sqrt(model.E[0] * model.I[0] / model.mass_per_length[0])
+    C = fem.rayleigh(sp.diags(mass), K, 0.05 * 2 * omega1, 0.0)
+    loads = ml.crossing_loads(model, 25.0, 0.0005, -15000.0, (0.0,), n_steps=len(result['time']))
+    mid = model.free_index(model.n_elem // 2, fem.UY)
+    explicit = fem.central_difference(mass, C, K, loads, 0.0005, record=[mid],
+                                      dt_critical=model.critical_time_step(mass))
+    np.testing.assert_array_equal(explicit['accel'][:, 0], result['accel'])
+    implicit = fem.newmark(sp.diags(mass), C, K, loads, 0.0005, record=[mid])
+    for key, tol in [('disp', 1e-3), ('vel', 1e-2)]:
+        scale = np.abs(implicit[key]).max()
+        assert np.abs(explicit[key] - implicit[key]).max() < tol * scale
+    # Newmark distorts the high element modes the moving load excites, so
+    # accelerations agree in peak rather than sample by sample
+    assert np.abs(result['accel']).max() == pytest.approx(np.abs(implicit['accel']).max(), rel=0.05)
+
+
+def test_consistent_loads_are_statically_equivalent():
+    model = fem.Frame2D.beam(12.0, 6, 3e10, 0.5, 0.1, 1250.0, supports=None)
+    x = np.array([[0.0], [1.3], [4.0], [11.9], [12.0], [13.0]])
+    F = ml.load_matrix(model, x, -1000.0).toarray()
+    fy = F[:, fem.UY::fem.NDF]
+    mz = F[:, fem.RZ::fem.NDF]
+    np.testing.assert_allclose(fy.sum(axis=1), [-1000.0] * 5 + [0.0])
+    # Moment of the nodal loads about x = 0 equals that of the axle load
+    moment = (fy * model.nodes[:, 0]).sum(axis=1) + mz.sum(axis=1)
+    np.testing.assert_allclose(moment, -1000.0 * np.where(x[:, 0] <= 12.0, x[:, 0], 0.0), atol=1e-9)
+
+
+def test_axle_train_is_superposition_of_single_axles():
+    model = bridges.bridge_car2_model(num_elem=20)
+    dt, v = 0.01, 20.0
+    train = ml.crossing_loads(model, v, dt, [-60e3, -90e3], axle_offsets=(0.0, 4.0))
+    front = ml.crossing_loads(model, v, dt, -60e3, n_steps=train.shape[0])
+    positions = ml.axle_positions(dt * np.arange(train.shape[0]), v, (4.0,))
+    rear = ml.load_matrix(model, positions, -90e3)
+    assert abs(train - front - rear).max() < 1e-6
+    # Runs until the rear axle has left the 30 m deck
+    assert np.isclose(dt * (train.shape[0] - 1) * v, 34.0)
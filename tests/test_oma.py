@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+import scipy.signal as ss
+
+from Structural_monitoring import bridges, fem, oma
+
+
+@pytest.fixture(scope='module')
+def ambient():
+    """Deck accelerations under white-noise loads on every vertical DOF"""
+    model = bridges.bridge_car1_model()
+    K, M = model.stiffness(), model.mass()
+    omega, modes = fem.eigen(K, M, 3)
+    alpha, beta = fem.rayleigh_coefficients(0.02, omega[0], omega[2])
+    dt, n_steps = 0.01, 30000
+    vertical = model.free_index(np.arange(1, model.n_elem), fem.UY)
+    loads = np.zeros((n_steps, model.n_free))
+    loads[:, vertical] = 1000 * np.random.default_rng(1).standard_normal((n_steps, len(vertical)))
+    sensors = model.free_index(np.arange(1, model.n_elem, 3), fem.UY)
+    accel = fem.newmark(M, fem.rayleigh(M, K, alpha, beta), K, loads, dt, record=sensors)['accel'].T
+    # Average-acceleration Newmark lengthens periods: compare with its own frequencies
+    f = omega / (2 * np.pi)
+    return {'accel': accel, 'fs': 1 / dt, 'frequency': np.arctan(np.pi * f * dt) / (np.pi * dt),
+            'damping': 0.5 * (alpha / omega + beta * omega), 'modes': modes[sensors]}
+
+
+def test_cross_spectra_and_correlations_match_direct_estimates():
+    y = np.random.default_rng(0).standard_normal((3, 5000))
+    _, G = oma.cross_spectra(y, 50.0, nperseg=256)
+    # G = E[Y Y^H]; scipy's csd(x, y) is E[conj(X) Y]. The lowest lines differ
+    # because scipy removes each segment's mean rather than the record's.
+    _, Pxy = ss.csd(y[1], y[0], 50.0, nperseg=256)
+    np.testing.assert_allclose(G[2:, 0, 1], Pxy[2:], rtol=1e-10, atol=1e-14)
+    np.testing.assert_allclose(np.diagonal(G, axis1=1, axis2=2).imag, 0, atol=1e-12)
+
+    R = oma.correlations(y, 5, ref_channels=[2], segment=1000)
+    y0 = y - y.mean(axis=1, keepdims=True)
+    direct = [y0[:, 1000 * s + k:1000 * (s + 1)] @ y0[2, 1000 * s:1000 * (s + 1) - k]
+              for k in range(6) for s in range(5)]
+    direct = np.reshape(direct, (6, 5, 3)).sum(axis=1) / (5 * (1000 - np.arange(6)))[:, None]
+    np.testing.assert_allclose(R[:, :, 0], direct, rtol=1e-10, atol=1e-14)
+
+
+@pytest.mark.parametrize('method', ['fdd', 'ssi'])
+def test_identifies_frequencies_damping_and_shapes(ambient, method):
+    if method == 'fdd':
+        result = oma.fdd(ambient['accel'], ambient['fs'], 3, (1.0, 30.0), nperseg=2048)
+    else:
+        result = oma.ssi_cov(ambient['accel'], ambient['fs'], 40, f_range=(1.0, 30.0))
+        assert not result['diagram'].empty and result['diagram']['stable'].any()
+    found = np.abs(result['frequency'][:, None] - ambient['frequency']).argmin(axis=0)
+    np.testing.assert_allclose(result['frequency'][found], ambient['frequency'], rtol=0.01)
+    np.testing.assert_allclose(result['damping'][found], ambient['damping'], rtol=0.35)
+    assert np.diag(oma.mac(result['modes'][:, found], ambient['modes'])).min() > 0.95
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from soils.out_of_core import TARGET_COL, evaluate_out_of_core, fit_scaler_streaming, train_out_of_core
+
+
+def _write_archive(path, n=600):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'SampleNo.': np.arange(1, n + 1),
+        'AtterbergLimits.PI.%': rng.uniform(0, 40, n),
+        'Swell.(%)': rng.uniform(0, 5, n),
+    })
+    df[TARGET_COL] = 80 - 1.0 * df['AtterbergLimits.PI.%'] - 5 * df['Swell.(%)']
+    df.to_csv(path, index=False)
+    return df
+
+
+def test_streaming_scaler_matches_full_fit(tmp_path):
+    path = tmp_path / 'archive.csv'
+    df = _write_archive(path)
+    cols = ['AtterbergLimits.PI.%', 'Swell.(%)']
+    scaler, n_rows = fit_scaler_streaming(path, cols, block_size=97)
+    assert n_rows == len(df)
+    np.testing.assert_allclose(scaler.mean_, df[cols].mean().to_numpy())
+    np.testing.assert_allclose(scaler.scale_, df[cols].std(ddof=0).to_numpy())
+
+
+def test_block_ensemble_learns_and_runs_in_parallel(tmp_path):
+    path = tmp_path / 'archive.csv'
+    _write_archive(path)
+    model, scaler, cols = train_out_of_core(path, block_size=200, n_estimators_per_block=5, n_jobs=2)
+    assert len(model.members) == 3
+    assert cols == ['AtterbergLimits.PI.%', 'Swell.(%)']
+    rmse, r2 = evaluate_out_of_core(model, scaler, cols, path, block_size=150)
+    assert r2 > 0.9
@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+import pytest
+
+from Structural_monitoring import recorder_io
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _write(path, data):
+    np.savetxt(path, data, fmt='%g')
+    return str(path)
+
+
+def test_shear_recorder_round_trip(tmp_path):
+    source = os.path.join(ROOT, 'Structural_monitoring', 'scy_scapper', 'shear.out')
+    expected = np.loadtxt(source)
+    rec = recorder_io.convert(source, out=str(tmp_path / 'shear'), columns=recorder_io.FORCE_2D,
+                              chunk_rows=256)
+    np.testing.assert_array_equal(rec.data, expected)
+    np.testing.assert_array_equal(rec.column('Fy_i'), expected[:, 2])
+    assert rec.dt == pytest.approx(0.02)
+
+    # Window bounds are inclusive and returned without copying
+    window = rec.window(1.0, 2.0)
+    np.testing.assert_allclose(window[[0, -1], 0], [1.0, 2.0])
+    assert np.shares_memory(window, rec.data)
+
+
+def test_downsample_stride_and_mean(tmp_path):
+    t = 0.01 * np.arange(1, 1001)
+    data = np.column_stack([t, np.sin(t), t**2])
+    rec = recorder_io.convert(_write(tmp_path / 'node.out', data), chunk_rows=97)
+    assert rec.dt == pytest.approx(0.01)
+    one_row = recorder_io.convert(_write(tmp_path / 'rows.out', data), chunk_rows=1)
+    assert one_row.dt == pytest.approx(0.01)
+    np.testing.assert_allclose(rec.downsample(10), data[::10], rtol=1e-5)
+    mean = rec.downsample(7, t_start=2.0, t_end=5.0, method='mean')
+    rows = data[199:500][:301 // 7 * 7]
+    np.testing.assert_allclose(mean, rows.reshape(-1, 7, 3).mean(axis=1), rtol=1e-5)
+
+
+@pytest.mark.parametrize('chunk_rows', [30, 1])
+def test_non_uniform_time_uses_search(tmp_path, chunk_rows):
+    t = np.round(np.cumsum(np.r_[0.01 * np.ones(50), 0.005 * np.ones(50)]), 6)
+    rec = recorder_io.convert(_write(tmp_path / 'adaptive.out', np.column_stack([t, t])), chunk_rows=chunk_rows)
+    assert rec.dt is None
+    window = rec.window(0.45, 0.52)
+    assert window[0, 0] >= 0.45 - 1e-12 and window[-1, 0] <= 0.52 + 1e-12
+    np.testing.assert_array_equal(window[:, 0], t[(t >= 0.45 - 1e-12) & (t <= 0.52 + 1e-12)])
+
+
+def test_unchanged_source_is_not_reconverted(tmp_path):
+    path = _write(tmp_path / 'disp.out', np.column_stack([np.arange(1, 11) * 0.1, np.ones(10)]))
+    recorder_io.convert(path)
+    bin_path = str(tmp_path / 'disp.bin')
+    mtime = os.stat(bin_path).st_mtime_ns
+    rec = recorder_io.open_recorder(path)
+    assert os.stat(bin_path).st_mtime_ns == mtime
+    assert rec.columns == ['value0']
+
+    _write(path, np.column_stack([np.arange(1, 21) * 0.1, np.ones(20)]))
+    assert len(recorder_io.open_recorder(path)) == 20
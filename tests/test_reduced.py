@@ -0,0 +1,71 @@
+import numpy as np
+import scipy.sparse as sp
+
+from Structural_monitoring import bridges, fem, moving_load, reduced, response_spectrum
+
+
+def test_step_matrices_match_nigam_jennings_and_overdamped_static_limit():
+    omega = np.array([2.0, 15.0, 80.0])
+    zeta = np.array([0.0, 0.05, 0.6])
+    A, B = reduced.step_matrices(omega, zeta, 0.01)
+    A_nj, B_nj = response_spectrum.nigam_jennings(2 * np.pi / omega, zeta, 0.01)
+    np.testing.assert_allclose(A, A_nj, atol=1e-12)
+    np.testing.assert_allclose(B, -B_nj, atol=1e-12)     # forcing +p instead of -ag
+
+    # Overdamped and stiff modes settle on the static p / w^2
+    omega = np.array([50.0, 1e4])
+    A, B = reduced.step_matrices(omega, [3.0, 40.0], 0.01)
+    x = np.zeros((2, 2))
+    for _ in range(2000):
+        x = np.einsum('rst,rt->rs', A, x) + B.sum(axis=-1)
+    np.testing.assert_allclose(x[:, 0], 1.0 / omega**2, rtol=1e-6)
+
+
+def test_modal_and_craig_bampton_match_full_model():
+    model = bridges.bridge_car2_model(num_elem=40)
+    K, M = model.stiffness(), model.mass()
+    rayleigh = fem.rayleigh_coefficients(0.05, 17.0, 200.0)
+    C = fem.rayleigh(M, K, *rayleigh)
+    dt = 0.0005
+    loads = moving_load.crossing_loads(model, 25.0, dt, -15000.0, (0.0, 4.0), n_steps=2000)
+    record = [model.free_index(n, fem.UY) for n in (10, 20, 30)]
+    full = fem.newmark(M, C, K, loads, dt, record=record)
+
+    modal = reduced.ReducedModel.modal(K, M, 12, rayleigh=rayleigh)
+    np.testing.assert_allclose(modal.basis.T @ M @ modal.basis, np.eye(12), atol=1e-10)
+    result = modal.run(loads, dt, record=record, block=8, chunk=7)
+    errors = reduced.response_error(full, result)
+    assert errors['disp']['rms'] < 1e-3 and errors['accel']['rms'] < 2e-2
+    # Chunking and block size do not change the answer
+    again = modal.run(loads.toarray(), dt, record=record)
+    np.testing.assert_allclose(again['accel'], result['accel'], atol=1e-9 * np.abs(result['accel']).max())
+
+    cb = reduced.ReducedModel.craig_bampton(K, M, record, 6, rayleigh=rayleigh)
+    assert cb.n_modes == 9
+    assert reduced.response_error(full, cb.run(loads, dt, record=record))['disp']['rms'] < 1e-3
+
+
+def test_craig_bampton_static_and_initial_conditions():
+    model = fem.Frame2D.beam(10.0, 20, 2e11, 0.01, 8e-5, 80.0)
+    K, M = model.stiffness(), model.mass()
+    load_dof = model.free_index(7, fem.UY)
+    force = np.zeros(model.n_free)
+    force[load_dof] = -1000.0
+    static = sp.linalg.spsolve(sp.csc_matrix(K), force)
+
+    # Boundary load: the constraint modes carry the static response exactly
+    cb = reduced.ReducedModel.craig_bampton(K, M, [load_dof], 1, zeta=0.9)
+    truncated = reduced.ReducedModel.modal(K, M, 2, zeta=0.9)
+    steps = 4000
+    loads = np.tile(force, (steps, 1))
+    np.testing.assert_allclose(cb.run(loads, 0.001)['disp'][-1], static, atol=1e-9 * np.abs(static).max())
+    assert not np.allclose(truncated.run(loads, 0.001)['disp'][-1], static, rtol=1e-4)
+
+    # Free vibration from the static shape, with a callable (zero) load
+    modal = reduced.ReducedModel.modal(K, M, 30)
+    result = modal.run(lambda i: np.zeros(model.n_free), 0.0005, n_steps=400, record=[load_dof],
+                       u0=static, v0=np.zeros(model.n_free), M=M)
+    full = fem.newmark(M, sp.csr_matrix(K.shape), K, lambda i: np.zeros(model.n_free), 0.0005 / 4,
+                       n_steps=1600, record=[load_dof], u0=static)
+    np.testing.assert_allclose(result['disp'][:, 0], full['disp'][3::4, 0], atol=1e-2 * abs(static[load_dof]))
+    assert result['modal_peaks'].shape == (30,)
@@ -0,0 +1,65 @@
+import os
+import zipfile
+
+from soils.report_store import ReportStore, parse_file_name
+
+_DOC = """<?xml version="1.0" encoding="UTF-8"?>
+<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>
+<w:p><w:r><w:t>Job Card No.{lab}/S/2023 Sample Description: Gravel for base   7.</w:t></w:r></w:p>
+<w:tbl>{rows}</w:tbl></w:body></w:document>"""
+
+
+def _row(cells):
+    return '<w:tr>' + ''.join(f'<w:tc><w:p><w:r><w:t>{c}</w:t></w:r></w:p></w:tc>' for c in cells) + '</w:tr>'
+
+
+def _write_report(folder, name, lab):
+    rows = [
+        _row(['Sample No.', 'Reference', 'Grading', 'LL', 'PL', 'PI', 'LS', 'PM', 'MDD', 'OMC', 'CBR', 'Swell']),
+        _row(['922/S/22', 'Gravel', '100', '78', '48', '25', '11', '9', '34', '16', '18', '9',
+              '209', '1996', '11.3', '45', '&lt;0.1']),
+        _row(['', '', 'SOIL COMPOSITION: Gravel =75%, Sand =16%, Silt/clay =9%']),
+    ]
+    with zipfile.ZipFile(os.path.join(folder, name), 'w') as archive:
+        archive.writestr('word/document.xml', _DOC.format(lab=lab, rows=''.join(rows)))
+
+
+def test_parse_file_name():
+    meta = parse_file_name('10.01.2023 CRJE KAA 1420&1427fdd.docx')
+    assert meta['report_date'] == '2023-01-10'
+    assert meta['lab_numbers'] == [1420, 1427]
+    assert meta['test_type'] == 'fdd'
+    assert meta['agency'] == 'KAA'
+    meta = parse_file_name('14.07.23 RE, KURA  neat 077.docx')
+    assert (meta['client'], meta['agency'], meta['lab_numbers']) == ('RE KURA', 'KURA', [77])
+    # Test type glued to the client name
+    meta = parse_file_name('20.04.23  GLOBAL LINK LTDneat 2175.docx')
+    assert (meta['client'], meta['test_type'], meta['lab_numbers']) == ('GLOBAL LINK LTD', 'neat', [2175])
+    meta = parse_file_name('7.02.2023  UnknownNeat.docx')
+    assert (meta['client'], meta['test_type'], meta['lab_numbers']) == ('Unknown', 'neat', [])
+    # Gravel grade is not a lab number; a lone number after GCS is
+    meta = parse_file_name('27.03.2023 INTERCONTINENTAL CONSULTANTS  GCS 040 1799.docx')
+    assert (meta['client'], meta['test_type'], meta['lab_numbers']) == ('INTERCONTINENTAL CONSULTANTS', 'gcs', [1799])
+    assert parse_file_name('31.08.2023 RE KENHA GCS 334  .docx')['lab_numbers'] == [334]
+
+
+def test_refresh_and_query(tmp_path):
+    folder = tmp_path / 'reports'
+    folder.mkdir()
+    _write_report(folder, '14.07.23 RE, KURA  neat 077.docx', 77)
+    _write_report(folder, '02.05.2023 RESIDENT ENGINEER KeNHA  2307 Neat.docx', 2307)
+
+    with ReportStore(str(tmp_path / 'store.sqlite')) as store:
+        assert store.refresh(folder, verbose=False)['added'] == 2
+        df = store.samples(agency='KURA', test_type='neat', quarter='2023Q3')
+        assert len(df) == 1
+        assert df.loc[0, 'CBR.4daysSoak.(%)'] == 45
+        assert df.loc[0, 'Swell.(%)'] == 0.1
+        assert df.loc[0, 'SoilComposition.SiltClay.(%)'] == 9
+        assert store.reports(lab_no=2307)['client'].tolist() == ['RESIDENT ENGINEER KeNHA']
+
+        _write_report(folder, '16.08.23 SAMA HOLDINGS 308 neat.docx', 308)
+        os.remove(folder / '02.05.2023 RESIDENT ENGINEER KeNHA  2307 Neat.docx')
+        stats = store.refresh(folder, verbose=False)
+        assert (stats['added'], stats['removed'], stats['unchanged']) == (1, 1, 1)
+        assert len(store.samples()) == 2
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from scipy.linalg import expm
+
+from Structural_monitoring import response_spectrum as rs
+
+
+def test_nigam_jennings_matches_exact_discretization():
+    dt = 0.02
+    for period, zeta in [(0.05, 0.02), (1.0, 0.05), (7.0, 0.2)]:
+        w = 2 * np.pi / period
+        # States (u, v, ag, slope) with ag linear over the step
+        M = np.zeros((4, 4))
+        M[:2, :2] = [[0, 1], [-w**2, -2 * zeta * w]]
+        M[1, 2] = -1
+        M[2, 3] = 1
+        E = expm(M * dt)
+        A, B = rs.nigam_jennings(period, zeta, dt)
+        np.testing.assert_allclose(A, E[:2, :2], rtol=1e-10, atol=1e-14)
+        np.testing.assert_allclose(B, np.column_stack([E[:2, 2] - E[:2, 3] / dt, E[:2, 3] / dt]),
+                                   rtol=1e-9, atol=1e-14)
+
+
+def test_block_spectra_match_step_recurrence():
+    rng = np.random.default_rng(0)
+    ag = rng.standard_normal((4, 333))
+    lengths = [333, 300, 40, 5]
+    periods = np.array([0.0, 0.05, 0.3, 1.0, 4.0])
+    damping = [0.02, 0.1]
+    dt = 0.01
+    result = rs.response_spectrum(ag, dt, periods, damping, lengths=lengths)
+    assert result['Sa'].shape == (4, 2, 5)
+
+    w = 2 * np.pi / periods[1:]
+    for r, n in enumerate(lengths):
+        for j, zeta in enumerate(damping):
+            A, B = rs.nigam_jennings(periods[1:], zeta, dt)
+            x = np.zeros((len(w), 2))
+            peak = np.zeros((len(w), 3))
+            for i in range(n - 1):
+                x = np.einsum('pij,pj->pi', A, x) + B @ ag[r, i:i + 2]
+                a = -(w**2 * x[:, 0] + 2 * zeta * w * x[:, 1])
+                peak = np.maximum(peak, np.abs(np.column_stack([x, a])))
+            for k, key in enumerate(('Sd', 'Sv', 'Sa')):
+                np.testing.assert_allclose(result[key][r, j, 1:], peak[:, k], rtol=1e-10, atol=1e-14)
+            # Rigid oscillator follows the ground
+            assert result['Sa'][r, j, 0] == pytest.approx(np.abs(ag[r, :n]).max())
+    np.testing.assert_allclose(result['PSA'][..., 1:], w**2 * result['Sd'][..., 1:])
+
+
+def test_resonant_harmonic_and_single_record_shape():
+    dt = 0.005
+    t = dt * np.arange(4000)
+    ag = np.sin(2 * np.pi * t)            # 1 Hz, 20 s
+    result = rs.response_spectrum(ag, dt, [0.2, 1.0, 5.0], damping=0.05)
+    assert result['Sd'].shape == (3,)
+    # Resonant steady state amplitude ag / (2 zeta w^2)
+    assert result['Sd'][1] == pytest.approx(1 / (2 * 0.05 * (2 * np.pi)**2), rel=0.02)
+    # Stiff oscillator: quasi-static amplification of the ground motion
+    assert result['PSA'][0] == pytest.approx(1 / (1 - 0.2**2), rel=0.05)
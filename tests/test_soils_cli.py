@@ -0,0 +1,52 @@
+import subprocess
+import sys
+import time
+
+from soils.cli import main
+from soils.training import PREDICTION_COL
+
+HEAVY = ('pandas', 'sklearn', 'matplotlib', 'seaborn', 'shap')
+
+
+def test_cli_startup_imports_no_heavy_libraries():
+    code = ("import sys, soils, soils.cli; "
+            f"print(','.join(m for m in {HEAVY!r} if m in sys.modules))")
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    elapsed = time.perf_counter() - start
+    assert out.stdout.strip() == ''
+    assert elapsed < 2.0
+
+
+def test_split_train_score_round_trip(tmp_path):
+    import pandas as pd
+
+    main(['split', '--out-dir', str(tmp_path), '--methods', 'random'])
+    model = tmp_path / 'model.pkl'
+    main(['train', str(tmp_path / 'soil_train_random.csv'), str(tmp_path / 'soil_test_random.csv'),
+          '--model-out', str(model)])
+    out = tmp_path / 'scored.csv'
+    main(['score', str(model), str(tmp_path / 'soil_test_random.csv'), '--out', str(out)])
+    scored = pd.read_csv(out)
+    assert PREDICTION_COL in scored.columns
+    assert scored[PREDICTION_COL].notna().all()
+
+
+def test_chunked_train_passes_subsample(tmp_path, monkeypatch):
+    from soils import out_of_core, training
+
+    main(['split', '--out-dir', str(tmp_path), '--methods', 'random'])
+    train_csv, test_csv = str(tmp_path / 'soil_train_random.csv'), str(tmp_path / 'soil_test_random.csv')
+    train_df, test_df = training.load_split(train_csv, test_csv, 'random', verbose=False)
+    assert len(train_df) > len(test_df) > 0
+
+    fit_block = out_of_core._fit_block
+    seen = []
+
+    def spy(X, y, n_estimators, subsample, seed):
+        seen.append(subsample)
+        return fit_block(X, y, n_estimators, subsample, seed)
+
+    monkeypatch.setattr(out_of_core, '_fit_block', spy)
+    main(['train', train_csv, test_csv, '--chunked', '--subsample', '0.5', '--block-size', '100'])
+    assert seen and set(seen) == {0.5}
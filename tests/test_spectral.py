@@ -0,0 +1,41 @@
+import numpy as np
+import scipy.signal as ss
+
+from Structural_monitoring import bridges, fem, spectral
+
+
+def test_welch_matches_scipy_for_stacked_channels():
+    x = np.random.default_rng(0).standard_normal((3, 2, 4000))
+    freqs, psd = spectral.welch(x, 200.0, nperseg=500, nfft=1024)
+    ref_freqs, ref = ss.welch(x, 200.0, nperseg=500, noverlap=250, nfft=1024)
+    np.testing.assert_allclose(freqs, ref_freqs)
+    np.testing.assert_allclose(psd, ref, rtol=1e-10)
+
+
+def test_parabolic_peaks_resolve_between_bins():
+    fs = 500.0
+    t = np.arange(10000) / fs
+    true = np.array([[3.137, 11.52], [4.071, 17.33]])
+    x = np.sin(2 * np.pi * true[:, :1] * t) + 0.5 * np.sin(2 * np.pi * true[:, 1:] * t)
+    freqs, psd = spectral.welch(x, fs, nperseg=2048)
+    peaks, amplitude = spectral.pick_peaks(freqs, psd, n_peaks=2)
+    # Bin spacing is 0.24 Hz; interpolation does far better
+    np.testing.assert_allclose(peaks, true, atol=0.01)
+    assert np.all(amplitude[:, 0] > amplitude[:, 1])
+
+
+def test_free_vibration_recovers_model_frequencies():
+    model = bridges.bridge_car1_model()
+    K, M = model.stiffness(), model.mass()
+    omega, _ = fem.eigen(K, M, 2)
+    C = fem.rayleigh(M, K, *fem.rayleigh_coefficients(0.01, omega[0], omega[1]))
+    # Impulse at a quarter point excites the first two bending modes
+    n_steps, dt = 4000, 0.002
+    loads = np.zeros((n_steps, model.n_free))
+    loads[0, model.free_index(model.n_elem // 4, fem.UY)] = -1e6
+    sensors = model.free_index([model.n_elem // 4, model.n_elem // 3], fem.UY)
+    accel = fem.newmark(M, C, K, loads, dt, record=sensors)['accel'].T
+
+    result = spectral.screen(accel, 1.0 / dt, omega / (2 * np.pi), nperseg=2048, nfft=8192)
+    assert result['matched'].all()
+    assert np.abs(result['error']).max() < 0.01
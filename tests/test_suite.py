@@ -0,0 +1,80 @@
+import os
+
+import numpy as np
+import pytest
+
+from Structural_monitoring import column, motions, suite
+
+
+@pytest.fixture
+def records(tmp_path):
+    rng = np.random.default_rng(3)
+    directory = tmp_path / 'records'
+    directory.mkdir()
+    time = 0.01 * np.arange(400)
+    np.savetxt(directory / 'two_column.txt', np.column_stack([time, 0.1 * rng.standard_normal(400)]))
+    np.savetxt(directory / 'single.dat', 0.1 * rng.standard_normal(250))
+    values = 0.1 * rng.standard_normal(300)
+    lines = [' '.join(f'{x:.7e}' for x in values[i:i + 5]) for i in range(0, 300, 5)]
+    (directory / 'peer.AT2').write_text('PEER NGA\nrecord\nACCELERATION IN G\n'
+                                        'NPTS=  300, DT= .0200 SEC\n' + '\n'.join(lines) + '\n')
+    return str(directory)
+
+
+def test_read_record_formats(records):
+    accel, dt = suite.read_record(os.path.join(records, 'peer.AT2'))
+    assert accel.shape == (300,) and dt == 0.02
+    accel, dt = suite.read_record(os.path.join(records, 'two_column.txt'))
+    assert accel.shape == (400,) and dt == pytest.approx(0.01)
+    with pytest.raises(ValueError):
+        suite.read_record(os.path.join(records, 'single.dat'))
+    assert len(suite.find_records(records)) == 3
+
+
+def test_suite_scaling_histories_and_cache(records, tmp_path):
+    path = str(tmp_path / 'store')
+    summary = suite.run_suite(records, [0.5, 1.0], path, record_dt=0.02, n_jobs=2, verbose=False)
+    assert len(summary) == 6 and not summary['cached'].any()
+    assert (summary['runtime'] > 0).all()
+
+    # Linear model: responses scale with the record
+    by_factor = summary.set_index(['record', 'factor'])
+    for name in ('two_column.txt', 'single.dat', 'peer.AT2'):
+        np.testing.assert_allclose(by_factor.loc[(name, 1.0), 'peak_drift'],
+                                   2 * by_factor.loc[(name, 0.5), 'peak_drift'], rtol=1e-10)
+
+    # Stored histories match a direct run of the column
+    store = suite.SuiteStore(path)
+    row = summary[(summary['record'] == 'peer.AT2') & (summary['factor'] == 1.0)].iloc[0]
+    histories, stored = store.read(row['run'])
+    accel, dt = suite.read_record(os.path.join(records, 'peer.AT2'))
+    direct = column.run(accel * 9.81, dt, row['n_steps'], nodes=((3, 1), (2, 1)))
+    np.testing.assert_allclose(histories['top_disp'], direct['disp'][:, 0])
+    assert stored['peak_drift'] == pytest.approx(np.abs(histories['drift']).max())
+
+    # Re-run with one more factor: only the new analyses are computed
+    mtime = os.path.getmtime(store.run_path(row['run']))
+    summary = suite.run_suite(records, [0.5, 1.0, 2.0], path, record_dt=0.02, verbose=False)
+    assert summary['cached'].sum() == 6 and len(summary) == 9
+    assert os.path.getmtime(store.run_path(row['run'])) == mtime
+    assert len(store.summary()) == 9
+
+
+def test_run_key_follows_record_contents(records, tmp_path):
+    settings = {'units': 9.81}
+    path = os.path.join(records, 'two_column.txt')
+    key = suite.run_key(path, 1.0, settings)
+    os.utime(path, (0, 0))
+    assert suite.run_key(path, 1.0, settings) == key
+    with open(path, 'a') as f:
+        f.write('4.0 0.0\n')
+    assert suite.run_key(path, 1.0, settings) != key
+    assert suite.run_key(path, 2.0, settings) != suite.run_key(path, 1.0, settings)
+
+    # Store records are keyed by their own samples
+    values = np.random.default_rng(4).standard_normal((2, 100))
+    store = str(tmp_path / 'motions')
+    first = [suite.run_key(p, 1.0, settings) for p in motions.write_records(store, [values], 0.02, 100).paths()]
+    values[1] *= 2
+    second = [suite.run_key(p, 1.0, settings) for p in motions.write_records(store, [values], 0.02, 100).paths()]
+    assert first[0] == second[0] and first[1] != second[1]
@@ -0,0 +1,43 @@
+import os
+
+import numpy as np
+import pytest
+
+from Structural_monitoring import sweep
+
+
+def test_grid_and_latin_hypercube_tables():
+    table = sweep.grid(speed=[10, 20], damage=[0.0, 0.2, 0.4])
+    assert len(table) == 6
+    assert (table['span'] == sweep.DEFAULTS['span']).all()
+
+    lhs = sweep.latin_hypercube(10, {'speed': (10, 30), 'damping': (0.01, 0.05)})
+    # One sample per stratum in every sampled dimension
+    strata = np.floor((lhs['speed'] - 10) / 2).astype(int)
+    assert sorted(strata) == list(range(10))
+    with pytest.raises(ValueError):
+        sweep.grid(mass=[1.0])
+
+
+def test_sweep_store_roundtrip_and_resume(tmp_path):
+    scenarios = sweep.grid(speed=[20.0, 30.0], span=[10.0, 12.0], damage=[0.0, 0.3])
+    path = str(tmp_path / 'store')
+    store = sweep.run_sweep(scenarios, path, dt=0.005, chunk_size=3, n_jobs=2, verbose=False)
+    assert store.completed_chunks() == {0, 1, 2}
+    data = store.histories()
+    assert data.shape == (8, store.meta['n_steps'], 3)
+
+    expected = sweep.simulate(store.index.iloc[5], 0.005, store.meta['n_steps'])
+    np.testing.assert_allclose(data[5], expected, rtol=1e-5, atol=1e-6)
+
+    # Interrupted sweep: only the missing chunk is recomputed
+    os.remove(store.chunk_path(1))
+    mtime = os.path.getmtime(store.chunk_path(0))
+    sweep.run_sweep(scenarios, path, verbose=False)
+    assert os.path.getmtime(store.chunk_path(0)) == mtime
+    np.testing.assert_array_equal(store.histories(), data)
+
+    damaged = store.query(damage=0.3, speed=(25, 35))
+    assert len(damaged) == 2
+    with pytest.raises(ValueError):
+        sweep.run_sweep(scenarios.iloc[:4], path, verbose=False)
@@ -0,0 +1,133 @@
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from Structural_monitoring import bridges, tcl_import
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MONITORING = os.path.join(ROOT, 'Structural_monitoring')
+BRIDGE1 = os.path.join(MONITORING, 'bridge_car1')
+
+
+def test_interpreter_core():
+    interp = tcl_import.TclInterpreter()
+    interp.eval('set total 0; for {set i 1} {$i <= 10} {incr i} {'
+                ' if {$i % 2 == 0} {continue} elseif {$i > 7} {break}; set total [expr $total + $i] }')
+    assert interp.vars['total'] == '16'
+    assert interp.expr('7 / 2') == '3' and interp.expr('7 / 2.0') == '3.5'
+    assert interp.expr('sqrt(4) + 2**3') == '10.0'
+    interp.eval('set xs {}; foreach {a b} {1 2 3 4} {lappend xs [expr {$a * $b}]}')
+    assert interp.eval('llength $xs') == '2' and interp.eval('lindex $xs 1') == '12'
+    interp.eval('set f [open "out.txt" "w"]; puts $f "x = ${total}"; close $f')
+    assert interp.files['out.txt'] == 'x = 16\n'
+    with pytest.raises(tcl_import.TclError):
+        interp.eval('frobnicate 1')
+    with pytest.raises(tcl_import.TclError):
+        interp.eval('eleLoad -ele 1')
+    assert interp.eval('lindex {a b c} end') == 'c' and interp.eval('lindex {a b c} end-2') == 'a'
+    assert interp.eval('lindex {a b c} end-3') == ''
+
+
+RAYLEIGH_SCRIPT = '''
+model basic -ndm 2 -ndf 3
+for {set i 0} {$i <= 4} {incr i} {node [expr $i + 1] [expr 2.5 * $i] 0.0 -mass 100.0 100.0 0.0}
+fix 1 1 1 0
+fix 5 0 1 0
+node 6 20.0 0.0
+fix 6 1 1 1
+mass 6 1.0 1.0 0.0
+remove node 6
+geomTransf Linear 1
+for {set i 1} {$i <= 4} {incr i} {element elasticBeamColumn $i $i [expr $i + 1] 0.01 2e11 1e-5 1}
+set lam [eigen 2]
+set w1 [expr sqrt([lindex $lam 0])]
+set w2 [expr sqrt([lindex $lam end])]
+set a0 [expr 2 * 0.02 * $w1 * $w2 / ($w1 + $w2)]
+rayleigh $a0 0.0 0.0 0.0
+puts "w1 $w1"
+'''
+
+
+def test_model_only_and_removed_nodes(tmp_path):
+    script = tmp_path / 'rayleigh.tcl'
+    script.write_text(RAYLEIGH_SCRIPT)
+    model = tcl_import.load_model(str(script))
+    assert 6 not in model.fixes and 6 not in model.masses
+    assert model.frame().n_nodes == 5
+    assert model.rayleigh[0] > 0
+
+
+@pytest.mark.parametrize('source', [
+    'expr {__import__("os").system("echo unsafe")}',
+    'expr {"abc".upper()}',
+    'expr {abs.__class__}',
+    'expr {(1).real}',
+    'expr {open("x")}',
+])
+def test_expr_rejects_python(source):
+    with pytest.raises(tcl_import.TclError):
+        tcl_import.TclInterpreter().eval(source)
+
+
+def test_bridge_car1_script_matches_opensees_outputs():
+    interp = tcl_import.run_script(os.path.join(BRIDGE1, 'bridge_car.tcl'))
+    frequencies = pd.read_csv(io.StringIO(interp.files['frequencies.txt']))['Freq(Hz)'].to_numpy()
+    expected = pd.read_csv(os.path.join(BRIDGE1, 'frequencies.txt'))['Freq(Hz)'].to_numpy()
+    np.testing.assert_allclose(frequencies, expected, rtol=1e-9)
+
+    result = np.loadtxt(io.StringIO(interp.files['accel.txt']))
+    accel = np.loadtxt(os.path.join(BRIDGE1, 'accel.txt'))
+    np.testing.assert_allclose(result[:, 0], accel[:, 0])
+    scale = np.abs(accel[:, 1]).max()
+    assert np.abs(result[:, 1] - accel[:, 1]).max() < 1e-5 * scale
+
+    # The compiled frame is the hand-built one
+    structure = interp.compile()['structure']
+    native = bridges.bridge_car1_model()
+    np.testing.assert_allclose(structure.nodes, native.nodes)
+    assert (structure.stiffness() != native.stiffness()).nnz == 0
+
+
+def test_bridge_car2_script_matches_opensees_output():
+    bridge2 = os.path.join(MONITORING, 'bridge_car2')
+    interp = tcl_import.run_script(os.path.join(bridge2, 'bridge_car2.tcl'))
+    result = np.loadtxt(io.StringIO(interp.files['accello.txt']))
+    accel = np.loadtxt(os.path.join(bridge2, 'accello.txt'))
+    np.testing.assert_allclose(result[:, 0], accel[:, 0])
+    scale = np.abs(accel[:, 1]).max()
+    assert np.abs(result[:, 1] - accel[:, 1]).max() < 1e-5 * scale
+
+
+def test_testing_script():
+    interp = tcl_import.run_script(os.path.join(MONITORING, 'testing.tcl'))
+    assert interp.output == ['Hello World!\n']
+
+
+def test_analysis_script_matches_modal_data():
+    interp = tcl_import.run_script(os.path.join(MONITORING, 'analysis', 'analysis.tcl'))
+    result = pd.read_csv(io.StringIO(interp.files['modal_data.csv']), index_col='State')
+    expected = pd.read_csv(os.path.join(ROOT, 'modal_data.csv'), index_col='State')
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), rtol=1e-9)
+
+
+def test_models_of_other_scripts():
+    truss = tcl_import.load_model(os.path.join(ROOT, 'TCL', 'Trusses.tcl'))
+    assert (truss.ndm, truss.ndf) == (2, 2)
+    assert truss.element_types() == {'truss': 3}
+    assert truss.nodes[3] == pytest.approx([3.0, 3 * np.sqrt(3)])
+    np.testing.assert_allclose(truss.patterns[1]['loads'][3], [0.0, -10000.0])
+    interp = tcl_import.run_script(os.path.join(ROOT, 'TCL', 'Trusses.tcl'))
+    with open(os.path.join(ROOT, 'TCL', 'forces.txt')) as f:
+        assert interp.files['forces.txt'].split() == f.read().split()
+
+    column = tcl_import.load_model(os.path.join(MONITORING, 'scy_scapper', 'scy_scraper.tcl'))
+    assert column.elements[1]['directions'] == [1, 2, 1]
+    assert column.patterns[1]['type'] == 'UniformExcitation'
+    section = column.fiber_section(1)
+    assert section.concrete_area.sum() == pytest.approx(1.0)
+    np.testing.assert_allclose(section.steel_y, 0.4)
+    with pytest.raises(tcl_import.TclError):
+        column.frame()
@@ -0,0 +1,67 @@
+import os
+
+import numpy as np
+import pytest
+
+from Structural_monitoring import truss
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _triangle():
+    model = truss.Truss([[0.0, 0.0], [6.0, 0.0], [3.0, 3 * np.sqrt(3)]], [[0, 1], [0, 2], [1, 2]], 200e9, 0.001)
+    model.fix(0, 1, 1)
+    model.fix(1, 0, 1)
+    return model
+
+
+def test_matches_opensees_forces():
+    model = _triangle()
+    result = model.solve(model.load_cases([{2: (0.0, -10000.0)}])[0])
+    expected = np.loadtxt(os.path.join(ROOT, 'TCL', 'forces.txt'))
+    np.testing.assert_allclose(result['axial_force'], expected, rtol=1e-5)
+    np.testing.assert_allclose(result['stress'], result['axial_force'] / 0.001)
+    np.testing.assert_allclose(result['reactions'], [[0.0, 5000.0], [0.0, 5000.0], [0.0, 0.0]], atol=1e-9)
+
+    model.fix(1, 0, 0)
+    with pytest.raises(ValueError):
+        model.solve(np.zeros(model.n_dof))
+
+
+def test_load_cases_share_one_factorization():
+    model, bottom = truss.warren(20, depth=3.0)
+    rng = np.random.default_rng(0)
+    loads = rng.normal(size=(6, model.n_dof)) * 1e4
+    batch = model.solve(loads)
+    for case in (0, 5):
+        single = model.solve(loads[case])
+        for key in ('disp', 'axial_force', 'reactions'):
+            np.testing.assert_allclose(batch[key][case], single[key], rtol=1e-10, atol=1e-9)
+    # Equilibrium at the free DOFs, and reactions balance the applied loads
+    K = model.stiffness()
+    free = model.free_dofs
+    u = batch['disp'].reshape(6, -1)[:, free]
+    np.testing.assert_allclose((K @ u.T).T, loads[:, free], rtol=1e-8, atol=1e-4)
+    np.testing.assert_allclose(batch['reactions'].sum(axis=1), -loads.reshape(6, -1, 2).sum(axis=1), rtol=1e-9)
+
+
+def test_3d_truss():
+    # A plane truss embedded in 3D with every z DOF held gives the 2D answer
+    plane, bottom = truss.warren(10, depth=2.0)
+    spatial = truss.Truss(np.column_stack([plane.nodes, np.zeros(plane.n_nodes)]), plane.elements, 200e9, 0.001)
+    spatial.fixed[:] = np.column_stack([plane.fixed, np.ones(plane.n_nodes, dtype=bool)])
+    loads = np.zeros((plane.n_nodes, 3))
+    loads[bottom[1:-1], 1] = -20000.0
+    loads[bottom[3], 0] = 5000.0
+    result = spatial.solve(loads.ravel())
+    expected = plane.solve(loads[:, :2].ravel())
+    np.testing.assert_allclose(result['axial_force'], expected['axial_force'], rtol=1e-9)
+    np.testing.assert_allclose(result['disp'][:, :2], expected['disp'], rtol=1e-9, atol=1e-15)
+
+    box, bottom = truss.warren(10, depth=2.0, width=3.0)
+    assert box.ndm == 3 and box.stiffness().shape == (box.n_free, box.n_free)
+    loads = np.zeros((box.n_nodes, 3))
+    loads[bottom[:, 5], 1] = -50000.0
+    loads[bottom[0, 2], 2] = 1000.0
+    result = box.solve(loads.ravel())
+    np.testing.assert_allclose(result['reactions'].sum(axis=0), [0.0, 100000.0, -1000.0], atol=1e-6)
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from soils import validation as v
+
+
+def _frame():
+    return pd.DataFrame({
+        'SampleNo.': [1, 2, 3, 4],
+        'Grading.%PassingBSSieveSize(mm).10': [90, 60, 90, 90],
+        'Grading.%PassingBSSieveSize(mm).2': [50, 70, 50, 50],
+        'Grading.%PassingBSSieveSize(mm).0.075': [20, 20, 20, 20],
+        'AtterbergLimits.LL.%': [40, 40, 40, 40],
+        'AtterbergLimits.PL.%': [25, 25, 25, 25],
+        'AtterbergLimits.PI.%': [15, 15, 9, 15],
+        'SoilComposition.Gravel.(%)': [50, 50, 50, 50],
+        'SoilComposition.Sand.(%)': [30, 30, 30, 40],
+        'SoilComposition.SiltClay.(%)': [20, 20, 20, 20],
+        'CBR.4daysSoak.(%)': [30.0, 12.0, 8.0, np.nan],
+        'CBR_Bin': ['Medium', 'Medium', 'Low', 'Low'],
+    })
+
+
+def test_rule_bits_per_row():
+    mask, summary = v.validate_frame(_frame())
+    assert mask[0] == 0
+    assert mask[1] == v.GRADING_NOT_MONOTONIC
+    assert mask[2] == v.PI_MISMATCH
+    assert mask[3] == v.COMPOSITION_SUM | v.MISSING_TARGET
+    assert summary.set_index('rule').loc['any', 'rows'] == 3
+    assert v.describe(mask[3]) == ['composition_sum', 'missing_target']
+
+
+def test_text_in_measurements_is_flagged_but_labels_are_not():
+    df = _frame().astype({'AtterbergLimits.LL.%': object})
+    df.loc[0, 'AtterbergLimits.LL.%'] = 'NP'
+    clean, mask = v.drop_invalid(df, verbose=False)
+    assert mask[0] == v.NON_NUMERIC
+    assert 1 not in clean['SampleNo.'].tolist()
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+import scipy.sparse.linalg as spla
+
+from Structural_monitoring import bridges, fem, moving_load, vbi
+
+
+def test_light_stiff_vehicle_is_a_moving_force():
+    model = bridges.bridge_car1_model()
+    K, M = model.stiffness(), model.mass()
+    C = fem.rayleigh(M, K, 0.5, 0.002)
+    car = vbi.Vehicle.quarter_car(ms=20.0, mu=2.0, ks=1e8, cs=1e3, kt=1e8)
+    dt, speed = 0.002, 20.0
+    mid = model.free_index(15, fem.UY)
+    result = vbi.simulate(model, [(car, speed, 0.0)], dt, K=K, M=M, C=C, record=[mid])
+    assert result['converged'].all()
+
+    n_steps = len(result['time'])
+    positions = moving_load.axle_positions(result['time'], speed)
+    force = fem.newmark(M, C, K, moving_load.load_matrix(model, positions, -car.weight), dt, record=[mid])
+    peak = np.abs(force['disp']).max()
+    assert np.abs(result['disp'] - force['disp']).max() < 2e-3 * peak
+    # Quasi-static reference of the same wheel load
+    static = moving_load.load_matrix(model, positions, -car.weight)
+    np.testing.assert_allclose(result['static'][:, 0], spla.spsolve(K.tocsc(), static.T.toarray())[mid],
+                               atol=1e-9 * peak)
+    assert n_steps == int(np.ceil(30.0 / speed / dt))
+
+
+def test_quarter_car_on_rough_rigid_road_matches_transmissibility():
+    model = bridges.bridge_car1_model(E=3e16)
+    car = vbi.Vehicle.quarter_car()
+    speed, wavelength, amplitude = 15.0, 6.0, 0.005
+    x = np.arange(-100.0, 31.0, 0.01)
+    road = amplitude * np.sin(2 * np.pi * x / wavelength)
+    result = vbi.simulate(model, [(car, speed, 100.0 / speed)], 0.001, roughness=(x, road), record=[0])
+
+    omega = 2 * np.pi * speed / wavelength
+    dynamic = car.K + np.diag([0.0, 2e5]) - omega**2 * car.M + 1j * omega * car.C
+    response = np.linalg.solve(dynamic, [0.0, 2e5 * amplitude])
+    # Steady state on the approach, before the deck
+    steady = (result['time'] > 3.0) & (result['time'] < 6.5)
+    sprung = result['vehicle_disp'][steady, 0]
+    assert (sprung.max() - sprung.min()) / 2 == pytest.approx(abs(response[0]), rel=1e-2)
+
+
+def test_half_car_traffic_static_axle_loads():
+    model = bridges.bridge_car1_model(E=3e14)
+    truck = vbi.Vehicle.half_car()
+    traffic = vbi.traffic_stream(3, 2.0, 6.0, [truck, vbi.Vehicle.quarter_car()], seed=None)
+    result = vbi.simulate(model, traffic, 0.005)
+    assert result['converged'].all()
+    assert result['contact_force'].shape[1] == 2 + 1 + 2
+    # With both axles of the slow first truck on the stiff deck, the tires
+    # carry the static axle loads
+    both = (result['time'] > 3.0) & (result['time'] < 14.0)
+    front = truck.M[0, 0] * 2.0 / 4.5 + truck.M[2, 2]
+    rear = truck.M[0, 0] * 2.5 / 4.5 + truck.M[3, 3]
+    np.testing.assert_allclose(result['contact_force'][both][:, :2].mean(axis=0), -vbi.G * np.array([front, rear]),
+                               rtol=1e-3)
+    assert vbi.iso_roughness(0.0, 100.0, 'C', seed=1)[1].std() > vbi.iso_roughness(0.0, 100.0, 'A', seed=1)[1].std()